@@ -11,7 +11,7 @@ from app.models import Base
 from app.core.config import settings
 
 # Import all models so Alembic can detect them
-from app.models import User, Player, Team, TeamPlayer, Match, MatchSet  # noqa
+from app.models import User, Player, Season, Division, Team, TeamPlayer, Match, MatchSet, DataVersion, StandingsSnapshot, TeamRating  # noqa
 
 # this is the Alembic Config object
 config = context.config
@@ -0,0 +1,62 @@
+"""add_match_result_summary
+
+Revision ID: add_match_result_summary
+Revises: index_audit
+Create Date: 2026-10-19 22:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_match_result_summary'
+down_revision: Union[str, None] = 'index_audit'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Backfill from the sets of every match that has a result
+BACKFILL_SUMMARY = """
+    UPDATE matches SET
+        home_sets_won = s.home_sets_won,
+        away_sets_won = s.away_sets_won,
+        home_games = s.home_games,
+        away_games = s.away_games,
+        winner_team_id = CASE
+            WHEN s.home_sets_won >= 2 THEN matches.home_team_id
+            WHEN s.away_sets_won >= 2 THEN matches.away_team_id
+        END
+    FROM (
+        SELECT match_id,
+               count(*) FILTER (WHERE home_games > away_games) AS home_sets_won,
+               count(*) FILTER (WHERE away_games > home_games) AS away_sets_won,
+               sum(home_games) AS home_games,
+               sum(away_games) AS away_games
+        FROM match_sets
+        GROUP BY match_id
+    ) AS s
+    WHERE s.match_id = matches.id
+"""
+
+
+def upgrade() -> None:
+    # Result summary maintained by enter_match_result (apply_result_summary)
+    op.add_column('matches', sa.Column('home_sets_won', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('matches', sa.Column('away_sets_won', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('matches', sa.Column('home_games', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('matches', sa.Column('away_games', sa.Integer(), server_default='0', nullable=False))
+    op.add_column('matches', sa.Column('winner_team_id', sa.UUID(), nullable=True))
+    op.create_foreign_key('matches_winner_team_id_fkey', 'matches', 'teams', ['winner_team_id'], ['id'])
+
+    op.execute(BACKFILL_SUMMARY)
+
+
+def downgrade() -> None:
+    op.drop_constraint('matches_winner_team_id_fkey', 'matches', type_='foreignkey')
+    op.drop_column('matches', 'winner_team_id')
+    op.drop_column('matches', 'away_games')
+    op.drop_column('matches', 'home_games')
+    op.drop_column('matches', 'away_sets_won')
+    op.drop_column('matches', 'home_sets_won')
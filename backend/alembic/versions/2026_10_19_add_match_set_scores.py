@@ -0,0 +1,48 @@
+"""add_match_set_scores
+
+Revision ID: add_match_set_scores
+Revises: add_match_result_summary
+Create Date: 2026-10-19 23:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_match_set_scores'
+down_revision: Union[str, None] = 'add_match_result_summary'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # [home1, away1, home2, away2, home3, away3], -1 = set not played (MATCH_SET_STORAGE=array)
+    op.add_column('matches', sa.Column('set_scores', postgresql.ARRAY(sa.SmallInteger()), nullable=True))
+
+    # Filled from the sets of every match with a result; the match_sets rows stay
+    # (scripts/convert_set_storage.py --to array removes them)
+    op.execute("""
+        UPDATE matches SET set_scores = s.scores
+        FROM (
+            SELECT match_id, ARRAY[
+                coalesce(max(home_games) FILTER (WHERE set_number = 1), -1),
+                coalesce(max(away_games) FILTER (WHERE set_number = 1), -1),
+                coalesce(max(home_games) FILTER (WHERE set_number = 2), -1),
+                coalesce(max(away_games) FILTER (WHERE set_number = 2), -1),
+                coalesce(max(home_games) FILTER (WHERE set_number = 3), -1),
+                coalesce(max(away_games) FILTER (WHERE set_number = 3), -1)
+            ]::smallint[] AS scores
+            FROM match_sets
+            GROUP BY match_id
+        ) AS s
+        WHERE s.match_id = matches.id
+    """)
+
+
+def downgrade() -> None:
+    # Matches entered with MATCH_SET_STORAGE=array: restore their rows first
+    # (scripts/convert_set_storage.py --to rows)
+    op.drop_column('matches', 'set_scores')
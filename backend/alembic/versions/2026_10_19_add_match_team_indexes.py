@@ -0,0 +1,29 @@
+"""add_match_team_indexes
+
+Revision ID: add_match_team_indexes
+Revises: add_data_version
+Create Date: 2026-10-19 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_match_team_indexes'
+down_revision: Union[str, None] = 'add_data_version'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Built without locking matches against result entry; CONCURRENTLY cannot run in a transaction
+    with op.get_context().autocommit_block():
+        op.create_index('ix_matches_home_team_date', 'matches', ['home_team_id', 'date'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_matches_away_team_date', 'matches', ['away_team_id', 'date'], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_matches_away_team_date', table_name='matches', postgresql_concurrently=True)
+        op.drop_index('ix_matches_home_team_date', table_name='matches', postgresql_concurrently=True)
@@ -0,0 +1,26 @@
+"""add_season_archived_at
+
+Revision ID: add_season_archived_at
+Revises: add_seasons_and_divisions
+Create Date: 2026-10-19 15:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_season_archived_at'
+down_revision: Union[str, None] = 'add_seasons_and_divisions'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Set by scripts/archive_season.py once a season lives in the columnar archive
+    op.add_column('seasons', sa.Column('archived_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('seasons', 'archived_at')
@@ -0,0 +1,26 @@
+"""add_season_rules
+
+Revision ID: add_season_rules
+Revises: add_team_ratings
+Create Date: 2026-10-19 23:55:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_season_rules'
+down_revision: Union[str, None] = 'add_team_ratings'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # NULL = default rules (3/2/1/0 points; matches won, set and game difference)
+    op.add_column('seasons', sa.Column('rules', sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('seasons', 'rules')
@@ -0,0 +1,120 @@
+"""add_seasons_and_divisions
+
+Replaces the fixed A/B group enum on teams and matches with season-scoped
+divisions. Existing data is moved into a single current season whose
+divisions are the former groups.
+
+Revision ID: add_seasons_and_divisions
+Revises: add_round_to_matches
+Create Date: 2026-10-19 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_seasons_and_divisions'
+down_revision: Union[str, None] = 'add_round_to_matches'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('seasons',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('is_current', sa.Boolean(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('name')
+    )
+    op.create_index('uq_seasons_current', 'seasons', ['is_current'], unique=True,
+                    postgresql_where=sa.text('is_current'))
+    op.create_table('divisions',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('season_id', sa.UUID(), nullable=False),
+    sa.Column('code', sa.String(length=10), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=True),
+    sa.Column('sort_order', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('season_id', 'code', name='unique_season_division_code')
+    )
+
+    # Current season for all existing data, named after the year of its first match
+    op.execute("""
+        INSERT INTO seasons (id, name, start_date, is_current)
+        SELECT gen_random_uuid(),
+               'Season ' || to_char(COALESCE(MIN(date), now()), 'YYYY'),
+               MIN(date)::date,
+               true
+        FROM matches
+    """)
+    # One division per former group value
+    op.execute("""
+        INSERT INTO divisions (id, season_id, code, name, sort_order)
+        SELECT gen_random_uuid(), s.id, g.code::text, 'Group ' || g.code::text, g.sort_order - 1
+        FROM seasons s
+        CROSS JOIN unnest(enum_range(NULL::groupenum)) WITH ORDINALITY AS g(code, sort_order)
+    """)
+
+    for table in ('teams', 'matches'):
+        op.add_column(table, sa.Column('season_id', sa.UUID(), nullable=True))
+        op.add_column(table, sa.Column('division_id', sa.UUID(), nullable=True))
+        op.execute(f"""
+            UPDATE {table} t
+            SET season_id = d.season_id, division_id = d.id
+            FROM divisions d
+            WHERE d.code = t."group"::text
+        """)
+        op.alter_column(table, 'season_id', nullable=False)
+        op.alter_column(table, 'division_id', nullable=False)
+        op.create_foreign_key(f'{table}_season_id_fkey', table, 'seasons', ['season_id'], ['id'])
+        op.create_foreign_key(f'{table}_division_id_fkey', table, 'divisions', ['division_id'], ['id'])
+        op.drop_index(op.f(f'ix_{table}_group'), table_name=table)
+        op.drop_column(table, 'group')
+    op.execute("DROP TYPE groupenum")
+
+    # Team names only need to be unique within a season
+    op.drop_index(op.f('ix_teams_name'), table_name='teams')
+    op.create_index(op.f('ix_teams_name'), 'teams', ['name'], unique=False)
+    op.create_unique_constraint('unique_season_team_name', 'teams', ['season_id', 'name'])
+
+    # Season-scoped composite indexes for team lists, standings and match lists
+    op.create_index('ix_teams_season_division_active', 'teams', ['season_id', 'division_id', 'active'], unique=False)
+    op.create_index('ix_matches_season_status_date', 'matches', ['season_id', 'status', 'date'], unique=False)
+    op.create_index('ix_matches_season_division_date', 'matches', ['season_id', 'division_id', 'date'], unique=False)
+
+
+def downgrade() -> None:
+    # Only divisions coded A or B can be mapped back to the old enum
+    op.drop_index('ix_matches_season_division_date', table_name='matches')
+    op.drop_index('ix_matches_season_status_date', table_name='matches')
+    op.drop_index('ix_teams_season_division_active', table_name='teams')
+    op.drop_constraint('unique_season_team_name', 'teams', type_='unique')
+    op.drop_index(op.f('ix_teams_name'), table_name='teams')
+    op.create_index(op.f('ix_teams_name'), 'teams', ['name'], unique=True)
+
+    groupenum = sa.Enum('A', 'B', name='groupenum')
+    groupenum.create(op.get_bind())
+    for table in ('teams', 'matches'):
+        op.add_column(table, sa.Column('group', groupenum, nullable=True))
+        op.execute(f"""
+            UPDATE {table} t
+            SET "group" = d.code::groupenum
+            FROM divisions d
+            WHERE d.id = t.division_id
+        """)
+        op.alter_column(table, 'group', nullable=False)
+        op.create_index(op.f(f'ix_{table}_group'), table, ['group'], unique=False)
+        op.drop_constraint(f'{table}_division_id_fkey', table, type_='foreignkey')
+        op.drop_constraint(f'{table}_season_id_fkey', table, type_='foreignkey')
+        op.drop_column(table, 'division_id')
+        op.drop_column(table, 'season_id')
+
+    op.drop_table('divisions')
+    op.drop_index('uq_seasons_current', table_name='seasons')
+    op.drop_table('seasons')
@@ -0,0 +1,37 @@
+"""add_standings_snapshots
+
+Revision ID: add_standings_snapshots
+Revises: add_match_set_scores
+Create Date: 2026-10-19 23:30:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_standings_snapshots'
+down_revision: Union[str, None] = 'add_match_set_scores'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Filled on demand by /public/standings/history; nothing to backfill
+    op.create_table(
+        'standings_snapshots',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('season_id', sa.UUID(), nullable=False),
+        sa.Column('division_id', sa.UUID(), nullable=False),
+        sa.Column('round', sa.Integer(), nullable=False),
+        sa.Column('stats', sa.JSON(), nullable=False),
+        sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['division_id'], ['divisions.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('season_id', 'division_id', 'round', name='unique_standings_snapshot_round'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('standings_snapshots')
@@ -0,0 +1,47 @@
+"""add_team_ratings
+
+Revision ID: add_team_ratings
+Revises: add_standings_snapshots
+Create Date: 2026-10-19 23:50:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'add_team_ratings'
+down_revision: Union[str, None] = 'add_standings_snapshots'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Every team starts at the initial rating; scripts/recompute_ratings.py
+    # rates the results entered before this migration
+    op.add_column('teams', sa.Column('rating', sa.Float(), server_default=sa.text('1500'), nullable=False))
+    op.create_table(
+        'team_ratings',
+        sa.Column('id', sa.UUID(), nullable=False),
+        sa.Column('season_id', sa.UUID(), nullable=False),
+        sa.Column('team_id', sa.UUID(), nullable=False),
+        sa.Column('match_id', sa.UUID(), nullable=False),
+        sa.Column('date', sa.DateTime(), nullable=False),
+        sa.Column('rating', sa.Float(), nullable=False),
+        sa.Column('change', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['season_id'], ['seasons.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['team_id'], ['teams.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['match_id'], ['matches.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('match_id', 'team_id', name='unique_team_rating_match'),
+    )
+    op.create_index('ix_team_ratings_team_date', 'team_ratings', ['team_id', 'date'])
+    op.create_index('ix_team_ratings_season', 'team_ratings', ['season_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_team_ratings_season', table_name='team_ratings')
+    op.drop_index('ix_team_ratings_team_date', table_name='team_ratings')
+    op.drop_table('team_ratings')
+    op.drop_column('teams', 'rating')
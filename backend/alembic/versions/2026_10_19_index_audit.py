@@ -0,0 +1,51 @@
+"""index_audit
+
+Revision ID: index_audit
+Revises: add_match_team_indexes
+Create Date: 2026-10-19 21:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'index_audit'
+down_revision: Union[str, None] = 'add_match_team_indexes'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Every query is scoped to a season, so these single-column indexes are never
+# chosen (status/active have a handful of values, names are unique per season
+# through unique_season_team_name) but still cost a write on every change
+_UNUSED = [
+    ('ix_matches_status', 'matches', ['status']),
+    ('ix_matches_date', 'matches', ['date']),
+    ('ix_matches_round', 'matches', ['round']),
+    ('ix_teams_active', 'teams', ['active']),
+    ('ix_teams_name', 'teams', ['name']),
+    # Replaced by the partial ix_teams_active_season_division
+    ('ix_teams_season_division_active', 'teams', ['season_id', 'division_id', 'active']),
+]
+
+
+def upgrade() -> None:
+    # CONCURRENTLY builds without blocking writes but cannot run in a transaction
+    with op.get_context().autocommit_block():
+        # Foreign keys read per match / per player (and by ON DELETE CASCADE)
+        op.create_index('ix_match_sets_match_set', 'match_sets', ['match_id', 'set_number'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_team_players_player', 'team_players', ['player_id'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_teams_active_season_division', 'teams', ['season_id', 'division_id'], unique=False,
+                        postgresql_where=sa.text('active'), postgresql_concurrently=True)
+        for name, table, _ in _UNUSED:
+            op.drop_index(name, table_name=table, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name, table, columns in reversed(_UNUSED):
+            op.create_index(name, table, columns, unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_teams_active_season_division', table_name='teams', postgresql_concurrently=True)
+        op.drop_index('ix_team_players_player', table_name='team_players', postgresql_concurrently=True)
+        op.drop_index('ix_match_sets_match_set', table_name='match_sets', postgresql_concurrently=True)
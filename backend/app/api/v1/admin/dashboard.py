@@ -9,8 +9,10 @@ from sqlalchemy import select, func, and_
 from app.core.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
-from app.models.team import Team, GroupEnum
+from app.models.team import Team
+from app.models.season import Division
 from app.models.match import Match, MatchStatusEnum
+from app.services.season_service import get_current_season_id
 
 router = APIRouter()
 
@@ -21,62 +23,66 @@ async def get_dashboard_stats(
     current_user: User = Depends(get_current_user),
 ):
     """
-    Get dashboard statistics.
+    Get dashboard statistics for the current season.
     """
+    # With no current season every count below is simply 0
+    season_id = await get_current_season_id(db)
+    
     # Count active teams
-    active_teams_query = select(func.count(Team.id)).where(Team.active == True)
+    active_teams_query = select(func.count(Team.id)).where(
+        and_(Team.season_id == season_id, Team.active == True)
+    )
     active_teams_result = await db.execute(active_teams_query)
     active_teams_count = active_teams_result.scalar_one()
     
     # Count total teams
-    total_teams_query = select(func.count(Team.id))
+    total_teams_query = select(func.count(Team.id)).where(Team.season_id == season_id)
     total_teams_result = await db.execute(total_teams_query)
     total_teams_count = total_teams_result.scalar_one()
     
     # Count matches by status
     scheduled_matches_query = select(func.count(Match.id)).where(
-        Match.status == MatchStatusEnum.SCHEDULED
+        and_(Match.season_id == season_id, Match.status == MatchStatusEnum.SCHEDULED)
     )
     scheduled_result = await db.execute(scheduled_matches_query)
     scheduled_count = scheduled_result.scalar_one()
     
     in_progress_matches_query = select(func.count(Match.id)).where(
-        Match.status == MatchStatusEnum.IN_PROGRESS
+        and_(Match.season_id == season_id, Match.status == MatchStatusEnum.IN_PROGRESS)
     )
     in_progress_result = await db.execute(in_progress_matches_query)
     in_progress_count = in_progress_result.scalar_one()
     
     played_matches_query = select(func.count(Match.id)).where(
-        Match.status == MatchStatusEnum.PLAYED
+        and_(Match.season_id == season_id, Match.status == MatchStatusEnum.PLAYED)
     )
     played_result = await db.execute(played_matches_query)
     played_count = played_result.scalar_one()
     
     cancelled_matches_query = select(func.count(Match.id)).where(
-        Match.status == MatchStatusEnum.CANCELLED
+        and_(Match.season_id == season_id, Match.status == MatchStatusEnum.CANCELLED)
     )
     cancelled_result = await db.execute(cancelled_matches_query)
     cancelled_count = cancelled_result.scalar_one()
     
-    # Count teams by group
-    group_a_query = select(func.count(Team.id)).where(
-        and_(Team.group == GroupEnum.A, Team.active == True)
-    )
-    group_a_result = await db.execute(group_a_query)
-    group_a_count = group_a_result.scalar_one()
-    
-    group_b_query = select(func.count(Team.id)).where(
-        and_(Team.group == GroupEnum.B, Team.active == True)
-    )
-    group_b_result = await db.execute(group_b_query)
-    group_b_count = group_b_result.scalar_one()
+    # Count active teams per group of the season
+    groups_query = select(Division.code, func.count(Team.id)).outerjoin(
+        Team, and_(Team.division_id == Division.id, Team.active == True)
+    ).where(
+        Division.season_id == season_id
+    ).group_by(
+        Division.id, Division.code, Division.sort_order
+    ).order_by(Division.sort_order, Division.code)
+    groups_result = await db.execute(groups_query)
+    group_counts = {code: count for code, count in groups_result.all()}
     
     return {
         "teams": {
             "active": active_teams_count,
             "total": total_teams_count,
-            "group_a": group_a_count,
-            "group_b": group_b_count,
+            "group_a": group_counts.get("A", 0),
+            "group_b": group_counts.get("B", 0),
+            "groups": group_counts,
         },
         "matches": {
             "scheduled": scheduled_count,
@@ -1,10 +1,10 @@
 """
 Admin matches management endpoints
 """
-from typing import List
+from typing import List, Optional
 from uuid import UUID
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
@@ -19,10 +19,16 @@ from app.core.database import get_db
 from app.api.deps import get_current_user
 from app.models.user import User
 from app.models.match import Match, MatchStatusEnum
-from app.models.team import Team, GroupEnum
-from app.schemas.match import MatchCreate, MatchUpdate, MatchResponse, MatchResultCreate, MatchSetResponse
-from app.services.match_service import enter_match_result
+from app.models.team import Team
+from app.schemas.match import MatchCreate, MatchUpdate, MatchResponse, MatchResultCreate
+from app.services.match_service import (
+    apply_result_summary, enter_match_result, match_set_responses, match_sets_option, ordered_sets, set_relationships,
+)
+from app.services.season_service import resolve_season_id, get_division
+from app.services.standings_history import invalidate_history
+from app.services.ratings import rate_match, recompute_ratings
 from app.exceptions import NotFoundError
+from app.core.invalidation import publish, match_tags
 
 # Serbian timezone (Europe/Belgrade)
 SERBIAN_TZ = ZoneInfo("Europe/Belgrade")
@@ -61,7 +67,13 @@ async def create_match(
     if not away_team:
         raise HTTPException(status_code=404, detail="Away team not found")
     
-    if home_team.group != match_data.group or away_team.group != match_data.group:
+    # The match belongs to the teams' season; the group must exist in it
+    try:
+        division = await get_division(db, home_team.season_id, match_data.group)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    
+    if home_team.division_id != division.id or away_team.division_id != division.id:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Both teams must be in the same group as the match",
@@ -79,20 +91,24 @@ async def create_match(
     
     match = Match(
         date=date_value,
-        group=match_data.group,
+        season_id=home_team.season_id,
+        division=division,
         round=match_data.round,
         home_team_id=match_data.home_team_id,
         away_team_id=match_data.away_team_id,
         status=MatchStatusEnum.SCHEDULED,
     )
     db.add(match)
+    await db.flush()
+    await publish(db, *match_tags(match.id, match.group))
     await db.commit()
-    await db.refresh(match, ["home_team", "away_team", "match_sets"])
+    await db.refresh(match, ["home_team", "away_team", *set_relationships()])
     
     return MatchResponse(
         id=match.id,
         date=match.date,
         group=match.group,
+        season_id=match.season_id,
         round=match.round,
         home_team_id=match.home_team_id,
         away_team_id=match.away_team_id,
@@ -105,16 +121,21 @@ async def create_match(
 
 @router.get("/", response_model=List[MatchResponse])
 async def list_matches(
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    List all matches.
+    List all matches of a season.
     """
-    query = select(Match).options(
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    
+    query = select(Match).where(Match.season_id == season_id).options(
         selectinload(Match.home_team),
         selectinload(Match.away_team),
-        selectinload(Match.match_sets)
+        match_sets_option()
     ).order_by(Match.date.desc())
     
     result = await db.execute(query)
@@ -122,20 +143,13 @@ async def list_matches(
     
     match_responses = []
     for match in matches:
-        match_sets = [
-            MatchSetResponse(
-                id=ms.id,
-                set_number=ms.set_number,
-                home_games=ms.home_games,
-                away_games=ms.away_games
-            )
-            for ms in sorted(match.match_sets, key=lambda x: x.set_number)
-        ]
+        match_sets = match_set_responses(match)
         
         match_responses.append(MatchResponse(
             id=match.id,
             date=match.date,
             group=match.group,
+            season_id=match.season_id,
             round=match.round,
             home_team_id=match.home_team_id,
             away_team_id=match.away_team_id,
@@ -160,7 +174,7 @@ async def get_match(
     query = select(Match).where(Match.id == match_id).options(
         selectinload(Match.home_team),
         selectinload(Match.away_team),
-        selectinload(Match.match_sets)
+        match_sets_option()
     )
     
     result = await db.execute(query)
@@ -169,20 +183,13 @@ async def get_match(
     if not match:
         raise HTTPException(status_code=404, detail="Match not found")
     
-    match_sets = [
-        MatchSetResponse(
-            id=ms.id,
-            set_number=ms.set_number,
-            home_games=ms.home_games,
-            away_games=ms.away_games
-        )
-        for ms in sorted(match.match_sets, key=lambda x: x.set_number)
-    ]
+    match_sets = match_set_responses(match)
     
     return MatchResponse(
         id=match.id,
         date=match.date,
         group=match.group,
+        season_id=match.season_id,
         round=match.round,
         home_team_id=match.home_team_id,
         away_team_id=match.away_team_id,
@@ -207,7 +214,7 @@ async def update_match(
     query = select(Match).where(Match.id == match_id).options(
         selectinload(Match.home_team),
         selectinload(Match.away_team),
-        selectinload(Match.match_sets)
+        match_sets_option()
     )
     result = await db.execute(query)
     match = result.scalar_one_or_none()
@@ -217,6 +224,8 @@ async def update_match(
     
     # Allow updating played matches to fix errors
     # Status will be recalculated based on sets won
+    previous_group = match.group
+    previous_division_id, previous_round = match.division_id, match.round
     
     # Update fields
     if match_data.date is not None:
@@ -229,8 +238,11 @@ async def update_match(
             # If naive, assume it's already in Serbian time (no conversion needed)
             pass
         match.date = date_value
-    if match_data.group is not None:
-        match.group = match_data.group
+    if match_data.group is not None and match_data.group != match.group:
+        try:
+            match.division = await get_division(db, match.season_id, match_data.group)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     if match_data.round is not None:
         match.round = match_data.round
     if match_data.home_team_id is not None:
@@ -244,6 +256,8 @@ async def update_match(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Home team and away team must be different",
         )
+    # The winner is stored as a team id
+    apply_result_summary(match, ordered_sets(match))
 
     # Re-validate team groups if group or teams changed
     if match_data.group is not None or match_data.home_team_id is not None or match_data.away_team_id is not None:
@@ -255,29 +269,28 @@ async def update_match(
         if not home_team or not away_team:
             raise HTTPException(status_code=404, detail="Team not found")
         
-        if home_team.group != match.group or away_team.group != match.group:
+        if home_team.division_id != match.division.id or away_team.division_id != match.division.id:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Both teams must be in the same group as the match",
             )
     
+    # Ratings depend on the teams and the order of matches
+    if match_data.date is not None or match_data.home_team_id is not None or match_data.away_team_id is not None:
+        await rate_match(db, match)
+    await invalidate_history(db, match.season_id, previous_division_id, previous_round)
+    await invalidate_history(db, match.season_id, match.division.id, match.round)
+    await publish(db, *match_tags(match.id, previous_group, match.group))
     await db.commit()
-    await db.refresh(match, ["home_team", "away_team", "match_sets"])
+    await db.refresh(match, ["home_team", "away_team", *set_relationships()])
     
-    match_sets = [
-        MatchSetResponse(
-            id=ms.id,
-            set_number=ms.set_number,
-            home_games=ms.home_games,
-            away_games=ms.away_games
-        )
-        for ms in sorted(match.match_sets, key=lambda x: x.set_number)
-    ]
+    match_sets = match_set_responses(match)
     
     return MatchResponse(
         id=match.id,
         date=match.date,
         group=match.group,
+        season_id=match.season_id,
         round=match.round,
         home_team_id=match.home_team_id,
         away_team_id=match.away_team_id,
@@ -300,23 +313,18 @@ async def enter_match_result_endpoint(
     """
     try:
         match = await enter_match_result(db, match_id, result)
+        await invalidate_history(db, match.season_id, match.division_id, match.round)
+        await publish(db, *match_tags(match.id, match.group))
         await db.commit()
-        await db.refresh(match, ["home_team", "away_team", "match_sets"])
+        await db.refresh(match, ["home_team", "away_team", *set_relationships()])
         
-        match_sets = [
-            MatchSetResponse(
-                id=ms.id,
-                set_number=ms.set_number,
-                home_games=ms.home_games,
-                away_games=ms.away_games
-            )
-            for ms in sorted(match.match_sets, key=lambda x: x.set_number)
-        ]
+        match_sets = match_set_responses(match)
         
         return MatchResponse(
             id=match.id,
             date=match.date,
             group=match.group,
+            season_id=match.season_id,
             home_team_id=match.home_team_id,
             away_team_id=match.away_team_id,
             status=match.status,
@@ -349,6 +357,11 @@ async def delete_match(
         raise HTTPException(status_code=404, detail="Match not found")
     
     # Allow deletion of any match, including played ones
+    await invalidate_history(db, match.season_id, match.division_id, match.round)
+    await publish(db, *match_tags(match.id, match.group))
     await db.delete(match)
+    if match.status == MatchStatusEnum.PLAYED:
+        await db.flush()
+        await recompute_ratings(db, match.season_id)
     await db.commit()
 
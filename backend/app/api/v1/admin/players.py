@@ -16,6 +16,7 @@ from app.models.player import Player
 from app.models.team import Team
 from app.models.team_player import TeamPlayer
 from app.schemas.player import PlayerCreate, PlayerUpdate, PlayerResponse
+from app.core.invalidation import publish
 
 router = APIRouter()
 
@@ -134,6 +135,13 @@ async def update_player(
                 status_code=status.HTTP_409_CONFLICT,
                 detail="Email already in use",
             ) from None
+        
+        # Player names are shown in the rosters of their teams
+        team_ids = (await db.execute(
+            select(TeamPlayer.team_id).where(TeamPlayer.player_id == player_id)
+        )).scalars().all()
+        if team_ids:
+            await publish(db, "teams", *(f"team:{team_id}" for team_id in team_ids))
     
     return PlayerResponse(
         id=player.id,
@@ -171,7 +179,8 @@ async def get_player_teams(
         {
             "team_id": str(tp.team.id),
             "team_name": tp.team.name,
-            "group": tp.team.group.value,
+            "group": tp.team.group,
+            "season_id": str(tp.team.season_id),
             "role": tp.role.value,
             "active": tp.team.active,
         }
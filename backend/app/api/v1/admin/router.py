@@ -3,7 +3,7 @@ Admin API router - combines all admin endpoints
 """
 from fastapi import APIRouter
 
-from app.api.v1.admin import auth, teams, players, matches, dashboard
+from app.api.v1.admin import auth, teams, players, matches, dashboard, seasons
 
 router = APIRouter()
 
@@ -12,4 +12,5 @@ router.include_router(teams.router, prefix="/teams", tags=["admin-teams"])
 router.include_router(players.router, prefix="/players", tags=["admin-players"])
 router.include_router(matches.router, prefix="/matches", tags=["admin-matches"])
 router.include_router(dashboard.router, prefix="/dashboard", tags=["admin-dashboard"])
+router.include_router(seasons.router, prefix="/seasons", tags=["admin-seasons"])
 
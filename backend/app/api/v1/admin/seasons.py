@@ -0,0 +1,159 @@
+"""
+Admin seasons and divisions management endpoints
+"""
+from typing import List
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import get_db
+from app.api.deps import get_current_user
+from app.models.user import User
+from app.models.season import Season
+from app.schemas.season import SeasonCreate, SeasonUpdate, SeasonResponse, DivisionCreate
+from app.services.season_service import get_season, create_season, set_current_season, add_division
+from app.services.standings_history import invalidate_season_history
+from app.exceptions import NotFoundError
+from app.core.invalidation import publish, season_tags
+
+router = APIRouter()
+
+
+@router.post("/", response_model=SeasonResponse, status_code=status.HTTP_201_CREATED)
+async def create_season_endpoint(
+    season_data: SeasonCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Create a new season with its groups (divisions).
+    """
+    try:
+        season = await create_season(db, season_data)
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    await publish(db, *season_tags(season.id))
+    await db.commit()
+
+    season = await get_season(db, season.id)
+    return SeasonResponse.model_validate(season)
+
+
+@router.get("/", response_model=List[SeasonResponse])
+async def list_seasons(
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    List all seasons with their groups.
+    """
+    query = select(Season).options(
+        selectinload(Season.divisions)
+    ).order_by(Season.start_date.desc().nulls_last(), Season.name.desc())
+
+    result = await db.execute(query)
+    seasons = result.scalars().all()
+
+    return [SeasonResponse.model_validate(season) for season in seasons]
+
+
+@router.put("/{season_id}", response_model=SeasonResponse)
+async def update_season(
+    season_id: UUID,
+    season_data: SeasonUpdate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Update season name, dates or standings rules ("rules": null resets them
+    to the default rules).
+    """
+    try:
+        season = await get_season(db, season_id)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    if season_data.name is not None:
+        name = season_data.name.strip()
+        if not name:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Season name cannot be empty")
+        existing = await db.execute(
+            select(Season.id).where(Season.name == name, Season.id != season_id)
+        )
+        if existing.scalar_one_or_none():
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Season with name '{name}' already exists",
+            )
+        season.name = name
+    if season_data.start_date is not None:
+        season.start_date = season_data.start_date
+    if season_data.end_date is not None:
+        season.end_date = season_data.end_date
+    if "rules" in season_data.model_fields_set:
+        rules = season_data.rules.model_dump() if season_data.rules is not None else None
+        if rules != season.rules:
+            season.rules = rules
+            # Snapshots hold points under the old rules
+            await invalidate_season_history(db, season.id)
+
+    await publish(db, *season_tags(season.id))
+    await db.commit()
+
+    season = await get_season(db, season_id)
+    return SeasonResponse.model_validate(season)
+
+
+@router.post("/{season_id}/current", response_model=SeasonResponse)
+async def set_current_season_endpoint(
+    season_id: UUID,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Make a season the current one. Public endpoints default to the current season.
+    """
+    try:
+        season = await set_current_season(db, season_id)
+    except NotFoundError as e:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    await publish(db, *season_tags(season.id))
+    await db.commit()
+
+    season = await get_season(db, season_id)
+    return SeasonResponse.model_validate(season)
+
+
+@router.post("/{season_id}/divisions", response_model=SeasonResponse, status_code=status.HTTP_201_CREATED)
+async def add_division_endpoint(
+    season_id: UUID,
+    division_data: DivisionCreate,
+    db: AsyncSession = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Add a group (division) to a season.
+    """
+    try:
+        await add_division(db, season_id, division_data)
+    except NotFoundError as e:
+        await db.rollback()
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        await db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+
+    await publish(db, *season_tags(season_id))
+    await db.commit()
+
+    season = await get_season(db, season_id)
+    return SeasonResponse.model_validate(season)
@@ -1,9 +1,9 @@
 """
 Admin teams management endpoints
 """
-from typing import List
+from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, delete
 from sqlalchemy.orm import selectinload
@@ -16,6 +16,8 @@ from app.models.team_player import TeamPlayer, PlayerRoleEnum
 from app.models.player import Player
 from app.schemas.team import TeamCreate, TeamUpdate, TeamResponse, TeamPlayerCreate, TeamPlayerResponse
 from app.services.team_service import validate_team_creation, archive_team, activate_team
+from app.services.season_service import resolve_season_id, get_division
+from app.core.invalidation import publish, team_tags
 
 router = APIRouter()
 
@@ -102,14 +104,26 @@ async def create_team(
     # Validate team composition
     await validate_team_creation(team_data.players, db)
     
+    # Resolve season (default: current) and the group within it
+    season_id = await resolve_season_id(db, team_data.season_id)
+    if season_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No current season. Create a season first.",
+        )
+    try:
+        division = await get_division(db, season_id, team_data.group)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
+    
     # Generate team name if not provided
     team_name = team_data.name
     if not team_name or not team_name.strip():
         team_name = await generate_team_name_from_players(team_data.players, db)
     
-    # Check if team name already exists
+    # Check if team name already exists in this season
     existing_team = await db.execute(
-        select(Team).where(Team.name == team_name)
+        select(Team).where(Team.season_id == season_id, Team.name == team_name)
     )
     if existing_team.scalar_one_or_none():
         raise HTTPException(
@@ -120,7 +134,8 @@ async def create_team(
     # Create team
     team = Team(
         name=team_name,
-        group=team_data.group,
+        season_id=season_id,
+        division=division,
         active=True,
     )
     db.add(team)
@@ -138,6 +153,7 @@ async def create_team(
         )
         db.add(team_player)
     
+    await publish(db, *team_tags(team.id, team.group))
     await db.commit()
     
     # Reload team with relationships for response
@@ -160,20 +176,27 @@ async def create_team(
         id=team.id,
         name=team.name,
         group=team.group,
+        season_id=team.season_id,
         active=team.active,
-        players=players
+        players=players,
+        rating=team.rating
     )
 
 
 @router.get("/", response_model=List[TeamResponse])
 async def list_teams(
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user),
 ):
     """
-    List all teams (including archived ones).
+    List all teams of a season (including archived ones).
     """
-    query = select(Team).options(
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    
+    query = select(Team).where(Team.season_id == season_id).options(
         selectinload(Team.team_players).selectinload(TeamPlayer.player)
     ).order_by(Team.name)
     
@@ -195,8 +218,10 @@ async def list_teams(
             id=team.id,
             name=team.name,
             group=team.group,
+            season_id=team.season_id,
             active=team.active,
-            players=players
+            players=players,
+            rating=team.rating
         ))
     
     return team_responses
@@ -234,8 +259,10 @@ async def get_team(
         id=team.id,
         name=team.name,
         group=team.group,
+        season_id=team.season_id,
         active=team.active,
-        players=players
+        players=players,
+        rating=team.rating
     )
 
 
@@ -258,6 +285,8 @@ async def update_team(
     if not team:
         raise HTTPException(status_code=404, detail="Team not found")
     
+    previous_group = team.group
+    
     # Update fields
     # Handle team name: if explicitly provided (even if empty), update it
     if team_data.name is not None:
@@ -276,9 +305,9 @@ async def update_team(
                     db
                 )
         
-        # Check for conflicts with the new name
+        # Check for conflicts with the new name within the season
         existing = await db.execute(
-            select(Team).where(Team.name == team_name, Team.id != team_id)
+            select(Team).where(Team.season_id == team.season_id, Team.name == team_name, Team.id != team_id)
         )
         if existing.scalar_one_or_none():
             raise HTTPException(
@@ -287,8 +316,11 @@ async def update_team(
             )
         team.name = team_name
     
-    if team_data.group is not None:
-        team.group = team_data.group
+    if team_data.group is not None and team_data.group != team.group:
+        try:
+            team.division = await get_division(db, team.season_id, team_data.group)
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e)) from e
     
     if team_data.active is not None:
         team.active = team_data.active
@@ -316,6 +348,7 @@ async def update_team(
             )
             db.add(team_player)
     
+    await publish(db, *team_tags(team.id, previous_group, team.group))
     await db.commit()
     
     # Reload team with relationships for response
@@ -338,8 +371,10 @@ async def update_team(
         id=team.id,
         name=team.name,
         group=team.group,
+        season_id=team.season_id,
         active=team.active,
-        players=players
+        players=players,
+        rating=team.rating
     )
 
 
@@ -359,6 +394,7 @@ async def delete_team(
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Team not found")
 
     await archive_team(db, team_id)
+    await publish(db, *team_tags(team.id, team.group))
     await db.commit()
 
 
@@ -372,6 +408,7 @@ async def activate_team_endpoint(
     Reactivate an archived team.
     """
     team = await activate_team(db, team_id)
+    await publish(db, *team_tags(team.id, team.group))
     await db.commit()
     
     # Reload team with relationships for response
@@ -394,7 +431,9 @@ async def activate_team_endpoint(
         id=team.id,
         name=team.name,
         group=team.group,
+        season_id=team.season_id,
         active=team.active,
-        players=players
+        players=players,
+        rating=team.rating
     )
 
@@ -0,0 +1,40 @@
+"""
+Public group endpoints
+"""
+from typing import Optional
+from uuid import UUID
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import get_db
+from app.core.response_cache import cached_response
+from app.schemas.season import GroupCode
+from app.schemas.standings import HeadToHeadResponse
+from app.services.head_to_head import get_head_to_head
+
+router = APIRouter()
+
+
+@router.get("/{group}/head-to-head", response_model=HeadToHeadResponse)
+@cached_response(HeadToHeadResponse, tags=lambda _, group, **__: {f"group:{group}", "seasons"})
+async def get_group_head_to_head(
+    request: Request,
+    group: GroupCode,
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the results between every pair of teams in a group.
+    
+    Teams are listed once (team_ids, team_names, in table order); every pair
+    that has played is one row of `results`, with the columns named in
+    `fields`: the two teams' indexes i < j, then matches played, won and lost,
+    sets and games for and against, all from team i's point of view.
+    
+    Query parameters:
+    - season_id: Season to show (default: current season)
+    """
+    matrix = await get_head_to_head(db, group=group, season_id=season_id)
+    if matrix is None:
+        raise HTTPException(status_code=404, detail="Group not found")
+    return matrix
@@ -1,126 +1,222 @@
 """
 Public matches endpoints
 """
-from typing import List, Optional
+from typing import List, Literal, Optional
 from uuid import UUID
 from datetime import date
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.core.database import get_db, session_factory
+from app.core.invalidation import current_generation
+from app.core.cdn import surrogate_headers
+from app.core.response_cache import cached_response
+from app.core.singleflight import SingleFlight
 from app.models.match import Match, MatchStatusEnum
-from app.models.team import GroupEnum
-from app.schemas.match import MatchResponse, MatchSetResponse
+from app.models.team import Team
+from app.schemas.match import MatchResponse
+from app.schemas.season import GroupCode
+from app.services.season_service import resolve_season_id, division_id_subquery
+from app.services.league_state import get_league_state
+from app.services.match_service import match_set_responses, match_sets_option, team_match_ids
+from app.services.match_export import MEDIA_TYPES, encode_matches, stream_season_matches
+from app.services.season_archive import is_archived, load_archived_season, find_archived_match, find_archived_team
 
 router = APIRouter()
 
+_list_flight = SingleFlight("public.matches.list")
+
+
+def _match_tags(match: MatchResponse, **_) -> set:
+    # Team names are part of the response
+    return {f"match:{match.id}", f"team:{match.home_team_id}", f"team:{match.away_team_id}"}
+
+
+async def _team_season_id(db: AsyncSession, team_id: UUID) -> Optional[UUID]:
+    """Season a team plays in (live or archived), None for unknown teams"""
+    result = await db.execute(select(Team.season_id).where(Team.id == team_id))
+    season_id = result.scalar_one_or_none()
+    if season_id is None:
+        archived = find_archived_team(team_id)
+        season_id = archived.season_id if archived is not None else None
+    return season_id
+
 
 @router.get("/", response_model=List[MatchResponse])
+@cached_response(List[MatchResponse], tags={"matches"})
 async def list_matches(
-    group: Optional[GroupEnum] = Query(None, description="Filter by group (A or B)"),
+    request: Request,
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B)"),
     status: Optional[MatchStatusEnum] = Query(None, description="Filter by status"),
     date_from: Optional[date] = Query(None, description="Filter matches from this date"),
     date_to: Optional[date] = Query(None, description="Filter matches until this date"),
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
+    team_id: Optional[UUID] = Query(None, description="Only this team's home and away matches"),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    List all matches.
+    List all matches of a season.
     
     Query parameters:
-    - group: Filter by group (A or B)
+    - group: Filter by group (e.g. A or B)
     - status: Filter by status (scheduled, played, cancelled)
     - date_from: Filter matches from this date
     - date_to: Filter matches until this date
+    - season_id: Season to list (default: current season, or the team's season with team_id)
+    - team_id: Only matches the team plays, home or away
     """
-    query = select(Match).options(
-        selectinload(Match.home_team),
-        selectinload(Match.away_team),
-        selectinload(Match.match_sets)
-    )
+    state = await get_league_state(db, season_id)
+    if state is not None and (team_id is None or team_id in state.team_index):
+        return state.list_matches(group=group, status=status, date_from=date_from, date_to=date_to, team_id=team_id)
     
-    conditions = []
-    if group:
-        conditions.append(Match.group == group)
-    if status:
-        conditions.append(Match.status == status)
-    if date_from:
-        conditions.append(Match.date >= date_from)
-    if date_to:
-        conditions.append(Match.date <= date_to)
+    if team_id is not None and season_id is None:
+        season_id = await _team_season_id(db, team_id)
+        if season_id is None:
+            return []
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    if is_archived(season_id):
+        return load_archived_season(season_id).list_matches(
+            group=group,
+            status=status.value if status else None,
+            date_from=date_from,
+            date_to=date_to,
+            team_id=team_id,
+        )
     
-    if conditions:
+    async def query_matches(session: AsyncSession) -> List[MatchResponse]:
+        query = select(Match).options(
+            selectinload(Match.home_team),
+            selectinload(Match.away_team),
+            match_sets_option()
+        )
+        
+        conditions = [Match.season_id == season_id]
+        if group:
+            conditions.append(Match.division_id == division_id_subquery(season_id, group))
+        if status:
+            conditions.append(Match.status == status)
+        if date_from:
+            conditions.append(Match.date >= date_from)
+        if date_to:
+            conditions.append(Match.date <= date_to)
+        if team_id:
+            conditions.append(Match.id.in_(team_match_ids(team_id)))
+        
         query = query.where(and_(*conditions))
-    
-    query = query.order_by(Match.date.desc())
-    
-    result = await db.execute(query)
-    matches = result.scalars().all()
-    
-    # Convert to response format
-    match_responses = []
-    for match in matches:
-        match_sets = [
-            MatchSetResponse(
-                id=ms.id,
-                set_number=ms.set_number,
-                home_games=ms.home_games,
-                away_games=ms.away_games
-            )
-            for ms in sorted(match.match_sets, key=lambda x: x.set_number)
-        ]
         
-        match_responses.append(MatchResponse(
-            id=match.id,
-            date=match.date,
-            group=match.group,
-            round=match.round,
-            home_team_id=match.home_team_id,
-            away_team_id=match.away_team_id,
-            status=match.status,
-            match_sets=match_sets,
-            home_team_name=match.home_team.name if match.home_team else None,
-            away_team_name=match.away_team.name if match.away_team else None,
-        ))
+        query = query.order_by(Match.date.desc())
+        
+        result = await session.execute(query)
+        matches = result.scalars().all()
+        
+        # Convert to response format
+        match_responses = []
+        for match in matches:
+            match_sets = match_set_responses(match)
+        
+            match_responses.append(MatchResponse(
+                id=match.id,
+                date=match.date,
+                group=match.group,
+                season_id=match.season_id,
+                round=match.round,
+                home_team_id=match.home_team_id,
+                away_team_id=match.away_team_id,
+                status=match.status,
+                match_sets=match_sets,
+                home_team_name=match.home_team.name if match.home_team else None,
+                away_team_name=match.away_team.name if match.away_team else None,
+            ))
+        
+        return match_responses
+
+    # Concurrent identical list requests share one query; the invalidation
+    # generation keeps requests after an admin write out of older queries
+    return await _list_flight.do(
+        (season_id, group, status, date_from, date_to, team_id, current_generation()), query_matches, session_factory(db), release=db
+    )
+
+
+@router.get("/export")
+async def export_matches(
+    fmt: Literal["ndjson", "csv"] = Query("ndjson", alias="format", description="ndjson (one match per line) or csv"),
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B)"),
+    status: Optional[MatchStatusEnum] = Query(None, description="Filter by status"),
+    date_from: Optional[date] = Query(None, description="Filter matches from this date"),
+    date_to: Optional[date] = Query(None, description="Filter matches until this date"),
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Export all matches of a season with their sets as a stream.
     
-    return match_responses
+    Rows come from a server-side cursor, so any history size exports in
+    constant memory. Takes the same filters as the match list.
+    """
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        matches = []
+    elif is_archived(season_id):
+        matches = load_archived_season(season_id).list_matches(
+            group=group,
+            status=status.value if status else None,
+            date_from=date_from,
+            date_to=date_to,
+        )
+    else:
+        matches = stream_season_matches(
+            db, season_id, group=group, status=status, date_from=date_from, date_to=date_to
+        )
+    
+    headers = surrogate_headers({"matches"})
+    headers["Content-Disposition"] = f'attachment; filename="matches.{fmt}"'
+    return StreamingResponse(encode_matches(matches, fmt), media_type=MEDIA_TYPES[fmt], headers=headers)
 
 
 @router.get("/{match_id}", response_model=MatchResponse)
+@cached_response(MatchResponse, tags=_match_tags)
 async def get_match(
+    request: Request,
     match_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get match details by ID.
     """
+    state = await get_league_state(db)
+    if state is not None:
+        match = state.get_match(match_id)
+        if match is not None:
+            return match
+    
     query = select(Match).where(Match.id == match_id).options(
         selectinload(Match.home_team),
         selectinload(Match.away_team),
-        selectinload(Match.match_sets)
+        match_sets_option()
     )
     
     result = await db.execute(query)
     match = result.scalar_one_or_none()
     
     if not match:
-        raise HTTPException(status_code=404, detail="Match not found")
+        # Matches of archived seasons only exist in the season archive
+        archived = find_archived_match(match_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Match not found")
+        return archived.get_match(match_id)
     
-    match_sets = [
-        MatchSetResponse(
-            id=ms.id,
-            set_number=ms.set_number,
-            home_games=ms.home_games,
-            away_games=ms.away_games
-        )
-        for ms in sorted(match.match_sets, key=lambda x: x.set_number)
-    ]
+    match_sets = match_set_responses(match)
     
     return MatchResponse(
         id=match.id,
         date=match.date,
         group=match.group,
+        season_id=match.season_id,
         round=match.round,
         home_team_id=match.home_team_id,
         away_team_id=match.away_team_id,
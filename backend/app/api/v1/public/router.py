@@ -3,12 +3,14 @@ Public API router - combines all public endpoints
 """
 from fastapi import APIRouter
 
-from app.api.v1.public import teams, matches, standings
+from app.api.v1.public import teams, matches, standings, seasons, groups
 
 router = APIRouter()
 
 router.include_router(teams.router, prefix="/teams", tags=["teams"])
 router.include_router(matches.router, prefix="/matches", tags=["matches"])
 router.include_router(standings.router, prefix="/standings", tags=["standings"])
+router.include_router(seasons.router, prefix="/seasons", tags=["seasons"])
+router.include_router(groups.router, prefix="/groups", tags=["groups"])
 
 
@@ -0,0 +1,47 @@
+"""
+Public seasons endpoints
+"""
+from typing import List
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.database import get_db
+from app.models.season import Season
+from app.schemas.season import SeasonResponse
+from app.services.season_service import get_current_season_id, get_season
+
+router = APIRouter()
+
+
+@router.get("/", response_model=List[SeasonResponse])
+async def list_seasons(
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    List all seasons with their groups, newest first.
+    """
+    query = select(Season).options(
+        selectinload(Season.divisions)
+    ).order_by(Season.start_date.desc().nulls_last(), Season.name.desc())
+
+    result = await db.execute(query)
+    seasons = result.scalars().all()
+
+    return [SeasonResponse.model_validate(season) for season in seasons]
+
+
+@router.get("/current", response_model=SeasonResponse)
+async def get_current_season(
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the current season and its groups.
+    """
+    season_id = await get_current_season_id(db)
+    if season_id is None:
+        raise HTTPException(status_code=404, detail="No current season")
+
+    season = await get_season(db, season_id)
+    return SeasonResponse.model_validate(season)
@@ -3,47 +3,155 @@ Public standings endpoints
 """
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
 
 from app.core.database import get_db
-from app.models.team import GroupEnum
-from app.services.standings import calculate_standings
-from app.schemas.standings import TeamStandingResponse
+from app.core.response_cache import cached_response
+from app.models.team import Team
+from app.schemas.season import GroupCode
+from app.services.standings import get_standings as get_cached_standings
+from app.exceptions import NotFoundError
+from app.schemas.standings import SeasonSimulationResponse, StandingsRoundResponse, TeamStandingResponse, WhatIfRequest
+from app.services.clinch import get_position_bounds, with_position_bounds
+from app.services.league_state import get_league_state
+from app.services.season_simulator import simulate_season
+from app.services.standings_history import get_standings_history
+from app.services.season_archive import is_archived, load_archived_season, find_archived_team
+from app.services.what_if import get_what_if_standings
 
 router = APIRouter()
 
 
+def _standings_tags(standings, group: Optional[GroupCode] = None, **_) -> set:
+    # Every write that changes a group's table publishes its group tag
+    return {f"group:{group}", "seasons"} if group else {"standings"}
+
+
 @router.get("/", response_model=List[TeamStandingResponse])
+@cached_response(List[TeamStandingResponse], tags=_standings_tags)
 async def get_standings(
-    group: Optional[GroupEnum] = Query(None, description="Filter by group (A or B), or all if not specified"),
+    request: Request,
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B), or all if not specified"),
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get league standings.
     
     Query parameters:
-    - group: Filter by group (A or B), or return all groups if not specified
+    - group: Filter by group (e.g. A or B), or return all groups if not specified
+    - season_id: Season to show (default: current season)
+    
+    best_position / worst_position are the best and worst positions each team
+    can still finish in within its group.
+    """
+    state = await get_league_state(db, season_id)
+    if state is not None:
+        standings = state.standings(group=group)
+    elif season_id is not None and is_archived(season_id):
+        # Final standings stored with the season archive
+        standings = load_archived_season(season_id).standings(group=group)
+    else:
+        standings = await get_cached_standings(db, group=group, season_id=season_id)
+    return with_position_bounds(standings, await get_position_bounds(db, season_id))
+
+
+@router.get("/history", response_model=List[StandingsRoundResponse])
+@cached_response(List[StandingsRoundResponse], tags=_standings_tags)
+async def get_history(
+    request: Request,
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B), or all if not specified"),
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
+    as_of_round: Optional[int] = Query(None, ge=1, description="Only the table as of this round"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the league table after every numbered round, oldest first.
+    
+    Query parameters:
+    - group: Filter by group (e.g. A or B), or all groups if not specified
+    - season_id: Season to show (default: current season)
+    - as_of_round: Only the table as of this round (after the last round played up to it)
+    """
+    return await get_standings_history(db, group=group, season_id=season_id, as_of_round=as_of_round)
+
+
+@router.get("/simulation", response_model=SeasonSimulationResponse)
+@cached_response(SeasonSimulationResponse, tags=_standings_tags)
+async def get_simulation(
+    request: Request,
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B), or all if not specified"),
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get every team's probability of finishing in each position of its group,
+    from simulating the remaining matches of the season.
+    
+    Query parameters:
+    - group: Filter by group (e.g. A or B), or all groups if not specified
+    - season_id: Season to simulate (default: current season)
+    """
+    try:
+        return await simulate_season(db, group=group, season_id=season_id)
+    except ImportError as e:
+        raise HTTPException(status_code=503, detail="Season simulation is not available") from e
+
+
+@router.post("/what-if", response_model=List[TeamStandingResponse])
+async def get_what_if(
+    what_if: WhatIfRequest,
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B), or all if not specified"),
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Get the current season's standings as if the given results of scheduled
+    matches had been entered. Nothing is stored. Every result must be
+    finished (a team has won 2 sets).
+    
+    Query parameters:
+    - group: Filter by group (e.g. A or B), or return all groups if not specified
     """
-    standings = await calculate_standings(db, group=group)
-    return standings
+    try:
+        return await get_what_if_standings(db, what_if.results, group=group)
+    except NotFoundError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
 
 
 @router.get("/teams/{team_id}", response_model=TeamStandingResponse)
+@cached_response(TeamStandingResponse, tags={"standings"})
 async def get_team_standings(
+    request: Request,
     team_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
     """
-    Get standings for a specific team.
+    Get standings for a specific team (in the team's own season), with the
+    same best_position / worst_position as the group table.
     """
-    standings = await calculate_standings(db)
+    state = await get_league_state(db)
+    if state is not None and state.get_team(team_id) is not None:
+        season_id, standings = state.season_id, state.standings()
+    else:
+        result = await db.execute(select(Team.season_id).where(Team.id == team_id))
+        season_id = result.scalar_one_or_none()
+        if season_id is None:
+            archived = find_archived_team(team_id)
+            if archived is None:
+                raise HTTPException(status_code=404, detail="Team standing not found")
+            season_id, standings = archived.season_id, archived.standings()
+        else:
+            standings = await get_cached_standings(db, season_id=season_id)
     
     team_standing = next((s for s in standings if s.team_id == team_id), None)
     
     if not team_standing:
         raise HTTPException(status_code=404, detail="Team standing not found")
     
-    return team_standing
+    return with_position_bounds([team_standing], await get_position_bounds(db, season_id))[0]
 
 
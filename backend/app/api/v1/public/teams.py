@@ -3,79 +3,119 @@ Public teams endpoints
 """
 from typing import List, Optional
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
 from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
-from app.models.team import Team, GroupEnum
+from app.core.database import get_db, session_factory
+from app.core.invalidation import current_generation
+from app.core.response_cache import cached_response
+from app.core.singleflight import SingleFlight
+from app.models.team import Team
 from app.models.player import Player
 from app.models.team_player import TeamPlayer
-from app.schemas.team import TeamResponse, TeamPlayerResponse
+from app.schemas.team import TeamResponse, TeamPlayerResponse, TeamRatingResponse
+from app.schemas.season import GroupCode
+from app.services.season_service import resolve_season_id, division_id_subquery
+from app.services.league_state import get_league_state
+from app.services.ratings import team_rating_history
+from app.services.season_archive import is_archived, load_archived_season, find_archived_team
 
 router = APIRouter()
 
+_list_flight = SingleFlight("public.teams.list")
+
 
 @router.get("/", response_model=List[TeamResponse])
+@cached_response(List[TeamResponse], tags={"teams"})
 async def list_teams(
-    group: Optional[GroupEnum] = Query(None, description="Filter by group (A or B)"),
+    request: Request,
+    group: Optional[GroupCode] = Query(None, description="Filter by group (e.g. A or B)"),
     active: Optional[bool] = Query(True, description="Filter by active status"),
+    season_id: Optional[UUID] = Query(None, description="Season, defaults to the current season"),
     db: AsyncSession = Depends(get_db),
 ):
     """
-    List all teams.
+    List all teams of a season.
     
     Query parameters:
-    - group: Filter by group (A or B)
+    - group: Filter by group (e.g. A or B)
     - active: Filter by active status (default: true)
+    - season_id: Season to list (default: current season)
     """
-    query = select(Team).options(
-        selectinload(Team.team_players).selectinload(TeamPlayer.player)
-    )
+    state = await get_league_state(db, season_id)
+    if state is not None:
+        return state.list_teams(group=group, active=active)
     
-    conditions = []
-    if active is not None:
-        conditions.append(Team.active == active)
-    if group:
-        conditions.append(Team.group == group)
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    if is_archived(season_id):
+        return load_archived_season(season_id).list_teams(group=group, active=active)
     
-    if conditions:
+    async def query_teams(session: AsyncSession) -> List[TeamResponse]:
+        query = select(Team).options(
+            selectinload(Team.team_players).selectinload(TeamPlayer.player)
+        )
+        
+        conditions = [Team.season_id == season_id]
+        if active is not None:
+            conditions.append(Team.active == active)
+        if group:
+            conditions.append(Team.division_id == division_id_subquery(season_id, group))
+        
         query = query.where(and_(*conditions))
-    
-    result = await db.execute(query)
-    teams = result.scalars().all()
-    
-    # Convert to response format
-    team_responses = []
-    for team in teams:
-        players = []
-        for team_player in team.team_players:
-            players.append(TeamPlayerResponse(
-                id=team_player.player.id,
-                name=team_player.player.name,
-                role=team_player.role.value.lower()  # Convert "MAIN"/"RESERVE" to "main"/"reserve"
+        
+        result = await session.execute(query)
+        teams = result.scalars().all()
+        
+        # Convert to response format
+        team_responses = []
+        for team in teams:
+            players = []
+            for team_player in team.team_players:
+                players.append(TeamPlayerResponse(
+                    id=team_player.player.id,
+                    name=team_player.player.name,
+                    role=team_player.role.value.lower()  # Convert "MAIN"/"RESERVE" to "main"/"reserve"
+                ))
+        
+            team_responses.append(TeamResponse(
+                id=team.id,
+                name=team.name,
+                group=team.group,
+                season_id=team.season_id,
+                active=team.active,
+                players=players,
+                rating=team.rating
             ))
         
-        team_responses.append(TeamResponse(
-            id=team.id,
-            name=team.name,
-            group=team.group,
-            active=team.active,
-            players=players
-        ))
-    
-    return team_responses
+        return team_responses
+
+    # Concurrent identical list requests share one query; the invalidation
+    # generation keeps requests after an admin write out of older queries
+    return await _list_flight.do(
+        (season_id, group, active, current_generation()), query_teams, session_factory(db), release=db
+    )
 
 
 @router.get("/{team_id}", response_model=TeamResponse)
+@cached_response(TeamResponse, tags=lambda team, **_: {f"team:{team.id}"})
 async def get_team(
+    request: Request,
     team_id: UUID,
     db: AsyncSession = Depends(get_db),
 ):
     """
     Get team details by ID.
     """
+    state = await get_league_state(db)
+    if state is not None:
+        team = state.get_team(team_id)
+        if team is not None:
+            return team
+    
     query = select(Team).where(Team.id == team_id).options(
         selectinload(Team.team_players).selectinload(TeamPlayer.player)
     )
@@ -84,7 +124,11 @@ async def get_team(
     team = result.scalar_one_or_none()
     
     if not team:
-        raise HTTPException(status_code=404, detail="Team not found")
+        # Teams of archived seasons only exist in the season archive
+        archived = find_archived_team(team_id)
+        if archived is None:
+            raise HTTPException(status_code=404, detail="Team not found")
+        return archived.get_team(team_id)
     
     # Convert to response format
     players = []
@@ -99,8 +143,27 @@ async def get_team(
         id=team.id,
         name=team.name,
         group=team.group,
+        season_id=team.season_id,
         active=team.active,
-        players=players
+        players=players,
+        rating=team.rating
     )
 
 
+@router.get("/{team_id}/ratings", response_model=List[TeamRatingResponse])
+@cached_response(List[TeamRatingResponse], tags=lambda _, team_id, **__: {f"team:{team_id}"})
+async def get_team_ratings(
+    request: Request,
+    team_id: UUID,
+    db: AsyncSession = Depends(get_db),
+):
+    """
+    Rating history of a team: its rating after each played match, oldest first.
+    Teams of archived seasons only keep their final rating.
+    """
+    history = await team_rating_history(db, team_id)
+    if not history:
+        exists = await db.scalar(select(Team.id).where(Team.id == team_id))
+        if exists is None and find_archived_team(team_id) is None:
+            raise HTTPException(status_code=404, detail="Team not found")
+    return [TeamRatingResponse.model_validate(row) for row in history]
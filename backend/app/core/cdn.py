@@ -0,0 +1,207 @@
+"""
+CDN edge caching: Surrogate-Key headers and purges.
+
+Public responses carry a Surrogate-Key header listing their invalidation
+tags ("teams", "team:{id}", "group:A", "standings", ... - see
+app/core/response_cache.py), so the CDN can index cached objects by the
+entities they depend on.
+
+Admin writes committed by this worker enqueue exactly the tags they publish
+(app/core/invalidation.py). The PurgeQueue debounces them - it waits until
+no write arrived for CDN_PURGE_DEBOUNCE_SECONDS, but at most
+CDN_PURGE_MAX_DELAY_SECONDS - and sends the collected keys in batches of
+CDN_PURGE_BATCH_SIZE, so a round of result entries becomes a few purge
+requests instead of one per write.
+
+Purge clients (CDN_PURGE_BACKEND):
+- none: disabled
+- http: POST {"surrogate_keys": [...]} (or {"purge_all": true}) as JSON to
+        CDN_PURGE_URL, with "Authorization: Bearer CDN_PURGE_TOKEN" if set
+Other CDNs: implement `purge(keys)` and `purge_all()` and install the client
+with `set_purge_client`. scripts/cdn_purge_standin.py is a local stand-in
+for the http client that records the purges it receives.
+"""
+import asyncio
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, Set
+
+from app.core.config import settings
+from app.core.invalidation import ALL, subscribe_commits
+
+
+def surrogate_headers(tags: Iterable[str]) -> Dict[str, str]:
+    """Headers telling the CDN which keys purge a response"""
+    headers = {"Surrogate-Key": " ".join(sorted(tags))}
+    if settings.CDN_SURROGATE_MAX_AGE > 0:
+        headers["Surrogate-Control"] = f"max-age={settings.CDN_SURROGATE_MAX_AGE}"
+    return headers
+
+
+class HttpPurgeClient:
+    """Generic JSON purge endpoint (the shape of Fastly's batch surrogate-key purge)"""
+
+    def __init__(self, url: str, token: str = "", timeout_s: float = 10.0) -> None:
+        self.url = url
+        self.headers = {"Authorization": f"Bearer {token}"} if token else {}
+        self.timeout_s = timeout_s
+
+    async def _post(self, payload: dict) -> None:
+        import httpx
+
+        async with httpx.AsyncClient(timeout=self.timeout_s) as client:
+            response = await client.post(self.url, json=payload, headers=self.headers)
+            response.raise_for_status()
+
+    async def purge(self, keys: List[str]) -> None:
+        await self._post({"surrogate_keys": keys})
+
+    async def purge_all(self) -> None:
+        await self._post({"purge_all": True})
+
+
+class PurgeQueue:
+    """Collects surrogate keys of committed writes and purges them debounced and batched"""
+
+    def __init__(self, client, debounce_s: float, max_delay_s: float, batch_size: int, attempts: int = 3) -> None:
+        self.client = client
+        self.debounce_s = debounce_s
+        self.max_delay_s = max(max_delay_s, debounce_s)
+        self.batch_size = max(1, batch_size)
+        self.attempts = attempts
+        self.requests = 0
+        self.keys_purged = 0
+        self.failures = 0
+        self._keys: Set[str] = set()
+        self._purge_all = False
+        self._first = 0.0
+        self._last = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    def add(self, keys: Iterable[str]) -> None:
+        keys = set(keys)
+        if ALL in keys:
+            self._purge_all = True
+        self._keys.update(keys - {ALL})
+        if not self._keys and not self._purge_all:
+            return
+        self._last = time.monotonic()
+        if self._task is None:
+            try:
+                loop = asyncio.get_running_loop()
+            except RuntimeError:
+                return  # No loop (sync scripts): sent with the next write or by close()
+            self._first = self._last
+            self._task = loop.create_task(self._run(), name="cdn-purge")
+
+    async def _run(self) -> None:
+        try:
+            while self._keys or self._purge_all:
+                while True:
+                    wait = min(self._last + self.debounce_s, self._first + self.max_delay_s) - time.monotonic()
+                    if wait <= 0:
+                        break
+                    await asyncio.sleep(wait)
+                await self.flush()
+                self._first = time.monotonic()  # Keys that arrived meanwhile wait their own delay
+        finally:
+            self._task = None
+
+    async def flush(self) -> None:
+        """Send everything queued now"""
+        keys, purge_all = sorted(self._keys), self._purge_all
+        self._keys, self._purge_all = set(), False
+        if purge_all:
+            await self._send(self.client.purge_all)
+            return
+        for start in range(0, len(keys), self.batch_size):
+            batch = keys[start:start + self.batch_size]
+            if await self._send(self.client.purge, batch):
+                self.keys_purged += len(batch)
+
+    async def _send(self, call, *args) -> bool:
+        for attempt in range(self.attempts):
+            try:
+                self.requests += 1
+                await call(*args)
+                return True
+            except Exception as e:
+                if attempt + 1 == self.attempts:
+                    # The CDN serves these until Surrogate-Control max-age expires
+                    self.failures += 1
+                    print(f"WARNING: CDN purge failed: {e}", file=sys.stderr, flush=True)
+                    return False
+                await asyncio.sleep(0.5 * 2 ** attempt)
+        return False
+
+    async def close(self) -> None:
+        """Stop waiting and send what is queued (application shutdown)"""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._keys or self._purge_all:
+            await self.flush()
+
+    def stats(self) -> dict:
+        return {
+            "requests": self.requests,
+            "keys_purged": self.keys_purged,
+            "failures": self.failures,
+            "queued": len(self._keys),
+        }
+
+
+_queue: Optional[PurgeQueue] = None
+_configured = False
+
+
+def _new_queue(client) -> PurgeQueue:
+    return PurgeQueue(
+        client,
+        debounce_s=settings.CDN_PURGE_DEBOUNCE_SECONDS,
+        max_delay_s=settings.CDN_PURGE_MAX_DELAY_SECONDS,
+        batch_size=settings.CDN_PURGE_BATCH_SIZE,
+    )
+
+
+def get_purge_queue() -> Optional[PurgeQueue]:
+    """The configured purge queue (created on first use), None when disabled"""
+    global _queue, _configured
+    if not _configured:
+        backend = settings.CDN_PURGE_BACKEND.lower()
+        if backend == "http":
+            if not settings.CDN_PURGE_URL:
+                raise ValueError("CDN_PURGE_BACKEND=http requires CDN_PURGE_URL")
+            _queue = _new_queue(HttpPurgeClient(settings.CDN_PURGE_URL, settings.CDN_PURGE_TOKEN))
+        elif backend != "none":
+            raise ValueError(f"Unknown CDN_PURGE_BACKEND {settings.CDN_PURGE_BACKEND!r} (http or none)")
+        _configured = True
+    return _queue
+
+
+def set_purge_client(client) -> Optional[PurgeQueue]:
+    """Purge through `client` (None disables purging); returns the new queue"""
+    global _queue, _configured
+    _queue = _new_queue(client) if client is not None else None
+    _configured = True
+    return _queue
+
+
+@subscribe_commits
+def _purge_committed(tags: set) -> None:
+    queue = get_purge_queue()
+    if queue is not None:
+        queue.add(tags)
+
+
+async def stop_purges() -> None:
+    if _queue is not None:
+        await _queue.close()
+
+
+def purge_stats() -> Optional[dict]:
+    return _queue.stats() if _queue is not None else None
@@ -0,0 +1,246 @@
+"""
+Response compression (gzip and Brotli).
+
+`CompressionMiddleware` negotiates the encoding from Accept-Encoding
+(Brotli preferred when the `brotli` package is installed) and compresses
+JSON/text responses of at least COMPRESSION_MINIMUM_SIZE bytes, buffered
+ones in one shot and streamed ones (exports) chunk by chunk. Responses that
+already carry a Content-Encoding pass through untouched: the response cache
+(app/core/response_cache.py) stores entries precompressed with `precompress`
+and serves the negotiated variant directly, so hits cost no compression.
+
+Bytes in/out and the time spent compressing are counted per encoding and
+reported by /metrics.
+"""
+import time
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+_COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+
+_brotli_module = None
+_brotli_checked = False
+
+
+def _brotli():
+    """The brotli module, or None when it is not installed (gzip only)"""
+    global _brotli_module, _brotli_checked
+    if not _brotli_checked:
+        try:
+            import brotli
+            _brotli_module = brotli
+        except ImportError:
+            _brotli_module = None
+        _brotli_checked = True
+    return _brotli_module
+
+
+def available_encodings() -> List[str]:
+    """Supported encodings in order of preference"""
+    return ["br", "gzip"] if _brotli() is not None else ["gzip"]
+
+
+def negotiate(accept_encoding: Optional[str]) -> Optional[str]:
+    """The encoding to use for a request's Accept-Encoding header, None for identity"""
+    if not accept_encoding or not settings.COMPRESSION_ENABLED:
+        return None
+    weights: Dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[token.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in available_encodings():
+        q = weights.get(encoding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def is_compressible(content_type: Optional[str]) -> bool:
+    return bool(content_type) and content_type.startswith(_COMPRESSIBLE_TYPES)
+
+
+class CompressionStats:
+    """Per-encoding counters: responses, bytes before/after, seconds spent compressing"""
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, List[float]] = {}
+
+    def record(self, encoding: str, bytes_in: int, bytes_out: int, seconds: float, responses: int = 1) -> None:
+        counters = self._counters.setdefault(encoding, [0, 0, 0, 0.0, 0])
+        counters[0] += responses
+        counters[1] += bytes_in
+        counters[2] += bytes_out
+        counters[3] += seconds
+
+    def record_precompressed_hit(self, encoding: str, bytes_in: int, bytes_out: int) -> None:
+        self.record(encoding, bytes_in, bytes_out, 0.0)
+        self._counters[encoding][4] += 1
+
+    def as_dict(self) -> Dict[str, dict]:
+        return {
+            encoding: {
+                "responses": int(responses),
+                "precompressed_hits": int(hits),
+                "bytes_in": int(bytes_in),
+                "bytes_out": int(bytes_out),
+                "bytes_saved": int(bytes_in - bytes_out),
+                "ratio": round(bytes_out / bytes_in, 3) if bytes_in else None,
+                "cpu_ms_per_response": round(seconds * 1000 / responses, 3) if responses else None,
+            }
+            for encoding, (responses, bytes_in, bytes_out, seconds, hits) in self._counters.items()
+        }
+
+
+stats = CompressionStats()
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """One-shot compression at the configured level"""
+    if encoding == "br":
+        return _brotli().compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+    compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+    return compressor.compress(body) + compressor.flush()
+
+
+def precompress(body: bytes) -> Dict[str, bytes]:
+    """Compressed variants of a body worth compressing (for cache entries)"""
+    if not settings.COMPRESSION_ENABLED or len(body) < settings.COMPRESSION_MINIMUM_SIZE:
+        return {}
+    variants = {}
+    for encoding in available_encodings():
+        started = time.perf_counter()
+        variants[encoding] = compress(body, encoding)
+        stats.record(encoding, 0, 0, time.perf_counter() - started, responses=0)
+    return variants
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes after every chunk so streams stay live"""
+
+    def __init__(self, encoding: str) -> None:
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = _brotli().Compressor(quality=settings.COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(settings.COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def process(self, chunk: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(chunk) + self._compressor.flush()
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush()
+
+
+def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    for index, (name, value) in enumerate(headers):
+        if name.lower() == b"vary":
+            if b"accept-encoding" not in value.lower():
+                headers[index] = (name, value + b", Accept-Encoding")
+            return headers
+    headers.append((b"vary", b"Accept-Encoding"))
+    return headers
+
+
+class CompressionMiddleware:
+    """ASGI middleware compressing JSON/text responses with gzip or Brotli"""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or not settings.COMPRESSION_ENABLED:
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = None
+        for name, value in scope.get("headers", ()):
+            if name == b"accept-encoding":
+                accept_encoding = value.decode("latin-1")
+                break
+        await self.app(scope, receive, _Responder(send, negotiate(accept_encoding)).send)
+
+
+class _Responder:
+    def __init__(self, send, encoding: Optional[str]) -> None:
+        self._send = send
+        self.encoding = encoding
+        self.start: Optional[dict] = None
+        self.passthrough = False
+        self.compressor: Optional[_StreamCompressor] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.seconds = 0.0
+
+    async def send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if self.compressor is None:
+            await self._first_body(body, more_body)
+            return
+
+        started = time.perf_counter()
+        data = self.compressor.process(body) if body else b""
+        if not more_body:
+            data += self.compressor.finish()
+        self._count(len(body), len(data), time.perf_counter() - started, done=not more_body)
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    async def _first_body(self, body: bytes, more_body: bool) -> None:
+        start = self.start
+        headers = list(start.get("headers", []))
+        names = {name.lower(): value for name, value in headers}
+        content_type = names.get(b"content-type", b"").decode("latin-1")
+        compressible = is_compressible(content_type) and start["status"] not in (204, 304)
+        if compressible:
+            headers = _with_vary(headers)
+
+        if (
+            not compressible
+            or self.encoding is None
+            or b"content-encoding" in names  # Precompressed (response cache) or already encoded
+            or (not more_body and len(body) < settings.COMPRESSION_MINIMUM_SIZE)
+        ):
+            self.passthrough = True
+            await self._send({**start, "headers": headers})
+            await self._send({"type": "http.response.body", "body": body, "more_body": more_body})
+            return
+
+        headers = [(n, v) for n, v in headers if n.lower() != b"content-length"]
+        headers.append((b"content-encoding", self.encoding.encode("latin-1")))
+        started = time.perf_counter()
+        if more_body:
+            self.compressor = _StreamCompressor(self.encoding)
+            data = self.compressor.process(body) if body else b""
+        else:
+            data = compress(body, self.encoding)
+            headers.append((b"content-length", str(len(data)).encode("latin-1")))
+        self._count(len(body), len(data), time.perf_counter() - started, done=not more_body)
+        await self._send({**start, "headers": headers})
+        await self._send({"type": "http.response.body", "body": data, "more_body": more_body})
+
+    def _count(self, bytes_in: int, bytes_out: int, seconds: float, done: bool) -> None:
+        self.bytes_in += bytes_in
+        self.bytes_out += bytes_out
+        self.seconds += seconds
+        if done:
+            stats.record(self.encoding, self.bytes_in, self.bytes_out, self.seconds)
@@ -90,6 +90,61 @@ class Settings(BaseSettings):
     ENVIRONMENT: str = "development"
     DEBUG: bool = True
     
+    # Server
+    WORKERS: int = 1  # uvicorn worker processes started by scripts/start.sh
+    
+    # Cache invalidation (PostgreSQL LISTEN/NOTIFY, see app/core/invalidation.py)
+    CACHE_INVALIDATION_LISTEN: bool = True
+    CACHE_INVALIDATION_CHANNEL: str = "district_padel_invalidate"
+    CACHE_INVALIDATION_KEEPALIVE_SECONDS: float = 30.0
+    
+    # Archived seasons (Arrow IPC files, see app/services/season_archive.py)
+    SEASON_ARCHIVE_DIR: str = "archive"  # Must be shared by all workers and survive deploys
+    SEASON_ARCHIVE_COMPRESSION: str = "zstd"  # zstd, lz4 or none (none = zero-copy memory map)
+    SEASON_ARCHIVE_CACHE_SIZE: int = 4  # Archived seasons kept open per worker
+    
+    # In-memory current season for public reads (see app/services/league_state.py)
+    LEAGUE_STATE_ENABLED: bool = True
+    LEAGUE_STATE_CHECK_SECONDS: float = 300.0  # Background consistency check against the database, 0 disables
+    LEAGUE_SNAPSHOT_PATH: str = "snapshot/league.snapshot"  # Cold-start snapshot, empty disables
+    LEAGUE_SNAPSHOT_SECONDS: float = 60.0  # How often workers refresh the snapshot if data changed, 0 disables writing
+    
+    # Set score storage (see app/services/match_service.py)
+    MATCH_SET_STORAGE: str = "rows"  # rows (match_sets table) or array (set_scores column on matches)
+    
+    # Team ratings (see app/services/ratings.py)
+    RATING_INITIAL: float = 1500.0  # Rating of every team at the start of a season
+    RATING_K: float = 32.0  # Largest change from one match (before the margin factor)
+    
+    # Season outcome simulation (see app/services/season_simulator.py)
+    SIMULATION_RUNS: int = 100_000  # Simulated seasons per table; results are cached per league version
+    SIMULATION_WORKERS: int = 2  # Processes in the simulation pool, 0 = run in a thread of the worker
+    SIMULATION_STRENGTH_MODEL: str = "sets"  # sets (set ratio so far), rating (team ratings) or equal (every set a coin flip)
+    SIMULATION_STRENGTH_PRIOR: float = 4.0  # Pseudo-sets won and lost per team, damps early-season ratios
+    SIMULATION_SEED: int = 2025  # Same league version -> same result on every worker
+    
+    # Public response cache (see app/core/response_cache.py)
+    RESPONSE_CACHE_BACKEND: str = "memory"  # memory, redis or none
+    RESPONSE_CACHE_TTL_SECONDS: float = 300.0  # Safety net; entries are purged by tag on admin writes
+    RESPONSE_CACHE_MAX_BYTES: int = 32 * 1024 * 1024  # Per worker, memory backend only
+    RESPONSE_CACHE_REDIS_URL: str = "redis://localhost:6379/0"
+    RESPONSE_CACHE_REDIS_PREFIX: str = "district_padel:response:"
+    
+    # Response compression (see app/core/compression.py)
+    COMPRESSION_ENABLED: bool = True
+    COMPRESSION_MINIMUM_SIZE: int = 1024  # Smaller responses are sent uncompressed
+    COMPRESSION_GZIP_LEVEL: int = 6  # 1 (fastest) - 9 (smallest)
+    COMPRESSION_BROTLI_QUALITY: int = 5  # 0 (fastest) - 11 (smallest); Brotli needs the brotli package
+    
+    # CDN edge caching (see app/core/cdn.py)
+    CDN_SURROGATE_MAX_AGE: int = 0  # Surrogate-Control max-age for the CDN, 0 = no header
+    CDN_PURGE_BACKEND: str = "none"  # http or none
+    CDN_PURGE_URL: str = ""
+    CDN_PURGE_TOKEN: str = ""
+    CDN_PURGE_DEBOUNCE_SECONDS: float = 1.0  # Quiet period before queued keys are purged
+    CDN_PURGE_MAX_DELAY_SECONDS: float = 5.0  # Upper bound while writes keep arriving
+    CDN_PURGE_BATCH_SIZE: int = 256  # Keys per purge request
+    
     def _csv_to_list(self, value: str) -> List[str]:
         """Convert comma-separated environment values into trimmed lists"""
         if not value:
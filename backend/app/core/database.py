@@ -2,7 +2,7 @@
 Database connection and session management
 """
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, SessionTransactionOrigin
 
 from app.core.config import settings
 
@@ -24,6 +24,39 @@ AsyncSessionLocal = async_sessionmaker(
 )
 
 
+def session_factory(db: AsyncSession) -> async_sessionmaker:
+    """
+    Factory for independent sessions on the engine of `db`: AsyncSessionLocal
+    for the application's engine, an equivalent one for engines swapped in by
+    tests and benchmarks (get_db overrides).
+    """
+    if db.bind is engine:
+        return AsyncSessionLocal
+    return async_sessionmaker(
+        db.bind,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+async def release_connection(db: AsyncSession) -> None:
+    """
+    Give the pooled connection of a read-only `db` back by ending the
+    transaction it began implicitly; its next statement begins a new one.
+    Sessions with pending changes or an explicit `db.begin()` keep theirs.
+    """
+    transaction = db.sync_session.get_transaction()
+    if (
+        transaction is None
+        or transaction.origin is not SessionTransactionOrigin.AUTOBEGIN
+        or db.new or db.dirty or db.deleted
+    ):
+        return
+    await db.commit()  # Nothing to write: ends the transaction, objects stay loaded
+
+
 # Base class for all models
 class Base(DeclarativeBase):
     pass
@@ -0,0 +1,281 @@
+"""
+Cross-process cache invalidation via PostgreSQL LISTEN/NOTIFY.
+
+Admin writes call `publish(db, *tags)` before committing. On PostgreSQL this
+queues a NOTIFY inside the same transaction, so it is only delivered if the
+commit succeeds. The publishing worker invalidates its own caches right after
+the commit; every other worker keeps a dedicated LISTEN connection and
+invalidates its caches when the notification arrives.
+
+In-process caches register with `subscribe(callback)`; callbacks receive the
+set of invalidated tags. The ALL tag means "drop everything" and is sent after
+every (re)connect of the listener, because notifications issued while a worker
+was disconnected are lost.
+
+Tag vocabulary: "seasons", "teams", "matches", "standings", "season:{id}",
+"team:{id}", "match:{id}", "group:{code}".
+
+Every publish also increments the data_version counter in the same
+transaction; `get_data_version` tells whether anything changed since a given
+point (used to validate league snapshots).
+"""
+import asyncio
+import json
+import sys
+import uuid
+from typing import Callable, Iterable, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy import event, select, update, func
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models.data_version import DataVersion
+
+ALL = "*"
+
+# Identifies this process in NOTIFY payloads so a worker skips its own messages
+INSTANCE_ID = uuid.uuid4().hex
+
+# NOTIFY payloads must stay below 8000 bytes; fall back to ALL beyond this
+_MAX_PAYLOAD_BYTES = 7000
+_PENDING_KEY = "pending_invalidations"
+
+_subscribers: List[Callable[[Set[str]], None]] = []
+_commit_subscribers: List[Callable[[Set[str]], None]] = []
+_generation = 0
+
+
+def subscribe(callback: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """Register an in-process cache to be told about invalidated tags"""
+    _subscribers.append(callback)
+    return callback
+
+
+def subscribe_commits(callback: Callable[[Set[str]], None]) -> Callable[[Set[str]], None]:
+    """
+    Register a callback for the tags of writes committed by this process only
+    (not for notifications from other workers or listener resyncs), e.g. to
+    purge external caches exactly once per write
+    """
+    _commit_subscribers.append(callback)
+    return callback
+
+
+def invalidate_local(tags: Iterable[str]) -> None:
+    """Invalidate this process' caches for the given tags"""
+    global _generation
+    tags = set(tags)
+    if not tags:
+        return
+    _generation += 1
+    _notify(_subscribers, tags)
+
+
+def _notify(callbacks: List[Callable[[Set[str]], None]], tags: Set[str]) -> None:
+    for callback in list(callbacks):
+        try:
+            callback(tags)
+        except Exception as e:
+            # A broken cache must not break the write that triggered it
+            print(f"WARNING: cache invalidation callback failed: {e}", file=sys.stderr, flush=True)
+
+
+def current_generation() -> int:
+    """Increases with every local invalidation; part of single-flight keys"""
+    return _generation
+
+
+def caches_are_coherent() -> bool:
+    """
+    Whether in-process caches may be served.
+    True for a single process without a listener (tests, scripts) or when the
+    listener is connected; False while it is (re)connecting, since other
+    workers' writes would go unnoticed.
+    """
+    return listener is None or listener.connected.is_set()
+
+
+def team_tags(team_id: UUID, *groups) -> Set[str]:
+    """Tags affected by a change to a team (names show up in matches and standings)"""
+    tags = {"teams", "matches", "standings", f"team:{team_id}"}
+    tags.update(f"group:{_group_code(g)}" for g in groups if g is not None)
+    return tags
+
+
+def match_tags(match_id: UUID, *groups) -> Set[str]:
+    """Tags affected by a change to a match or its result"""
+    tags = {"matches", "standings", f"match:{match_id}"}
+    tags.update(f"group:{_group_code(g)}" for g in groups if g is not None)
+    return tags
+
+
+def season_tags(season_id: UUID) -> Set[str]:
+    """Tags affected by a change to a season, its divisions or which season is current"""
+    return {"seasons", "teams", "matches", "standings", f"season:{season_id}"}
+
+
+def _group_code(group) -> str:
+    return getattr(group, "value", group)
+
+
+async def publish(db: AsyncSession, *tags: str) -> None:
+    """
+    Announce that the current transaction changes data behind `tags`.
+    Call before commit; nothing is invalidated if the transaction rolls back.
+    """
+    tags = {t for t in tags if t}
+    if not tags:
+        return
+    db.info.setdefault(_PENDING_KEY, set()).update(tags)
+    await db.execute(_bump_version_statement(db.bind.dialect.name if db.bind is not None else None))
+
+    if db.bind is not None and db.bind.dialect.name == "postgresql":
+        payload = json.dumps({"origin": INSTANCE_ID, "tags": sorted(tags)})
+        if len(payload.encode("utf-8")) > _MAX_PAYLOAD_BYTES:
+            payload = json.dumps({"origin": INSTANCE_ID, "tags": [ALL]})
+        await db.execute(select(func.pg_notify(settings.CACHE_INVALIDATION_CHANNEL, payload)))
+
+
+def _bump_version_statement(dialect_name: Optional[str]):
+    if dialect_name == "postgresql":
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect_name == "sqlite":
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        return update(DataVersion).where(DataVersion.id == 1).values(version=DataVersion.version + 1)
+    # Upsert: databases created with metadata.create_all have no row yet
+    return insert(DataVersion).values(id=1, version=1).on_conflict_do_update(
+        index_elements=[DataVersion.id],
+        set_={"version": DataVersion.version + 1},
+    )
+
+
+async def get_data_version(db: AsyncSession) -> int:
+    """Current data version (0 before the first published write)"""
+    result = await db.execute(select(DataVersion.version).where(DataVersion.id == 1))
+    return result.scalar_one_or_none() or 0
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    tags = session.info.pop(_PENDING_KEY, None)
+    if tags:
+        invalidate_local(tags)
+        _notify(_commit_subscribers, tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session: Session) -> None:
+    session.info.pop(_PENDING_KEY, None)
+
+
+class InvalidationListener:
+    """
+    Keeps a dedicated asyncpg connection LISTENing on the invalidation channel.
+    Reconnects with backoff and resynchronizes (invalidates everything) after
+    every successful (re)connect.
+    """
+
+    def __init__(self, dsn: str, channel: str, keepalive_s: float = 30.0, max_backoff_s: float = 30.0) -> None:
+        self.dsn = dsn
+        self.channel = channel
+        self.keepalive_s = keepalive_s
+        self.max_backoff_s = max_backoff_s
+        self.connected = asyncio.Event()
+        self.reconnects = 0
+        self.received = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run(), name="invalidation-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.connected.clear()
+
+    def _on_notification(self, connection, pid, channel, payload: str) -> None:
+        self.received += 1
+        try:
+            message = json.loads(payload)
+        except ValueError:
+            invalidate_local({ALL})
+            return
+        if message.get("origin") == INSTANCE_ID:
+            return  # Already invalidated locally after our own commit
+        invalidate_local(message.get("tags") or [ALL])
+
+    async def _run(self) -> None:
+        import asyncpg
+
+        backoff = 0.5
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(self.dsn)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _conn: lost.set())
+                await connection.add_listener(self.channel, self._on_notification)
+
+                # LISTEN is active: anything committed from now on is delivered.
+                # Anything committed while we were not listening is unknown - resync.
+                invalidate_local({ALL})
+                if self.reconnects:
+                    print(f"✓ Cache invalidation listener reconnected (#{self.reconnects})", flush=True)
+                self.connected.set()
+                backoff = 0.5
+
+                while not lost.is_set():
+                    try:
+                        await asyncio.wait_for(lost.wait(), timeout=self.keepalive_s)
+                    except asyncio.TimeoutError:
+                        # Detect half-open connections that never report termination
+                        await asyncio.wait_for(connection.fetchval("SELECT 1"), timeout=self.keepalive_s)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"WARNING: cache invalidation listener error: {e}", file=sys.stderr, flush=True)
+            finally:
+                self.connected.clear()
+                if connection is not None and not connection.is_closed():
+                    try:
+                        await connection.close(timeout=5)
+                    except Exception:
+                        connection.terminate()
+
+            self.reconnects += 1
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, self.max_backoff_s)
+
+
+listener: Optional[InvalidationListener] = None
+
+
+def start_listener() -> Optional[InvalidationListener]:
+    """Start the LISTEN connection for this worker (PostgreSQL only)"""
+    global listener
+    if not settings.CACHE_INVALIDATION_LISTEN:
+        return None
+    dsn = settings.DATABASE_URL.replace("postgresql+asyncpg://", "postgresql://", 1)
+    listener = InvalidationListener(
+        dsn,
+        settings.CACHE_INVALIDATION_CHANNEL,
+        keepalive_s=settings.CACHE_INVALIDATION_KEEPALIVE_SECONDS,
+    )
+    listener.start()
+    return listener
+
+
+async def stop_listener() -> None:
+    global listener
+    if listener is not None:
+        await listener.stop()
+        listener = None
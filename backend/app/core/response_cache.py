@@ -0,0 +1,363 @@
+"""
+Route-level response cache for public reads.
+
+Public list/detail responses are pure functions of the database state and
+the query parameters, so `@cached_response` stores their serialized JSON
+bytes keyed by path and normalized query string. A hit returns the bytes
+without running the endpoint or the response model serialization.
+
+Every entry carries invalidation tags (see app/core/invalidation.py):
+the admin write that publishes "team:{id}", "match:{id}", "group:A",
+"standings", ... drops exactly the entries tagged with it, on this worker
+right after the commit and on the others when the notification arrives.
+
+Backends (RESPONSE_CACHE_BACKEND):
+- memory: per-process LRU bounded by RESPONSE_CACHE_MAX_BYTES, with TTL
+- redis:  shared by all workers on a Redis-compatible server; size bound and
+          eviction come from the server's maxmemory / allkeys-lru settings
+- none:   disabled
+
+Entries are stored precompressed (gzip/Brotli, app/core/compression.py)
+next to the plain body; a hit returns the variant the client accepts, so
+the compression middleware does no work for it.
+
+Entries are only served while caches are coherent across workers, and a
+response is not stored if an invalidation overtook its computation.
+"""
+import asyncio
+import functools
+import sys
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Iterable, NamedTuple, Optional, Set, Tuple, Union
+from urllib.parse import parse_qsl, urlencode
+
+from fastapi import Request, Response
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.cdn import surrogate_headers
+from app.core.compression import negotiate, precompress, stats as compression_stats
+from app.core.config import settings
+from app.core.database import session_factory
+from app.core.invalidation import ALL, subscribe, caches_are_coherent, current_generation
+from app.core.singleflight import SingleFlight
+
+Tags = Union[Iterable[str], Callable[..., Iterable[str]]]
+
+IDENTITY = "identity"
+
+
+class CacheHit(NamedTuple):
+    body: bytes
+    encoding: str  # IDENTITY, "gzip" or "br"
+    tags: Set[str]
+    size: int  # Uncompressed size
+
+
+def _pick(variants: Dict[str, bytes], encoding: Optional[str]) -> str:
+    return encoding if encoding in variants else IDENTITY
+
+
+def cache_key(request: Request) -> str:
+    """Path plus query parameters in sorted order"""
+    query = sorted(parse_qsl(request.url.query, keep_blank_values=True))
+    return f"{request.url.path}?{urlencode(query)}" if query else request.url.path
+
+
+class MemoryResponseCache:
+    """Per-process LRU of serialized responses with TTL and a tag index"""
+
+    def __init__(self, max_bytes: int, ttl_s: float) -> None:
+        self.max_bytes = max_bytes
+        self.ttl_s = ttl_s
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # key -> ({encoding: body}, expires, tags)
+        self._entries: "OrderedDict[str, Tuple[Dict[str, bytes], float, Set[str]]]" = OrderedDict()
+        self._tags: Dict[str, Set[str]] = {}
+
+    async def get(self, key: str, encoding: Optional[str] = None) -> Optional[CacheHit]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            if entry is not None:
+                self._remove(key)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        variants = entry[0]
+        chosen = _pick(variants, encoding)
+        return CacheHit(variants[chosen], chosen, entry[2], len(variants[IDENTITY]))
+
+    async def set(self, key: str, variants: Dict[str, bytes], tags: Set[str]) -> None:
+        size = sum(len(body) for body in variants.values())
+        if size > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (variants, time.monotonic() + self.ttl_s, tags)
+        self.size += size
+        for tag in tags:
+            self._tags.setdefault(tag, set()).add(key)
+        while self.size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def invalidate(self, tags: Set[str]) -> None:
+        if ALL in tags:
+            self.clear()
+            return
+        for tag in tags:
+            for key in list(self._tags.get(tag, ())):
+                self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._tags.clear()
+        self.size = 0
+
+    async def settle(self) -> None:
+        """Nothing to wait for: invalidation is synchronous"""
+
+    def _remove(self, key: str) -> None:
+        variants, _, tags = self._entries.pop(key)
+        self.size -= sum(len(body) for body in variants.values())
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+    def stats(self) -> dict:
+        return {
+            "backend": "memory",
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+class RedisResponseCache:
+    """
+    Responses shared by all workers on a Redis-compatible server.
+
+    Entries are hashes with the space-separated tags and one field per
+    encoding. Each tag is a set of the keys stored under it. Invalidation runs as a task
+    (subscribers are synchronous); `settle` waits for it so a read following
+    a write on this worker never sees the purged entries. Redis errors count
+    as misses.
+    """
+
+    def __init__(self, url: str, ttl_s: float, prefix: str) -> None:
+        try:
+            import redis.asyncio as aioredis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis requires the redis package (pip install redis)") from e
+        from redis.exceptions import RedisError
+
+        self._redis = aioredis.Redis.from_url(url)
+        self._errors = (RedisError, OSError)
+        self.ttl_s = max(1, int(ttl_s))
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.failures = 0
+        self._available = True
+        self._pending: Set[asyncio.Task] = set()
+
+    def _entry_key(self, key: str) -> str:
+        return f"{self.prefix}r:{key}"
+
+    def _tag_key(self, tag: str) -> str:
+        return f"{self.prefix}t:{tag}"
+
+    def _failed(self, e: Exception) -> None:
+        self.failures += 1
+        if self._available:  # Warn once per outage
+            print(f"WARNING: response cache (redis) unavailable: {e}", file=sys.stderr, flush=True)
+            self._available = False
+
+    async def get(self, key: str, encoding: Optional[str] = None) -> Optional[CacheHit]:
+        fields = ["tags", "size", IDENTITY] + ([encoding] if encoding else [])
+        try:
+            values = await self._redis.hmget(self._entry_key(key), fields)
+            self._available = True
+        except self._errors as e:
+            self._failed(e)
+            values = [None]
+        if values[0] is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        tags = set(values[0].decode().split())
+        if encoding and values[3] is not None:
+            return CacheHit(values[3], encoding, tags, int(values[1]))
+        return CacheHit(values[2], IDENTITY, tags, int(values[1]))
+
+    async def set(self, key: str, variants: Dict[str, bytes], tags: Set[str]) -> None:
+        entry_key = self._entry_key(key)
+        pipe = self._redis.pipeline(transaction=False)
+        pipe.delete(entry_key)
+        pipe.hset(entry_key, mapping={"tags": " ".join(sorted(tags)), "size": len(variants[IDENTITY]), **variants})
+        pipe.expire(entry_key, self.ttl_s)
+        for tag in tags:
+            pipe.sadd(self._tag_key(tag), entry_key)
+            pipe.expire(self._tag_key(tag), self.ttl_s)
+        try:
+            await pipe.execute()
+        except self._errors as e:
+            self._failed(e)
+
+    def invalidate(self, tags: Set[str]) -> None:
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return  # No loop (sync scripts): entries expire through their TTL
+        task = loop.create_task(self._purge(set(tags)))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    async def _purge(self, tags: Set[str]) -> None:
+        try:
+            if ALL in tags:
+                keys = [key async for key in self._redis.scan_iter(match=f"{self.prefix}*", count=500)]
+            else:
+                keys = []
+                for tag in tags:
+                    keys.append(self._tag_key(tag))
+                    keys.extend(await self._redis.smembers(self._tag_key(tag)))
+            for start in range(0, len(keys), 500):
+                await self._redis.unlink(*keys[start:start + 500])
+        except self._errors as e:
+            self._failed(e)
+
+    async def settle(self) -> None:
+        loop = asyncio.get_running_loop()
+        pending = [task for task in self._pending if task.get_loop() is loop]
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "failures": self.failures,
+        }
+
+
+ResponseCache = Union[MemoryResponseCache, RedisResponseCache]
+
+_cache: Optional[ResponseCache] = None
+_configured = False
+_render_flight = SingleFlight("response_cache.render")
+
+
+def get_response_cache() -> Optional[ResponseCache]:
+    """The configured backend (created on first use), None when disabled"""
+    global _cache, _configured
+    if not _configured:
+        backend = settings.RESPONSE_CACHE_BACKEND.lower()
+        if backend == "memory":
+            _cache = MemoryResponseCache(settings.RESPONSE_CACHE_MAX_BYTES, settings.RESPONSE_CACHE_TTL_SECONDS)
+        elif backend == "redis":
+            _cache = RedisResponseCache(
+                settings.RESPONSE_CACHE_REDIS_URL,
+                settings.RESPONSE_CACHE_TTL_SECONDS,
+                settings.RESPONSE_CACHE_REDIS_PREFIX,
+            )
+        elif backend != "none":
+            raise ValueError(f"Unknown RESPONSE_CACHE_BACKEND {settings.RESPONSE_CACHE_BACKEND!r} (memory, redis or none)")
+        _configured = True
+    return _cache
+
+
+def set_response_cache(cache: Optional[ResponseCache]) -> None:
+    """Replace the backend (None disables caching), e.g. in tests and benchmarks"""
+    global _cache, _configured
+    _cache = cache
+    _configured = True
+
+
+@subscribe
+def _invalidate_responses(tags: set) -> None:
+    if _cache is not None:
+        _cache.invalidate(tags)
+
+
+def response_cache_stats() -> Optional[dict]:
+    return _cache.stats() if _cache is not None else None
+
+
+def _json_response(body: bytes, tags: Set[str], encoding: str = IDENTITY) -> Response:
+    headers = surrogate_headers(tags)
+    if encoding != IDENTITY:
+        headers["Content-Encoding"] = encoding  # The compression middleware passes it through
+    return Response(body, media_type="application/json", headers=headers)
+
+
+def _serve(hit: CacheHit) -> Response:
+    if hit.encoding != IDENTITY:
+        compression_stats.record_precompressed_hit(hit.encoding, hit.size, len(hit.body))
+    return _json_response(hit.body, hit.tags, hit.encoding)
+
+
+def cached_response(response_model: Any, tags: Tags) -> Callable:
+    """
+    Cache the JSON response of a GET endpoint.
+
+    The endpoint must declare `request: Request` and `db: AsyncSession`
+    parameters; on a miss it is rendered on a session of its own (see
+    app.core.singleflight). `tags` is a set
+    of invalidation tags, or a callable receiving the endpoint's result and
+    its parameters (for tags that depend on the response, e.g. team ids).
+    The tags are also sent as Surrogate-Key header (app/core/cdn.py), cached
+    or not. Only successful responses are cached; exceptions pass through.
+    """
+    adapter = TypeAdapter(response_model)
+
+    def decorator(endpoint: Callable[..., Awaitable[Any]]) -> Callable[..., Awaitable[Any]]:
+        async def render(kwargs: dict) -> Tuple[bytes, Set[str]]:
+            result = await endpoint(**kwargs)
+            return adapter.dump_json(result), set(tags(result, **kwargs) if callable(tags) else tags)
+
+        @functools.wraps(endpoint)
+        async def wrapper(**kwargs):
+            cache = get_response_cache()
+            if cache is None or not caches_are_coherent():
+                return _json_response(*await render(kwargs))
+
+            await cache.settle()
+            request: Request = kwargs["request"]
+            key = cache_key(request)
+            encoding = negotiate(request.headers.get("accept-encoding"))
+            hit = await cache.get(key, encoding)
+            if hit is not None:
+                return _serve(hit)
+
+            generation = current_generation()
+
+            async def render_and_store(session: AsyncSession) -> Tuple[Dict[str, bytes], Set[str]]:
+                # The render is shared and may outlive this request: it runs on its own session
+                body, entry_tags = await render({**kwargs, "db": session})
+                variants = {IDENTITY: body, **precompress(body)}
+                if generation == current_generation() and caches_are_coherent():
+                    await cache.set(key, variants, entry_tags)
+                return variants, entry_tags
+
+            # Concurrent misses for the same key render (and compress) once
+            variants, entry_tags = await _render_flight.do(
+                (key, generation), render_and_store, session_factory(kwargs["db"]), release=kwargs["db"]
+            )
+            chosen = _pick(variants, encoding)
+            return _serve(CacheHit(variants[chosen], chosen, entry_tags, len(variants[IDENTITY])))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,98 @@
+"""
+Single-flight request coalescing.
+
+Concurrent callers asking for the same computation (same key) share one
+in-flight coroutine and its result instead of each running it. The first
+caller starts the computation as a task and later callers await the same
+task. The key leaves the table as soon as the task finishes, so nothing is
+cached beyond the in-flight window.
+
+The task outlives the request that started it (a cancelled or finished
+caller must not break the others), so it never uses a request's session:
+it opens its own from the session factory passed in and hands it to the
+computation. `app.core.database.session_factory(db)` gives the factory for
+a request's engine. Pass the caller's session as `release` too: its
+read-only transaction is ended before waiting, so callers waiting on a task
+hold no pooled connection while the task needs one (with a pool smaller
+than the number of waiting requests, that would deadlock).
+
+Results are shared between requests and must not be mutated. Include
+`app.core.invalidation.current_generation()` in keys of database reads so a
+request that starts after an admin write never joins a computation that
+started before it.
+"""
+import asyncio
+from typing import Awaitable, Callable, Dict, Hashable, List, Optional, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.database import release_connection
+
+T = TypeVar("T")
+
+_flights: List["SingleFlight"] = []
+
+
+class SingleFlight:
+    """A named group of coalesced computations, with counters for /metrics"""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._inflight: Dict[Hashable, asyncio.Task] = {}
+        _flights.append(self)
+
+    async def do(
+        self,
+        key: Hashable,
+        fn: Callable[[AsyncSession], Awaitable[T]],
+        sessions: async_sessionmaker,
+        release: Optional[AsyncSession] = None,
+    ) -> T:
+        """
+        Run `fn(session)` on a new session from `sessions` unless a call with
+        the same key is in flight; return its result. The connection of the
+        caller's session `release` is given back before waiting.
+        """
+        if release is not None:
+            await release_connection(release)
+        self.calls += 1
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(_run(fn, sessions))
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finished(key, done))
+        # shield: one caller being cancelled must not cancel the others' result
+        return await asyncio.shield(task)
+
+    def _finished(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Retrieve the exception so it is never reported as unhandled
+        if not task.cancelled() and task.exception() is not None:
+            self.errors += 1
+
+    def stats(self) -> dict:
+        return {
+            "calls": self.calls,
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+            "errors": self.errors,
+            "in_flight": len(self._inflight),
+        }
+
+
+async def _run(fn: Callable[[AsyncSession], Awaitable[T]], sessions: async_sessionmaker) -> T:
+    async with sessions() as session:
+        return await fn(session)
+
+
+def flight_stats() -> Dict[str, dict]:
+    """Counters of every single-flight group in this process"""
+    return {flight.name: flight.stats() for flight in _flights}
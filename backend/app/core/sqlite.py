@@ -0,0 +1,82 @@
+"""
+SQLite-backed databases for tests, benchmarks and profiling without PostgreSQL.
+
+The models only use portable types (see app.core.types), so the full schema can
+be created on SQLite and the services exercised against thousands of rows in
+milliseconds. PostgreSQL-specific behaviour (query plans, native enums, NOTIFY)
+still needs a real PostgreSQL database.
+"""
+from typing import Callable, Optional
+
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, get_db
+
+
+def create_sqlite_engine(path: Optional[str] = None, echo: bool = False) -> AsyncEngine:
+    """
+    Create an async SQLite engine.
+
+    Args:
+        path: Database file path, or None for a private in-memory database.
+              In-memory databases live on a single shared connection, so use a
+              file when many sessions must run concurrently (e.g. load tests).
+        echo: Log SQL statements
+    """
+    if path is None:
+        engine = create_async_engine(
+            "sqlite+aiosqlite://",
+            echo=echo,
+            poolclass=StaticPool,
+            connect_args={"check_same_thread": False},
+        )
+    else:
+        engine = create_async_engine(f"sqlite+aiosqlite:///{path}", echo=echo)
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def _enable_foreign_keys(dbapi_connection, connection_record):
+        # SQLite ignores ON DELETE CASCADE unless foreign keys are switched on
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA foreign_keys=ON")
+        cursor.close()
+
+    return engine
+
+
+async def create_sqlite_session_factory(
+    path: Optional[str] = None,
+    create_schema: bool = True,
+) -> async_sessionmaker:
+    """
+    Create a session factory on a fresh SQLite database with the full schema.
+    Session options match AsyncSessionLocal.
+    """
+    engine = create_sqlite_engine(path)
+    if create_schema:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    return async_sessionmaker(
+        engine,
+        class_=AsyncSession,
+        expire_on_commit=False,
+        autocommit=False,
+        autoflush=False,
+    )
+
+
+def make_get_db(session_factory: async_sessionmaker) -> Callable:
+    """Build a get_db replacement that yields sessions from `session_factory`"""
+    async def _get_db() -> AsyncSession:
+        async with session_factory() as session:
+            yield session
+
+    return _get_db
+
+
+def override_get_db(app: FastAPI, session_factory: async_sessionmaker) -> None:
+    """Route every get_db dependency of `app` to `session_factory`"""
+    app.dependency_overrides[get_db] = make_get_db(session_factory)
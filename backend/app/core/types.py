@@ -0,0 +1,83 @@
+"""
+Portable column types and primary-key generation.
+
+Models use these instead of dialect-specific types so the same schema runs on
+PostgreSQL in production and on SQLite for tests and local benchmarks.
+
+New rows get time-ordered UUIDv7 keys (`uuid7`): consecutive inserts land
+on the right edge of the primary-key B-tree instead of random leaf pages.
+They are ordinary UUIDs, so existing v4 ids and the API are unaffected.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+
+from sqlalchemy import SmallInteger, Text, TypeDecorator, Uuid
+from sqlalchemy.dialects.postgresql import ARRAY
+
+
+def UUID(as_uuid: bool = True) -> Uuid:
+    """
+    UUID column type: native UUID on PostgreSQL, CHAR(32) on other dialects.
+    Drop-in replacement for sqlalchemy.dialects.postgresql.UUID.
+    """
+    return Uuid(as_uuid=as_uuid)
+
+
+class SmallIntArray(TypeDecorator):
+    """
+    List of small integers: smallint[] on PostgreSQL, JSON text on other dialects.
+    """
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "postgresql":
+            return dialect.type_descriptor(ARRAY(SmallInteger()))
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return json.dumps(list(value))
+
+    def process_result_value(self, value, dialect):
+        if value is None or dialect.name == "postgresql":
+            return value
+        return json.loads(value)
+
+
+_uuid7_lock = threading.Lock()
+_last_ms = 0
+_counter = 0
+
+
+def uuid7() -> uuid.UUID:
+    """
+    RFC 9562 UUIDv7: 48-bit Unix milliseconds, then a 12-bit counter (random
+    start each millisecond) and 62 random bits. Ids of one process are
+    strictly increasing, also within a millisecond and if the clock steps back.
+    """
+    global _last_ms, _counter
+    random_bits = int.from_bytes(os.urandom(10), "big")
+    with _uuid7_lock:
+        ms = time.time_ns() // 1_000_000
+        if ms > _last_ms:
+            _last_ms = ms
+            _counter = random_bits >> 69  # 11 bits: leaves room to count up
+        else:
+            _counter += 1
+            if _counter > 0xFFF:
+                _last_ms += 1  # Borrow the next millisecond
+                _counter = 0
+        ms, counter = _last_ms, _counter
+    value = (
+        (ms & 0xFFFF_FFFF_FFFF) << 80
+        | 0x7 << 76
+        | counter << 64
+        | 0b10 << 62
+        | random_bits & 0x3FFF_FFFF_FFFF_FFFF
+    )
+    return uuid.UUID(int=value)
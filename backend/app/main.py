@@ -7,6 +7,14 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.core.config import settings
+from app.core.invalidation import start_listener, stop_listener
+from app.core.singleflight import flight_stats
+from app.core.response_cache import response_cache_stats
+from app.core.cdn import get_purge_queue, stop_purges, purge_stats
+from app.core.compression import CompressionMiddleware, stats as compression_stats
+from app.services.league_state import start_consistency_check, stop_consistency_check
+from app.services.league_snapshot import restore_snapshot, start_snapshot_tasks, stop_snapshot_tasks
+from app.services.season_simulator import start_simulation_pool, stop_simulation_pool
 from app.api.v1.public.router import router as public_router
 from app.api.v1.admin.router import router as admin_router
 
@@ -109,10 +117,36 @@ async def lifespan(app: FastAPI):
     # Startup: Validate CORS configuration
     validate_cors_origins_on_startup()
     
+    # Startup: Serve public reads from the last league snapshot until the database catches up
+    snapshot = restore_snapshot()
+    if snapshot is not None:
+        print(f"✓ League snapshot restored ({len(snapshot.teams)} teams, {len(snapshot.matches)} matches, version {snapshot.db_version})", flush=True)
+    
+    # Startup: Listen for cache invalidations from other workers/instances
+    if start_listener():
+        print(f"✓ Cache invalidation listener started (channel: {settings.CACHE_INVALIDATION_CHANNEL})", flush=True)
+    
+    # Startup: Periodically compare the in-memory league state with the database
+    if start_consistency_check():
+        print(f"✓ League state consistency check every {settings.LEAGUE_STATE_CHECK_SECONDS:g}s", flush=True)
+    start_snapshot_tasks()
+    
+    # Startup: Processes for the season outcome simulation
+    if start_simulation_pool():
+        print(f"✓ Season simulation pool started ({settings.SIMULATION_WORKERS} processes)", flush=True)
+    
+    # Startup: Purge CDN surrogate keys after admin writes
+    if get_purge_queue():
+        print(f"✓ CDN purges enabled ({settings.CDN_PURGE_BACKEND}, debounce {settings.CDN_PURGE_DEBOUNCE_SECONDS:g}s)", flush=True)
+    
     yield
     
-    # Shutdown: Add any cleanup logic here if needed in the future
-    pass
+    # Shutdown: Send queued CDN purges, stop background tasks and close the invalidation listener connection
+    await stop_purges()
+    stop_simulation_pool()
+    await stop_snapshot_tasks()
+    await stop_consistency_check()
+    await stop_listener()
 
 
 # Create FastAPI app with lifespan events
@@ -125,6 +159,9 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Compress JSON/NDJSON/CSV responses (gzip or Brotli); cached responses arrive precompressed
+app.add_middleware(CompressionMiddleware)
+
 # Configure CORS - must be added before routers to handle error responses
 # Log CORS origins for debugging (in production, check logs to verify)
 cors_origins = settings.cors_origins_list
@@ -161,3 +198,14 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy"}
 
+
+
+@app.get("/metrics")
+async def metrics():
+    """Per-process counters (single-flight coalescing, response cache hits, CDN purges, compression)"""
+    return {
+        "singleflight": flight_stats(),
+        "response_cache": response_cache_stats(),
+        "cdn_purge": purge_stats(),
+        "compression": compression_stats.as_dict(),
+    }
@@ -3,9 +3,13 @@ Database models (SQLAlchemy)
 """
 from app.models.user import User
 from app.models.player import Player
-from app.models.team import Team, GroupEnum
+from app.models.season import Season, Division
+from app.models.team import Team
 from app.models.team_player import TeamPlayer, PlayerRoleEnum
 from app.models.match import Match, MatchSet, MatchStatusEnum
+from app.models.data_version import DataVersion
+from app.models.standings_snapshot import StandingsSnapshot
+from app.models.team_rating import TeamRating
 
 # Import Base for Alembic
 from app.core.database import Base
@@ -14,11 +18,15 @@ __all__ = [
     "Base",
     "User",
     "Player",
+    "Season",
+    "Division",
     "Team",
     "TeamPlayer",
     "Match",
     "MatchSet",
-    "GroupEnum",
+    "DataVersion",
+    "StandingsSnapshot",
+    "TeamRating",
     "PlayerRoleEnum",
     "MatchStatusEnum",
 ]
@@ -0,0 +1,21 @@
+"""
+DataVersion model - a single counter bumped by every published admin write
+"""
+from sqlalchemy import Column, Integer, BigInteger
+
+from app.core.database import Base
+
+
+class DataVersion(Base):
+    """
+    Monotonic version of the league data (one row, id 1).
+    app.core.invalidation.publish increments it in the writing transaction, so
+    a snapshot stamped with a version is current exactly while it matches.
+    """
+    __tablename__ = "data_version"
+
+    id = Column(Integer, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+    def __repr__(self):
+        return f"<DataVersion {self.version}>"
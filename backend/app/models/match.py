@@ -1,19 +1,12 @@
 """
 Match and MatchSet models
 """
-from sqlalchemy import Column, DateTime, ForeignKey, Integer, Enum as SQLEnum, CheckConstraint, String
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, Enum as SQLEnum, CheckConstraint, String, Index
 from sqlalchemy.orm import relationship
-import uuid
 import enum
 
 from app.core.database import Base
-
-
-class GroupEnum(str, enum.Enum):
-    """Match group enumeration"""
-    A = "A"
-    B = "B"
+from app.core.types import SmallIntArray, UUID, uuid7
 
 
 class MatchStatusEnum(str, enum.Enum):
@@ -28,15 +21,27 @@ class Match(Base):
     """Match model"""
     __tablename__ = "matches"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    date = Column(DateTime, nullable=False, index=True)
-    group = Column(SQLEnum(GroupEnum), nullable=False, index=True)
-    round = Column(String(50), nullable=True, index=True)  # Round number (e.g., "1", "2", "QF", "SF", "Final")
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), nullable=False)
+    division_id = Column(UUID(as_uuid=True), ForeignKey("divisions.id"), nullable=False)
+    date = Column(DateTime, nullable=False)
+    round = Column(String(50), nullable=True)  # Round number (e.g., "1", "2", "QF", "SF", "Final")
     home_team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"), nullable=False)
     away_team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"), nullable=False)
-    status = Column(SQLEnum(MatchStatusEnum), default=MatchStatusEnum.SCHEDULED, nullable=False, index=True)
+    status = Column(SQLEnum(MatchStatusEnum), default=MatchStatusEnum.SCHEDULED, nullable=False)
+    # Result summary derived from the sets, kept in sync by enter_match_result
+    # (see apply_result_summary) so aggregates can skip match_sets
+    home_sets_won = Column(Integer, nullable=False, default=0, server_default="0")
+    away_sets_won = Column(Integer, nullable=False, default=0, server_default="0")
+    home_games = Column(Integer, nullable=False, default=0, server_default="0")
+    away_games = Column(Integer, nullable=False, default=0, server_default="0")
+    winner_team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id"), nullable=True)
+    # Set scores [home1, away1, home2, away2, home3, away3], -1 = set not played;
+    # NULL without a result. Read when MATCH_SET_STORAGE=array (app/services/match_service.py)
+    set_scores = Column(SmallIntArray(), nullable=True)
 
     # Relationships
+    division = relationship("Division", lazy="joined", innerjoin=True)
     home_team = relationship("Team", foreign_keys=[home_team_id], back_populates="home_matches")
     away_team = relationship("Team", foreign_keys=[away_team_id], back_populates="away_matches")
     match_sets = relationship("MatchSet", back_populates="match", cascade="all, delete-orphan", order_by="MatchSet.set_number")
@@ -44,17 +49,28 @@ class Match(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint("home_team_id != away_team_id", name="check_different_teams"),
+        # Season-scoped lists: results/fixtures by status, and per-group schedules
+        Index("ix_matches_season_status_date", "season_id", "status", "date"),
+        Index("ix_matches_season_division_date", "season_id", "division_id", "date"),
+        # A team's matches (public list ?team_id=): one index per side, see team_match_ids
+        Index("ix_matches_home_team_date", "home_team_id", "date"),
+        Index("ix_matches_away_team_date", "away_team_id", "date"),
     )
 
+    @property
+    def group(self) -> str:
+        """Division code of the match (e.g. "A")"""
+        return self.division.code
+
     def __repr__(self):
-        return f"<Match {self.date} - Group {self.group.value}>"
+        return f"<Match {self.date} - Group {self.group}>"
 
 
 class MatchSet(Base):
     """Individual set in a match"""
     __tablename__ = "match_sets"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     match_id = Column(UUID(as_uuid=True), ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
     set_number = Column(Integer, nullable=False)  # 1, 2, or 3
     home_games = Column(Integer, nullable=False)
@@ -66,6 +82,8 @@ class MatchSet(Base):
     # Constraints
     __table_args__ = (
         CheckConstraint("set_number >= 1 AND set_number <= 3", name="check_set_number_range"),
+        # Sets are always loaded per match, in set order
+        Index("ix_match_sets_match_set", "match_id", "set_number"),
     )
 
     def __repr__(self):
@@ -0,0 +1,68 @@
+"""
+Season and Division models
+"""
+from sqlalchemy import Column, String, Boolean, Date, DateTime, Integer, JSON, ForeignKey, UniqueConstraint, Index, text
+from sqlalchemy.orm import relationship
+
+from app.core.database import Base
+from app.core.types import UUID, uuid7
+
+
+class Season(Base):
+    """League season - teams, matches and standings all belong to exactly one season"""
+    __tablename__ = "seasons"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    name = Column(String(100), unique=True, nullable=False)
+    start_date = Column(Date, nullable=True)
+    end_date = Column(Date, nullable=True)
+    is_current = Column(Boolean, default=False, nullable=False)
+    # Set once teams/matches were exported to the season archive and removed from the database
+    archived_at = Column(DateTime, nullable=True)
+    # Points table and tiebreakers (schemas.season.StandingsRules); NULL = default rules
+    rules = Column(JSON, nullable=True)
+
+    # Relationships
+    divisions = relationship(
+        "Division",
+        back_populates="season",
+        cascade="all, delete-orphan",
+        order_by="Division.sort_order, Division.code",
+    )
+
+    # Constraints
+    __table_args__ = (
+        # At most one current season; public endpoints default to it
+        Index(
+            "uq_seasons_current",
+            "is_current",
+            unique=True,
+            postgresql_where=text("is_current"),
+            sqlite_where=text("is_current"),
+        ),
+    )
+
+    def __repr__(self):
+        return f"<Season {self.name}>"
+
+
+class Division(Base):
+    """Group within a season (e.g. "A", "B"); replaces the former fixed A/B enum"""
+    __tablename__ = "divisions"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE"), nullable=False)
+    code = Column(String(10), nullable=False)  # Short code shown as "group" in the API
+    name = Column(String(100), nullable=True)
+    sort_order = Column(Integer, default=0, nullable=False)
+
+    # Relationships
+    season = relationship("Season", back_populates="divisions")
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint("season_id", "code", name="unique_season_division_code"),
+    )
+
+    def __repr__(self):
+        return f"<Division {self.code}>"
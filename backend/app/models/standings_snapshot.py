@@ -0,0 +1,32 @@
+"""
+StandingsSnapshot model - cumulative standings of a group after a round
+"""
+from sqlalchemy import Column, Integer, ForeignKey, JSON, UniqueConstraint
+
+from app.core.database import Base
+from app.core.types import UUID, uuid7
+
+
+class StandingsSnapshot(Base):
+    """
+    Per-team totals of one group after one numbered round, written by
+    app/services/standings_history.py. Derived data: a result change deletes
+    the snapshots from its round onward and the next read recomputes them.
+    """
+    __tablename__ = "standings_snapshots"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE"), nullable=False)
+    division_id = Column(UUID(as_uuid=True), ForeignKey("divisions.id", ondelete="CASCADE"), nullable=False)
+    round = Column(Integer, nullable=False)
+    # {team_id: [played, won, lost, sets_for, sets_against, games_for, games_against, points]}
+    stats = Column(JSON, nullable=False)
+
+    # Constraints
+    __table_args__ = (
+        # Also the index for reads and for invalidating a group from a round onward
+        UniqueConstraint("season_id", "division_id", "round", name="unique_standings_snapshot_round"),
+    )
+
+    def __repr__(self):
+        return f"<StandingsSnapshot round {self.round}>"
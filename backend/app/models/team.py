@@ -1,36 +1,50 @@
 """
 Team model
 """
-from sqlalchemy import Column, String, Boolean, Enum as SQLEnum
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, String, Boolean, Float, ForeignKey, UniqueConstraint, Index, text
 from sqlalchemy.orm import relationship
-import uuid
-import enum
 
 from app.core.database import Base
-
-
-class GroupEnum(str, enum.Enum):
-    """Team group enumeration"""
-    A = "A"
-    B = "B"
+from app.core.types import UUID, uuid7
 
 
 class Team(Base):
     """Team model"""
     __tablename__ = "teams"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    name = Column(String(100), unique=True, nullable=False, index=True)
-    group = Column(SQLEnum(GroupEnum), nullable=False, index=True)
-    active = Column(Boolean, default=True, nullable=False, index=True)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id"), nullable=False)
+    division_id = Column(UUID(as_uuid=True), ForeignKey("divisions.id"), nullable=False)
+    name = Column(String(100), nullable=False)
+    active = Column(Boolean, default=True, nullable=False)
+    # Elo-style strength, maintained by app/services/ratings.py
+    rating = Column(Float, default=1500.0, server_default=text("1500"), nullable=False)
 
     # Relationships
+    # Divisions are tiny and needed for every response ("group"), so always join them
+    division = relationship("Division", lazy="joined", innerjoin=True)
     team_players = relationship("TeamPlayer", back_populates="team", cascade="all, delete-orphan")
     home_matches = relationship("Match", foreign_keys="Match.home_team_id", back_populates="home_team")
     away_matches = relationship("Match", foreign_keys="Match.away_team_id", back_populates="away_team")
 
-    def __repr__(self):
-        return f"<Team {self.name} (Group {self.group.value})>"
-
+    # Constraints
+    __table_args__ = (
+        # Also the index for season-scoped lookups (lists, name checks)
+        UniqueConstraint("season_id", "name", name="unique_season_team_name"),
+        # Standings and the public team list read the active teams of a season/group
+        Index(
+            "ix_teams_active_season_division",
+            "season_id",
+            "division_id",
+            postgresql_where=text("active"),
+            sqlite_where=text("active"),
+        ),
+    )
+
+    @property
+    def group(self) -> str:
+        """Division code of the team (e.g. "A")"""
+        return self.division.code
 
+    def __repr__(self):
+        return f"<Team {self.name} (Group {self.group})>"
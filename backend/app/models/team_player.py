@@ -1,13 +1,12 @@
 """
 TeamPlayer junction table - links players to teams with roles
 """
-from sqlalchemy import Column, ForeignKey, Enum as SQLEnum, UniqueConstraint
-from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Column, ForeignKey, Enum as SQLEnum, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
-import uuid
 import enum
 
 from app.core.database import Base
+from app.core.types import UUID, uuid7
 
 
 class PlayerRoleEnum(str, enum.Enum):
@@ -20,7 +19,7 @@ class TeamPlayer(Base):
     """Junction table linking teams and players with roles"""
     __tablename__ = "team_players"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
     player_id = Column(UUID(as_uuid=True), ForeignKey("players.id", ondelete="CASCADE"), nullable=False)
     role = Column(SQLEnum(PlayerRoleEnum), nullable=False)
@@ -32,6 +31,8 @@ class TeamPlayer(Base):
     # Constraints
     __table_args__ = (
         UniqueConstraint("team_id", "player_id", name="unique_team_player"),
+        # A player's teams; the unique constraint only serves lookups by team
+        Index("ix_team_players_player", "player_id"),
     )
 
     def __repr__(self):
@@ -0,0 +1,35 @@
+"""
+TeamRating model - rating history of a team, one row per rated match
+"""
+from sqlalchemy import Column, DateTime, Float, ForeignKey, Index, UniqueConstraint
+
+from app.core.database import Base
+from app.core.types import UUID, uuid7
+
+
+class TeamRating(Base):
+    """
+    A team's rating after one of its played matches, written by
+    app/services/ratings.py. Rows of a season are rewritten as a whole when
+    an earlier result is corrected.
+    """
+    __tablename__ = "team_ratings"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
+    season_id = Column(UUID(as_uuid=True), ForeignKey("seasons.id", ondelete="CASCADE"), nullable=False)
+    team_id = Column(UUID(as_uuid=True), ForeignKey("teams.id", ondelete="CASCADE"), nullable=False)
+    match_id = Column(UUID(as_uuid=True), ForeignKey("matches.id", ondelete="CASCADE"), nullable=False)
+    date = Column(DateTime, nullable=False)  # Date of the match, the order ratings are applied in
+    rating = Column(Float, nullable=False)
+    change = Column(Float, nullable=False)
+
+    # Constraints
+    __table_args__ = (
+        UniqueConstraint("match_id", "team_id", name="unique_team_rating_match"),
+        # A team's history in date order; also answers "any later rated match?"
+        Index("ix_team_ratings_team_date", "team_id", "date"),
+        Index("ix_team_ratings_season", "season_id"),
+    )
+
+    def __repr__(self):
+        return f"<TeamRating {self.rating:.1f} ({self.change:+.1f})>"
@@ -2,17 +2,16 @@
 User model for admin authentication
 """
 from sqlalchemy import Column, String, Boolean
-from sqlalchemy.dialects.postgresql import UUID
-import uuid
 
 from app.core.database import Base
+from app.core.types import UUID, uuid7
 
 
 class User(Base):
     """Admin user model"""
     __tablename__ = "users"
 
-    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid7)
     username = Column(String(50), unique=True, nullable=False, index=True)
     email = Column(String(100), unique=True, nullable=False, index=True)
     hashed_password = Column(String(255), nullable=False)
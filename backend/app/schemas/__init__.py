@@ -13,6 +13,13 @@ from app.schemas.match import (
     MatchSetResponse,
 )
 from app.schemas.standings import TeamStandingResponse
+from app.schemas.season import (
+    SeasonCreate,
+    SeasonUpdate,
+    SeasonResponse,
+    DivisionCreate,
+    DivisionResponse,
+)
 
 __all__ = [
     # User schemas
@@ -39,4 +46,10 @@ __all__ = [
     "MatchSetResponse",
     # Standings schemas
     "TeamStandingResponse",
+    # Season schemas
+    "SeasonCreate",
+    "SeasonUpdate",
+    "SeasonResponse",
+    "DivisionCreate",
+    "DivisionResponse",
 ]
@@ -5,7 +5,7 @@ from pydantic import BaseModel, field_validator
 from uuid import UUID
 from datetime import date, datetime
 from typing import List, Optional
-from app.models.team import GroupEnum
+from app.schemas.season import GroupCode
 from app.models.match import MatchStatusEnum
 
 
@@ -35,7 +35,7 @@ class MatchSetCreate(BaseModel):
 class MatchBase(BaseModel):
     """Base match schema"""
     date: datetime
-    group: GroupEnum
+    group: GroupCode
     round: Optional[str] = None
     home_team_id: UUID
     away_team_id: UUID
@@ -74,7 +74,7 @@ class MatchResultCreate(BaseModel):
 class MatchUpdate(BaseModel):
     """Schema for updating a match"""
     date: Optional[datetime] = None
-    group: Optional[GroupEnum] = None
+    group: Optional[GroupCode] = None
     round: Optional[str] = None
     home_team_id: Optional[UUID] = None
     away_team_id: Optional[UUID] = None
@@ -94,6 +94,7 @@ class MatchSetResponse(BaseModel):
 class MatchResponse(MatchBase):
     """Schema for match response"""
     id: UUID
+    season_id: Optional[UUID] = None
     status: MatchStatusEnum
     match_sets: List[MatchSetResponse] = []
     home_team_name: Optional[str] = None
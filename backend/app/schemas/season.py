@@ -0,0 +1,122 @@
+"""
+Season and division schemas for request/response validation
+"""
+from pydantic import BaseModel, AfterValidator, field_validator
+from uuid import UUID
+from datetime import date, datetime
+from typing import Annotated, Dict, List, Literal, Optional
+
+
+def normalize_group_code(v: str) -> str:
+    """Group (division) codes are short, case-insensitive labels such as "A" or "B2" """
+    v = v.strip().upper()
+    if not v:
+        raise ValueError("Group cannot be empty")
+    if len(v) > 10:
+        raise ValueError("Group cannot exceed 10 characters")
+    return v
+
+
+# Division code as used by the "group" field of teams, matches and standings
+GroupCode = Annotated[str, AfterValidator(normalize_group_code)]
+
+
+class DivisionCreate(BaseModel):
+    """Schema for adding a division (group) to a season"""
+    code: GroupCode
+    name: Optional[str] = None
+    sort_order: Optional[int] = None  # Defaults to after the season's existing divisions
+
+
+class DivisionResponse(BaseModel):
+    """Schema for division response"""
+    id: UUID
+    code: str
+    name: Optional[str] = None
+    sort_order: int
+
+    class Config:
+        from_attributes = True
+
+
+# Standings criteria after points (app/services/standings_rules.py); the
+# head_to_head_* ones are computed among the teams still tied at that point
+Tiebreaker = Literal[
+    "matches_won", "set_diff", "game_diff", "sets_for", "games_for",
+    "head_to_head_points", "head_to_head_set_diff", "head_to_head_game_diff",
+]
+MATCH_RESULTS = ("2-0", "2-1", "1-2", "0-2")
+
+
+class StandingsRules(BaseModel):
+    """Points table and tiebreakers of a season's standings (team name always breaks the last tie)"""
+    points: Dict[str, int] = {"2-0": 3, "2-1": 2, "1-2": 1, "0-2": 0}
+    tiebreakers: List[Tiebreaker] = ["matches_won", "set_diff", "game_diff"]
+
+    @field_validator("points")
+    @classmethod
+    def validate_points(cls, v: Dict[str, int]) -> Dict[str, int]:
+        if set(v) != set(MATCH_RESULTS):
+            raise ValueError(f"Points must be given for exactly these results: {', '.join(MATCH_RESULTS)}")
+        if any(points < 0 or points > 100 for points in v.values()):
+            raise ValueError("Points per result must be between 0 and 100")
+        return v
+
+    @field_validator("tiebreakers")
+    @classmethod
+    def validate_tiebreakers(cls, v: List[str]) -> List[str]:
+        if len(v) != len(set(v)):
+            raise ValueError("Tiebreakers must be unique")
+        return v
+
+
+class SeasonBase(BaseModel):
+    """Base season schema"""
+    name: str
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+    @field_validator("name")
+    @classmethod
+    def validate_name(cls, v: str) -> str:
+        v = v.strip()
+        if not v:
+            raise ValueError("Season name cannot be empty")
+        if len(v) > 100:
+            raise ValueError("Season name cannot exceed 100 characters")
+        return v
+
+
+class SeasonCreate(SeasonBase):
+    """Schema for creating a season together with its divisions"""
+    is_current: bool = False
+    divisions: List[DivisionCreate] = []
+    rules: Optional[StandingsRules] = None  # Default: 3/2/1/0 points, won, set and game difference
+
+    @field_validator("divisions")
+    @classmethod
+    def validate_divisions(cls, v: List[DivisionCreate]) -> List[DivisionCreate]:
+        codes = [d.code for d in v]
+        if len(codes) != len(set(codes)):
+            raise ValueError("Division codes must be unique")
+        return v
+
+
+class SeasonUpdate(BaseModel):
+    """Schema for updating a season (omitted fields are unchanged)"""
+    name: Optional[str] = None
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+    rules: Optional[StandingsRules] = None  # An explicit null resets to the default rules
+
+
+class SeasonResponse(SeasonBase):
+    """Schema for season response"""
+    id: UUID
+    is_current: bool
+    archived_at: Optional[datetime] = None
+    divisions: List[DivisionResponse] = []
+    rules: Optional[StandingsRules] = None  # None = default rules
+
+    class Config:
+        from_attributes = True
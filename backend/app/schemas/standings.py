@@ -1,16 +1,18 @@
 """
 Standings schemas for response validation
 """
-from pydantic import BaseModel
+from typing import List, Optional
+from pydantic import BaseModel, field_validator
 from uuid import UUID
-from app.models.team import GroupEnum
+
+from app.schemas.match import MatchResultCreate
 
 
 class TeamStandingResponse(BaseModel):
     """Schema for team standing in league table"""
     team_id: UUID
     team_name: str
-    group: GroupEnum
+    group: str
     matches_played: int
     matches_won: int
     matches_lost: int
@@ -22,8 +24,67 @@ class TeamStandingResponse(BaseModel):
     set_diff: int
     game_diff: int
     position: int
+    rating: Optional[float] = None  # Elo-style strength; not part of the ranking
+    # Best / worst final position still possible within the group (GET /standings only)
+    best_position: Optional[int] = None
+    worst_position: Optional[int] = None
 
     class Config:
         from_attributes = True
 
 
+class StandingsRoundResponse(BaseModel):
+    """Schema for the league table after a round (standings history)"""
+    round: int
+    standings: List[TeamStandingResponse]
+
+
+class TeamSimulationResponse(BaseModel):
+    """Schema for a team's simulated final positions"""
+    team_id: UUID
+    team_name: str
+    group: str
+    position: int  # Current position in the group
+    expected_points: float
+    position_probabilities: List[float]  # Index 0 = first place
+
+
+class SeasonSimulationResponse(BaseModel):
+    """Schema for the season outcome simulation"""
+    runs: int
+    remaining_matches: int
+    teams: List[TeamSimulationResponse]
+
+
+# Columns of a HeadToHeadResponse result row; i and j index team_ids, the
+# other values are from team i's point of view
+HEAD_TO_HEAD_FIELDS = (
+    "i", "j", "played", "won", "lost", "sets_for", "sets_against", "games_for", "games_against",
+)
+
+
+class HeadToHeadResponse(BaseModel):
+    """Schema for a group's head-to-head matrix (one row per pair that has played)"""
+    group: str
+    team_ids: List[UUID]  # In table order
+    team_names: List[str]
+    fields: List[str]  # HEAD_TO_HEAD_FIELDS
+    results: List[List[int]]
+
+
+class WhatIfResult(MatchResultCreate):
+    """A hypothetical result of a scheduled match"""
+    match_id: UUID
+
+
+class WhatIfRequest(BaseModel):
+    """Schema for the what-if standings: hypothetical results on top of the current table"""
+    results: List[WhatIfResult]
+
+    @field_validator("results")
+    @classmethod
+    def validate_results(cls, v: List[WhatIfResult]) -> List[WhatIfResult]:
+        match_ids = [r.match_id for r in v]
+        if len(match_ids) != len(set(match_ids)):
+            raise ValueError("Each match can only have one result")
+        return v
@@ -1,10 +1,11 @@
 """
 Team schemas for request/response validation
 """
+from datetime import datetime
 from pydantic import BaseModel, field_validator, model_validator
 from uuid import UUID
 from typing import List, Optional
-from app.models.team import GroupEnum
+from app.schemas.season import GroupCode
 
 
 class TeamPlayerCreate(BaseModel):
@@ -49,11 +50,12 @@ class TeamPlayerCreate(BaseModel):
 class TeamBase(BaseModel):
     """Base team schema"""
     name: Optional[str] = None
-    group: GroupEnum
+    group: GroupCode
 
 
 class TeamCreate(TeamBase):
     """Schema for creating a team"""
+    season_id: Optional[UUID] = None  # Defaults to the current season
     players: List[TeamPlayerCreate]
 
     @field_validator("players")
@@ -78,7 +80,7 @@ class TeamCreate(TeamBase):
 class TeamUpdate(BaseModel):
     """Schema for updating a team"""
     name: Optional[str] = None
-    group: Optional[GroupEnum] = None
+    group: Optional[GroupCode] = None
     active: Optional[bool] = None
     players: Optional[List[TeamPlayerCreate]] = None
 
@@ -116,9 +118,21 @@ class TeamPlayerResponse(BaseModel):
 class TeamResponse(TeamBase):
     """Schema for team response"""
     id: UUID
+    season_id: Optional[UUID] = None
     active: bool
     players: List[TeamPlayerResponse] = []
+    rating: Optional[float] = None  # Elo-style strength (app/services/ratings.py)
 
     class Config:
         from_attributes = True
 
+
+class TeamRatingResponse(BaseModel):
+    """Schema for a team's rating after one of its matches"""
+    match_id: UUID
+    date: datetime
+    rating: float
+    change: float
+
+    class Config:
+        from_attributes = True
@@ -1,14 +1,23 @@
 """
 Business logic services
 """
-from app.services.standings import calculate_standings, calculate_match_points
+from app.services.standings import calculate_standings, calculate_match_points, get_standings
 from app.services.match_service import enter_match_result, determine_match_winner
 from app.services.team_service import validate_team_creation, archive_team, activate_team
+from app.services.season_service import (
+    get_current_season_id,
+    resolve_season_id,
+    get_division,
+    create_season,
+    set_current_season,
+    add_division,
+)
 
 __all__ = [
     # Standings
     "calculate_standings",
     "calculate_match_points",
+    "get_standings",
     # Match
     "enter_match_result",
     "determine_match_winner",
@@ -16,4 +25,11 @@ __all__ = [
     "validate_team_creation",
     "archive_team",
     "activate_team",
+    # Season
+    "get_current_season_id",
+    "resolve_season_id",
+    "get_division",
+    "create_season",
+    "set_current_season",
+    "add_division",
 ]
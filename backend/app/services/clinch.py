@@ -0,0 +1,314 @@
+"""
+Clinch and elimination - best and worst possible final positions.
+
+For every team, the best and worst position it can still finish in within its
+group, from the current points and the group's remaining fixtures: every
+match not played or cancelled, in-progress ones included (the table only
+counts played matches, so a partial result changes nothing yet). Teams
+level on points are counted against the team for the worst position and for
+it for the best one, so the bounds are safe to announce: worst_position <= 2
+means a top-2 place is clinched, best_position > 2 that it is out of reach.
+
+Per team, cheap points bounds come first: a rival whose fewest possible
+points exceed the team's most is certainly above it, and one whose most
+can't reach the team's fewest is certainly below. Teams in between are
+ambiguous. Only then, and only for points tables where every match hands
+out the same total and any split of it (the default 3/2/1/0 does), the
+exact answer is searched: the team's own matches are fixed to its best (or
+worst) results and max-flow checks whether the other remaining matches can
+keep a set of rivals below it (or lift them level with it). Other tables,
+and searches over the SEARCH_FLOWS budget, keep the points bounds.
+
+Results are only computed again after an admin write: while the in-memory
+league state serves the season they are kept with its views (no data version
+read per request), otherwise cached per (season, data version).
+"""
+from collections import deque
+from itertools import combinations
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.database import session_factory
+from app.core.invalidation import get_data_version
+from app.core.singleflight import SingleFlight
+from app.schemas.standings import TeamStandingResponse
+from app.services.league_state import get_league_state
+from app.services.season_archive import is_archived, load_archived_season
+from app.services.season_service import resolve_season_id
+from app.services.season_simulator import remaining_fixtures
+from app.services.standings import get_standings
+from app.services.standings_rules import DEFAULT_RULES, CompiledRules, get_season_rules
+
+# Max-flow runs per team and bound before the search keeps the points bound
+SEARCH_FLOWS = 500
+
+# (best position, worst position) within the group
+Bounds = Tuple[int, int]
+
+# (season, data version) -> team id -> bounds; only the latest version is kept
+_bounds: Dict[tuple, Dict[UUID, Bounds]] = {}
+_bounds_flight = SingleFlight("clinch")
+
+_RESULTS = ((2, 0), (2, 1), (1, 2), (0, 2))
+
+
+def _max_flow(capacity: Dict[int, Dict[int, int]], source: int, sink: int) -> int:
+    """Edmonds-Karp on an adjacency map of residual capacities (modified in place)"""
+    flow = 0
+    while True:
+        parent = {source: source}
+        queue = deque([source])
+        while queue and sink not in parent:
+            node = queue.popleft()
+            for nxt, cap in capacity[node].items():
+                if cap > 0 and nxt not in parent:
+                    parent[nxt] = node
+                    queue.append(nxt)
+        if sink not in parent:
+            return flow
+        push, node = None, sink
+        while node != source:
+            cap = capacity[parent[node]][node]
+            push = cap if push is None else min(push, cap)
+            node = parent[node]
+        node = sink
+        while node != source:
+            prev = parent[node]
+            capacity[prev][node] -= push
+            capacity[node][prev] = capacity[node].get(prev, 0) + push
+            node = prev
+        flow += push
+
+
+def _routable(pairs: Dict[Tuple[int, int], int], total: int, limits: Dict[int, int]) -> int:
+    """
+    Most points of `pairs` ((team, team) -> matches, `total` points each)
+    that can go to teams with a limit, each receiving at most its limit;
+    teams without a limit are not connected to the sink.
+    """
+    source, sink = -1, -2
+    capacity: Dict[int, Dict[int, int]] = {source: {}, sink: {}}
+    for team, limit in limits.items():
+        capacity[team] = {sink: max(0, limit)}
+    # Greedy pre-flow: most points go straight to a team with room, leaving
+    # few augmenting paths for the search
+    routed = 0
+    for i, ((a, b), count) in enumerate(pairs.items()):
+        node = -3 - i  # Teams are indexes >= 0
+        points = total * count
+        edges = capacity[node] = {a: points, b: points}
+        for team in (a, b):
+            team_edges = capacity.setdefault(team, {})
+            push = min(points, team_edges.get(sink, 0))
+            if push:
+                points -= push
+                routed += push
+                edges[team] -= push
+                team_edges[node] = push
+                team_edges[sink] -= push
+                capacity[sink][team] = capacity[sink].get(team, 0) + push
+                capacity[node][source] = capacity[node].get(source, 0) + push
+        capacity[source][node] = points
+    return routed + _max_flow(capacity, source, sink)
+
+
+class _Group:
+    """One group's current points and remaining fixtures, by team index"""
+
+    def __init__(self, points: Sequence[int], fixtures: Sequence[Tuple[int, int]], rules: CompiledRules) -> None:
+        self.points = list(points)
+        self.fixtures = list(fixtures)
+        n = len(points)
+        outcomes = [(rules.match_points(f, a), rules.match_points(a, f)) for f, a in _RESULTS]
+        self.max_for = max(f for f, _ in outcomes)
+        self.min_for = min(f for f, _ in outcomes)
+        totals = {f + a for f, a in outcomes}
+        self.total = totals.pop() if len(totals) == 1 else None
+        # Exact search: every match hands out `total`, split any way
+        self.exact = self.total is not None and {f for f, _ in outcomes} == set(range(self.total + 1))
+        self.games = [0] * n
+        for home, away in self.fixtures:
+            self.games[home] += 1
+            self.games[away] += 1
+        self.most = [p + g * self.max_for for p, g in zip(self.points, self.games)]
+        self.fewest = [p + g * self.min_for for p, g in zip(self.points, self.games)]
+
+    def _other_pairs(self, team: int) -> Dict[Tuple[int, int], int]:
+        pairs: Dict[Tuple[int, int], int] = {}
+        for home, away in self.fixtures:
+            if team not in (home, away):
+                key = (home, away) if home < away else (away, home)
+                pairs[key] = pairs.get(key, 0) + 1
+        return pairs
+
+    def _played_against(self, team: int) -> List[int]:
+        against = [0] * len(self.points)
+        for home, away in self.fixtures:
+            if home == team:
+                against[away] += 1
+            elif away == team:
+                against[home] += 1
+        return against
+
+    def best(self, team: int) -> int:
+        """Best final position of `team` (1 = first)"""
+        target = self.most[team]
+        above = sum(1 for j, fewest in enumerate(self.fewest) if j != team and fewest > target)
+        ambiguous = [j for j in range(len(self.points)) if j != team and self.fewest[j] <= target < self.most[j]]
+        if not ambiguous or not self.exact:
+            return 1 + above
+        # The team wins every match outright; its opponents get nothing from them
+        pairs = self._other_pairs(team)
+        needed = self.total * sum(pairs.values())
+        # Room below the team; rivals already above it (and conceded ones) take any points
+        room = {j: min(needed, target - self.points[j]) if self.points[j] <= target else needed
+                for j in range(len(self.points)) if j != team}
+        flows = 0
+        for k in range(len(ambiguous) + 1):
+            for conceded in combinations(ambiguous, k):
+                limits = dict(room)
+                limits.update((j, needed) for j in conceded)
+                if _routable(pairs, self.total, limits) == needed:
+                    return 1 + above + k
+                flows += 1
+                if flows >= SEARCH_FLOWS:
+                    return 1 + above
+        return 1 + above
+
+    def worst(self, team: int) -> int:
+        """Worst final position of `team` (level on points counts as above it)"""
+        target = self.fewest[team]
+        at_least = sum(1 for j, fewest in enumerate(self.fewest) if j != team and fewest >= target)
+        ambiguous = [j for j in range(len(self.points)) if j != team and self.fewest[j] < target <= self.most[j]]
+        if not ambiguous or not self.exact:
+            return 1 + at_least + len(ambiguous)
+        # The team loses every match outright; its opponents take all the points
+        against = self._played_against(team)
+        pairs = self._other_pairs(team)
+        available = self.total * sum(pairs.values())
+        need = {j: target - self.points[j] - self.total * against[j] for j in ambiguous}
+        certain = at_least + sum(1 for j in ambiguous if need[j] <= 0)
+        ambiguous = sorted((j for j in ambiguous if need[j] > 0), key=lambda j: need[j])
+        # Prune: the k cheapest rivals to lift must fit in the points left
+        k, spent = 0, 0
+        while k < len(ambiguous) and spent + need[ambiguous[k]] <= available:
+            spent += need[ambiguous[k]]
+            k += 1
+        flows = 0
+        for size in range(k, 0, -1):
+            for lifted in combinations(ambiguous, size):
+                demand = {j: need[j] for j in lifted}
+                if _routable(pairs, self.total, demand) == sum(demand.values()):
+                    return 1 + certain + size
+                flows += 1
+                if flows >= SEARCH_FLOWS:
+                    return 1 + certain + len(ambiguous)
+        return 1 + certain
+
+
+def position_bounds(
+    standings: Sequence[TeamStandingResponse],
+    fixtures: Sequence[Tuple[UUID, UUID]],
+    rules: CompiledRules,
+) -> Dict[UUID, Bounds]:
+    """
+    Best and worst final positions of one group's teams.
+
+    Args:
+        standings: The group's current table
+        fixtures: Remaining (home, away) matches; others than the group's are ignored
+        rules: The season's rules (points table)
+    """
+    index = {s.team_id: i for i, s in enumerate(standings)}
+    own = [(index[h], index[a]) for h, a in fixtures if h in index and a in index]
+    if not own:
+        # Nothing left to play: the table is final
+        return {s.team_id: (s.position, s.position) for s in _group_positions(standings)}
+    group = _Group([s.points for s in standings], own, rules)
+    return {s.team_id: (group.best(i), group.worst(i)) for i, s in enumerate(standings)}
+
+
+def _group_positions(standings: Sequence[TeamStandingResponse]) -> List[TeamStandingResponse]:
+    # Positions of an all-groups table run across groups; renumber within the group
+    return [s.model_copy(update={"position": i + 1}) for i, s in enumerate(standings)]
+
+
+async def get_position_bounds(db: AsyncSession, season_id: Optional[UUID] = None) -> Dict[UUID, Bounds]:
+    """
+    Best and worst final positions of every active team of a season, within
+    its group.
+
+    Args:
+        db: Database session
+        season_id: Season, defaults to the current season
+    """
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return {}
+    if is_archived(season_id):
+        # Every match is played: the final positions
+        archived = load_archived_season(season_id)
+        bounds: Dict[UUID, Bounds] = {}
+        for code in _groups(archived.standings()):
+            bounds.update(position_bounds(archived.standings(group=code), [], DEFAULT_RULES))
+        return bounds
+
+    state = await get_league_state(db, season_id)
+    if state is not None:
+        # Dropped with the state's views on its next change
+        return state.derived(
+            "position_bounds",
+            lambda: _group_bounds(
+                {code: state.standings(group=code) for code in _groups(state.standings())},
+                state.remaining_fixtures(),
+                state.rules,
+            ),
+        )
+
+    version = await get_data_version(db)
+    key = (season_id, version)
+    cached = _bounds.get(key)
+    if cached is not None:
+        return cached
+
+    async def compute(session: AsyncSession) -> Dict[UUID, Bounds]:
+        rules = await get_season_rules(session, season_id)
+        all_standings = await get_standings(session, season_id=season_id)
+        tables = {code: await get_standings(session, group=code, season_id=season_id) for code in _groups(all_standings)}
+        bounds = _group_bounds(tables, await remaining_fixtures(session, season_id), rules)
+        # Older versions can't be asked for again
+        for stale in [k for k in _bounds if k[1] != version]:
+            del _bounds[stale]
+        _bounds[key] = bounds
+        return bounds
+
+    return await _bounds_flight.do(key, compute, session_factory(db), release=db)
+
+
+def _groups(standings: Sequence[TeamStandingResponse]) -> List[str]:
+    return sorted({s.group for s in standings})
+
+
+def _group_bounds(
+    tables: Dict[str, List[TeamStandingResponse]],
+    fixtures: Sequence[Tuple[UUID, UUID]],
+    rules: CompiledRules,
+) -> Dict[UUID, Bounds]:
+    bounds: Dict[UUID, Bounds] = {}
+    for standings in tables.values():
+        bounds.update(position_bounds(standings, fixtures, rules))
+    return bounds
+
+
+def with_position_bounds(
+    standings: Sequence[TeamStandingResponse],
+    bounds: Dict[UUID, Bounds],
+) -> List[TeamStandingResponse]:
+    """Copies of `standings` (shared, read-only lists) with best/worst positions set"""
+    return [
+        s.model_copy(update={"best_position": bounds[s.team_id][0], "worst_position": bounds[s.team_id][1]})
+        if s.team_id in bounds else s
+        for s in standings
+    ]
@@ -0,0 +1,140 @@
+"""
+Head-to-head matrix - who beat whom within a group.
+
+The results between every pair of a group's teams come from one aggregated
+query over the group's played matches (GROUP BY home team, away team on the
+result summary columns); the two legs of a pair are folded into one row.
+The response is index based: teams are listed once, in table order, and each
+pair that has played is one flat integer row referring to them by position
+(`HEAD_TO_HEAD_FIELDS`), which keeps an N x N grid small.
+
+Matrices are cached per (season, group, data version), so the query only runs
+again after an admin write.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import case, func, select
+
+from app.core.database import session_factory
+from app.core.invalidation import get_data_version
+from app.core.singleflight import SingleFlight
+from app.models.match import Match, MatchStatusEnum
+from app.schemas.standings import HEAD_TO_HEAD_FIELDS, HeadToHeadResponse
+from app.services.league_state import get_league_state
+from app.services.match_service import count_sets_won
+from app.services.season_archive import is_archived, load_archived_season
+from app.services.season_service import resolve_season_id, division_id_subquery
+from app.services.standings import get_standings
+
+# (season, group, data version) -> matrix; only the latest version is kept
+_matrices: Dict[tuple, HeadToHeadResponse] = {}
+_matrix_flight = SingleFlight("head_to_head")
+
+# (home, away, played, home wins, home sets, away sets, home games, away games)
+PairTotals = Tuple[UUID, UUID, int, int, int, int, int, int]
+
+
+def build_matrix(group: str, teams: List[Tuple[UUID, str]], totals: Iterable[PairTotals]) -> HeadToHeadResponse:
+    """
+    Fold per (home, away) totals into one row per pair of `teams` ((id, name)
+    in display order). Each row is from the point of view of the team listed
+    first, which is always the one with the lower index.
+    """
+    index = {team_id: i for i, (team_id, _) in enumerate(teams)}
+    rows: Dict[Tuple[int, int], List[int]] = {}
+    for home, away, played, home_wins, home_sets, away_sets, home_games, away_games in totals:
+        i, j = index.get(home), index.get(away)
+        if i is None or j is None:
+            continue  # Deactivated team
+        if i > j:
+            i, j = j, i
+            wins, losses = played - home_wins, home_wins
+            sets_for, sets_against, games_for, games_against = away_sets, home_sets, away_games, home_games
+        else:
+            wins, losses = home_wins, played - home_wins
+            sets_for, sets_against, games_for, games_against = home_sets, away_sets, home_games, away_games
+        row = rows.get((i, j))
+        if row is None:
+            row = rows[(i, j)] = [i, j, 0, 0, 0, 0, 0, 0, 0]
+        for k, value in enumerate((played, wins, losses, sets_for, sets_against, games_for, games_against), 2):
+            row[k] += value
+    return HeadToHeadResponse(
+        group=group,
+        team_ids=[team_id for team_id, _ in teams],
+        team_names=[name for _, name in teams],
+        fields=list(HEAD_TO_HEAD_FIELDS),
+        results=[rows[pair] for pair in sorted(rows)],
+    )
+
+
+async def _pair_totals(db: AsyncSession, season_id: UUID, group: str) -> List[PairTotals]:
+    """The group's played matches summed per (home team, away team)"""
+    query = select(
+        Match.home_team_id,
+        Match.away_team_id,
+        func.count(),
+        func.sum(case((Match.home_sets_won > Match.away_sets_won, 1), else_=0)),
+        func.sum(Match.home_sets_won),
+        func.sum(Match.away_sets_won),
+        func.sum(Match.home_games),
+        func.sum(Match.away_games),
+    ).where(
+        Match.season_id == season_id,
+        Match.division_id == division_id_subquery(season_id, group),
+        Match.status == MatchStatusEnum.PLAYED,
+    ).group_by(Match.home_team_id, Match.away_team_id)
+    return [tuple(row) for row in (await db.execute(query)).all()]
+
+
+def _archived_matrix(season_id: UUID, group: str) -> HeadToHeadResponse:
+    archived = load_archived_season(season_id)
+    totals = []
+    for m in archived.list_matches(group=group, status=MatchStatusEnum.PLAYED.value):
+        home_sets, away_sets = count_sets_won(m.match_sets)
+        totals.append((
+            m.home_team_id, m.away_team_id, 1, 1 if home_sets > away_sets else 0, home_sets, away_sets,
+            sum(s.home_games for s in m.match_sets), sum(s.away_games for s in m.match_sets),
+        ))
+    teams = [(s.team_id, s.team_name) for s in archived.standings(group=group)]
+    return build_matrix(group, teams, totals)
+
+
+async def get_head_to_head(db: AsyncSession, group: str, season_id: Optional[UUID] = None) -> Optional[HeadToHeadResponse]:
+    """
+    Head-to-head results of a group's active teams, in table order.
+
+    Args:
+        db: Database session
+        group: Group (division) code
+        season_id: Season, defaults to the current season
+
+    Returns:
+        The matrix, or None if the season or group has no teams
+    """
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return None
+    if is_archived(season_id):
+        matrix = _archived_matrix(season_id, group)
+        return matrix if matrix.team_ids else None
+
+    version = await get_data_version(db)
+    key = (season_id, group, version)
+    cached = _matrices.get(key)
+    if cached is not None:
+        return cached
+
+    async def compute(session: AsyncSession) -> HeadToHeadResponse:
+        state = await get_league_state(session, season_id)
+        standings = state.standings(group=group) if state is not None else await get_standings(session, group=group, season_id=season_id)
+        matrix = build_matrix(group, [(s.team_id, s.team_name) for s in standings], await _pair_totals(session, season_id, group))
+        # Older versions can't be asked for again
+        for stale in [k for k in _matrices if k[2] != version]:
+            del _matrices[stale]
+        _matrices[key] = matrix
+        return matrix
+
+    matrix = await _matrix_flight.do(key, compute, session_factory(db), release=db)
+    return matrix if matrix.team_ids else None
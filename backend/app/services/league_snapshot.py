@@ -0,0 +1,412 @@
+"""
+League snapshot - the current-season LeagueState as a binary file.
+
+Workers periodically write the state (teams, rosters, matches, sets and the
+standings accumulators) to LEAGUE_SNAPSHOT_PATH, stamped with the data_version
+it was read at. A freshly started worker memory-maps the file, restores the
+state without touching the database and serves public reads from it at once;
+a background task then compares the stamped version with the database and
+either adopts the snapshot or drops it in favour of a normal load.
+
+File layout (little endian), all sections follow the header in this order:
+
+    header     magic, format, crc32 of the body, data_version, season id, counts,
+               standings rules (string index of the JSON, none = default rules)
+    strings    uint32 end offsets into the UTF-8 blob (last section)
+    teams      id, name, group, active, first player, player count, rating
+    players    id, name, role
+    matches    id, date (us since epoch), group, round, home, away, status,
+               first set, set count
+    sets       id, set number, home games, away games
+    groups     per accumulator group: string index, value count, int32 values
+    blob       UTF-8 string data
+"""
+import asyncio
+import json
+import mmap
+import os
+import struct
+import sys
+import zlib
+from array import array
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List, Optional
+from uuid import UUID
+
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core import invalidation
+from app.core.invalidation import get_data_version
+from app.models.match import MatchStatusEnum
+from app.models.season import Season
+from app.services import league_state
+from app.services.league_state import LeagueState, TeamRow, MatchRow
+from app.services.standings_rules import DEFAULT_RULES, compile_rules
+
+try:
+    import fcntl
+except ImportError:  # Not on Windows - concurrent writers then simply race on the rename
+    fcntl = None
+
+MAGIC = b"DPLS"
+FORMAT_VERSION = 3
+NO_STRING = 0xFFFFFFFF
+
+_HEADER = struct.Struct("<4sHIq16sIIIIIII")
+_TEAM = struct.Struct("<16sIIBIHd")
+_PLAYER = struct.Struct("<16sIB")
+_MATCH = struct.Struct("<16sqIIIIBIB")
+_SET = struct.Struct("<16shhh")
+_GROUP = struct.Struct("<II")
+
+_EPOCH = datetime(1970, 1, 1)
+_STATUSES = list(MatchStatusEnum)
+_ROLES = ("main", "reserve")
+
+
+def snapshot_path() -> Path:
+    return Path(settings.LEAGUE_SNAPSHOT_PATH)
+
+
+# ---------------------------------------------------------------------------
+# Encoding
+# ---------------------------------------------------------------------------
+
+def encode_snapshot(state: LeagueState) -> bytes:
+    """Serialize a state whose db_version is set"""
+    strings: List[str] = []
+    string_index: Dict[str, int] = {}
+
+    def intern(value: Optional[str]) -> int:
+        if value is None:
+            return NO_STRING
+        index = string_index.get(value)
+        if index is None:
+            index = string_index[value] = len(strings)
+            strings.append(value)
+        return index
+
+    rules = intern(None if state.rules is DEFAULT_RULES else state.rules.rules.model_dump_json())
+
+    teams, players = bytearray(), bytearray()
+    player_count = 0
+    for row in state.teams:
+        teams += _TEAM.pack(
+            row.id.bytes, intern(row.name), intern(row.group), row.active, player_count, len(row.players), row.rating,
+        )
+        for player_id, name, role in row.players:
+            players += _PLAYER.pack(player_id.bytes, intern(name), _ROLES.index(role))
+            player_count += 1
+
+    matches, sets = bytearray(), bytearray()
+    set_count = 0
+    for row in state.matches:
+        date_us = (row.date - _EPOCH) // timedelta(microseconds=1)
+        matches += _MATCH.pack(
+            row.id.bytes, date_us, intern(row.group), intern(row.round), row.home, row.away,
+            _STATUSES.index(row.status), set_count, len(row.set_ids),
+        )
+        for i, set_id in enumerate(row.set_ids):
+            sets += _SET.pack(set_id.bytes, row.sets[i * 3], row.sets[i * 3 + 1], row.sets[i * 3 + 2])
+            set_count += 1
+
+    groups = bytearray()
+    for group, values in state.accumulators.items():
+        groups += _GROUP.pack(intern(group), len(values))
+        groups += values.tobytes() if sys.byteorder == "little" else _swapped(values)
+
+    encoded = [value.encode("utf-8") for value in strings]
+    ends = array("I")
+    total = 0
+    for value in encoded:
+        total += len(value)
+        ends.append(total)
+    if sys.byteorder != "little":
+        ends.byteswap()
+
+    body = b"".join([ends.tobytes(), teams, players, matches, sets, groups, *encoded])
+    header = _HEADER.pack(
+        MAGIC, FORMAT_VERSION, zlib.crc32(body), state.db_version, state.season_id.bytes,
+        len(strings), len(state.teams), player_count, len(state.matches), set_count, len(state.accumulators),
+        rules,
+    )
+    return header + body
+
+
+def _swapped(values: array) -> bytes:
+    copy = array(values.typecode, values)
+    copy.byteswap()
+    return copy.tobytes()
+
+
+def decode_snapshot(buffer) -> LeagueState:
+    """Restore a LeagueState from snapshot bytes (e.g. a memory map)"""
+    view = memoryview(buffer)
+    try:
+        return _decode(view)
+    finally:
+        # A memory map can't be closed while views of it are alive
+        view.release()
+
+
+def _decode(view: memoryview) -> LeagueState:
+    if len(view) < _HEADER.size:
+        raise ValueError("League snapshot is truncated")
+    (magic, format_version, checksum, db_version, season_id,
+     n_strings, n_teams, n_players, n_matches, n_sets, n_groups, rules) = _HEADER.unpack_from(view, 0)
+    if magic != MAGIC or format_version != FORMAT_VERSION:
+        raise ValueError("Not a league snapshot of a supported format")
+    with view[_HEADER.size:] as body:
+        if zlib.crc32(body) != checksum:
+            raise ValueError("League snapshot checksum mismatch")
+        return _decode_body(body, db_version, season_id, n_strings, n_teams, n_players, n_matches, n_sets, n_groups, rules)
+
+
+def _decode_body(body, db_version, season_id, n_strings, n_teams, n_players, n_matches, n_sets, n_groups, rules) -> LeagueState:
+    offset = 0
+    ends = array("I")
+    ends.frombytes(body[offset:offset + 4 * n_strings])
+    if sys.byteorder != "little":
+        ends.byteswap()
+    offset += 4 * n_strings
+
+    sections = {}
+    for name, layout, count in (("teams", _TEAM, n_teams), ("players", _PLAYER, n_players),
+                                ("matches", _MATCH, n_matches), ("sets", _SET, n_sets)):
+        size = layout.size * count
+        sections[name] = list(layout.iter_unpack(body[offset:offset + size])) if count else []
+        offset += size
+
+    group_arrays = []
+    for _ in range(n_groups):
+        group_index, count = _GROUP.unpack_from(body, offset)
+        offset += _GROUP.size
+        values = array("i")
+        values.frombytes(body[offset:offset + 4 * count])
+        if sys.byteorder != "little":
+            values.byteswap()
+        group_arrays.append((group_index, values))
+        offset += 4 * count
+
+    blob = bytes(body[offset:])
+    strings = []
+    start = 0
+    for end in ends:
+        strings.append(blob[start:end].decode("utf-8"))
+        start = end
+
+    def text(index: int) -> Optional[str]:
+        return None if index == NO_STRING else strings[index]
+
+    state = LeagueState(UUID(bytes=season_id), compile_rules(None if rules == NO_STRING else json.loads(strings[rules])))
+    state.db_version = db_version
+    players = sections["players"]
+    for index, (team_id, name, group, active, first, count, rating) in enumerate(sections["teams"]):
+        row = TeamRow(
+            id=UUID(bytes=team_id),
+            name=strings[name],
+            group=strings[group],
+            active=bool(active),
+            players=tuple(
+                (UUID(bytes=player_id), strings[player_name], _ROLES[role])
+                for player_id, player_name, role in players[first:first + count]
+            ),
+            rating=rating,
+        )
+        state.team_index[row.id] = index
+        state.teams.append(row)
+
+    sets = sections["sets"]
+    for index, (match_id, date_us, group, round_, home, away, status, first, count) in enumerate(sections["matches"]):
+        scores = array("h")
+        for _set_id, set_number, home_games, away_games in sets[first:first + count]:
+            scores.extend((set_number, home_games, away_games))
+        row = MatchRow(
+            id=UUID(bytes=match_id),
+            date=_EPOCH + timedelta(microseconds=date_us),
+            group=strings[group],
+            round=text(round_),
+            home=home,
+            away=away,
+            status=_STATUSES[status],
+            set_ids=tuple(UUID(bytes=s[0]) for s in sets[first:first + count]),
+            sets=scores,
+        )
+        state.match_index[row.id] = index
+        state.matches.append(row)
+
+    for group_index, values in group_arrays:
+        state.accumulators[strings[group_index]] = values
+    return state
+
+
+# ---------------------------------------------------------------------------
+# Files
+# ---------------------------------------------------------------------------
+
+def read_snapshot(path: Optional[Path] = None) -> Optional[LeagueState]:
+    """Memory-map and decode the snapshot file; None if missing or unreadable"""
+    path = path or snapshot_path()
+    try:
+        with open(path, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return decode_snapshot(mapped)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError, struct.error) as e:
+        print(f"WARNING: ignoring league snapshot {path}: {e}", file=sys.stderr, flush=True)
+        return None
+
+
+def read_snapshot_version(path: Optional[Path] = None) -> Optional[int]:
+    """data_version stamped in the snapshot file, without decoding it"""
+    path = path or snapshot_path()
+    try:
+        with open(path, "rb") as f:
+            header = f.read(_HEADER.size)
+    except OSError:
+        return None
+    if len(header) < _HEADER.size or header[:4] != MAGIC:
+        return None
+    return _HEADER.unpack(header)[3]
+
+
+def write_snapshot_file(state: LeagueState, path: Optional[Path] = None) -> Path:
+    """Write atomically: readers see the old file or the complete new one"""
+    path = path or snapshot_path()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = encode_snapshot(state)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+    return path
+
+
+async def write_snapshot(session_factory=None, path: Optional[Path] = None) -> Optional[int]:
+    """
+    Load the current season from the database and write it as the snapshot.
+    Returns the data_version written, or None if there is nothing to write or
+    a write committed during the load (try again later).
+    """
+    if session_factory is None:
+        from app.core.database import AsyncSessionLocal as session_factory
+
+    async with session_factory() as db:
+        version = await get_data_version(db)
+        result = await db.execute(select(Season.id).where(Season.is_current == True))
+        season_id = result.scalar_one_or_none()
+        if season_id is None:
+            return None
+        state = await LeagueState.load(db, season_id)
+        if await get_data_version(db) != version:
+            return None
+
+    state.db_version = version
+    write_snapshot_file(state, path)
+    return version
+
+
+# ---------------------------------------------------------------------------
+# Worker lifecycle
+# ---------------------------------------------------------------------------
+
+_tasks: List[asyncio.Task] = []
+
+
+def restore_snapshot() -> Optional[LeagueState]:
+    """Cold start: serve public reads from the snapshot until it is verified"""
+    if not settings.LEAGUE_STATE_ENABLED or not settings.LEAGUE_SNAPSHOT_PATH:
+        return None
+    state = read_snapshot()
+    if state is not None:
+        league_state.install_provisional(state)
+    return state
+
+
+async def _catch_up() -> None:
+    """Adopt or drop the provisional snapshot state once the database is reachable"""
+    from app.core.database import AsyncSessionLocal
+
+    backoff = 0.5
+    while True:
+        listener = invalidation.listener
+        if listener is not None:
+            await listener.connected.wait()
+        try:
+            async with AsyncSessionLocal() as db:
+                adopted = await league_state.adopt_provisional(db)
+            if adopted:
+                print("✓ League snapshot verified against the database", flush=True)
+            else:
+                print("✓ League snapshot outdated - reloading the season from the database", flush=True)
+            return
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WARNING: league snapshot version check failed: {e}", file=sys.stderr, flush=True)
+            await asyncio.sleep(backoff)
+            backoff = min(backoff * 2, 30.0)
+
+
+def _try_lock(lock_file):
+    if fcntl is None:
+        return True
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+
+async def refresh_snapshot() -> Optional[int]:
+    """Write a new snapshot if the data changed since the last one; one worker at a time"""
+    from app.core.database import AsyncSessionLocal
+
+    path = snapshot_path()
+    async with AsyncSessionLocal() as db:
+        version = await get_data_version(db)
+    if version == read_snapshot_version(path):
+        return None
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path.with_name(f".{path.name}.lock"), "a+b") as lock_file:
+        if not _try_lock(lock_file):
+            return None  # Another worker is writing it
+        return await write_snapshot(AsyncSessionLocal, path)
+
+
+async def _writer_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await refresh_snapshot()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WARNING: league snapshot write failed: {e}", file=sys.stderr, flush=True)
+
+
+def start_snapshot_tasks() -> bool:
+    """Start the version check for a restored snapshot and the periodic writer"""
+    if not settings.LEAGUE_STATE_ENABLED or not settings.LEAGUE_SNAPSHOT_PATH:
+        return False
+    if league_state.has_provisional():
+        _tasks.append(asyncio.create_task(_catch_up(), name="league-snapshot-catch-up"))
+    if settings.LEAGUE_SNAPSHOT_SECONDS > 0:
+        _tasks.append(asyncio.create_task(_writer_loop(settings.LEAGUE_SNAPSHOT_SECONDS), name="league-snapshot-writer"))
+    return True
+
+
+async def stop_snapshot_tasks() -> None:
+    while _tasks:
+        task = _tasks.pop()
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
@@ -0,0 +1,665 @@
+"""
+LeagueState - the current season held in memory for public reads.
+
+The whole current season (teams with rosters, matches with sets, standings
+accumulators) is loaded once per worker into compact `__slots__` rows with
+id -> index maps. Standings are kept as flat integer arrays per group and are
+updated by subtracting/adding a match's contribution, so a result entry costs
+one match re-read instead of a full recalculation.
+
+Admin writes reach the state through app.core.invalidation: "team:{id}" and
+"match:{id}" tags queue those rows, which are re-read and applied by the next
+public request; concurrent requests share that pass (app.core.singleflight). "seasons" or ALL (listener reconnect) reload the state.
+
+A background task (LEAGUE_STATE_CHECK_SECONDS) rebuilds the state from the
+database and compares fingerprints; on drift it logs a warning and swaps in
+the fresh state.
+
+A state restored from a league snapshot (app/services/league_snapshot.py) is
+installed as *provisional*: it is served without touching the database until
+`adopt_provisional` has compared its data version with the database.
+"""
+import asyncio
+import sys
+from array import array
+from datetime import date, datetime, time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.database import session_factory
+from app.core.invalidation import ALL, subscribe, caches_are_coherent, get_data_version
+from app.core.singleflight import SingleFlight
+from app.models.season import Season
+from app.models.team import Team
+from app.models.team_player import TeamPlayer
+from app.models.match import Match, MatchStatusEnum
+from app.schemas.match import MatchResponse, MatchSetResponse
+from app.schemas.standings import TeamStandingResponse
+from app.schemas.team import TeamResponse, TeamPlayerResponse
+from app.services.match_service import match_sets_option, ordered_sets
+from app.services.season_service import get_current_season_id
+from app.services.standings import rank_standings
+from app.services.standings_rules import DEFAULT_RULES, CompiledRules, MatchResult, get_season_rules
+
+# Per-team accumulator layout; each group has one array of len(teams) * _STATS
+_PLAYED, _WON, _LOST, _SETS_FOR, _SETS_AGAINST, _GAMES_FOR, _GAMES_AGAINST, _POINTS = range(8)
+_STATS = 8
+
+
+class TeamRow:
+    """A team of the loaded season"""
+    __slots__ = ("id", "name", "group", "active", "players", "rating")
+
+    def __init__(self, id: UUID, name: str, group: str, active: bool, players: Tuple[tuple, ...], rating: float) -> None:
+        self.id = id
+        self.name = name
+        self.group = group
+        self.active = active
+        self.players = players  # (player_id, name, role) tuples
+        self.rating = rating
+
+
+class MatchRow:
+    """A match of the loaded season; teams are referenced by index"""
+    __slots__ = ("id", "date", "group", "round", "home", "away", "status", "set_ids", "sets")
+
+    def __init__(self, id, date, group, round, home, away, status, set_ids, sets) -> None:
+        self.id = id
+        self.date = date
+        self.group = group
+        self.round = round
+        self.home = home
+        self.away = away
+        self.status = status
+        self.set_ids = set_ids  # MatchSet ids, in set order
+        self.sets = sets  # array('h') of (set_number, home_games, away_games) triples
+
+
+class LeagueState:
+    """In-memory copy of one season; build with `LeagueState.load`"""
+
+    def __init__(self, season_id: UUID, rules: CompiledRules = DEFAULT_RULES) -> None:
+        self.season_id = season_id
+        self.rules = rules  # Points and tiebreakers of the season; a change reloads the state
+        self.teams: List[TeamRow] = []
+        self.team_index: Dict[UUID, int] = {}
+        self.matches: List[MatchRow] = []
+        self.match_index: Dict[UUID, int] = {}
+        self.accumulators: Dict[str, array] = {}
+        self.version = 0
+        self.db_version: Optional[int] = None  # data_version the state reflects, if known
+        # Derived views, rebuilt lazily after changes
+        self._match_responses: Dict[UUID, MatchResponse] = {}
+        self._team_responses: Dict[UUID, TeamResponse] = {}
+        self._views: Dict[tuple, Any] = {}
+
+    # Loading ---------------------------------------------------------------
+
+    @staticmethod
+    async def _fetch_teams(db: AsyncSession, *conditions) -> List[Team]:
+        # populate_existing: sessions don't expire on commit, identity-mapped rows may be stale
+        result = await db.execute(
+            select(Team).where(*conditions).options(
+                selectinload(Team.team_players).selectinload(TeamPlayer.player)
+            ).execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
+
+    @staticmethod
+    async def _fetch_matches(db: AsyncSession, *conditions) -> List[Match]:
+        result = await db.execute(
+            select(Match).where(*conditions).options(
+                match_sets_option()
+            ).execution_options(populate_existing=True)
+        )
+        return result.scalars().all()
+
+    @classmethod
+    async def load(cls, db: AsyncSession, season_id: UUID) -> "LeagueState":
+        state = cls(season_id, await get_season_rules(db, season_id))
+        for team in await cls._fetch_teams(db, Team.season_id == season_id):
+            state._upsert_team(team)
+        for match in await cls._fetch_matches(db, Match.season_id == season_id):
+            if not state._upsert_match(match):
+                raise ValueError(f"Match {match.id} references a team outside season {season_id}")
+        return state
+
+    async def apply_changes(self, db: AsyncSession, team_ids: Set[UUID], match_ids: Set[UUID]) -> bool:
+        """
+        Re-read changed teams and matches and apply them.
+        Returns False if the change can't be applied incrementally (reload instead).
+        """
+        teams = await self._fetch_teams(db, Team.id.in_(team_ids)) if team_ids else []
+        matches = await self._fetch_matches(db, Match.id.in_(match_ids)) if match_ids else []
+
+        # No awaits below - readers never see a half-applied change
+        found_teams = set()
+        for team in teams:
+            if team.season_id != self.season_id:
+                if team.id in self.team_index:
+                    return False  # Teams only leave a season when it is archived/rebuilt
+                continue
+            found_teams.add(team.id)
+            self._upsert_team(team)
+        if any(team_id in self.team_index for team_id in team_ids - found_teams):
+            return False  # Hard-deleted team
+
+        found_matches = set()
+        for match in matches:
+            found_matches.add(match.id)
+            if match.season_id != self.season_id:
+                self._remove_match(match.id)
+            elif not self._upsert_match(match):
+                return False
+        for match_id in match_ids - found_matches:
+            self._remove_match(match_id)
+
+        self._changed()
+        return True
+
+    # Row maintenance -------------------------------------------------------
+
+    def _upsert_team(self, team: Team) -> None:
+        row = TeamRow(
+            id=team.id,
+            name=team.name,
+            group=team.group,
+            active=team.active,
+            players=tuple(
+                (tp.player.id, tp.player.name, tp.role.value.lower())
+                for tp in team.team_players
+            ),
+            rating=team.rating,
+        )
+        index = self.team_index.get(team.id)
+        if index is None:
+            self.team_index[team.id] = len(self.teams)
+            self.teams.append(row)
+            for values in self.accumulators.values():
+                values.extend([0] * _STATS)
+        else:
+            self.teams[index] = row
+            # Names show up in match responses
+            for match in self.matches:
+                if match.home == index or match.away == index:
+                    self._match_responses.pop(match.id, None)
+        self._team_responses.pop(team.id, None)
+
+    def _upsert_match(self, match: Match) -> bool:
+        home = self.team_index.get(match.home_team_id)
+        away = self.team_index.get(match.away_team_id)
+        if home is None or away is None:
+            return False
+        match_sets = ordered_sets(match)
+        sets = array("h")
+        for ms in match_sets:
+            sets.extend((ms.set_number, ms.home_games, ms.away_games))
+        row = MatchRow(
+            id=match.id,
+            date=match.date,
+            group=match.group,
+            round=match.round,
+            home=home,
+            away=away,
+            status=match.status,
+            set_ids=tuple(ms.id for ms in match_sets),
+            sets=sets,
+        )
+        index = self.match_index.get(match.id)
+        if index is None:
+            self.match_index[match.id] = len(self.matches)
+            self.matches.append(row)
+        else:
+            self._accumulate(self.matches[index], -1)
+            self.matches[index] = row
+        self._accumulate(row, 1)
+        self._match_responses.pop(match.id, None)
+        return True
+
+    def _remove_match(self, match_id: UUID) -> None:
+        index = self.match_index.pop(match_id, None)
+        if index is None:
+            return
+        self._accumulate(self.matches[index], -1)
+        # Swap with the last row to keep the list dense
+        last = self.matches.pop()
+        if index < len(self.matches):
+            self.matches[index] = last
+            self.match_index[last.id] = index
+        self._match_responses.pop(match_id, None)
+
+    def _accumulate(self, match: MatchRow, sign: int) -> None:
+        """Add (sign=1) or remove (sign=-1) a played match's contribution to its group"""
+        if match.status != MatchStatusEnum.PLAYED:
+            return
+        values = self.accumulators.get(match.group)
+        if values is None:
+            values = self.accumulators[match.group] = array("i", [0]) * (len(self.teams) * _STATS)
+
+        home_sets, away_sets, home_games, away_games = _summary(match)
+
+        for team, sets_for, sets_against, games_for, games_against in (
+            (match.home, home_sets, away_sets, home_games, away_games),
+            (match.away, away_sets, home_sets, away_games, home_games),
+        ):
+            base = team * _STATS
+            values[base + _PLAYED] += sign
+            values[base + (_WON if sets_for > sets_against else _LOST)] += sign
+            values[base + _SETS_FOR] += sign * sets_for
+            values[base + _SETS_AGAINST] += sign * sets_against
+            values[base + _GAMES_FOR] += sign * games_for
+            values[base + _GAMES_AGAINST] += sign * games_against
+            values[base + _POINTS] += sign * self.rules.match_points(sets_for, sets_against)
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._views.clear()
+
+    # Reads -----------------------------------------------------------------
+
+    def _team_response(self, row: TeamRow) -> TeamResponse:
+        response = self._team_responses.get(row.id)
+        if response is None:
+            response = self._team_responses[row.id] = TeamResponse(
+                id=row.id,
+                name=row.name,
+                group=row.group,
+                season_id=self.season_id,
+                active=row.active,
+                players=[
+                    TeamPlayerResponse(id=player_id, name=name, role=role)
+                    for player_id, name, role in row.players
+                ],
+                rating=row.rating,
+            )
+        return response
+
+    def _match_response(self, row: MatchRow) -> MatchResponse:
+        response = self._match_responses.get(row.id)
+        if response is None:
+            sets = row.sets
+            response = self._match_responses[row.id] = MatchResponse(
+                id=row.id,
+                date=row.date,
+                group=row.group,
+                season_id=self.season_id,
+                round=row.round,
+                home_team_id=self.teams[row.home].id,
+                away_team_id=self.teams[row.away].id,
+                status=row.status,
+                match_sets=[
+                    MatchSetResponse(
+                        id=set_id,
+                        set_number=sets[i * 3],
+                        home_games=sets[i * 3 + 1],
+                        away_games=sets[i * 3 + 2],
+                    )
+                    for i, set_id in enumerate(row.set_ids)
+                ],
+                home_team_name=self.teams[row.home].name,
+                away_team_name=self.teams[row.away].name,
+            )
+        return response
+
+    def list_teams(self, group: Optional[str] = None, active: Optional[bool] = None) -> List[TeamResponse]:
+        key = ("teams", group, active)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = [
+                self._team_response(row)
+                for row in self.teams
+                if (group is None or row.group == group) and (active is None or row.active == active)
+            ]
+        return view
+
+    def get_team(self, team_id: UUID) -> Optional[TeamResponse]:
+        index = self.team_index.get(team_id)
+        return None if index is None else self._team_response(self.teams[index])
+
+    def list_matches(
+        self,
+        group: Optional[str] = None,
+        status: Optional[MatchStatusEnum] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        team_id: Optional[UUID] = None,
+    ) -> List[MatchResponse]:
+        key = ("matches", group, status, team_id)
+        view = self._views.get(key)
+        if view is None:
+            team = self.team_index.get(team_id, -1) if team_id is not None else None
+            rows = [
+                row for row in self.matches
+                if (group is None or row.group == group) and (status is None or row.status == status)
+                and (team is None or row.home == team or row.away == team)
+            ]
+            rows.sort(key=lambda row: row.date, reverse=True)
+            view = self._views[key] = [self._match_response(row) for row in rows]
+        if date_from or date_to:
+            # Same comparison the database does for `timestamp >= date`
+            start = datetime.combine(date_from, time.min) if date_from else None
+            end = datetime.combine(date_to, time.min) if date_to else None
+            view = [
+                m for m in view
+                if (start is None or m.date >= start) and (end is None or m.date <= end)
+            ]
+        return view
+
+    def get_match(self, match_id: UUID) -> Optional[MatchResponse]:
+        index = self.match_index.get(match_id)
+        return None if index is None else self._match_response(self.matches[index])
+
+    def standings(self, group: Optional[str] = None) -> List[TeamStandingResponse]:
+        """Same result as calculate_standings(db, group, season_id)"""
+        key = ("standings", group)
+        view = self._views.get(key)
+        if view is not None:
+            return view
+
+        if group is None:
+            arrays = list(self.accumulators.values())
+        else:
+            arrays = [self.accumulators[group]] if group in self.accumulators else []
+
+        standings = []
+        for index, row in enumerate(self.teams):
+            if not row.active or (group is not None and row.group != group):
+                continue
+            base = index * _STATS
+            stats = [sum(values[base + i] for values in arrays) for i in range(_STATS)]
+            standings.append(TeamStandingResponse(
+                team_id=row.id,
+                team_name=row.name,
+                group=row.group,
+                matches_played=stats[_PLAYED],
+                matches_won=stats[_WON],
+                matches_lost=stats[_LOST],
+                sets_for=stats[_SETS_FOR],
+                sets_against=stats[_SETS_AGAINST],
+                games_for=stats[_GAMES_FOR],
+                games_against=stats[_GAMES_AGAINST],
+                points=stats[_POINTS],
+                set_diff=stats[_SETS_FOR] - stats[_SETS_AGAINST],
+                game_diff=stats[_GAMES_FOR] - stats[_GAMES_AGAINST],
+                position=0,
+                rating=row.rating,
+            ))
+        matches = self.played_results(group) if self.rules.head_to_head else None
+        view = self._views[key] = rank_standings(standings, self.rules, matches)
+        return view
+
+    def played_results(self, group: Optional[str] = None) -> List[MatchResult]:
+        """Played matches as MatchResult tuples (for head-to-head tiebreakers)"""
+        return [
+            (self.teams[row.home].id, self.teams[row.away].id, *_summary(row))
+            for row in self.matches
+            if row.status == MatchStatusEnum.PLAYED and (group is None or row.group == group)
+        ]
+
+    def match_teams(self, match_id: UUID) -> Optional[Tuple[UUID, UUID, MatchStatusEnum]]:
+        """(home team, away team, status) of a match, None if unknown"""
+        index = self.match_index.get(match_id)
+        if index is None:
+            return None
+        row = self.matches[index]
+        return self.teams[row.home].id, self.teams[row.away].id, row.status
+
+    def remaining_fixtures(self, group: Optional[str] = None) -> List[Tuple[UUID, UUID]]:
+        """(home team, away team) of the matches still to finish: scheduled and in progress"""
+        return [
+            (self.teams[row.home].id, self.teams[row.away].id)
+            for row in self.matches
+            if row.status not in (MatchStatusEnum.PLAYED, MatchStatusEnum.CANCELLED)
+            and (group is None or row.group == group)
+        ]
+
+    def derived(self, name: str, build: Callable[[], Any]) -> Any:
+        """
+        A value computed from the state by another module (e.g. position
+        bounds), built on first use and kept with the views until the next change
+        """
+        key = ("derived", name)
+        view = self._views.get(key)
+        if view is None:
+            view = self._views[key] = build()
+        return view
+
+    def fingerprint(self) -> tuple:
+        """Order-independent summary of the state, for the consistency check"""
+        team_ids = [row.id for row in self.teams]
+        matches = {
+            row.id: (row.date, row.group, row.round, team_ids[row.home], team_ids[row.away],
+                     row.status, row.set_ids, tuple(row.sets))
+            for row in self.matches
+        }
+        teams = {row.id: (row.name, row.group, row.active, tuple(sorted(row.players)), row.rating) for row in self.teams}
+        standings = tuple(s.model_dump_json() for s in self.standings())
+        return (self.season_id, teams, matches, standings)
+
+
+def _summary(match: MatchRow) -> Tuple[int, int, int, int]:
+    """(home sets won, away sets won, home games, away games) of a match row"""
+    home_sets = away_sets = home_games = away_games = 0
+    sets = match.sets
+    for i in range(0, len(sets), 3):
+        if sets[i + 1] > sets[i + 2]:
+            home_sets += 1
+        elif sets[i + 2] > sets[i + 1]:
+            away_sets += 1
+        home_games += sets[i + 1]
+        away_games += sets[i + 2]
+    return home_sets, away_sets, home_games, away_games
+
+
+# ---------------------------------------------------------------------------
+# Per-process state and change queue
+# ---------------------------------------------------------------------------
+
+_state: Optional[LeagueState] = None
+_provisional: Optional[LeagueState] = None
+_reload_required = True
+_reload_generation = 0  # _generation of the latest reload request
+_pending_teams: Set[UUID] = set()
+_pending_matches: Set[UUID] = set()
+_generation = 0
+_sync_flight = SingleFlight("league_state.sync")
+drift_count = 0
+
+
+@subscribe
+def _queue_changes(tags: set) -> None:
+    global _reload_required, _reload_generation, _generation
+    _generation += 1
+    if ALL in tags or "seasons" in tags:
+        _reload_required = True
+        _reload_generation = _generation
+        return
+
+    specific = False
+    for tag in tags:
+        kind, _, value = tag.partition(":")
+        if kind in ("team", "match") and value:
+            specific = True
+            (_pending_teams if kind == "team" else _pending_matches).add(UUID(value))
+    if not specific and tags & {"teams", "matches", "standings"}:
+        _reload_required = True
+        _reload_generation = _generation
+
+
+def _is_current(state: Optional[LeagueState], season_id: UUID) -> bool:
+    return (
+        state is not None
+        and state.season_id == season_id
+        and not _reload_required
+        and not _pending_teams
+        and not _pending_matches
+    )
+
+
+async def _sync(db: AsyncSession, current_season_id: UUID) -> None:
+    """Load the state or apply queued changes until it is current"""
+    global _state, _reload_required
+    for _ in range(2):
+        if _is_current(_state, current_season_id):
+            return
+        if _reload_required or _state is None or _state.season_id != current_season_id:
+            # Changes queued so far are part of the reload; later ones queue up again
+            _reload_required = False
+            _pending_teams.clear()
+            _pending_matches.clear()
+            try:
+                _state = await LeagueState.load(db, current_season_id)
+            except ValueError as e:
+                print(f"WARNING: league state not loaded, serving from the database: {e}", file=sys.stderr, flush=True)
+                _state = None
+                _reload_required = True
+                return
+        else:
+            team_ids, match_ids = set(_pending_teams), set(_pending_matches)
+            _pending_teams.difference_update(team_ids)
+            _pending_matches.difference_update(match_ids)
+            if not await _state.apply_changes(db, team_ids, match_ids):
+                _reload_required = True
+
+
+async def get_league_state(db: AsyncSession, season_id: Optional[UUID] = None) -> Optional[LeagueState]:
+    """
+    The in-memory state if `season_id` (default: current season) is the
+    current season, with all queued admin writes applied. None when public
+    reads must go to the database instead (disabled, other season, or caches
+    not coherent across workers).
+    """
+    if not settings.LEAGUE_STATE_ENABLED:
+        return None
+    provisional = _provisional
+    if provisional is not None and (season_id is None or season_id == provisional.season_id):
+        # Cold start: serve the snapshot until adopt_provisional has checked it
+        return provisional
+    if not caches_are_coherent():
+        return None
+    current_season_id = await get_current_season_id(db)
+    if current_season_id is None or (season_id is not None and season_id != current_season_id):
+        return None
+    if _is_current(_state, current_season_id):
+        return _state
+
+    # Concurrent requests after a write share one load / apply_changes pass
+    await _sync_flight.do(
+        current_season_id, lambda session: _sync(session, current_season_id), session_factory(db), release=db
+    )
+    if not caches_are_coherent() or _state is None or _state.season_id != current_season_id:
+        return None
+    return _state
+
+
+def install_provisional(state: LeagueState) -> None:
+    """Serve `state` (restored from a snapshot, db_version set) until it is verified"""
+    global _provisional
+    _provisional = state
+
+
+def has_provisional() -> bool:
+    return _provisional is not None
+
+
+async def adopt_provisional(db: AsyncSession) -> bool:
+    """
+    Verify the provisional state against the database's data version. If it is
+    still current it becomes the live state; otherwise it is dropped and the
+    next request loads the season from the database. Returns True if adopted.
+
+    With a LISTEN connection, call only once it is connected: later writes
+    then arrive as notifications, earlier ones show up in the data version.
+    """
+    global _provisional, _state, _reload_required
+    state = _provisional
+    if state is None:
+        return False
+
+    generation = _generation
+    version = await get_data_version(db)
+    result = await db.execute(select(Season.id).where(Season.is_current == True))
+    current_season_id = result.scalar_one_or_none()
+
+    _provisional = None
+    if version != state.db_version or current_season_id != state.season_id:
+        return False
+    if _state is None:
+        _state = state
+        # Reload requests up to the version read (e.g. the listener's initial
+        # resync) are satisfied by the matching version; later ones stand
+        if _reload_generation <= generation:
+            _reload_required = False
+    return True
+
+
+async def check_consistency(session_factory=None) -> bool:
+    """
+    Rebuild the state from the database and compare it with the live one.
+    On drift, log it and replace the live state. Returns False on drift.
+    """
+    global _state, drift_count
+    state = _state
+    if state is None or not _is_current(state, state.season_id) or not caches_are_coherent():
+        return True
+    if session_factory is None:
+        from app.core.database import AsyncSessionLocal as session_factory
+
+    generation = _generation
+    async with session_factory() as db:
+        fresh = await LeagueState.load(db, state.season_id)
+    # A write committed meanwhile: the comparison would be meaningless - next round
+    if generation != _generation or _state is not state or not _is_current(state, state.season_id):
+        return True
+
+    if fresh.fingerprint() == state.fingerprint():
+        return True
+    drift_count += 1
+    print(
+        f"WARNING: in-memory league state drifted from the database (season {state.season_id}); reloaded",
+        file=sys.stderr,
+        flush=True,
+    )
+    _state = fresh
+    return False
+
+
+_check_task: Optional[asyncio.Task] = None
+
+
+async def _check_loop(interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await check_consistency()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WARNING: league state consistency check failed: {e}", file=sys.stderr, flush=True)
+
+
+def start_consistency_check() -> Optional[asyncio.Task]:
+    """Start the periodic consistency check for this worker"""
+    global _check_task
+    interval = settings.LEAGUE_STATE_CHECK_SECONDS
+    if not settings.LEAGUE_STATE_ENABLED or interval <= 0:
+        return None
+    if _check_task is None:
+        _check_task = asyncio.create_task(_check_loop(interval), name="league-state-check")
+    return _check_task
+
+
+async def stop_consistency_check() -> None:
+    global _check_task
+    if _check_task is not None:
+        _check_task.cancel()
+        try:
+            await _check_task
+        except asyncio.CancelledError:
+            pass
+        _check_task = None
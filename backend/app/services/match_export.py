@@ -0,0 +1,170 @@
+"""
+Streaming match exports (NDJSON and CSV)
+
+Matches with their sets are read through a server-side cursor
+(`AsyncSession.stream` with `yield_per`) as one flat joined row per set and
+regrouped on the fly, so memory stays constant whatever the size of the
+match history. Output is yielded in chunks of about 64 KiB.
+
+NDJSON lines have the shape of the public match responses; CSV has one row
+per match with up to three set columns.
+"""
+import csv
+import io
+from datetime import date
+from typing import AsyncIterator, Iterable, List, Optional, Union
+from uuid import UUID
+
+from sqlalchemy import and_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import aliased
+
+from app.models.season import Division
+from app.models.match import Match, MatchSet, MatchStatusEnum
+from app.models.team import Team
+from app.schemas.match import MatchResponse, MatchSetResponse
+from app.services.match_service import set_storage_is_array, unpack_set_scores
+from app.services.season_service import division_id_subquery
+
+EXPORT_FORMATS = ("ndjson", "csv")
+MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+
+_YIELD_PER = 1000  # Rows fetched per cursor round trip
+_CHUNK_BYTES = 64 * 1024
+
+CSV_COLUMNS = [
+    "match_id", "date", "season_id", "group", "round", "status",
+    "home_team_id", "home_team_name", "away_team_id", "away_team_name",
+    "home_sets_won", "away_sets_won",
+    "set1_home", "set1_away", "set2_home", "set2_away", "set3_home", "set3_away",
+]
+
+
+async def stream_season_matches(
+    db: AsyncSession,
+    season_id: UUID,
+    group: Optional[str] = None,
+    status: Optional[MatchStatusEnum] = None,
+    date_from: Optional[date] = None,
+    date_to: Optional[date] = None,
+) -> AsyncIterator[MatchResponse]:
+    """Matches of a season (newest first) from a server-side cursor, one at a time"""
+    home = aliased(Team)
+    away = aliased(Team)
+    conditions = [Match.season_id == season_id]
+    if group:
+        conditions.append(Match.division_id == division_id_subquery(season_id, group))
+    if status:
+        conditions.append(Match.status == status)
+    if date_from:
+        conditions.append(Match.date >= date_from)
+    if date_to:
+        conditions.append(Match.date <= date_to)
+
+    columns = (
+        Match.id, Match.date, Match.season_id, Division.code, Match.round, Match.status,
+        Match.home_team_id, home.name, Match.away_team_id, away.name,
+    )
+    query = (
+        select(*columns)
+        .join(Division, Division.id == Match.division_id)
+        .join(home, home.id == Match.home_team_id)
+        .join(away, away.id == Match.away_team_id)
+        .where(and_(*conditions))
+        .execution_options(yield_per=_YIELD_PER)
+    )
+
+    if set_storage_is_array():
+        # One row per match, sets included
+        result = await db.stream(query.add_columns(Match.set_scores).order_by(Match.date.desc(), Match.id))
+        async for partition in result.partitions():
+            for row in partition:
+                yield _match_response(row, [
+                    MatchSetResponse(id=s.id, set_number=s.set_number, home_games=s.home_games, away_games=s.away_games)
+                    for s in unpack_set_scores(row[0], row[10])
+                ])
+        return
+
+    query = (
+        query.add_columns(MatchSet.id, MatchSet.set_number, MatchSet.home_games, MatchSet.away_games)
+        .outerjoin(MatchSet, MatchSet.match_id == Match.id)
+        # Match id keeps a match's set rows together when dates tie
+        .order_by(Match.date.desc(), Match.id, MatchSet.set_number)
+    )
+    result = await db.stream(query)
+    current = None
+    sets: List[MatchSetResponse] = []
+    async for partition in result.partitions():
+        for row in partition:
+            if current is None or row[0] != current[0]:
+                if current is not None:
+                    yield _match_response(current, sets)
+                current, sets = row, []
+            if row[10] is not None:
+                sets.append(MatchSetResponse(id=row[10], set_number=row[11], home_games=row[12], away_games=row[13]))
+    if current is not None:
+        yield _match_response(current, sets)
+
+
+def _match_response(row, sets: List[MatchSetResponse]) -> MatchResponse:
+    return MatchResponse(
+        id=row[0],
+        date=row[1],
+        season_id=row[2],
+        group=row[3],
+        round=row[4],
+        status=row[5],
+        home_team_id=row[6],
+        home_team_name=row[7],
+        away_team_id=row[8],
+        away_team_name=row[9],
+        match_sets=sets,
+    )
+
+
+def _csv_row(match: MatchResponse) -> list:
+    home_sets = sum(1 for s in match.match_sets if s.home_games > s.away_games)
+    away_sets = sum(1 for s in match.match_sets if s.away_games > s.home_games)
+    row = [
+        match.id, match.date.isoformat(), match.season_id or "", match.group, match.round or "",
+        match.status.value, match.home_team_id, match.home_team_name or "",
+        match.away_team_id, match.away_team_name or "",
+        home_sets if match.match_sets else "", away_sets if match.match_sets else "",
+    ]
+    games = {s.set_number: (s.home_games, s.away_games) for s in match.match_sets}
+    for set_number in (1, 2, 3):
+        row.extend(games.get(set_number, ("", "")))
+    return row
+
+
+async def encode_matches(
+    matches: Union[AsyncIterator[MatchResponse], Iterable[MatchResponse]],
+    fmt: str,
+) -> AsyncIterator[bytes]:
+    """Serialize matches as NDJSON or CSV, yielding chunks of about _CHUNK_BYTES"""
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}")
+    if not hasattr(matches, "__aiter__"):
+        matches = _aiter(matches)
+
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n") if fmt == "csv" else None
+    if writer is not None:
+        writer.writerow(CSV_COLUMNS)
+    async for match in matches:
+        if writer is not None:
+            writer.writerow(_csv_row(match))
+        else:
+            buffer.write(match.model_dump_json())
+            buffer.write("\n")
+        if buffer.tell() >= _CHUNK_BYTES:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+async def _aiter(items: Iterable[MatchResponse]) -> AsyncIterator[MatchResponse]:
+    for item in items:
+        yield item
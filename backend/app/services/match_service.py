@@ -1,25 +1,125 @@
 """
 Match service for processing match results
+
+Set scores are stored two ways, selected by MATCH_SET_STORAGE:
+- rows: one match_sets row per set (the original layout)
+- array: the fixed-width set_scores column on matches,
+  [home1, away1, home2, away2, home3, away3] with -1 for sets not played, so
+  reading matches with their sets needs no second query
+set_scores is written in both modes, so either can be switched on at any
+time; scripts/convert_set_storage.py brings the match_sets rows in line.
+Read sets through `ordered_sets` / `match_set_responses` and load them with
+`match_sets_option`, never through Match.match_sets directly.
 """
+import uuid
+from typing import Iterable, List, NamedTuple, Optional, Protocol
 from uuid import UUID
 
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from sqlalchemy import delete, select, union_all
+from sqlalchemy.orm import noload, selectinload
 
+from app.core.config import settings
 from app.models.match import Match, MatchSet, MatchStatusEnum
-from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.schemas.match import MatchResultCreate, MatchSetCreate, MatchSetResponse
+from app.services.ratings import rate_match
 from app.exceptions import NotFoundError
 
+MAX_SETS = 3
+
+
+def team_match_ids(team_id: UUID):
+    """
+    Ids of a team's home and away matches.
+
+    `home_team_id = :id OR away_team_id = :id` cannot be answered from one
+    index, so the two sides are separate index scans (ix_matches_home_team_date,
+    ix_matches_away_team_date) combined with UNION ALL - a team never plays
+    itself, so the halves cannot overlap.
+    """
+    return union_all(
+        select(Match.id).where(Match.home_team_id == team_id),
+        select(Match.id).where(Match.away_team_id == team_id),
+    )
+
+
+class SetScore(Protocol):
+    """A set's games: MatchSet rows and MatchSetCreate payloads both qualify"""
+    home_games: int
+    away_games: int
+
+
+class SetRow(NamedTuple):
+    """A set read from the set_scores array; same attributes as a MatchSet"""
+    id: UUID
+    set_number: int
+    home_games: int
+    away_games: int
+
+
+def set_storage_is_array() -> bool:
+    return settings.MATCH_SET_STORAGE == "array"
+
+
+def match_sets_option():
+    """Loader option for the sets of queried matches"""
+    return noload(Match.match_sets) if set_storage_is_array() else selectinload(Match.match_sets)
+
+
+def set_relationships() -> List[str]:
+    """Relationship names to refresh for the sets of a match (db.refresh)"""
+    return [] if set_storage_is_array() else ["match_sets"]
+
+
+def set_id(match_id: UUID, set_number: int) -> UUID:
+    """Stable id of a set stored in the array (API responses carry set ids)"""
+    return uuid.uuid5(match_id, str(set_number))
+
+
+def pack_set_scores(match_sets: Iterable) -> Optional[List[int]]:
+    """set_scores value for a match's sets (objects with set_number/home_games/away_games)"""
+    scores = [-1] * (2 * MAX_SETS)
+    empty = True
+    for match_set in match_sets:
+        index = 2 * (match_set.set_number - 1)
+        scores[index] = match_set.home_games
+        scores[index + 1] = match_set.away_games
+        empty = False
+    return None if empty else scores
+
+
+def unpack_set_scores(match_id: UUID, scores: Optional[List[int]]) -> List[SetRow]:
+    if not scores:
+        return []
+    return [
+        SetRow(set_id(match_id, i // 2 + 1), i // 2 + 1, scores[i], scores[i + 1])
+        for i in range(0, len(scores), 2)
+        if scores[i] >= 0
+    ]
+
+
+def ordered_sets(match: Match) -> list:
+    """The sets of a match in set order, from the configured storage"""
+    if set_storage_is_array():
+        return unpack_set_scores(match.id, match.set_scores)
+    return sorted(match.match_sets, key=lambda x: x.set_number)
+
 
-def count_sets_won(match_sets: list[MatchSet]) -> tuple[int, int]:
+def match_set_responses(match: Match) -> List[MatchSetResponse]:
+    return [
+        MatchSetResponse(id=s.id, set_number=s.set_number, home_games=s.home_games, away_games=s.away_games)
+        for s in ordered_sets(match)
+    ]
+
+
+def count_sets_won(match_sets: Iterable[SetScore]) -> tuple[int, int]:
     """
     Count how many sets the home and away teams have won.
     """
     home_sets_won = 0
     away_sets_won = 0
 
-    for match_set in sorted(match_sets, key=lambda x: x.set_number):
+    for match_set in match_sets:
         if match_set.home_games > match_set.away_games:
             home_sets_won += 1
         elif match_set.away_games > match_set.home_games:
@@ -28,13 +128,32 @@ def count_sets_won(match_sets: list[MatchSet]) -> tuple[int, int]:
     return home_sets_won, away_sets_won
 
 
+def apply_result_summary(match: Match, match_sets: Iterable[SetScore]) -> None:
+    """
+    Store the result summary columns of a match (sets won, games, winner) for
+    its sets. Call whenever the sets or the teams of a match change.
+    """
+    match_sets = list(match_sets)
+    match.home_sets_won, match.away_sets_won = count_sets_won(match_sets)
+    match.home_games = sum(s.home_games for s in match_sets)
+    match.away_games = sum(s.away_games for s in match_sets)
+    # Match is won when a team wins 2 sets (best of 3)
+    if match.home_sets_won >= 2:
+        match.winner_team_id = match.home_team_id
+    elif match.away_sets_won >= 2:
+        match.winner_team_id = match.away_team_id
+    else:
+        match.winner_team_id = None
+
+
 async def enter_match_result(
     db: AsyncSession,
     match_id: UUID,
     result: MatchResultCreate
 ) -> Match:
     """
-    Enter match result and calculate winner.
+    Enter match result and calculate winner. Both teams' ratings are updated
+    in the same transaction (app/services/ratings.py).
     
     Args:
         db: Database session
@@ -45,9 +164,7 @@ async def enter_match_result(
         Updated match object
     """
     # Get match with existing sets
-    query = select(Match).where(Match.id == match_id).options(
-        selectinload(Match.match_sets)
-    )
+    query = select(Match).where(Match.id == match_id).options(match_sets_option())
     result_query = await db.execute(query)
     match = result_query.scalar_one_or_none()
     
@@ -64,30 +181,36 @@ async def enter_match_result(
         if set_data.home_games == 0 and set_data.away_games == 0:
             raise ValueError(f"Set {set_data.set_number} cannot have both scores as 0")
     
-    # Delete existing sets if any
-    for existing_set in match.match_sets:
-        await db.delete(existing_set)    
-    # Create new match sets
-    for set_data in result.sets:
-        match_set = MatchSet(
-            match_id=match.id,
-            set_number=set_data.set_number,
-            home_games=set_data.home_games,
-            away_games=set_data.away_games,
-        )
-        db.add(match_set)
-    
-    # Determine match status based on whether there's a winner
-    await db.flush()
-    await db.refresh(match, ["match_sets"])
+    match.set_scores = pack_set_scores(result.sets)
+    if set_storage_is_array():
+        # Rows left from before the switch would be stale
+        await db.execute(delete(MatchSet).where(MatchSet.match_id == match.id))
+    else:
+        # Delete existing sets if any
+        for existing_set in match.match_sets:
+            await db.delete(existing_set)    
+        # Create new match sets
+        for set_data in result.sets:
+            match_set = MatchSet(
+                match_id=match.id,
+                set_number=set_data.set_number,
+                home_games=set_data.home_games,
+                away_games=set_data.away_games,
+            )
+            db.add(match_set)
+    apply_result_summary(match, result.sets)
     
     # Determine match status based on winner
-    winner_id = determine_match_winner(match)
-    if winner_id:
+    if match.winner_team_id:
         match.status = MatchStatusEnum.PLAYED
     else:
         match.status = MatchStatusEnum.IN_PROGRESS
     
+    await db.flush()
+    await rate_match(db, match)
+    if not set_storage_is_array():
+        await db.refresh(match, ["match_sets"])
+    
     return match
 
 
@@ -97,15 +220,16 @@ def determine_match_winner(match: Match) -> UUID | None:
     Match is won when a team wins 2 sets (best of 3).
     
     Args:
-        match: Match object with match_sets loaded
+        match: Match object with its sets loaded (match_sets_option)
     
     Returns:
         UUID of winning team, or None if match not completed (no team has won 2 sets yet)
     """
-    if not match.match_sets:
+    match_sets = ordered_sets(match)
+    if not match_sets:
         return None
     
-    home_sets_won, away_sets_won = count_sets_won(match.match_sets)
+    home_sets_won, away_sets_won = count_sets_won(match_sets)
     
     # Match is won when a team wins 2 sets (best of 3)
     if home_sets_won >= 2:
@@ -115,3 +239,33 @@ def determine_match_winner(match: Match) -> UUID | None:
     else:
         return None  # No team has won 2 sets yet, match still in progress
 
+
+
+async def restore_set_rows(db: AsyncSession) -> int:
+    """
+    Rewrite the match_sets rows of every match with a result from set_scores
+    (before switching MATCH_SET_STORAGE from array to rows). Returns the number of matches.
+    """
+    result = await db.execute(select(Match.id, Match.set_scores).where(Match.set_scores.is_not(None)))
+    matches = result.all()
+    if not matches:
+        return 0
+    await db.execute(delete(MatchSet).where(MatchSet.match_id.in_(select(Match.id).where(Match.set_scores.is_not(None)))))
+    db.add_all(
+        MatchSet(match_id=match_id, set_number=s.set_number, home_games=s.home_games, away_games=s.away_games)
+        for match_id, scores in matches
+        for s in unpack_set_scores(match_id, scores)
+    )
+    await db.flush()
+    return len(matches)
+
+
+async def drop_set_rows(db: AsyncSession) -> int:
+    """
+    Delete the match_sets rows that set_scores already holds (after switching
+    MATCH_SET_STORAGE to array). Returns the number of rows deleted.
+    """
+    result = await db.execute(
+        delete(MatchSet).where(MatchSet.match_id.in_(select(Match.id).where(Match.set_scores.is_not(None))))
+    )
+    return result.rowcount
@@ -0,0 +1,191 @@
+"""
+Team ratings - an Elo-style strength per team, beyond league points.
+
+Every team of a season starts at RATING_INITIAL. A played match moves both
+teams by the same amount in opposite directions:
+
+    expected = 1 / (1 + 10 ** ((opponent - rating) / 400))
+    change   = RATING_K * margin * (won - expected)
+    margin   = (set margin + ln(1 + |game margin|)) / 3
+
+so a 2-0 with a wide game margin counts for more than a close 2-1. Ratings
+depend on the order results happened in, so matches are applied by
+(date, id).
+
+`rate_match` runs in the transaction that enters a result: if the match is
+the latest rated one of both teams, only those two teams move (the common
+case, one result after another). Otherwise - a corrected result, a result
+entered out of date order, a rated match changed or deleted - the season is
+replayed by `recompute_ratings`, which streams the played matches in date
+order keeping one rating per team in memory. Each application writes a
+team_ratings row per team, the history the ratings came from.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import and_, bindparam, delete, insert, or_, select, update
+
+from app.core.config import settings
+from app.core.invalidation import publish, season_tags, team_tags
+from app.models.match import Match, MatchStatusEnum
+from app.models.team import Team
+from app.models.team_rating import TeamRating
+
+# team_ratings rows written per statement while replaying a season
+_WRITE_BATCH = 1000
+
+
+def expected_score(rating: float, opponent: float) -> float:
+    """Probability that a team rated `rating` beats one rated `opponent`"""
+    return 1.0 / (1.0 + 10.0 ** ((opponent - rating) / 400.0))
+
+
+def rating_change(
+    home_rating: float,
+    away_rating: float,
+    home_sets_won: int,
+    away_sets_won: int,
+    home_games: int,
+    away_games: int,
+    k: Optional[float] = None,
+) -> float:
+    """
+    Rating change of the home team for a result (the away team gets the
+    negative). The winner is the team with more sets (count_sets_won).
+    """
+    if home_sets_won == away_sets_won:
+        return 0.0
+    k = settings.RATING_K if k is None else k
+    margin = (abs(home_sets_won - away_sets_won) + math.log1p(abs(home_games - away_games))) / 3.0
+    won = 1.0 if home_sets_won > away_sets_won else 0.0
+    return k * margin * (won - expected_score(home_rating, away_rating))
+
+
+def _history_rows(match, home_rating: float, away_rating: float) -> Tuple[float, float, List[dict]]:
+    """New ratings of both teams after `match` and their team_ratings rows"""
+    change = rating_change(
+        home_rating, away_rating,
+        match.home_sets_won, match.away_sets_won, match.home_games, match.away_games,
+    )
+    home_rating += change
+    away_rating -= change
+    rows = [
+        {"season_id": match.season_id, "team_id": team_id, "match_id": match.id,
+         "date": match.date, "rating": rating, "change": team_change}
+        for team_id, rating, team_change in (
+            (match.home_team_id, home_rating, change),
+            (match.away_team_id, away_rating, -change),
+        )
+    ]
+    return home_rating, away_rating, rows
+
+
+async def _needs_replay(db: AsyncSession, match: Match) -> bool:
+    """True if `match` is already rated or either team has a rated match after it"""
+    query = select(TeamRating.id).where(
+        or_(
+            TeamRating.match_id == match.id,
+            and_(
+                TeamRating.team_id.in_((match.home_team_id, match.away_team_id)),
+                or_(
+                    TeamRating.date > match.date,
+                    and_(TeamRating.date == match.date, TeamRating.match_id > match.id),
+                ),
+            ),
+        )
+    ).limit(1)
+    return (await db.execute(query)).first() is not None
+
+
+async def rate_match(db: AsyncSession, match: Match) -> None:
+    """
+    Bring ratings up to date after a change to `match` (its result entered
+    or corrected, or its teams or date changed). Call before commit, after
+    the result summary columns are set; publishes the teams whose ratings
+    changed.
+    """
+    # Concurrent results of the same team are applied one after the other
+    result = await db.execute(
+        select(Team.id, Team.rating)
+        .where(Team.id.in_((match.home_team_id, match.away_team_id)))
+        .order_by(Team.id)
+        .with_for_update()
+    )
+    ratings = dict(result.all())
+    if await _needs_replay(db, match):
+        await recompute_ratings(db, match.season_id)
+        return
+    if match.status != MatchStatusEnum.PLAYED:
+        return
+
+    home_rating, away_rating, rows = _history_rows(match, ratings[match.home_team_id], ratings[match.away_team_id])
+    await db.execute(insert(TeamRating), rows)
+    await _store_ratings(db, {match.home_team_id: home_rating, match.away_team_id: away_rating})
+    await publish(db, *team_tags(match.home_team_id), *team_tags(match.away_team_id))
+
+
+async def recompute_ratings(db: AsyncSession, season_id: UUID) -> int:
+    """
+    Replay every played match of a season in date order, rewriting the
+    rating history and the teams' ratings. Memory is one rating per team;
+    matches are streamed and history rows written in batches. Call before
+    commit; publishes the season and its teams. Returns the number of
+    matches applied.
+    """
+    # Serializes replays of a season with rate_match (which locks its two teams)
+    result = await db.execute(select(Team.id).where(Team.season_id == season_id).order_by(Team.id).with_for_update())
+    team_ids = result.scalars().all()
+    await db.execute(delete(TeamRating).where(TeamRating.season_id == season_id))
+
+    ratings: Dict[UUID, float] = {}
+    initial = settings.RATING_INITIAL
+    pending: List[dict] = []
+    applied = 0
+    query = select(
+        Match.id, Match.season_id, Match.date, Match.home_team_id, Match.away_team_id,
+        Match.home_sets_won, Match.away_sets_won, Match.home_games, Match.away_games,
+    ).where(
+        Match.season_id == season_id,
+        Match.status == MatchStatusEnum.PLAYED,
+    ).order_by(Match.date, Match.id).execution_options(yield_per=_WRITE_BATCH)
+
+    async for match in await db.stream(query):
+        home_rating, away_rating, rows = _history_rows(
+            match, ratings.get(match.home_team_id, initial), ratings.get(match.away_team_id, initial)
+        )
+        ratings[match.home_team_id] = home_rating
+        ratings[match.away_team_id] = away_rating
+        pending.extend(rows)
+        applied += 1
+        if len(pending) >= _WRITE_BATCH:
+            await db.execute(insert(TeamRating), pending)
+            pending = []
+    if pending:
+        await db.execute(insert(TeamRating), pending)
+
+    # Teams without a played match go back to the initial rating
+    await db.execute(update(Team).where(Team.season_id == season_id).values(rating=initial))
+    await _store_ratings(db, ratings)
+    # Single-team responses are tagged by team only
+    await publish(db, *season_tags(season_id), *(f"team:{team_id}" for team_id in team_ids))
+    return applied
+
+
+async def _store_ratings(db: AsyncSession, ratings: Dict[UUID, float]) -> None:
+    if not ratings:
+        return
+    # Core executemany: one statement for all teams, no ORM objects loaded
+    await db.execute(
+        update(Team.__table__).where(Team.__table__.c.id == bindparam("team_id")).values(rating=bindparam("rating")),
+        [{"team_id": team_id, "rating": rating} for team_id, rating in ratings.items()],
+    )
+
+
+async def team_rating_history(db: AsyncSession, team_id: UUID) -> List[TeamRating]:
+    """A team's rating after each of its rated matches, oldest first"""
+    result = await db.execute(
+        select(TeamRating).where(TeamRating.team_id == team_id).order_by(TeamRating.date, TeamRating.match_id)
+    )
+    return list(result.scalars().all())
@@ -0,0 +1,539 @@
+"""
+Season archive - finished seasons as columnar Arrow IPC files.
+
+`archive_season` exports a season's teams (with rosters), matches (with sets)
+and final standings to SEASON_ARCHIVE_DIR/<season_id>/ and then deletes those
+rows from the database. Public endpoints serve archived seasons from the files
+through `load_archived_season`, which memory-maps them and keeps the most
+recently used seasons open, so archived data never touches PostgreSQL.
+
+Files are written to a temporary directory and renamed into place only when
+complete; the manifest is written last and marks a season as archived. Next
+to it, ids.json lists the season's team and match ids: lookups by id that
+miss the database (`find_archived_team` / `find_archived_match`) use an index
+built once from these files instead of opening every archive.
+
+pyarrow is imported lazily so the API still starts without it; only archived
+seasons are unavailable then.
+"""
+import json
+import os
+import shutil
+from collections import OrderedDict
+from datetime import date, datetime, time
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from sqlalchemy.orm import selectinload
+
+from app.core.config import settings
+from app.core.invalidation import ALL, subscribe, publish, season_tags
+from app.models.season import Season
+from app.models.team import Team
+from app.models.team_player import TeamPlayer
+from app.models.match import Match, MatchSet, MatchStatusEnum
+from app.models.standings_snapshot import StandingsSnapshot
+from app.models.team_rating import TeamRating
+from app.schemas.match import MatchResponse, MatchSetResponse
+from app.schemas.standings import TeamStandingResponse
+from app.schemas.team import TeamResponse, TeamPlayerResponse
+from app.services.match_service import match_sets_option, ordered_sets
+from app.services.standings import calculate_standings
+from app.exceptions import NotFoundError
+
+ARCHIVE_FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+IDS_FILE = "ids.json"
+TABLE_FILES = ("teams", "matches", "standings")
+
+_STANDING_FIELDS = (
+    "matches_played", "matches_won", "matches_lost", "sets_for", "sets_against",
+    "games_for", "games_against", "points", "set_diff", "game_diff",
+)
+
+
+def _schemas():
+    import pyarrow as pa
+
+    uuid_type = pa.binary(16)
+    return {
+        "teams": pa.schema([
+            ("id", uuid_type),
+            ("name", pa.string()),
+            ("group", pa.string()),
+            ("active", pa.bool_()),
+            ("players", pa.list_(pa.struct([
+                ("id", uuid_type),
+                ("name", pa.string()),
+                ("role", pa.string()),
+            ]))),
+            ("rating", pa.float64()),
+        ]),
+        "matches": pa.schema([
+            ("id", uuid_type),
+            ("date", pa.timestamp("us")),
+            ("group", pa.string()),
+            ("round", pa.string()),
+            ("home_team_id", uuid_type),
+            ("away_team_id", uuid_type),
+            ("home_team_name", pa.string()),
+            ("away_team_name", pa.string()),
+            ("status", pa.string()),
+            ("sets", pa.list_(pa.struct([
+                ("id", uuid_type),
+                ("set_number", pa.int8()),
+                ("home_games", pa.int16()),
+                ("away_games", pa.int16()),
+            ]))),
+        ]),
+        "standings": pa.schema(
+            [("team_id", uuid_type), ("team_name", pa.string()), ("group", pa.string())]
+            + [(name, pa.int32()) for name in _STANDING_FIELDS]
+            + [("position", pa.int32()), ("group_position", pa.int32()), ("rating", pa.float64())]
+        ),
+    }
+
+
+def archive_root() -> Path:
+    return Path(settings.SEASON_ARCHIVE_DIR)
+
+
+def season_archive_path(season_id: UUID) -> Path:
+    return archive_root() / str(season_id)
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+async def _collect_rows(db: AsyncSession, season: Season) -> Dict[str, List[dict]]:
+    """Read everything public endpoints show for a season as plain rows"""
+    teams_result = await db.execute(
+        select(Team).where(Team.season_id == season.id).options(
+            selectinload(Team.team_players).selectinload(TeamPlayer.player)
+        ).order_by(Team.name)
+    )
+    teams = teams_result.scalars().all()
+    team_names = {team.id: team.name for team in teams}
+
+    matches_result = await db.execute(
+        select(Match).where(Match.season_id == season.id).options(
+            match_sets_option()
+        ).order_by(Match.date.desc())
+    )
+    matches = matches_result.scalars().all()
+
+    standings = await calculate_standings(db, season_id=season.id)
+    group_positions = {}
+    for division in season.divisions:
+        for standing in await calculate_standings(db, group=division.code, season_id=season.id):
+            group_positions[standing.team_id] = standing.position
+
+    return {
+        "teams": [
+            {
+                "id": team.id.bytes,
+                "name": team.name,
+                "group": team.group,
+                "active": team.active,
+                "players": [
+                    {"id": tp.player.id.bytes, "name": tp.player.name, "role": tp.role.value.lower()}
+                    for tp in team.team_players
+                ],
+                "rating": team.rating,
+            }
+            for team in teams
+        ],
+        "matches": [
+            {
+                "id": match.id.bytes,
+                "date": match.date,
+                "group": match.group,
+                "round": match.round,
+                "home_team_id": match.home_team_id.bytes,
+                "away_team_id": match.away_team_id.bytes,
+                "home_team_name": team_names.get(match.home_team_id),
+                "away_team_name": team_names.get(match.away_team_id),
+                "status": match.status.value,
+                "sets": [
+                    {
+                        "id": ms.id.bytes,
+                        "set_number": ms.set_number,
+                        "home_games": ms.home_games,
+                        "away_games": ms.away_games,
+                    }
+                    for ms in ordered_sets(match)
+                ],
+            }
+            for match in matches
+        ],
+        "standings": [
+            {
+                "team_id": s.team_id.bytes,
+                "team_name": s.team_name,
+                "group": s.group,
+                **{name: getattr(s, name) for name in _STANDING_FIELDS},
+                "position": s.position,
+                "group_position": group_positions.get(s.team_id, s.position),
+                "rating": s.rating,
+            }
+            for s in standings
+        ],
+    }
+
+
+def _write_archive(season: Season, rows: Dict[str, List[dict]]) -> Path:
+    """Write the season's tables and manifest; returns the final directory"""
+    import pyarrow as pa
+
+    compression = settings.SEASON_ARCHIVE_COMPRESSION.lower()
+    options = pa.ipc.IpcWriteOptions(compression=None if compression == "none" else compression)
+
+    final_path = season_archive_path(season.id)
+    tmp_path = final_path.with_name(f".{season.id}.tmp")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    files = {}
+    for name, schema in _schemas().items():
+        table = pa.Table.from_pylist(rows[name], schema=schema)
+        file_path = tmp_path / f"{name}.arrow"
+        with pa.OSFile(str(file_path), "wb") as sink:
+            with pa.ipc.new_file(sink, schema, options=options) as writer:
+                writer.write_table(table)
+        files[name] = {"rows": table.num_rows, "bytes": file_path.stat().st_size}
+
+    ids = {kind: [UUID(bytes=row["id"]).hex for row in rows[kind]] for kind in ("teams", "matches")}
+    (tmp_path / IDS_FILE).write_text(json.dumps(ids), encoding="utf-8")
+
+    manifest = {
+        "format_version": ARCHIVE_FORMAT_VERSION,
+        "season_id": str(season.id),
+        "season_name": season.name,
+        "start_date": season.start_date.isoformat() if season.start_date else None,
+        "end_date": season.end_date.isoformat() if season.end_date else None,
+        "divisions": [d.code for d in season.divisions],
+        "compression": compression,
+        "created_at": datetime.utcnow().isoformat(),
+        "files": files,
+    }
+    manifest_path = tmp_path / MANIFEST_FILE
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    for file_path in tmp_path.iterdir():
+        with open(file_path, "rb") as f:
+            os.fsync(f.fileno())
+
+    if final_path.exists():
+        # Left over from an earlier run whose database delete did not complete
+        shutil.rmtree(final_path)
+    os.replace(tmp_path, final_path)
+    return final_path
+
+
+async def archive_season(db: AsyncSession, season_id: UUID, dry_run: bool = False) -> dict:
+    """
+    Export a finished season to the archive and delete its teams, rosters,
+    matches and sets from the database. Commits on success.
+
+    Args:
+        db: Database session
+        season_id: Season to archive
+        dry_run: Only report what would be archived
+
+    Returns:
+        The archive manifest (row counts and file sizes)
+
+    Raises:
+        NotFoundError: If the season does not exist
+        ValueError: If the season is current, already archived or still has open matches
+    """
+    result = await db.execute(
+        select(Season).where(Season.id == season_id).options(selectinload(Season.divisions))
+    )
+    season = result.scalar_one_or_none()
+    if not season:
+        raise NotFoundError(f"Season {season_id} not found")
+    if season.is_current:
+        raise ValueError(f"Season '{season.name}' is the current season and cannot be archived")
+    if season.archived_at is not None:
+        raise ValueError(f"Season '{season.name}' is already archived")
+
+    open_result = await db.execute(
+        select(func.count(Match.id)).where(
+            Match.season_id == season_id,
+            Match.status.in_([MatchStatusEnum.SCHEDULED, MatchStatusEnum.IN_PROGRESS]),
+        )
+    )
+    open_matches = open_result.scalar_one()
+    if open_matches:
+        raise ValueError(f"Season '{season.name}' still has {open_matches} scheduled or in-progress matches")
+
+    rows = await _collect_rows(db, season)
+    if dry_run:
+        return {
+            "season_id": str(season.id),
+            "season_name": season.name,
+            "files": {name: {"rows": len(table_rows)} for name, table_rows in rows.items()},
+        }
+
+    path = _write_archive(season, rows)
+    manifest = ArchivedSeason(path).manifest  # Read back before deleting anything
+
+    team_ids = select(Team.id).where(Team.season_id == season_id)
+    match_ids = select(Match.id).where(Match.season_id == season_id)
+    await db.execute(delete(TeamRating).where(TeamRating.season_id == season_id))
+    await db.execute(delete(MatchSet).where(MatchSet.match_id.in_(match_ids)))
+    await db.execute(delete(Match).where(Match.season_id == season_id))
+    await db.execute(delete(TeamPlayer).where(TeamPlayer.team_id.in_(team_ids)))
+    await db.execute(delete(Team).where(Team.season_id == season_id))
+    # History of archived seasons is computed from the archive
+    await db.execute(delete(StandingsSnapshot).where(StandingsSnapshot.season_id == season_id))
+    season.archived_at = datetime.utcnow()
+
+    await publish(db, *season_tags(season.id))
+    await db.commit()
+    return manifest
+
+
+# ---------------------------------------------------------------------------
+# Query-through
+# ---------------------------------------------------------------------------
+
+def _uuid_scalar(value: UUID):
+    import pyarrow as pa
+    return pa.scalar(value.bytes, type=pa.binary(16))
+
+
+def _midnight(value: date) -> datetime:
+    # Same comparison the database does for `timestamp >= date`
+    return datetime.combine(value, time.min)
+
+
+class ArchivedSeason:
+    """Read-only, memory-mapped view of one archived season"""
+
+    def __init__(self, path: Path) -> None:
+        import pyarrow as pa
+
+        self.path = path
+        self.manifest = json.loads((path / MANIFEST_FILE).read_text(encoding="utf-8"))
+        if self.manifest.get("format_version") != ARCHIVE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported season archive format in {path}")
+        self.season_id = UUID(self.manifest["season_id"])
+
+        # Uncompressed files stay zero-copy views of the mapping; compressed
+        # buffers are decoded once here and then served from memory
+        self._sources = []
+        tables = {}
+        for name in TABLE_FILES:
+            source = pa.memory_map(str(path / f"{name}.arrow"), "r")
+            self._sources.append(source)
+            tables[name] = pa.ipc.open_file(source).read_all()
+            expected = self.manifest["files"][name]["rows"]
+            if tables[name].num_rows != expected:
+                raise ValueError(f"Season archive {path} is incomplete: {name} has {tables[name].num_rows} of {expected} rows")
+        self.teams = tables["teams"]
+        self.matches = tables["matches"]
+        self.standings_table = tables["standings"]
+
+    def close(self) -> None:
+        for source in self._sources:
+            source.close()
+
+    # Row filters -----------------------------------------------------------
+
+    def _filter(self, table, **equals):
+        import pyarrow.compute as pc
+
+        mask = None
+        for column, value in equals.items():
+            if value is None:
+                continue
+            condition = pc.equal(table[column], value)
+            mask = condition if mask is None else pc.and_(mask, condition)
+        return table if mask is None else table.filter(mask)
+
+    # Responses ---------------------------------------------------------------
+
+    def _team_responses(self, table) -> List[TeamResponse]:
+        return [
+            TeamResponse(
+                id=UUID(bytes=row["id"]),
+                name=row["name"],
+                group=row["group"],
+                season_id=self.season_id,
+                active=row["active"],
+                players=[
+                    TeamPlayerResponse(id=UUID(bytes=p["id"]), name=p["name"], role=p["role"])
+                    for p in row["players"]
+                ],
+                rating=row.get("rating"),  # Archives written before ratings have none
+            )
+            for row in table.to_pylist()
+        ]
+
+    def _match_responses(self, table) -> List[MatchResponse]:
+        return [
+            MatchResponse(
+                id=UUID(bytes=row["id"]),
+                date=row["date"],
+                group=row["group"],
+                season_id=self.season_id,
+                round=row["round"],
+                home_team_id=UUID(bytes=row["home_team_id"]),
+                away_team_id=UUID(bytes=row["away_team_id"]),
+                status=row["status"],
+                match_sets=[
+                    MatchSetResponse(
+                        id=UUID(bytes=ms["id"]),
+                        set_number=ms["set_number"],
+                        home_games=ms["home_games"],
+                        away_games=ms["away_games"],
+                    )
+                    for ms in row["sets"]
+                ],
+                home_team_name=row["home_team_name"],
+                away_team_name=row["away_team_name"],
+            )
+            for row in table.to_pylist()
+        ]
+
+    def list_teams(self, group: Optional[str] = None, active: Optional[bool] = None) -> List[TeamResponse]:
+        return self._team_responses(self._filter(self.teams, group=group, active=active))
+
+    def get_team(self, team_id: UUID) -> Optional[TeamResponse]:
+        teams = self._team_responses(self._filter(self.teams, id=_uuid_scalar(team_id)))
+        return teams[0] if teams else None
+
+    def list_matches(
+        self,
+        group: Optional[str] = None,
+        status: Optional[str] = None,
+        date_from: Optional[date] = None,
+        date_to: Optional[date] = None,
+        team_id: Optional[UUID] = None,
+    ) -> List[MatchResponse]:
+        import pyarrow.compute as pc
+
+        table = self._filter(self.matches, group=group, status=status)
+        if team_id is not None:
+            team = _uuid_scalar(team_id)
+            table = table.filter(pc.or_(pc.equal(table["home_team_id"], team), pc.equal(table["away_team_id"], team)))
+        if date_from:
+            table = table.filter(pc.greater_equal(table["date"], _midnight(date_from)))
+        if date_to:
+            table = table.filter(pc.less_equal(table["date"], _midnight(date_to)))
+        return self._match_responses(table)
+
+    def get_match(self, match_id: UUID) -> Optional[MatchResponse]:
+        matches = self._match_responses(self._filter(self.matches, id=_uuid_scalar(match_id)))
+        return matches[0] if matches else None
+
+    def standings(self, group: Optional[str] = None) -> List[TeamStandingResponse]:
+        rows = self._filter(self.standings_table, group=group).to_pylist()
+        return [
+            TeamStandingResponse(
+                team_id=UUID(bytes=row["team_id"]),
+                team_name=row["team_name"],
+                group=row["group"],
+                **{name: row[name] for name in _STANDING_FIELDS},
+                # Positions are per group when the table is filtered by group
+                position=row["group_position"] if group else row["position"],
+                rating=row.get("rating"),
+            )
+            for row in rows
+        ]
+
+
+_NOT_LOADED = object()
+
+# Per-process caches; archives never change once written, but the set of
+# archived seasons does whenever a season is archived
+_archived_ids = _NOT_LOADED
+_id_index = _NOT_LOADED  # "teams"/"matches" -> id -> archived season id
+_open_seasons: "OrderedDict[UUID, ArchivedSeason]" = OrderedDict()
+
+
+@subscribe
+def _invalidate_archive_cache(tags: set) -> None:
+    global _archived_ids, _id_index
+    if ALL in tags or "seasons" in tags:
+        _archived_ids = _NOT_LOADED
+        _id_index = _NOT_LOADED
+
+
+def archived_season_ids() -> Set[UUID]:
+    """IDs of all archived seasons, from the archive directory (no database access)"""
+    global _archived_ids
+    if _archived_ids is _NOT_LOADED:
+        root = archive_root()
+        ids = set()
+        if root.is_dir():
+            for entry in root.iterdir():
+                if not entry.name.startswith(".") and (entry / MANIFEST_FILE).is_file():
+                    try:
+                        ids.add(UUID(entry.name))
+                    except ValueError:
+                        continue
+        _archived_ids = ids
+    return _archived_ids
+
+
+def is_archived(season_id: UUID) -> bool:
+    return season_id in archived_season_ids()
+
+
+def load_archived_season(season_id: UUID) -> ArchivedSeason:
+    """Open an archived season, keeping the SEASON_ARCHIVE_CACHE_SIZE most recent ones mapped"""
+    season = _open_seasons.get(season_id)
+    if season is not None:
+        _open_seasons.move_to_end(season_id)
+        return season
+
+    season = ArchivedSeason(season_archive_path(season_id))
+    _open_seasons[season_id] = season
+    while len(_open_seasons) > max(settings.SEASON_ARCHIVE_CACHE_SIZE, 1):
+        _, evicted = _open_seasons.popitem(last=False)
+        evicted.close()
+    return season
+
+
+def _season_ids(season_id: UUID) -> Dict[str, List[UUID]]:
+    path = season_archive_path(season_id) / IDS_FILE
+    if path.is_file():
+        ids = json.loads(path.read_text(encoding="utf-8"))
+        return {kind: [UUID(hex=value) for value in ids[kind]] for kind in ("teams", "matches")}
+    # Archived before ids.json existed: read the id columns instead
+    season = load_archived_season(season_id)
+    return {
+        "teams": [UUID(bytes=value) for value in season.teams["id"].to_pylist()],
+        "matches": [UUID(bytes=value) for value in season.matches["id"].to_pylist()],
+    }
+
+
+def _archived_id_index() -> Dict[str, Dict[UUID, UUID]]:
+    """Team and match ids of all archived seasons, loaded once per set of archives"""
+    global _id_index
+    if _id_index is _NOT_LOADED:
+        index: Dict[str, Dict[UUID, UUID]] = {"teams": {}, "matches": {}}
+        for season_id in archived_season_ids():
+            for kind, ids in _season_ids(season_id).items():
+                index[kind].update(dict.fromkeys(ids, season_id))
+        _id_index = index
+    return _id_index
+
+
+def find_archived_team(team_id: UUID) -> Optional[ArchivedSeason]:
+    """Archived season containing a team, for lookups by id"""
+    season_id = _archived_id_index()["teams"].get(team_id)
+    return load_archived_season(season_id) if season_id is not None else None
+
+
+def find_archived_match(match_id: UUID) -> Optional[ArchivedSeason]:
+    """Archived season containing a match, for lookups by id"""
+    season_id = _archived_id_index()["matches"].get(match_id)
+    return load_archived_season(season_id) if season_id is not None else None
@@ -0,0 +1,186 @@
+"""
+Season service - current season lookup and division (group) resolution
+"""
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update, func
+from sqlalchemy.orm import selectinload
+
+from app.models.season import Season, Division
+from app.schemas.season import SeasonCreate, DivisionCreate
+from app.exceptions import NotFoundError
+from app.core.invalidation import ALL, subscribe, caches_are_coherent
+
+_NOT_LOADED = object()
+
+# Per-process cache of the current season id - read by every public request,
+# changed only by admins through set_current_season / create_season.
+_current_season_id = _NOT_LOADED
+_cache_generation = 0
+
+
+@subscribe
+def _invalidate_current_season(tags: set) -> None:
+    global _current_season_id, _cache_generation
+    if ALL in tags or "seasons" in tags:
+        _cache_generation += 1
+        _current_season_id = _NOT_LOADED
+
+
+async def get_current_season_id(db: AsyncSession) -> Optional[UUID]:
+    """
+    ID of the current season, or None if no season is marked current.
+    """
+    global _current_season_id
+    if _current_season_id is not _NOT_LOADED and caches_are_coherent():
+        return _current_season_id
+
+    generation = _cache_generation
+    result = await db.execute(select(Season.id).where(Season.is_current == True))
+    season_id = result.scalar_one_or_none()
+    if generation == _cache_generation and caches_are_coherent():
+        _current_season_id = season_id
+    return season_id
+
+
+async def resolve_season_id(db: AsyncSession, season_id: Optional[UUID] = None) -> Optional[UUID]:
+    """
+    Season to scope a query to: the requested one, or the current season by default.
+    """
+    if season_id is not None:
+        return season_id
+    return await get_current_season_id(db)
+
+
+async def get_division(db: AsyncSession, season_id: UUID, code: str) -> Division:
+    """
+    Look up a division of a season by its code.
+
+    Raises:
+        ValueError: If the season has no division with that code
+    """
+    result = await db.execute(
+        select(Division).where(Division.season_id == season_id, Division.code == code)
+    )
+    division = result.scalar_one_or_none()
+    if not division:
+        raise ValueError(f"Group '{code}' does not exist in this season")
+    return division
+
+
+def division_id_subquery(season_id: UUID, code: str):
+    """
+    Scalar subquery for the id of a season's division, so group filters stay
+    a single query on the season-scoped composite indexes.
+    """
+    return (
+        select(Division.id)
+        .where(Division.season_id == season_id, Division.code == code)
+        .scalar_subquery()
+    )
+
+
+async def get_season(db: AsyncSession, season_id: UUID) -> Season:
+    """
+    Get a season with its divisions.
+
+    Raises:
+        NotFoundError: If the season does not exist
+    """
+    # populate_existing: sessions don't expire on commit, so refresh divisions added since
+    result = await db.execute(
+        select(Season)
+        .where(Season.id == season_id)
+        .options(selectinload(Season.divisions))
+        .execution_options(populate_existing=True)
+    )
+    season = result.scalar_one_or_none()
+    if not season:
+        raise NotFoundError(f"Season {season_id} not found")
+    return season
+
+
+async def create_season(db: AsyncSession, data: SeasonCreate) -> Season:
+    """
+    Create a season with its divisions, optionally making it the current season.
+
+    Raises:
+        ValueError: If a season with the same name exists
+    """
+    existing = await db.execute(select(Season.id).where(Season.name == data.name))
+    if existing.scalar_one_or_none():
+        raise ValueError(f"Season with name '{data.name}' already exists")
+
+    if data.is_current:
+        await db.execute(update(Season).where(Season.is_current == True).values(is_current=False))
+
+    season = Season(
+        name=data.name,
+        start_date=data.start_date,
+        end_date=data.end_date,
+        is_current=data.is_current,
+        rules=data.rules.model_dump() if data.rules is not None else None,
+    )
+    season.divisions = [
+        Division(code=d.code, name=d.name, sort_order=i if d.sort_order is None else d.sort_order)
+        for i, d in enumerate(data.divisions)
+    ]
+    db.add(season)
+    await db.flush()
+
+    return season
+
+
+async def set_current_season(db: AsyncSession, season_id: UUID) -> Season:
+    """
+    Make a season the current one (the default of every public endpoint).
+
+    Raises:
+        NotFoundError: If the season does not exist
+        ValueError: If the season is archived
+    """
+    season = await get_season(db, season_id)
+    if season.archived_at is not None:
+        raise ValueError(f"Season '{season.name}' is archived and cannot be made current")
+    await db.execute(
+        update(Season).where(Season.is_current == True, Season.id != season_id).values(is_current=False)
+    )
+    # Clear the old flag before setting the new one - only one current season is allowed
+    await db.flush()
+    season.is_current = True
+    await db.flush()
+
+    return season
+
+
+async def add_division(db: AsyncSession, season_id: UUID, data: DivisionCreate) -> Division:
+    """
+    Add a division (group) to a season.
+
+    Raises:
+        NotFoundError: If the season does not exist
+        ValueError: If the season is archived or already has a division with that code
+    """
+    season = await get_season(db, season_id)
+    if season.archived_at is not None:
+        raise ValueError(f"Season '{season.name}' is archived")
+    existing = await db.execute(
+        select(Division.id).where(Division.season_id == season_id, Division.code == data.code)
+    )
+    if existing.scalar_one_or_none():
+        raise ValueError(f"Group '{data.code}' already exists in this season")
+
+    sort_order = data.sort_order
+    if sort_order is None:
+        result = await db.execute(
+            select(func.coalesce(func.max(Division.sort_order) + 1, 0)).where(Division.season_id == season_id)
+        )
+        sort_order = result.scalar_one()
+
+    division = Division(season_id=season_id, code=data.code, name=data.name, sort_order=sort_order)
+    db.add(division)
+    await db.flush()
+
+    return division
@@ -0,0 +1,474 @@
+"""
+Season outcome simulator - final position probabilities by Monte Carlo.
+
+Starts from the current standings and plays the remaining matches of a
+season (scheduled and in progress) SIMULATION_RUNS times. Every set is won
+by the home team with probability s_home / (s_home + s_away) for team
+strengths s (SIMULATION_STRENGTH_MODEL: set ratio so far or team rating),
+so a match ends 2-0, 2-1, 1-2 or 0-2; the winner's game margin per set
+follows a fixed distribution. Points and the ranking of the final tables come from the
+season's rules (app/services/standings_rules.py), as for the published table:
+field criteria are ranked with one sort key, and head-to-head criteria split
+the teams still tied at that point by their played and simulated matches
+against each other (`_rank_order_head_to_head`). With nothing left to play
+the current table is the final one.
+
+All simulations of a batch are computed at once as NumPy arrays
+(`simulate_chunk`): outcomes are sampled per (run, match, set), added to the
+teams through one-hot matrix products and ranked with one sort (one per
+criterion for head-to-head rules). Runs are split across a process pool of
+SIMULATION_WORKERS processes.
+
+Results are cached per (season, group, data version), so the simulation only
+runs again after an admin write. The seed is fixed (SIMULATION_SEED): every
+worker returns the same probabilities for the same league version.
+
+numpy is imported lazily so the API still starts without it; only the
+simulation is unavailable then.
+"""
+import asyncio
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.database import session_factory
+from app.core.invalidation import get_data_version
+from app.core.singleflight import SingleFlight
+from app.models.match import Match, MatchStatusEnum
+from app.schemas.standings import SeasonSimulationResponse, TeamSimulationResponse, TeamStandingResponse
+from app.services.season_archive import is_archived, load_archived_season
+from app.services.season_service import resolve_season_id, division_id_subquery
+from app.services.standings import get_standings
+from app.services.standings_rules import DEFAULT_RULES, HEAD_TO_HEAD, CompiledRules, MatchResult, get_season_rules
+
+STRENGTH_MODELS = ("sets", "rating", "equal")
+
+# Standings fields a simulation adds up per team (columns of simulate_chunk stats)
+STAT_FIELDS = ("points", "matches_won", "set_diff", "game_diff", "sets_for", "games_for")
+
+# Loser's games in a set (6-0 ... 6-4, 7-5, 7-6) as weights out of 256, so one
+# random byte picks a set's score; stored as the winner's game margin
+_LOSER_GAMES_WEIGHTS = (10, 23, 44, 61, 56, 34, 28)
+_LOSER_GAMES_MARGIN = (6, 5, 4, 3, 2, 2, 1)
+# Sets per batch (runs x matches x 3), bounds a worker's memory
+_BATCH_SETS = 2_000_000
+
+# (season, group, runs, data version) -> result; only the latest version is kept
+_results: Dict[tuple, SeasonSimulationResponse] = {}
+_simulation_flight = SingleFlight("simulation")
+_pool: Optional[ProcessPoolExecutor] = None
+
+
+def team_strengths(standings: Sequence[TeamStandingResponse], model: str, prior: float) -> List[float]:
+    """
+    Strength of every team for the set win probability.
+
+    - sets: (sets won + prior) / (sets lost + prior)
+    - rating: 10 ** (rating / 400), so a set goes to the home team with the
+      Elo expected score of the two ratings (app/services/ratings.py)
+    - equal: 1 for every team
+    """
+    if model == "equal":
+        return [1.0] * len(standings)
+    if model == "rating":
+        # Relative to the initial rating; unrated (archived) teams count as initial
+        return [
+            10.0 ** (((s.rating if s.rating is not None else settings.RATING_INITIAL) - settings.RATING_INITIAL) / 400.0)
+            for s in standings
+        ]
+    if model != "sets":
+        raise ValueError(f"Unknown SIMULATION_STRENGTH_MODEL '{model}' (expected one of {', '.join(STRENGTH_MODELS)})")
+    return [(s.sets_for + prior) / (s.sets_against + prior) for s in standings]
+
+
+def _rank_order(np, keys, name_rank):
+    """
+    Per run (row), team indexes in standings order: `keys` descending (the
+    first is the primary one), then name. The keys are packed into one
+    integer when their ranges fit 63 bits (one argsort instead of a lexsort).
+    """
+    n = keys[0].shape[1]
+    key = np.zeros(keys[0].shape, dtype=np.int64)
+    capacity = 1
+    for values in keys:
+        low, high = int(values.min()), int(values.max())
+        capacity *= high - low + 1
+        if capacity * n >= 2**63:
+            # lexsort: the last key is the primary one
+            return np.lexsort((np.broadcast_to(name_rank, keys[0].shape), *(-k for k in reversed(keys))), axis=-1)
+        key = key * (high - low + 1) + (high - values)
+    return np.argsort(key * n + name_rank, axis=-1)
+
+
+def _split_ties(np, tied, values):
+    """
+    Refine per-run tie groups by `values` (descending): dense group numbers
+    ordered as the table, equal only for teams equal on both
+    """
+    low, high = int(values.min()), int(values.max())
+    combined = tied * (high - low + 1) + (high - values)
+    order = np.argsort(combined, axis=-1)
+    ranked = np.take_along_axis(combined, order, axis=-1)
+    dense = np.concatenate(
+        [np.zeros((ranked.shape[0], 1), dtype=np.int64), np.cumsum(np.diff(ranked, axis=-1) != 0, axis=-1)], axis=-1
+    )
+    split = np.empty_like(dense)
+    np.put_along_axis(split, order, dense, axis=-1)
+    return split
+
+
+def _rank_order_head_to_head(np, criteria, values, head_to_head, name_rank):
+    """
+    `_rank_order` for rules with head-to-head criteria, as CompiledRules.sort
+    ranks them: ties are split criterion by criterion, and a head-to-head
+    criterion sums every team's results against the teams still tied with it.
+    `head_to_head(criterion, tied)` gives those sums for per-run tie groups.
+    """
+    tied = np.zeros(values["points"].shape, dtype=np.int64)
+    for criterion in criteria:
+        column = head_to_head(criterion, tied) if criterion in HEAD_TO_HEAD else values[criterion]
+        tied = _split_ties(np, tied, column)
+    return np.argsort(tied * len(name_rank) + name_rank, axis=-1)
+
+
+def match_points_table(rules: CompiledRules = DEFAULT_RULES) -> List[int]:
+    """Flat [home sets * 3 + away sets] -> points of the home team"""
+    return [rules.match_points(h, a) for h in range(3) for a in range(3)]
+
+
+def played_head_to_head(
+    index: Dict[UUID, int], played: Sequence[MatchResult], rules: CompiledRules,
+) -> List[List[List[int]]]:
+    """(criterion, teams, teams) head-to-head results of team i against team j in `played`"""
+    n = len(index)
+    table = [[[0] * n for _ in range(n)] for _ in HEAD_TO_HEAD]
+    for home, away, home_sets, away_sets, home_games, away_games in played:
+        h, a = index.get(home), index.get(away)
+        if h is None or a is None:
+            continue
+        table[0][h][a] += rules.match_points(home_sets, away_sets)
+        table[0][a][h] += rules.match_points(away_sets, home_sets)
+        table[1][h][a] += home_sets - away_sets
+        table[1][a][h] += away_sets - home_sets
+        table[2][h][a] += home_games - away_games
+        table[2][a][h] += away_games - home_games
+    return table
+
+
+def simulate_chunk(
+    stats, name_rank, home, away, p_home_set, runs: int, seed, points_table: Optional[Sequence[int]] = None,
+    criteria: Sequence[str] = DEFAULT_RULES.criteria, played_h2h=None,
+) -> Tuple["np.ndarray", "np.ndarray"]:
+    """
+    Play the remaining matches of one group `runs` times.
+
+    Args:
+        stats: (teams, len(STAT_FIELDS)) current values of STAT_FIELDS
+        name_rank: (teams,) rank of the team names, the last tiebreak
+        home, away: (matches,) team indexes of the remaining matches
+        p_home_set: (matches,) probability that the home team wins a set
+        runs: Simulations to run
+        seed: numpy SeedSequence (or entropy) for this chunk
+        points_table: `match_points_table` of the season, defaults to the
+            default rules
+        criteria: The season's ranking criteria (CompiledRules.criteria)
+        played_h2h: `played_head_to_head` of the played matches, needed by
+            head-to-head criteria
+
+    Returns:
+        (teams, teams) count of every final position per team, and
+        (teams,) sum of the final points over all runs
+    """
+    import numpy as np
+
+    rng = np.random.default_rng(seed)
+    n, m = len(stats), len(home)
+    counts = np.zeros(n * n, dtype=np.int64)
+    points_sum = np.zeros(n, dtype=np.int64)
+    stats = np.asarray(stats, dtype=np.int64)
+    name_rank = np.asarray(name_rank, dtype=np.int64)
+    head_to_head = any(c in HEAD_TO_HEAD for c in criteria)
+    if head_to_head:
+        played_h2h = np.asarray(played_h2h if played_h2h is not None else np.zeros((len(HEAD_TO_HEAD), n, n)),
+                                dtype=np.int64)
+
+    points_table = np.array(points_table if points_table is not None else match_points_table(), dtype=np.float64)
+    # Loser's games and game margin of a set, indexed by random byte; the home
+    # margin is signed, indexed by random byte + 256 if the home team won the set
+    loser_games = np.repeat(np.arange(len(_LOSER_GAMES_MARGIN), dtype=np.int16), _LOSER_GAMES_WEIGHTS)
+    margins = np.repeat(np.array(_LOSER_GAMES_MARGIN, dtype=np.int16), _LOSER_GAMES_WEIGHTS)
+    signed_margins = np.concatenate([-margins, margins])
+    # A set goes to the home team when a random uint16 is below its threshold
+    threshold = np.minimum(np.round(np.asarray(p_home_set) * 65536), 65535).astype(np.uint16)
+    # Team totals = current + match values @ one-hot team matrices
+    home_onehot = np.zeros((m, n))
+    home_onehot[np.arange(m), home] = 1.0
+    away_onehot = np.zeros((m, n))
+    away_onehot[np.arange(m), away] = 1.0
+    diff_onehot = home_onehot - away_onehot  # Differences count + for home, - for away
+    away_matches = away_onehot.sum(axis=0)
+    team_offsets = np.arange(n) * n
+    # Head-to-head criteria compare every pair of teams per run
+    batch = max(1, _BATCH_SETS // max(1, m * 3, n * n if head_to_head else 0))
+    done = 0
+    while done < runs:
+        b = min(batch, runs - done)
+        done += b
+
+        # Set-major (3, runs, matches): every set is one contiguous slice
+        home_won = np.frombuffer(rng.bytes(3 * b * m * 2), dtype=np.uint16).reshape(3, b, m) < threshold
+        score_bytes = np.frombuffer(rng.bytes(3 * b * m), dtype=np.uint8).reshape(3, b, m)
+        won_bytes = home_won.view(np.uint8)
+        first_two = won_bytes[0] + won_bytes[1]
+        decider = first_two == 1  # 1-1 after two sets
+        home_sets = first_two + (decider & home_won[2])
+        away_sets = 3 - home_sets - (~decider)  # 2-0 / 0-2 without a third set
+        set_margins = [
+            signed_margins[score_bytes[k].astype(np.uint16) | (won_bytes[k].astype(np.uint16) << 8)]
+            for k in range(3)
+        ]
+        home_game_diff = set_margins[0] + set_margins[1] + set_margins[2] * decider
+
+        home_points = points_table[home_sets * 3 + away_sets]
+        away_points = points_table[away_sets * 3 + home_sets]
+        points = stats[:, 0] + (home_points @ home_onehot + away_points @ away_onehot).astype(np.int64)
+        values = {"points": points}
+        if "matches_won" in criteria:
+            # Every match is won by one side: home wins count +1/-1 on the diff matrix, plus one per away match
+            values["matches_won"] = stats[:, 1] + ((home_sets == 2) @ diff_onehot + away_matches).astype(np.int64)
+        home_set_diff = home_sets.astype(np.float64) - away_sets
+        if "set_diff" in criteria:
+            values["set_diff"] = stats[:, 2] + (home_set_diff @ diff_onehot).astype(np.int64)
+        if "game_diff" in criteria:
+            values["game_diff"] = stats[:, 3] + (home_game_diff.astype(np.float64) @ diff_onehot).astype(np.int64)
+        if "sets_for" in criteria:
+            values["sets_for"] = stats[:, 4] + (
+                home_sets.astype(np.float64) @ home_onehot + away_sets.astype(np.float64) @ away_onehot
+            ).astype(np.int64)
+        if "games_for" in criteria:
+            # Home games of a set: the loser's games, plus the margin if the home team won it
+            set_games = [loser_games[score_bytes[k]] + home_won[k] * margins[score_bytes[k]] for k in range(3)]
+            home_games = set_games[0] + set_games[1] + set_games[2] * decider
+            away_games = home_games - home_game_diff
+            values["games_for"] = stats[:, 5] + (
+                home_games.astype(np.float64) @ home_onehot + away_games.astype(np.float64) @ away_onehot
+            ).astype(np.int64)
+
+        if head_to_head:
+            # Home team's value of every match per head-to-head criterion; the away team's is
+            # the opposite difference, or its own points
+            match_values = (home_points, home_set_diff, home_game_diff.astype(np.float64))
+
+            def mini_league(criterion, tied):
+                column = HEAD_TO_HEAD.index(criterion)
+                among = tied[:, home] == tied[:, away]  # Matches between teams still tied
+                home_values = match_values[column] * among
+                away_values = away_points * among if column == 0 else -home_values
+                simulated = (home_values @ home_onehot + away_values @ away_onehot).astype(np.int64)
+                same = tied[:, :, None] == tied[:, None, :]
+                return simulated + (played_h2h[column] * same).sum(axis=-1)
+
+            order = _rank_order_head_to_head(np, criteria, values, mini_league, name_rank)
+        else:
+            order = _rank_order(np, [values[c] for c in criteria], name_rank)
+        positions = np.empty((b, n), dtype=np.int64)
+        np.put_along_axis(positions, order, np.broadcast_to(np.arange(n), (b, n)), axis=-1)
+        counts += np.bincount((positions + team_offsets).ravel(), minlength=n * n)
+        points_sum += points.sum(axis=0)
+    return counts.reshape(n, n), points_sum
+
+
+def _get_pool() -> Optional[ProcessPoolExecutor]:
+    global _pool
+    if settings.SIMULATION_WORKERS <= 0:
+        return None
+    if _pool is None:
+        # spawn: the workers don't inherit the event loop, connections or listener threads
+        _pool = ProcessPoolExecutor(settings.SIMULATION_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    return _pool
+
+
+def _warm_up() -> None:
+    import numpy  # noqa: F401
+
+
+def start_simulation_pool() -> bool:
+    """
+    Start the simulation processes of this worker, so the first request
+    doesn't wait for them to start and import numpy. Returns True if started.
+    """
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    pool = _get_pool()
+    if pool is None:
+        return False
+    for _ in range(settings.SIMULATION_WORKERS):
+        pool.submit(_warm_up)
+    return True
+
+
+def stop_simulation_pool() -> None:
+    """Stop the simulation processes of this worker"""
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=False, cancel_futures=True)
+        _pool = None
+
+
+async def _simulate_group(
+    standings: List[TeamStandingResponse],
+    fixtures: List[Tuple[UUID, UUID]],
+    runs: int,
+    seed,
+    rules: CompiledRules = DEFAULT_RULES,
+    played: Sequence[MatchResult] = (),
+) -> List[TeamSimulationResponse]:
+    """
+    Position probabilities of one group's teams (`standings` ranked within the
+    group); `played` (the group's played matches) is only read by head-to-head
+    criteria
+    """
+    import numpy as np
+
+    index = {s.team_id: i for i, s in enumerate(standings)}
+    fixtures = [(index[h], index[a]) for h, a in fixtures if h in index and a in index]
+    if not fixtures:
+        # Nothing left to play: the current table is final
+        runs = 1
+        counts = np.eye(len(standings), dtype=np.int64)
+        points_sum = np.array([s.points for s in standings], dtype=np.int64)
+    else:
+        stats = np.array([[getattr(s, field) for field in STAT_FIELDS] for s in standings], dtype=np.int64)
+        names = sorted(range(len(standings)), key=lambda i: standings[i].team_name.lower())
+        name_rank = np.empty(len(standings), dtype=np.int64)
+        name_rank[names] = np.arange(len(standings))
+        home = np.array([h for h, _ in fixtures], dtype=np.int64)
+        away = np.array([a for _, a in fixtures], dtype=np.int64)
+        strengths = np.array(team_strengths(standings, settings.SIMULATION_STRENGTH_MODEL, settings.SIMULATION_STRENGTH_PRIOR))
+        p_home_set = strengths[home] / (strengths[home] + strengths[away])
+        points_table = match_points_table(rules)
+        played_h2h = played_head_to_head(index, played, rules) if rules.head_to_head else None
+
+        pool = _get_pool()
+        chunks = max(1, min(settings.SIMULATION_WORKERS, runs)) if pool is not None else 1
+        seeds = np.random.SeedSequence(seed).spawn(chunks)
+        sizes = [runs // chunks + (1 if i < runs % chunks else 0) for i in range(chunks)]
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*(
+            loop.run_in_executor(
+                pool, simulate_chunk, stats, name_rank, home, away, p_home_set, size, chunk_seed,
+                points_table, rules.criteria, played_h2h,
+            )
+            for size, chunk_seed in zip(sizes, seeds)
+        ))
+        counts = sum(c for c, _ in results)
+        points_sum = sum(p for _, p in results)
+
+    return [
+        TeamSimulationResponse(
+            team_id=s.team_id,
+            team_name=s.team_name,
+            group=s.group,
+            position=s.position,
+            expected_points=round(float(points_sum[i]) / runs, 3),
+            position_probabilities=[round(float(c) / runs, 5) for c in counts[i]],
+        )
+        for i, s in enumerate(standings)
+    ]
+
+
+async def remaining_fixtures(db: AsyncSession, season_id: UUID, group: Optional[str] = None) -> List[Tuple[UUID, UUID]]:
+    """(home team, away team) of the season's matches still to finish: scheduled and in progress"""
+    query = select(Match.home_team_id, Match.away_team_id).where(
+        Match.season_id == season_id,
+        Match.status.not_in([MatchStatusEnum.PLAYED, MatchStatusEnum.CANCELLED]),
+    )
+    if group:
+        query = query.where(Match.division_id == division_id_subquery(season_id, group))
+    return [tuple(row) for row in (await db.execute(query)).all()]
+
+
+async def played_results(db: AsyncSession, season_id: UUID, group: Optional[str] = None) -> List[MatchResult]:
+    """The season's played matches as MatchResult tuples (for head-to-head criteria)"""
+    query = select(
+        Match.home_team_id, Match.away_team_id,
+        Match.home_sets_won, Match.away_sets_won, Match.home_games, Match.away_games,
+    ).where(Match.season_id == season_id, Match.status == MatchStatusEnum.PLAYED)
+    if group:
+        query = query.where(Match.division_id == division_id_subquery(season_id, group))
+    return [tuple(row) for row in (await db.execute(query)).all()]
+
+
+async def simulate_season(
+    db: AsyncSession,
+    group: Optional[str] = None,
+    season_id: Optional[UUID] = None,
+    runs: Optional[int] = None,
+) -> SeasonSimulationResponse:
+    """
+    Final position probabilities of every team, within its group.
+
+    Args:
+        db: Database session
+        group: Optional group (division code) filter
+        season_id: Season to simulate, defaults to the current season
+        runs: Simulations per group, defaults to SIMULATION_RUNS
+
+    Returns:
+        Per team: current position, expected final points and the probability
+        of every final position (index 0 = first)
+
+    Raises:
+        ImportError: If numpy is not installed
+    """
+    import numpy  # noqa: F401 - fail before touching the database
+
+    runs = runs or settings.SIMULATION_RUNS
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return SeasonSimulationResponse(runs=runs, remaining_matches=0, teams=[])
+    version = await get_data_version(db)
+    key = (season_id, group, runs, version)
+    cached = _results.get(key)
+    if cached is not None:
+        return cached
+
+    async def compute(session: AsyncSession) -> SeasonSimulationResponse:
+        rules = await get_season_rules(session, season_id)
+        played: List[MatchResult] = []
+        if is_archived(season_id):
+            archived = load_archived_season(season_id)
+            tables = {code: archived.standings(group=code) for code in _groups(archived.standings(group=group))}
+            fixtures = []
+        else:
+            all_standings = await get_standings(session, group=group, season_id=season_id)
+            tables = {code: await get_standings(session, group=code, season_id=season_id) for code in _groups(all_standings)}
+            fixtures = await remaining_fixtures(session, season_id, group)
+            if fixtures and rules.head_to_head:
+                played = await played_results(session, season_id, group)
+
+        # Groups are independent: their chunks share the pool
+        groups = await asyncio.gather(*(
+            _simulate_group(list(standings), fixtures, runs, settings.SIMULATION_SEED, rules, played)
+            for standings in tables.values()
+        ))
+        teams = [team for group_teams in groups for team in group_teams]
+        result = SeasonSimulationResponse(runs=runs, remaining_matches=len(fixtures), teams=teams)
+        # Older versions can't be asked for again
+        for stale in [k for k in _results if k[3] != version]:
+            del _results[stale]
+        _results[key] = result
+        return result
+
+    return await _simulation_flight.do(key, compute, session_factory(db), release=db)
+
+
+def _groups(standings: Sequence[TeamStandingResponse]) -> List[str]:
+    return sorted({s.group for s in standings})
@@ -1,24 +1,48 @@
 """
 Standings calculation service
 """
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Tuple
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, and_
-from sqlalchemy.orm import selectinload
-
 from uuid import UUID
 
-from app.models.team import Team, GroupEnum
+from app.core.database import session_factory
+from app.models.team import Team
 from app.models.match import Match, MatchStatusEnum
 from app.schemas.standings import TeamStandingResponse
-from app.services.match_service import count_sets_won
+from app.services.season_service import resolve_season_id, division_id_subquery
+from app.core.invalidation import ALL, subscribe, caches_are_coherent
+from app.core.singleflight import SingleFlight
+from app.services.standings_rules import DEFAULT_RULES, CompiledRules, MatchResult, get_season_rules
+
+
+# Per-process standings cache keyed by (season, group); group None = all groups.
+# Cleared through app.core.invalidation whenever an admin write touches standings.
+_standings_cache: Dict[Tuple[UUID, Optional[str]], List[TeamStandingResponse]] = {}
+_cache_generation = 0
+# Concurrent misses for the same key share one calculation (e.g. the refresh
+# burst after a round's results are entered)
+_standings_flight = SingleFlight("standings")
+
+
+@subscribe
+def _invalidate_standings_cache(tags: set) -> None:
+    global _cache_generation
+    if ALL in tags or "standings" in tags:
+        _cache_generation += 1
+        _standings_cache.clear()
 
 
-def calculate_match_points(team_sets_won: int, opponent_sets_won: int) -> int:
+def calculate_match_points(
+    team_sets_won: int,
+    opponent_sets_won: int,
+    rules: Optional[CompiledRules] = None,
+) -> int:
     """
     Calculate points for a team based on sets won in a match.
     
-    Points system:
+    Default points system (seasons can declare their own, see
+    app/services/standings_rules.py):
     - Win 2-0: 3 points
     - Win 2-1: 2 points
     - Lose 1-2: 1 point
@@ -27,31 +51,23 @@ def calculate_match_points(team_sets_won: int, opponent_sets_won: int) -> int:
     Args:
         team_sets_won: Number of sets won by the team (0, 1, or 2)
         opponent_sets_won: Number of sets won by opponent (0, 1, or 2)
+        rules: Compiled rules of the season, defaults to the default rules
     
     Returns:
-        Points awarded (0, 1, 2, or 3)
+        Points awarded (0 for results outside the points table)
     """
-    if team_sets_won == 2 and opponent_sets_won == 0:
-        return 3  # Clean sweep win
-    elif team_sets_won == 2 and opponent_sets_won == 1:
-        return 2  # Win with 1 set lost
-    elif team_sets_won == 1 and opponent_sets_won == 2:
-        return 1  # Lost but won 1 set
-    elif team_sets_won == 0 and opponent_sets_won == 2:
-        return 0  # Clean sweep loss
-    else:
-        # Should not happen in best of 3 format, but handle edge case
-        return 0
+    return (rules or DEFAULT_RULES).match_points(team_sets_won, opponent_sets_won)
 
 
 async def calculate_standings(
     db: AsyncSession,
-    group: Optional[GroupEnum] = None
+    group: Optional[str] = None,
+    season_id: Optional[UUID] = None
 ) -> List[TeamStandingResponse]:
     """
-    Calculate league standings for all teams or filtered by group.
+    Calculate league standings of a season for all teams or filtered by group.
     
-    Ranking rules:
+    Ranking rules (the season's rules, by default):
     1. Points (descending)
     2. Matches Won (descending)
     3. Set Difference (descending)
@@ -60,26 +76,38 @@ async def calculate_standings(
     
     Args:
         db: Database session
-        group: Optional group filter (A or B)
+        group: Optional group (division code) filter
+        season_id: Season to calculate, defaults to the current season
     
     Returns:
         List of team standings sorted by ranking
     """
-    # Get all active teams
-    query = select(Team).where(Team.active == True)
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    rules = await get_season_rules(db, season_id)
+    
+    # Get all active teams of the season
+    query = select(Team).where(Team.season_id == season_id, Team.active == True)
     if group:
-        query = query.where(Team.group == group)
+        query = query.where(Team.division_id == division_id_subquery(season_id, group))
     
     teams_result = await db.execute(query)
     teams = teams_result.scalars().all()
     
-    # Get all played matches with their sets
-    matches_query = select(Match).where(
+    # Get the season's played matches; their result summary columns are all that's needed
+    matches_query = select(
+        Match.home_team_id, Match.away_team_id,
+        Match.home_sets_won, Match.away_sets_won, Match.home_games, Match.away_games,
+    ).where(
+        Match.season_id == season_id,
         Match.status == MatchStatusEnum.PLAYED
-    ).options(selectinload(Match.match_sets))
+    )
+    if group:
+        matches_query = matches_query.where(Match.division_id == division_id_subquery(season_id, group))
     
     matches_result = await db.execute(matches_query)
-    matches = matches_result.scalars().all()
+    matches = matches_result.all()
     
     standings = []
     
@@ -101,10 +129,8 @@ async def calculate_standings(
         for match in team_matches:
             is_home = match.home_team_id == team.id
             
-            # Calculate sets won for home and away
-            home_sets_won, away_sets_won = count_sets_won(match.match_sets)
-            team_sets_won = home_sets_won if is_home else away_sets_won
-            opponent_sets_won = away_sets_won if is_home else home_sets_won
+            team_sets_won = match.home_sets_won if is_home else match.away_sets_won
+            opponent_sets_won = match.away_sets_won if is_home else match.home_sets_won
             
             # Track match wins/losses
             if team_sets_won > opponent_sets_won:
@@ -113,21 +139,16 @@ async def calculate_standings(
                 matches_lost += 1
             
             # Calculate points for this match
-            match_points = calculate_match_points(team_sets_won, opponent_sets_won)
+            match_points = rules.match_points(team_sets_won, opponent_sets_won)
             total_points += match_points
             
             # Track sets
             sets_for += team_sets_won
             sets_against += opponent_sets_won
             
-            # Calculate games
-            for match_set in match.match_sets:
-                if is_home:
-                    games_for += match_set.home_games
-                    games_against += match_set.away_games
-                else:
-                    games_for += match_set.away_games
-                    games_against += match_set.home_games
+            # Track games
+            games_for += match.home_games if is_home else match.away_games
+            games_against += match.away_games if is_home else match.home_games
         
         standings.append(TeamStandingResponse(
             team_id=team.id,
@@ -143,17 +164,24 @@ async def calculate_standings(
             points=total_points,
             set_diff=sets_for - sets_against,
             game_diff=games_for - games_against,
-            position=0  # Will be set after sorting
+            position=0,  # Will be set after sorting
+            rating=team.rating,
         ))
     
-    # Sort by ranking rules
-    standings.sort(key=lambda s: (
-        -s.points,              # Points descending
-        -s.matches_won,         # Matches won descending
-        -s.set_diff,            # Set difference descending
-        -s.game_diff,           # Game difference descending
-        s.team_name.lower()     # Team name ascending
-    ))
+    # The match rows are (home, away, home sets, away sets, home games, away games)
+    return rank_standings(standings, rules, matches if rules.head_to_head else None)
+
+
+def rank_standings(
+    standings: List[TeamStandingResponse],
+    rules: Optional[CompiledRules] = None,
+    matches: Optional[Iterable[MatchResult]] = None,
+) -> List[TeamStandingResponse]:
+    """
+    Sort standings by the ranking rules and assign positions (in place).
+    `matches` (the table's played matches) is needed by head-to-head tiebreakers.
+    """
+    (rules or DEFAULT_RULES).sort(standings, matches)
     
     # Assign positions
     for i, standing in enumerate(standings):
@@ -162,3 +190,36 @@ async def calculate_standings(
     return standings
 
 
+async def get_standings(
+    db: AsyncSession,
+    group: Optional[str] = None,
+    season_id: Optional[UUID] = None
+) -> List[TeamStandingResponse]:
+    """
+    Cached calculate_standings for read endpoints.
+    
+    The returned list is shared between requests and must not be mutated.
+    Falls back to a fresh calculation while caches are not coherent across workers.
+    Concurrent misses for the same key share one calculation.
+    """
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    key = (season_id, group)
+    if caches_are_coherent():
+        cached = _standings_cache.get(key)
+        if cached is not None:
+            return cached
+    
+    generation = _cache_generation
+
+    async def compute(session: AsyncSession) -> List[TeamStandingResponse]:
+        standings = await calculate_standings(session, group=group, season_id=season_id)
+        # Don't store a result that an invalidation overtook while it was computed
+        if generation == _cache_generation and caches_are_coherent():
+            _standings_cache[key] = standings
+        return standings
+
+    # The generation is part of the key so requests after a write never join
+    # a calculation that started before it
+    return await _standings_flight.do((season_id, group, generation), compute, session_factory(db), release=db)
@@ -0,0 +1,356 @@
+"""
+Standings history - the table of a season after every numbered round.
+
+Cumulative totals are computed in one pass: each played match adds its
+contribution to its round's per-team deltas, and a running sum over the
+rounds in order turns the deltas into the totals after every round
+(`accumulate_rounds`). Instead of one standings calculation per round, the
+cost is one read of the matches plus one copy of the totals per round.
+
+The totals after each round are persisted per group (standings_snapshots).
+A result change only affects its own round and the ones after it, so admin
+writes delete a group's snapshots from that round onward
+(`invalidate_history`) and the next read extends the remaining prefix with
+the matches of the missing rounds only. Reads take no locks: the missing
+rounds are computed in memory, then stored in a short transaction of their
+own that is skipped when an admin write got in between (`_persist_snapshots`).
+
+Only rounds with a number ("1", "2", ...) are part of the history; played
+matches without a numbered round (e.g. "Final") count towards the current
+table only. Positions are ranked at read time, so renamed or deactivated
+teams never make snapshots stale. Archived seasons are computed from the
+archive without persisting anything.
+
+Points follow the season's rules (app/services/standings_rules.py); changing
+them deletes the season's snapshots. Round tables are ranked without
+head-to-head tiebreakers, which fall through to the next criterion.
+"""
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, delete, func
+from sqlalchemy.exc import IntegrityError
+
+from app.core.invalidation import get_data_version
+from app.models.match import Match, MatchStatusEnum
+from app.models.season import Division
+from app.models.standings_snapshot import StandingsSnapshot
+from app.models.team import Team
+from app.schemas.standings import StandingsRoundResponse, TeamStandingResponse
+from app.services.match_service import count_sets_won
+from app.services.season_service import resolve_season_id
+from app.services.season_archive import is_archived, load_archived_season
+from app.services.standings import rank_standings
+from app.services.standings_rules import DEFAULT_RULES, CompiledRules, get_season_rules
+
+# Per-team totals layout, as stored in StandingsSnapshot.stats
+_PLAYED, _WON, _LOST, _SETS_FOR, _SETS_AGAINST, _GAMES_FOR, _GAMES_AGAINST, _POINTS = range(8)
+_STATS = 8
+
+# Transaction-level advisory lock between snapshot writers and deleters (PostgreSQL)
+_SNAPSHOT_LOCK_KEY = 0x5354_414E_4453  # "STANDS"
+
+# (round, home_team_id, away_team_id, home_sets_won, away_sets_won, home_games, away_games)
+PlayedMatch = Tuple[int, UUID, UUID, int, int, int, int]
+# Totals after one round: (round, {team_id: [_STATS values]})
+RoundTotals = Tuple[int, Dict[UUID, List[int]]]
+
+
+def round_number(label: Optional[str]) -> Optional[int]:
+    """Number of a round label ("7" -> 7), None for unnumbered rounds"""
+    if label is None:
+        return None
+    label = label.strip()
+    return int(label) if label.isdigit() else None
+
+
+def accumulate_rounds(
+    matches: Iterable[PlayedMatch],
+    start: Optional[Dict[UUID, List[int]]] = None,
+    rules: CompiledRules = DEFAULT_RULES,
+) -> List[RoundTotals]:
+    """
+    Totals after every round of `matches`, continuing from `start` (the
+    totals before the earliest of these rounds), with points from `rules`.
+    """
+    deltas: Dict[int, Dict[UUID, List[int]]] = defaultdict(lambda: defaultdict(lambda: [0] * _STATS))
+    for round, home, away, home_sets, away_sets, home_games, away_games in matches:
+        round_deltas = deltas[round]
+        for team, sets_for, sets_against, games_for, games_against in (
+            (home, home_sets, away_sets, home_games, away_games),
+            (away, away_sets, home_sets, away_games, home_games),
+        ):
+            values = round_deltas[team]
+            values[_PLAYED] += 1
+            values[_WON if sets_for > sets_against else _LOST] += 1
+            values[_SETS_FOR] += sets_for
+            values[_SETS_AGAINST] += sets_against
+            values[_GAMES_FOR] += games_for
+            values[_GAMES_AGAINST] += games_against
+            values[_POINTS] += rules.match_points(sets_for, sets_against)
+
+    totals = {team: list(values) for team, values in (start or {}).items()}
+    history = []
+    for round in sorted(deltas):
+        for team, values in deltas[round].items():
+            current = totals.get(team)
+            if current is None:
+                totals[team] = list(values)
+            else:
+                for i in range(_STATS):
+                    current[i] += values[i]
+        history.append((round, {team: list(values) for team, values in totals.items()}))
+    return history
+
+
+# ---------------------------------------------------------------------------
+# Persisted snapshots
+# ---------------------------------------------------------------------------
+
+async def invalidate_history(db: AsyncSession, season_id: UUID, division_id: UUID, round: Optional[str]) -> None:
+    """
+    Delete a group's snapshots from `round` onward. Call in the transaction
+    that changes a result in that round (or moves a match into/out of it).
+    """
+    number = round_number(round)
+    if number is None:
+        return
+    await _lock_snapshots(db)
+    await db.execute(
+        delete(StandingsSnapshot).where(
+            StandingsSnapshot.season_id == season_id,
+            StandingsSnapshot.division_id == division_id,
+            StandingsSnapshot.round >= number,
+        )
+    )
+
+
+async def invalidate_season_history(db: AsyncSession, season_id: UUID) -> None:
+    """Delete all snapshots of a season, e.g. when its points rules change"""
+    await _lock_snapshots(db)
+    await db.execute(delete(StandingsSnapshot).where(StandingsSnapshot.season_id == season_id))
+
+
+async def _lock_snapshots(db: AsyncSession) -> None:
+    # Held until the write commits: readers skip storing snapshots meanwhile.
+    # Writers also bump the data version (publish), which readers check.
+    if db.bind is not None and db.bind.dialect.name == "postgresql":
+        await db.execute(select(func.pg_advisory_xact_lock(_SNAPSHOT_LOCK_KEY)))
+
+
+async def _persist_snapshots(db: AsyncSession, snapshots: List[StandingsSnapshot], version: int) -> bool:
+    """
+    Store snapshots computed from the data as of `version` in a transaction
+    of their own. Skipped (False) when a write changed the data since, is
+    changing it right now, or another reader stored the same rounds first.
+    """
+    try:
+        if db.bind is not None and db.bind.dialect.name == "postgresql":
+            # Never wait for a writer: the next read stores the rounds instead
+            if not await db.scalar(select(func.pg_try_advisory_xact_lock(_SNAPSHOT_LOCK_KEY))):
+                await db.rollback()
+                return False
+            if await get_data_version(db) != version:
+                await db.rollback()
+                return False
+            db.add_all(snapshots)
+            await db.commit()
+            return True
+        # SQLite: the insert takes the database write lock, so no write can
+        # commit between the version check and this commit
+        db.add_all(snapshots)
+        await db.flush()
+        if await get_data_version(db) != version:
+            await db.rollback()
+            return False
+        await db.commit()
+        return True
+    except IntegrityError:
+        await db.rollback()
+        return False
+
+
+def _decode_stats(stats: dict) -> Dict[UUID, List[int]]:
+    return {UUID(team_id): values for team_id, values in stats.items()}
+
+
+def _encode_stats(totals: Dict[UUID, List[int]]) -> dict:
+    return {str(team_id): values for team_id, values in totals.items()}
+
+
+async def load_history(db: AsyncSession, season_id: UUID, division_ids: Sequence[UUID]) -> Dict[UUID, List[RoundTotals]]:
+    """
+    Round totals of the given divisions, from the persisted snapshots,
+    computing the rounds that are missing (and storing them when no write
+    interferes). Ends the transaction.
+    """
+    if not division_ids:
+        return {}
+    # The data the rounds below are computed from is at least this version
+    version = await get_data_version(db)
+
+    result = await db.execute(
+        select(StandingsSnapshot.division_id, StandingsSnapshot.round, StandingsSnapshot.stats)
+        .where(StandingsSnapshot.season_id == season_id, StandingsSnapshot.division_id.in_(division_ids))
+        .order_by(StandingsSnapshot.division_id, StandingsSnapshot.round)
+    )
+    history: Dict[UUID, List[RoundTotals]] = {division_id: [] for division_id in division_ids}
+    for division_id, round, stats in result.all():
+        history[division_id].append((round, _decode_stats(stats)))
+
+    played = [Match.season_id == season_id, Match.status == MatchStatusEnum.PLAYED, Match.division_id.in_(division_ids)]
+    result = await db.execute(select(Match.division_id, Match.round).where(*played).distinct())
+    missing_labels = [
+        label for division_id, label in result.all()
+        if round_number(label) is not None
+        and (not history[division_id] or round_number(label) > history[division_id][-1][0])
+    ]
+    if not missing_labels:
+        await db.commit()
+        return history
+
+    # Only the matches of rounds after each division's last snapshot
+    result = await db.execute(
+        select(
+            Match.division_id, Match.round, Match.home_team_id, Match.away_team_id,
+            Match.home_sets_won, Match.away_sets_won, Match.home_games, Match.away_games,
+        ).where(*played, Match.round.in_(sorted(set(missing_labels))))
+    )
+    new_matches: Dict[UUID, List[PlayedMatch]] = defaultdict(list)
+    for division_id, label, *summary in result.all():
+        number = round_number(label)
+        if not history[division_id] or number > history[division_id][-1][0]:
+            new_matches[division_id].append((number, *summary))
+
+    rules = await get_season_rules(db, season_id)
+    snapshots = []
+    for division_id, matches in new_matches.items():
+        previous = history[division_id]
+        rounds = accumulate_rounds(matches, start=previous[-1][1] if previous else None, rules=rules)
+        snapshots.extend(
+            StandingsSnapshot(season_id=season_id, division_id=division_id, round=round, stats=_encode_stats(totals))
+            for round, totals in rounds
+        )
+        previous.extend(rounds)
+    await db.commit()  # End the read transaction
+    await _persist_snapshots(db, snapshots, version)
+    return history
+
+
+# ---------------------------------------------------------------------------
+# Responses
+# ---------------------------------------------------------------------------
+
+def _round_responses(
+    teams: Sequence[Tuple[UUID, str, str]],
+    history: Dict[str, List[RoundTotals]],
+    as_of_round: Optional[int] = None,
+    rules: CompiledRules = DEFAULT_RULES,
+) -> List[StandingsRoundResponse]:
+    """
+    Ranked tables of `teams` ((id, name, group) of the active teams) after
+    every round of `history` (round totals per group code). With several
+    groups a round's table uses each group's totals as of that round.
+    """
+    rounds = sorted({round for group_rounds in history.values() for round, _ in group_rounds})
+    if as_of_round is not None:
+        # The table as of a round is the one after the last round played by then
+        rounds = [round for round in rounds if round <= as_of_round][-1:]
+
+    responses = []
+    position = {group: -1 for group in history}
+    for round in rounds:
+        totals: Dict[UUID, List[int]] = {}
+        for group, group_rounds in history.items():
+            while position[group] + 1 < len(group_rounds) and group_rounds[position[group] + 1][0] <= round:
+                position[group] += 1
+            if position[group] >= 0:
+                totals.update(group_rounds[position[group]][1])
+
+        standings = []
+        for team_id, name, group in teams:
+            values = totals.get(team_id) or [0] * _STATS
+            standings.append(TeamStandingResponse(
+                team_id=team_id,
+                team_name=name,
+                group=group,
+                matches_played=values[_PLAYED],
+                matches_won=values[_WON],
+                matches_lost=values[_LOST],
+                sets_for=values[_SETS_FOR],
+                sets_against=values[_SETS_AGAINST],
+                games_for=values[_GAMES_FOR],
+                games_against=values[_GAMES_AGAINST],
+                points=values[_POINTS],
+                set_diff=values[_SETS_FOR] - values[_SETS_AGAINST],
+                game_diff=values[_GAMES_FOR] - values[_GAMES_AGAINST],
+                position=0,
+            ))
+        responses.append(StandingsRoundResponse(round=round, standings=rank_standings(standings, rules)))
+    return responses
+
+
+def _archived_history(
+    season_id: UUID, group: Optional[str], as_of_round: Optional[int], rules: CompiledRules
+) -> List[StandingsRoundResponse]:
+    archived = load_archived_season(season_id)
+    teams = [(t.id, t.name, t.group) for t in archived.list_teams(group=group, active=True)]
+    matches: Dict[str, List[PlayedMatch]] = defaultdict(list)
+    for m in archived.list_matches(group=group, status=MatchStatusEnum.PLAYED.value):
+        number = round_number(m.round)
+        if number is None:
+            continue
+        home_sets, away_sets = count_sets_won(m.match_sets)
+        matches[m.group].append((
+            number, m.home_team_id, m.away_team_id, home_sets, away_sets,
+            sum(s.home_games for s in m.match_sets), sum(s.away_games for s in m.match_sets),
+        ))
+    history = {code: accumulate_rounds(group_matches, rules=rules) for code, group_matches in matches.items()}
+    return _round_responses(teams, history, as_of_round, rules)
+
+
+async def get_standings_history(
+    db: AsyncSession,
+    group: Optional[str] = None,
+    season_id: Optional[UUID] = None,
+    as_of_round: Optional[int] = None,
+) -> List[StandingsRoundResponse]:
+    """
+    Standings after every numbered round of a season, oldest first.
+
+    Args:
+        db: Database session (committed if missing snapshots were written)
+        group: Optional group (division code) filter
+        season_id: Season, defaults to the current season
+        as_of_round: Only the table as of this round (after the last round
+                     played up to it), as a one-element list
+
+    Returns:
+        One ranked table per round with played matches
+    """
+    season_id = await resolve_season_id(db, season_id)
+    if season_id is None:
+        return []
+    rules = await get_season_rules(db, season_id)
+    if is_archived(season_id):
+        return _archived_history(season_id, group, as_of_round, rules)
+
+    query = select(Division.id, Division.code).where(Division.season_id == season_id)
+    if group:
+        query = query.where(Division.code == group)
+    divisions = dict((await db.execute(query)).all())
+
+    query = select(Team.id, Team.name, Team.division_id).where(
+        Team.season_id == season_id, Team.active == True, Team.division_id.in_(divisions)
+    )
+    teams = [(team_id, name, divisions[division_id]) for team_id, name, division_id in (await db.execute(query)).all()]
+
+    history = await load_history(db, season_id, list(divisions))
+    return _round_responses(
+        teams,
+        {divisions[division_id]: rounds for division_id, rounds in history.items()},
+        as_of_round,
+        rules,
+    )
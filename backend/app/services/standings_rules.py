@@ -0,0 +1,171 @@
+"""
+Standings rules - a season's points table and tiebreakers, compiled once.
+
+Seasons declare their rules (Season.rules, schemas.season.StandingsRules):
+the points for a 2-0, 2-1, 1-2 and 0-2 and the ordered criteria that break
+ties on points. `compile_rules` turns them into a `CompiledRules`:
+
+- the points table becomes a flat tuple indexed by sets for * 4 + sets
+  against, so a match's points are one index operation;
+- criteria that are plain standings fields compile into one
+  `operator.attrgetter` key; ranking is then two stable C-level sorts (team
+  name ascending, then the key descending), with no Python call per team;
+- head-to-head criteria rank the teams still tied at that point by a
+  mini-league of the matches among them. Ties are split criterion by
+  criterion and mini-leagues are only computed for groups of two or more
+  teams, so tables without ties never look at a match.
+
+Compiled rules are cached per season and dropped when seasons change.
+"""
+from itertools import groupby
+from operator import attrgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.core.invalidation import ALL, subscribe, caches_are_coherent
+from app.models.season import Season
+from app.schemas.season import StandingsRules
+from app.schemas.standings import TeamStandingResponse
+
+HEAD_TO_HEAD = ("head_to_head_points", "head_to_head_set_diff", "head_to_head_game_diff")
+
+# (home_team_id, away_team_id, home_sets_won, away_sets_won, home_games, away_games)
+MatchResult = Tuple[UUID, UUID, int, int, int, int]
+
+
+class CompiledRules:
+    """Rules ready for ranking; build with `compile_rules`"""
+    __slots__ = ("rules", "points_table", "criteria", "head_to_head", "_key")
+
+    def __init__(self, rules: StandingsRules) -> None:
+        self.rules = rules
+        table = [0] * 16
+        for result, points in rules.points.items():
+            team_sets, opponent_sets = (int(n) for n in result.split("-"))
+            table[team_sets * 4 + opponent_sets] = points
+        self.points_table = tuple(table)
+        self.criteria = ("points", *rules.tiebreakers)
+        self.head_to_head = any(c in HEAD_TO_HEAD for c in self.criteria)
+        self._key = None if self.head_to_head else attrgetter(*self.criteria)
+
+    def match_points(self, team_sets_won: int, opponent_sets_won: int) -> int:
+        """Points for a team's result (0 for results outside the table)"""
+        return self.points_table[team_sets_won * 4 + opponent_sets_won]
+
+    def sort(
+        self,
+        standings: List[TeamStandingResponse],
+        matches: Optional[Iterable[MatchResult]] = None,
+    ) -> None:
+        """
+        Sort standings in place. `matches` (the played matches of the table)
+        is only read by head-to-head criteria; without it those criteria
+        leave the tie for the next one.
+        """
+        standings.sort(key=_name_key)
+        if self._key is not None:
+            # Stable: teams equal on every criterion stay in name order
+            standings.sort(key=self._key, reverse=True)
+            return
+        standings[:] = self._sort_with_head_to_head(standings, matches)
+
+    def _sort_with_head_to_head(self, standings, matches) -> List[TeamStandingResponse]:
+        by_pair: Optional[Dict[Tuple[int, int], List[MatchResult]]] = None
+        mini_leagues: Dict[frozenset, Dict[UUID, Tuple[int, int, int]]] = {}
+        groups = [standings]
+        for criterion in self.criteria:
+            split = []
+            for group in groups:
+                if len(group) == 1:
+                    split.append(group)
+                    continue
+                if criterion in HEAD_TO_HEAD:
+                    if matches is None:
+                        split.append(group)
+                        continue
+                    if by_pair is None:
+                        by_pair = _index_matches(matches)
+                    team_ids = frozenset(s.team_id.int for s in group)
+                    table = mini_leagues.get(team_ids)
+                    if table is None:
+                        table = mini_leagues[team_ids] = self._mini_league(team_ids, by_pair)
+                    column = HEAD_TO_HEAD.index(criterion)
+                    key = lambda s, table=table, column=column: table[s.team_id.int][column]
+                else:
+                    key = attrgetter(criterion)
+                group.sort(key=key, reverse=True)
+                split.extend(list(tied) for _, tied in groupby(group, key=key))
+            groups = split
+        return [s for group in groups for s in group]
+
+    def _mini_league(
+        self, team_ids: frozenset, by_pair: Dict[Tuple[int, int], List[MatchResult]]
+    ) -> Dict[int, Tuple[int, int, int]]:
+        """(points, set difference, game difference) of the matches among `team_ids` (UUID.int)"""
+        totals = {team_id: [0, 0, 0] for team_id in team_ids}
+        # One lookup per ordered pair of tied teams, whatever their other matches
+        pair_matches = [by_pair.get((home, away), ()) for home in team_ids for away in team_ids if home != away]
+        for results in pair_matches:
+            for home, away, home_sets, away_sets, home_games, away_games in results:
+                home_totals, away_totals = totals[home.int], totals[away.int]
+                home_totals[0] += self.match_points(home_sets, away_sets)
+                away_totals[0] += self.match_points(away_sets, home_sets)
+                home_totals[1] += home_sets - away_sets
+                away_totals[1] += away_sets - home_sets
+                home_totals[2] += home_games - away_games
+                away_totals[2] += away_games - home_games
+        return {team_id: tuple(values) for team_id, values in totals.items()}
+
+
+def _name_key(standing: TeamStandingResponse) -> str:
+    return standing.team_name.lower()
+
+
+def _index_matches(matches: Iterable[MatchResult]) -> Dict[Tuple[int, int], List[MatchResult]]:
+    # Keyed by UUID.int: hashing ints stays in C, hashing UUIDs calls back into Python
+    by_pair: Dict[Tuple[int, int], List[MatchResult]] = {}
+    for match in matches:
+        by_pair.setdefault((match[0].int, match[1].int), []).append(match)
+    return by_pair
+
+
+DEFAULT_RULES = CompiledRules(StandingsRules())
+
+
+def compile_rules(rules: Optional[dict]) -> CompiledRules:
+    """Compile a Season.rules value (None = default rules)"""
+    if rules is None:
+        return DEFAULT_RULES
+    return CompiledRules(StandingsRules.model_validate(rules))
+
+
+# Per-process cache of compiled rules per season
+_season_rules: Dict[UUID, CompiledRules] = {}
+_rules_generation = 0
+
+
+@subscribe
+def _invalidate_rules(tags: set) -> None:
+    global _rules_generation
+    if ALL in tags or "seasons" in tags:
+        _rules_generation += 1
+        _season_rules.clear()
+
+
+async def get_season_rules(db: AsyncSession, season_id: Optional[UUID]) -> CompiledRules:
+    """Compiled rules of a season (default rules for None or a missing season)"""
+    if season_id is None:
+        return DEFAULT_RULES
+    if caches_are_coherent():
+        cached = _season_rules.get(season_id)
+        if cached is not None:
+            return cached
+    generation = _rules_generation
+    rules = compile_rules(await db.scalar(select(Season.rules).where(Season.id == season_id)))
+    if generation == _rules_generation and caches_are_coherent():
+        _season_rules[season_id] = rules
+    return rules
+
@@ -0,0 +1,166 @@
+"""
+What-if standings - the table with hypothetical results of scheduled matches.
+
+Hypothetical results are an overlay on the current standings: each result
+is added to its two teams' totals from the cached table (LeagueState or the
+standings cache) and the table is ranked again with the season's rules.
+With the league state loaded nothing is read from the database; matches are
+looked up in memory. Otherwise the matches are read by id in one query.
+"""
+from typing import Dict, List, Optional, Sequence
+from uuid import UUID
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select
+
+from app.exceptions import NotFoundError
+from app.models.match import Match, MatchStatusEnum
+from app.schemas.standings import TeamStandingResponse, WhatIfResult
+from app.services.league_state import get_league_state
+from app.services.match_service import count_sets_won
+from app.services.season_service import resolve_season_id, division_id_subquery
+from app.services.standings import get_standings
+from app.services.standings_rules import CompiledRules, MatchResult, get_season_rules
+
+
+def overlay_results(
+    standings: Sequence[TeamStandingResponse],
+    results: Sequence[MatchResult],
+    rules: CompiledRules,
+    played: Optional[Sequence[MatchResult]] = None,
+) -> List[TeamStandingResponse]:
+    """
+    `standings` (shared, left untouched) with `results` added and re-ranked.
+    Results of teams not in the table are skipped. `played` (the table's
+    played matches) is only needed by head-to-head tiebreakers.
+
+    Only rows whose totals or position change are copied; the others are the
+    shared rows themselves.
+    """
+    teams = {s.team_id for s in standings}
+    # team id -> [played, won, lost, sets for, sets against, games for, games against, points]
+    deltas: Dict[UUID, List[int]] = {}
+    applied = []
+    for result in results:
+        home, away, home_sets, away_sets, home_games, away_games = result
+        if home not in teams or away not in teams:
+            continue  # Other group or inactive team
+        applied.append(result)
+        for team, sets_for, sets_against, games_for, games_against in (
+            (home, home_sets, away_sets, home_games, away_games),
+            (away, away_sets, home_sets, away_games, home_games),
+        ):
+            delta = deltas.get(team)
+            if delta is None:
+                delta = deltas[team] = [0] * 8
+            delta[0] += 1
+            delta[1 if sets_for > sets_against else 2] += 1
+            delta[3] += sets_for
+            delta[4] += sets_against
+            delta[5] += games_for
+            delta[6] += games_against
+            delta[7] += rules.match_points(sets_for, sets_against)
+
+    table = [_add(s, deltas[s.team_id]) if s.team_id in deltas else s for s in standings]
+    matches = [*played, *applied] if rules.head_to_head and played is not None else None
+    rules.sort(table, matches)
+    # model_copy(update=...) writes the field directly; assigning would validate
+    return [
+        s if s.position == position else s.model_copy(update={"position": position})
+        for position, s in enumerate(table, 1)
+    ]
+
+
+def _add(s: TeamStandingResponse, delta: List[int]) -> TeamStandingResponse:
+    sets_for, sets_against = s.sets_for + delta[3], s.sets_against + delta[4]
+    games_for, games_against = s.games_for + delta[5], s.games_against + delta[6]
+    return s.model_copy(update={
+        "matches_played": s.matches_played + delta[0],
+        "matches_won": s.matches_won + delta[1],
+        "matches_lost": s.matches_lost + delta[2],
+        "sets_for": sets_for,
+        "sets_against": sets_against,
+        "games_for": games_for,
+        "games_against": games_against,
+        "points": s.points + delta[7],
+        "set_diff": sets_for - sets_against,
+        "game_diff": games_for - games_against,
+    })
+
+
+def _result(home_id: UUID, away_id: UUID, result: WhatIfResult) -> MatchResult:
+    home_sets, away_sets = count_sets_won(result.sets)
+    if max(home_sets, away_sets) < 2:
+        # enter_match_result would leave the match in progress, outside the table
+        raise ValueError(f"Result of match {result.match_id} has no winner (a team must win 2 sets)")
+    return (
+        home_id, away_id, home_sets, away_sets,
+        sum(s.home_games for s in result.sets), sum(s.away_games for s in result.sets),
+    )
+
+
+def _check_scheduled(match_id: UUID, status: Optional[MatchStatusEnum]) -> None:
+    if status is None:
+        raise NotFoundError(f"Match {match_id} not found")
+    if status != MatchStatusEnum.SCHEDULED:
+        raise ValueError(f"Match {match_id} is not scheduled (status: {status})")
+
+
+async def get_what_if_standings(
+    db: AsyncSession,
+    results: Sequence[WhatIfResult],
+    group: Optional[str] = None,
+) -> List[TeamStandingResponse]:
+    """
+    Current season standings as if `results` had been entered.
+
+    Args:
+        db: Database session
+        results: Hypothetical results of scheduled matches of the current season
+        group: Optional group (division code) filter
+
+    Returns:
+        The table, ranked as GET /standings ranks it
+
+    Raises:
+        NotFoundError: If a match is not in the current season
+        ValueError: If a match is not scheduled or its result has no winner
+    """
+    state = await get_league_state(db)
+    if state is not None:
+        overlay = []
+        for result in results:
+            teams = state.match_teams(result.match_id)
+            _check_scheduled(result.match_id, teams[2] if teams else None)
+            overlay.append(_result(teams[0], teams[1], result))
+        played = state.played_results(group) if state.rules.head_to_head else None
+        return overlay_results(state.standings(group=group), overlay, state.rules, played)
+
+    season_id = await resolve_season_id(db, None)
+    if season_id is None:
+        raise NotFoundError("No current season")
+    rules = await get_season_rules(db, season_id)
+    rows = {}
+    if results:
+        query = select(Match.id, Match.home_team_id, Match.away_team_id, Match.status).where(
+            Match.season_id == season_id,
+            Match.id.in_([r.match_id for r in results]),
+        )
+        rows = {row.id: row for row in (await db.execute(query)).all()}
+    overlay = []
+    for result in results:
+        row = rows.get(result.match_id)
+        _check_scheduled(result.match_id, row.status if row is not None else None)
+        overlay.append(_result(row.home_team_id, row.away_team_id, result))
+
+    played = None
+    if rules.head_to_head:
+        query = select(
+            Match.home_team_id, Match.away_team_id,
+            Match.home_sets_won, Match.away_sets_won, Match.home_games, Match.away_games,
+        ).where(Match.season_id == season_id, Match.status == MatchStatusEnum.PLAYED)
+        if group:
+            query = query.where(Match.division_id == division_id_subquery(season_id, group))
+        played = [tuple(row) for row in (await db.execute(query)).all()]
+    standings = await get_standings(db, group=group, season_id=season_id)
+    return overlay_results(standings, overlay, rules, played)
@@ -0,0 +1,3 @@
+"""
+Performance tooling: synthetic datasets, traffic profiles and the load-test harness
+"""
@@ -0,0 +1,271 @@
+"""
+Deterministic synthetic league generator used by the load tests and benchmarks
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import List, Optional, Sequence
+
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.core.security import get_password_hash
+from app.models.user import User
+from app.models.player import Player
+from app.models.season import Season, Division
+from app.models.team import Team
+from app.models.team_player import TeamPlayer, PlayerRoleEnum
+from app.models.match import Match, MatchSet, MatchStatusEnum
+from app.services.match_service import apply_result_summary, pack_set_scores, set_storage_is_array
+
+# Credentials of the admin user created alongside every synthetic league
+BENCH_ADMIN_USERNAME = "bench-admin"
+BENCH_ADMIN_PASSWORD = "bench-admin-password"
+
+# Realistic padel set scores (winner games, loser games)
+_SET_SCORES = [(6, 0), (6, 1), (6, 2), (6, 3), (6, 4), (7, 5), (7, 6)]
+
+# Rows per executemany batch when seeding a database
+_INSERT_CHUNK_SIZE = 1000
+
+
+@dataclass
+class SyntheticLeague:
+    """A generated league held as transient (never persisted) ORM objects"""
+    seasons: List[Season] = field(default_factory=list)
+    divisions: List[Division] = field(default_factory=list)
+    teams: List[Team] = field(default_factory=list)
+    players: List[Player] = field(default_factory=list)
+    team_players: List[TeamPlayer] = field(default_factory=list)
+    matches: List[Match] = field(default_factory=list)
+    match_sets: List[MatchSet] = field(default_factory=list)
+    admin: Optional[User] = None
+
+    @property
+    def current_season(self) -> Season:
+        return next(s for s in self.seasons if s.is_current)
+
+    @property
+    def played_matches(self) -> List[Match]:
+        return [m for m in self.matches if m.status == MatchStatusEnum.PLAYED]
+
+    @property
+    def scheduled_matches(self) -> List[Match]:
+        return [m for m in self.matches if m.status == MatchStatusEnum.SCHEDULED]
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    """Random-looking but reproducible v4 UUID"""
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _round_robin(team_ids: Sequence[uuid.UUID]) -> List[List[tuple]]:
+    """
+    Circle-method round robin schedule.
+    Returns a list of rounds, each a list of (home_id, away_id) pairings.
+    """
+    ids = list(team_ids)
+    if len(ids) % 2:
+        ids.append(None)  # Bye
+    n = len(ids)
+    rounds = []
+    for r in range(n - 1):
+        pairings = []
+        for i in range(n // 2):
+            home, away = ids[i], ids[n - 1 - i]
+            if home is None or away is None:
+                continue
+            # Alternate home advantage between rounds
+            pairings.append((home, away) if r % 2 == 0 else (away, home))
+        rounds.append(pairings)
+        ids = [ids[0]] + [ids[-1]] + ids[1:-1]
+    return rounds
+
+
+def _random_sets(rng: random.Random) -> List[tuple]:
+    """Generate a completed best-of-3 result as a list of (home_games, away_games)"""
+    outcome = rng.choice(["2-0", "2-1", "1-2", "0-2"])
+    if outcome == "2-0":
+        home_wins = [True, True]
+    elif outcome == "0-2":
+        home_wins = [False, False]
+    else:
+        # Deciding set goes to the match winner, the first two are split either way
+        first_set = rng.random() < 0.5
+        home_wins = [first_set, not first_set, outcome == "2-1"]
+    sets = []
+    for home_won in home_wins:
+        winner_games, loser_games = rng.choice(_SET_SCORES)
+        sets.append((winner_games, loser_games) if home_won else (loser_games, winner_games))
+    return sets
+
+
+def generate_league(
+    teams_per_group: int = 8,
+    groups: Sequence[str] = ("A", "B"),
+    legs: int = 1,
+    played_ratio: float = 0.6,
+    seed: int = 2025,
+    with_admin: bool = True,
+    seasons: int = 1,
+) -> SyntheticLeague:
+    """
+    Generate a complete league: teams with rosters, a round-robin schedule per group
+    and results for the first `played_ratio` share of rounds.
+
+    Args:
+        teams_per_group: Number of teams in every group
+        groups: Group (division) codes to generate
+        legs: How many times every pairing is played (1 = single round robin)
+        played_ratio: Share of rounds of the current season that already have results
+        seed: RNG seed - the same arguments always produce the same league
+        with_admin: Also create an admin user with BENCH_ADMIN_* credentials
+        seasons: Number of seasons; all but the last (current) one are fully played
+                 and only add history that season-scoped queries must skip
+
+    Returns:
+        SyntheticLeague with relationships wired between the transient objects
+    """
+    rng = random.Random(seed)
+    league = SyntheticLeague()
+    current_start = datetime(2025, 1, 6, 18, 0)
+
+    for season_index in range(seasons):
+        is_current = season_index == seasons - 1
+        # 52 weeks per season keeps match days on the same weekday
+        start = current_start - timedelta(weeks=52 * (seasons - 1 - season_index))
+        season = Season(
+            id=_uuid(rng),
+            name=f"Season {start.year}",
+            start_date=start.date(),
+            is_current=is_current,
+        )
+        league.seasons.append(season)
+        _generate_season(
+            rng, league, season, start, teams_per_group, groups, legs,
+            played_ratio if is_current else 1.0,
+        )
+
+    if with_admin:
+        league.admin = User(
+            id=_uuid(rng),
+            username=BENCH_ADMIN_USERNAME,
+            email=f"{BENCH_ADMIN_USERNAME}@example.com",
+            hashed_password=get_password_hash(BENCH_ADMIN_PASSWORD),
+            is_active=True,
+        )
+
+    return league
+
+
+def _generate_season(
+    rng: random.Random,
+    league: SyntheticLeague,
+    season: Season,
+    start: datetime,
+    teams_per_group: int,
+    groups: Sequence[str],
+    legs: int,
+    played_ratio: float,
+) -> None:
+    """Add the divisions, teams and schedule of one season to `league`"""
+    for sort_order, group in enumerate(groups):
+        division = Division(id=_uuid(rng), season_id=season.id, code=group, name=f"Group {group}", sort_order=sort_order)
+        league.divisions.append(division)
+
+        group_team_ids = []
+        season_teams = []
+        for t in range(teams_per_group):
+            team = Team(
+                id=_uuid(rng),
+                season_id=season.id,
+                division_id=division.id,
+                name=f"{group}{t + 1:04d} TEAM",
+                active=True,
+            )
+            team.division = division
+            team.team_players = []
+            league.teams.append(team)
+            season_teams.append(team)
+            group_team_ids.append(team.id)
+
+            for p, role in enumerate((PlayerRoleEnum.MAIN, PlayerRoleEnum.MAIN, PlayerRoleEnum.RESERVE)):
+                player = Player(id=_uuid(rng), name=f"Player{p + 1} {group}{t + 1:04d}")
+                team_player = TeamPlayer(id=_uuid(rng), team_id=team.id, player_id=player.id, role=role)
+                team_player.player = player
+                team.team_players.append(team_player)
+                league.players.append(player)
+                league.team_players.append(team_player)
+
+        teams_by_id = {team.id: team for team in season_teams}
+        schedule = _round_robin(group_team_ids)
+        rounds = []
+        for leg in range(legs):
+            for pairings in schedule:
+                # Second leg swaps home and away
+                rounds.append(pairings if leg % 2 == 0 else [(a, h) for h, a in pairings])
+
+        played_rounds = int(len(rounds) * played_ratio)
+        for round_index, pairings in enumerate(rounds):
+            for slot, (home_id, away_id) in enumerate(pairings):
+                match = Match(
+                    id=_uuid(rng),
+                    date=start + timedelta(days=7 * round_index, minutes=30 * slot),
+                    season_id=season.id,
+                    division_id=division.id,
+                    round=str(round_index + 1),
+                    home_team_id=home_id,
+                    away_team_id=away_id,
+                    status=MatchStatusEnum.SCHEDULED,
+                )
+                match.division = division
+                match.home_team = teams_by_id[home_id]
+                match.away_team = teams_by_id[away_id]
+                match.match_sets = []
+                if round_index < played_rounds:
+                    for set_number, (home_games, away_games) in enumerate(_random_sets(rng), start=1):
+                        match_set = MatchSet(
+                            id=_uuid(rng),
+                            match_id=match.id,
+                            set_number=set_number,
+                            home_games=home_games,
+                            away_games=away_games,
+                        )
+                        match.match_sets.append(match_set)
+                        league.match_sets.append(match_set)
+                    match.status = MatchStatusEnum.PLAYED
+                match.set_scores = pack_set_scores(match.match_sets)
+                apply_result_summary(match, match.match_sets)
+                league.matches.append(match)
+
+
+def _rows(objects: Sequence, model) -> List[dict]:
+    """Column values of transient ORM objects as plain insert rows"""
+    columns = [c.key for c in model.__table__.columns]
+    return [{key: getattr(obj, key) for key in columns} for obj in objects]
+
+
+async def seed_database(session_factory: async_sessionmaker, league: SyntheticLeague) -> None:
+    """
+    Bulk insert a synthetic league.
+    Uses Core executemany inserts so large leagues seed in seconds.
+    """
+    tables = [
+        (User, [league.admin] if league.admin else []),
+        (Season, league.seasons),
+        (Division, league.divisions),
+        (Player, league.players),
+        (Team, league.teams),
+        (TeamPlayer, league.team_players),
+        (Match, league.matches),
+        # The array storage keeps set scores on the match rows only
+        (MatchSet, [] if set_storage_is_array() else league.match_sets),
+    ]
+    session: AsyncSession
+    async with session_factory() as session:
+        async with session.begin():
+            for model, objects in tables:
+                rows = _rows(objects, model)
+                for i in range(0, len(rows), _INSERT_CHUNK_SIZE):
+                    await session.execute(insert(model), rows[i:i + _INSERT_CHUNK_SIZE])
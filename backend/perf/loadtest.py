@@ -0,0 +1,423 @@
+"""
+HTTP load-test harness for the public API.
+
+Replays a weighted traffic profile against an in-process app (default), a
+locally spawned uvicorn instance, or any running server, then reports
+p50/p95/p99 latency, throughput and error rates per operation.
+
+Usage (from the backend directory):
+    # Seed a synthetic league into DATABASE_URL and hammer the in-process app
+    python -m perf.loadtest run --profile match-night --seed --teams-per-group 12 --duration 30
+
+    # No PostgreSQL at hand: serve a seeded temporary SQLite database
+    python -m perf.loadtest run --sqlite --profile public-browse
+
+    # Spawn uvicorn with 4 workers and write machine-readable results
+    python -m perf.loadtest run --spawn --workers 4 --output results/after.json
+
+    # Compare two runs
+    python -m perf.loadtest compare results/before.json results/after.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Allow running as a plain script as well as with -m
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import httpx
+
+from perf.dataset import BENCH_ADMIN_USERNAME, BENCH_ADMIN_PASSWORD, generate_league, seed_database
+from perf.profiles import TrafficProfile, Operation, load_profile, API
+
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+class Recorder:
+    """Collects per-operation latencies and outcomes"""
+
+    def __init__(self) -> None:
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.status_counts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    def record(self, name: str, latency_ms: float, status: str, is_error: bool) -> None:
+        self.latencies[name].append(latency_ms)
+        self.status_counts[name][status] += 1
+        if is_error:
+            self.errors[name] += 1
+
+    def summarize(self, elapsed_s: float) -> dict:
+        operations = {}
+        all_latencies: List[float] = []
+        total_errors = 0
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            all_latencies.extend(values)
+            total_errors += self.errors[name]
+            operations[name] = _stats(values, self.errors[name], elapsed_s)
+            operations[name]["status_counts"] = dict(self.status_counts[name])
+        all_latencies.sort()
+        return {
+            "summary": _stats(all_latencies, total_errors, elapsed_s),
+            "operations": operations,
+        }
+
+
+def _stats(sorted_latencies: List[float], errors: int, elapsed_s: float) -> dict:
+    count = len(sorted_latencies)
+    stats = {
+        "requests": count,
+        "errors": errors,
+        "error_rate": round(errors / count, 6) if count else 0.0,
+        "throughput_rps": round(count / elapsed_s, 2) if elapsed_s > 0 else 0.0,
+        "mean_ms": round(sum(sorted_latencies) / count, 3) if count else 0.0,
+        "max_ms": round(sorted_latencies[-1], 3) if count else 0.0,
+    }
+    for pct in PERCENTILES:
+        stats[f"p{pct}_ms"] = round(percentile(sorted_latencies, pct), 3)
+    return stats
+
+
+async def discover_ids(client: httpx.AsyncClient) -> dict:
+    """Collect team/match ids and groups from the target so templates can be filled"""
+    teams = (await client.get(f"{API}/public/teams/")).json()
+    matches = (await client.get(f"{API}/public/matches/")).json()
+    if not teams or not matches:
+        raise RuntimeError("Target has no teams or matches - seed a dataset first (--seed)")
+    return {
+        "team_id": [t["id"] for t in teams],
+        "group": sorted({t["group"] for t in teams}),
+        "match_id": [m["id"] for m in matches if m["status"] != "cancelled"],
+    }
+
+
+async def admin_token(client: httpx.AsyncClient, username: str, password: str) -> Optional[str]:
+    response = await client.post(f"{API}/admin/auth/login", json={"username": username, "password": password})
+    if response.status_code != 200:
+        return None
+    return response.json()["access_token"]
+
+
+async def _worker(
+    client: httpx.AsyncClient,
+    operations: List[Operation],
+    weights: List[float],
+    ids: dict,
+    headers: dict,
+    deadline: float,
+    recorder: Recorder,
+    rng: random.Random,
+) -> None:
+    while time.perf_counter() < deadline:
+        op = rng.choices(operations, weights=weights, k=1)[0]
+        path = op.path.format(**{key: rng.choice(values) for key, values in ids.items()})
+        kwargs = {"headers": headers} if op.admin else {}
+        if op.body is not None:
+            kwargs["json"] = op.body(rng)
+
+        started = time.perf_counter()
+        try:
+            response = await client.request(op.method, path, **kwargs)
+            await response.aread()
+            status = str(response.status_code)
+            is_error = response.status_code >= 400
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+            is_error = True
+        recorder.record(op.name, (time.perf_counter() - started) * 1000.0, status, is_error)
+
+
+async def replay(
+    client: httpx.AsyncClient,
+    profile: TrafficProfile,
+    duration_s: float,
+    concurrency: int,
+    seed: int,
+    admin_username: str,
+    admin_password: str,
+    warmup_s: float = 2.0,
+) -> dict:
+    """Run `concurrency` virtual users through the profile for `duration_s` seconds"""
+    ids = await discover_ids(client)
+
+    operations = list(profile.operations)
+    headers = {}
+    if any(op.admin for op in operations):
+        token = await admin_token(client, admin_username, admin_password)
+        if token is None:
+            print("⚠️  Admin login failed - admin operations are skipped", file=sys.stderr)
+            operations = [op for op in operations if not op.admin]
+        else:
+            headers = {"Authorization": f"Bearer {token}"}
+    weights = [op.weight for op in operations]
+
+    if warmup_s > 0:
+        warmup_deadline = time.perf_counter() + warmup_s
+        await asyncio.gather(*[
+            _worker(client, operations, weights, ids, headers, warmup_deadline, Recorder(), random.Random(seed - i - 1))
+            for i in range(concurrency)
+        ])
+
+    recorder = Recorder()
+    started = time.perf_counter()
+    deadline = started + duration_s
+    await asyncio.gather(*[
+        _worker(client, operations, weights, ids, headers, deadline, recorder, random.Random(seed + i))
+        for i in range(concurrency)
+    ])
+    elapsed = time.perf_counter() - started
+    return {"elapsed_s": round(elapsed, 3), **recorder.summarize(elapsed)}
+
+
+def _git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _spawn_uvicorn(port: int, workers: int) -> subprocess.Popen:
+    cmd = [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port), "--log-level", "warning"]
+    if workers > 1:
+        cmd += ["--workers", str(workers)]
+    return subprocess.Popen(cmd, cwd=str(Path(__file__).parent.parent))
+
+
+async def _wait_healthy(base_url: str, timeout_s: float = 30.0) -> None:
+    deadline = time.perf_counter() + timeout_s
+    async with httpx.AsyncClient(base_url=base_url) as client:
+        while time.perf_counter() < deadline:
+            try:
+                if (await client.get("/health")).status_code == 200:
+                    return
+            except httpx.HTTPError:
+                pass
+            await asyncio.sleep(0.25)
+    raise RuntimeError(f"Server at {base_url} did not become healthy within {timeout_s}s")
+
+
+async def seed(teams_per_group: int, legs: int, reset_schema: bool, session_factory=None, seasons: int = 1) -> dict:
+    """Generate a synthetic league and insert it into the configured database"""
+    from app.core.database import AsyncSessionLocal, engine, Base
+
+    if session_factory is None:
+        session_factory = AsyncSessionLocal
+        if reset_schema:
+            async with engine.begin() as conn:
+                await conn.run_sync(Base.metadata.drop_all)
+                await conn.run_sync(Base.metadata.create_all)
+
+    league = generate_league(teams_per_group=teams_per_group, legs=legs, seasons=seasons)
+    await seed_database(session_factory, league)
+    return {
+        "seasons": len(league.seasons),
+        "teams": len(league.teams),
+        "matches": len(league.matches),
+        "match_sets": len(league.match_sets),
+    }
+
+
+async def run(args: argparse.Namespace) -> dict:
+    profile = load_profile(args.profile)
+
+    session_factory = None
+    if args.sqlite:
+        if args.spawn or args.base_url:
+            raise SystemExit("--sqlite only works with the in-process target")
+        from app.core.sqlite import create_sqlite_session_factory, override_get_db
+        from app.main import app
+
+        # A file rather than :memory: so concurrent sessions get their own connections
+        sqlite_path = Path(tempfile.mkdtemp(prefix="padel-loadtest-")) / "league.sqlite3"
+        session_factory = await create_sqlite_session_factory(str(sqlite_path))
+        override_get_db(app, session_factory)
+
+    if args.seed or args.sqlite:
+        dataset = await seed(args.teams_per_group, args.legs, args.reset_schema, session_factory, args.seasons)
+    else:
+        dataset = None
+
+    process = None
+    if args.spawn:
+        base_url = f"http://127.0.0.1:{args.port}"
+        process = _spawn_uvicorn(args.port, args.workers)
+        target = f"uvicorn ({args.workers} worker{'s' if args.workers > 1 else ''})"
+    elif args.base_url:
+        base_url = args.base_url.rstrip("/")
+        target = base_url
+    else:
+        base_url = "http://loadtest"
+        target = "in-process (sqlite)" if args.sqlite else "in-process"
+
+    try:
+        if args.spawn:
+            await _wait_healthy(base_url)
+
+        limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+        if base_url == "http://loadtest":
+            from app.main import app
+            transport = httpx.ASGITransport(app=app)
+            client = httpx.AsyncClient(transport=transport, base_url=base_url, timeout=args.timeout)
+        else:
+            client = httpx.AsyncClient(base_url=base_url, timeout=args.timeout, limits=limits)
+
+        async with client:
+            results = await replay(
+                client,
+                profile,
+                duration_s=args.duration,
+                concurrency=args.concurrency,
+                seed=args.rng_seed,
+                admin_username=args.admin_username,
+                admin_password=args.admin_password,
+                warmup_s=args.warmup,
+            )
+            # Server-side counters (with several workers: whichever one answers)
+            try:
+                response = await client.get("/metrics")
+                if response.status_code == 200:
+                    results["server_metrics"] = response.json()
+            except httpx.HTTPError:
+                pass
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait(timeout=10)
+
+    return {
+        "meta": {
+            "profile": profile.name,
+            "target": target,
+            "duration_s": args.duration,
+            "concurrency": args.concurrency,
+            "dataset": dataset,
+            "git_revision": _git_revision(),
+            "python": platform.python_version(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        **results,
+    }
+
+
+def print_report(results: dict) -> None:
+    meta = results["meta"]
+    print(f"\nProfile: {meta['profile']}  Target: {meta['target']}  "
+          f"Concurrency: {meta['concurrency']}  Elapsed: {results['elapsed_s']}s")
+    header = f"{'operation':<24}{'reqs':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}{'err%':>8}"
+    print(header)
+    print("-" * len(header))
+    rows = list(results["operations"].items()) + [("TOTAL", results["summary"])]
+    for name, s in rows:
+        print(f"{name:<24}{s['requests']:>8}{s['throughput_rps']:>10.1f}"
+              f"{s['p50_ms']:>10.2f}{s['p95_ms']:>10.2f}{s['p99_ms']:>10.2f}{s['error_rate'] * 100:>8.2f}")
+    flights = results.get("server_metrics", {}).get("singleflight", {})
+    if flights:
+        print("\nSingle-flight (one worker):")
+        for name, f in flights.items():
+            print(f"  {name:<22} calls {f['calls']:>7}  executions {f['executions']:>7}  coalesced {f['coalesced']:>7}")
+    compression = results.get("server_metrics", {}).get("compression", {})
+    if compression:
+        print("\nCompression (one worker):")
+        for encoding, c in compression.items():
+            print(f"  {encoding:<6} responses {c['responses']:>7}  saved {c['bytes_saved'] / 1e6:>8.2f} MB  "
+                  f"ratio {c['ratio']}  cpu {c['cpu_ms_per_response']} ms/response")
+
+
+def compare(base_path: str, new_path: str) -> None:
+    """Print per-operation deltas between two result files"""
+    base = json.loads(Path(base_path).read_text(encoding="utf-8"))
+    new = json.loads(Path(new_path).read_text(encoding="utf-8"))
+
+    def delta(old: float, current: float) -> str:
+        if not old:
+            return "   n/a"
+        return f"{(current - old) / old * 100:+6.1f}%"
+
+    header = f"{'operation':<24}{'rps':>17}{'p50':>19}{'p95':>19}{'p99':>19}"
+    print(header)
+    print("-" * len(header))
+    names = sorted(set(base["operations"]) | set(new["operations"]))
+    rows = [(n, base["operations"].get(n), new["operations"].get(n)) for n in names]
+    rows.append(("TOTAL", base["summary"], new["summary"]))
+    for name, old, current in rows:
+        if old is None or current is None:
+            print(f"{name:<24}  (only in {'new' if old is None else 'base'} run)")
+            continue
+        line = f"{name:<24}{current['throughput_rps']:>9.1f}{delta(old['throughput_rps'], current['throughput_rps']):>8}"
+        for key in ("p50_ms", "p95_ms", "p99_ms"):
+            line += f"{current[key]:>11.2f}{delta(old[key], current[key]):>8}"
+        print(line)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="District Padel API load-test harness")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="Replay a traffic profile")
+    run_parser.add_argument("--profile", default="public-browse", help="Built-in profile name or path to a JSON profile")
+    run_parser.add_argument("--duration", type=float, default=20.0, help="Measured seconds")
+    run_parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured warm-up seconds")
+    run_parser.add_argument("--concurrency", type=int, default=16, help="Concurrent virtual users")
+    run_parser.add_argument("--timeout", type=float, default=30.0)
+    run_parser.add_argument("--rng-seed", type=int, default=1)
+    target = run_parser.add_mutually_exclusive_group()
+    target.add_argument("--base-url", help="Target an already running server")
+    target.add_argument("--spawn", action="store_true", help="Start a local uvicorn instance")
+    run_parser.add_argument("--port", type=int, default=8765)
+    run_parser.add_argument("--workers", type=int, default=1, help="uvicorn workers when --spawn is used")
+    run_parser.add_argument("--seed", action="store_true", help="Insert a synthetic league into DATABASE_URL first")
+    run_parser.add_argument("--sqlite", action="store_true",
+                            help="In-process only: serve a seeded temporary SQLite database instead of DATABASE_URL")
+    run_parser.add_argument("--reset-schema", action="store_true", help="DROP and recreate all tables before seeding")
+    run_parser.add_argument("--teams-per-group", type=int, default=10)
+    run_parser.add_argument("--legs", type=int, default=2)
+    run_parser.add_argument("--seasons", type=int, default=1,
+                            help="Seasons to generate; all but the current one are finished history")
+    run_parser.add_argument("--admin-username", default=os.environ.get("ADMIN_USERNAME", BENCH_ADMIN_USERNAME))
+    run_parser.add_argument("--admin-password", default=os.environ.get("ADMIN_PASSWORD", BENCH_ADMIN_PASSWORD))
+    run_parser.add_argument("--output", help="Write JSON results to this file")
+
+    compare_parser = sub.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        compare(args.base, args.new)
+        return
+
+    results = asyncio.run(run(args))
+    print_report(results)
+    if args.output:
+        output = Path(args.output)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"\n✅ Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Profile the services layer against an in-memory SQLite league.
+
+Usage (from the backend directory):
+    python -m perf.profile_services --teams-per-group 32 --legs 2
+    python -m perf.profile_services --target standings --sort tottime --limit 40
+    python -m perf.profile_services --seasons 5   # current season behind four finished ones
+"""
+import argparse
+import asyncio
+import cProfile
+import pstats
+import sys
+import time
+from pathlib import Path
+
+# Allow running as a plain script as well as with -m
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.sqlite import create_sqlite_session_factory
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.schemas.team import TeamPlayerCreate
+from app.services.standings import calculate_standings
+from app.services.match_service import enter_match_result
+from app.services.team_service import validate_team_creation, archive_team, activate_team
+from perf.dataset import generate_league, seed_database
+
+RESULT = MatchResultCreate(sets=[
+    MatchSetCreate(set_number=1, home_games=6, away_games=3),
+    MatchSetCreate(set_number=2, home_games=4, away_games=6),
+    MatchSetCreate(set_number=3, home_games=7, away_games=6),
+])
+
+
+async def workload(session_factory, league, target: str, iterations: int) -> None:
+    scheduled = league.scheduled_matches
+    team = next(t for t in league.teams if t.season_id == league.current_season.id)
+    roster = [TeamPlayerCreate(player_id=tp.player_id, role=tp.role.value.lower()) for tp in team.team_players]
+
+    for i in range(iterations):
+        async with session_factory() as session:
+            if target in ("all", "standings"):
+                await calculate_standings(session)
+            if target in ("all", "match_service") and scheduled:
+                await enter_match_result(session, scheduled[i % len(scheduled)].id, RESULT)
+                await session.rollback()
+            if target in ("all", "team_service"):
+                await validate_team_creation(roster, session)
+                await archive_team(session, team.id)
+                await activate_team(session, team.id)
+                await session.rollback()
+
+
+async def main(args: argparse.Namespace) -> None:
+    started = time.perf_counter()
+    league = generate_league(teams_per_group=args.teams_per_group, legs=args.legs, seasons=args.seasons, with_admin=False)
+    session_factory = await create_sqlite_session_factory()
+    await seed_database(session_factory, league)
+    print(f"Seeded {len(league.seasons)} seasons, {len(league.teams)} teams, {len(league.matches)} matches, "
+          f"{len(league.match_sets)} sets in {(time.perf_counter() - started) * 1000:.0f}ms")
+
+    # Warm up caches (statement compilation, imports) outside the profile
+    await workload(session_factory, league, args.target, 1)
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    await workload(session_factory, league, args.target, args.iterations)
+    profiler.disable()
+    elapsed = (time.perf_counter() - started) * 1000
+    print(f"{args.iterations} iterations of '{args.target}' in {elapsed:.1f}ms "
+          f"({elapsed / args.iterations:.2f}ms each)\n")
+
+    stats = pstats.Stats(profiler).sort_stats(args.sort)
+    stats.print_stats(args.limit)
+    if args.output:
+        stats.dump_stats(args.output)
+        print(f"Profile written to {args.output} (open with snakeviz or pstats)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Profile services against an in-memory SQLite league")
+    parser.add_argument("--target", choices=["all", "standings", "match_service", "team_service"], default="all")
+    parser.add_argument("--teams-per-group", type=int, default=16)
+    parser.add_argument("--legs", type=int, default=2)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--sort", default="cumulative", help="pstats sort key")
+    parser.add_argument("--limit", type=int, default=25, help="Rows of the profile to print")
+    parser.add_argument("--output", help="Also dump raw profile data to this file")
+    asyncio.run(main(parser.parse_args()))
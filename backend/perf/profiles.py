@@ -0,0 +1,122 @@
+"""
+Weighted traffic profiles replayed by the load-test harness.
+
+A profile is a list of operations with relative weights. Path templates may use
+{team_id}, {match_id} and {group} placeholders, which are filled from the ids
+discovered on the target server before the run starts.
+"""
+import json
+import random
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+API = "/api/v1"
+
+
+@dataclass
+class Operation:
+    """A single request type in a traffic mix"""
+    name: str
+    method: str
+    path: str
+    weight: float
+    admin: bool = False
+    body: Optional[Callable[[random.Random], dict]] = None
+
+
+@dataclass
+class TrafficProfile:
+    """Named, weighted mix of operations"""
+    name: str
+    description: str
+    operations: List[Operation] = field(default_factory=list)
+
+
+def random_result_body(rng: random.Random) -> dict:
+    """Body for POST /admin/matches/{id}/result - a random completed best-of-3"""
+    scores = [(6, 2), (6, 4), (7, 5), (7, 6), (6, 3)]
+    sets = []
+    home_first = rng.random() < 0.5
+    pattern = [home_first, not home_first, rng.random() < 0.5] if rng.random() < 0.4 else [home_first, home_first]
+    for set_number, home_won in enumerate(pattern, start=1):
+        winner, loser = rng.choice(scores)
+        sets.append({
+            "set_number": set_number,
+            "home_games": winner if home_won else loser,
+            "away_games": loser if home_won else winner,
+        })
+    return {"sets": sets}
+
+
+PROFILES: Dict[str, TrafficProfile] = {
+    "public-browse": TrafficProfile(
+        name="public-browse",
+        description="Ordinary day: fans browsing teams, fixtures and the table",
+        operations=[
+            Operation("list_teams", "GET", f"{API}/public/teams/", 20),
+            Operation("get_team", "GET", f"{API}/public/teams/{{team_id}}", 15),
+            Operation("list_matches", "GET", f"{API}/public/matches/", 20),
+            Operation("list_matches_group", "GET", f"{API}/public/matches/?group={{group}}", 10),
+            Operation("get_match", "GET", f"{API}/public/matches/{{match_id}}", 10),
+            Operation("standings", "GET", f"{API}/public/standings/", 15),
+            Operation("standings_group", "GET", f"{API}/public/standings/?group={{group}}", 10),
+        ],
+    ),
+    "match-night": TrafficProfile(
+        name="match-night",
+        description="Results night: a read storm on standings and fixtures plus admin result entries",
+        operations=[
+            Operation("standings", "GET", f"{API}/public/standings/", 30),
+            Operation("standings_group", "GET", f"{API}/public/standings/?group={{group}}", 20),
+            Operation("list_matches_played", "GET", f"{API}/public/matches/?status=played", 20),
+            Operation("list_matches", "GET", f"{API}/public/matches/", 10),
+            Operation("get_team", "GET", f"{API}/public/teams/{{team_id}}", 10),
+            Operation("team_standing", "GET", f"{API}/public/standings/teams/{{team_id}}", 8),
+            Operation("enter_result", "POST", f"{API}/admin/matches/{{match_id}}/result", 2, admin=True, body=random_result_body),
+        ],
+    ),
+    "standings-only": TrafficProfile(
+        name="standings-only",
+        description="Isolates the standings computation",
+        operations=[
+            Operation("standings", "GET", f"{API}/public/standings/", 1),
+        ],
+    ),
+}
+
+
+def load_profile(name_or_path: str) -> TrafficProfile:
+    """
+    Resolve a built-in profile by name, or load a recorded profile from JSON.
+
+    Recorded profile format:
+        {"name": "...", "description": "...",
+         "operations": [{"name": "...", "method": "GET", "path": "/api/v1/...", "weight": 3}]}
+
+    Admin operations ("admin": true) with a POST to .../result get a random result body.
+    """
+    if name_or_path in PROFILES:
+        return PROFILES[name_or_path]
+
+    path = Path(name_or_path)
+    if not path.exists():
+        raise ValueError(
+            f"Unknown profile '{name_or_path}'. "
+            f"Built-in profiles: {', '.join(PROFILES)}; or pass a path to a JSON profile."
+        )
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    operations = []
+    for op in data["operations"]:
+        method = op.get("method", "GET").upper()
+        body = random_result_body if method == "POST" and op["path"].endswith("/result") else None
+        operations.append(Operation(
+            name=op.get("name", f"{method} {op['path']}"),
+            method=method,
+            path=op["path"],
+            weight=float(op.get("weight", 1)),
+            admin=bool(op.get("admin", False)),
+            body=body,
+        ))
+    return TrafficProfile(name=data.get("name", path.stem), description=data.get("description", ""), operations=operations)
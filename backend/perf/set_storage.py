@@ -0,0 +1,120 @@
+"""
+Compare the two set score storage modes (MATCH_SET_STORAGE=rows|array).
+
+Seeds the same synthetic league once per mode and reports the bytes taken
+by matches + match_sets (tables and indexes) and the latency of reading a
+season's matches with their sets the way the endpoints do.
+
+Usage (from the backend directory):
+    python -m perf.set_storage                                  # temporary SQLite files
+    python -m perf.set_storage --url postgresql+asyncpg://...   # wipes and reseeds that database
+    python -m perf.set_storage --teams-per-group 32 --seasons 5 --rounds 50
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+# Allow running as a plain script as well as with -m
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+
+from app.core.config import settings
+from app.core.database import Base
+from app.core.sqlite import create_sqlite_engine
+from app.models.match import Match
+from app.schemas.match import MatchSetResponse
+from app.services.match_service import match_set_responses, match_sets_option
+from perf.dataset import SyntheticLeague, generate_league, seed_database
+
+MODES = ("rows", "array")
+
+
+async def read_season_sets(db: AsyncSession, season_id) -> List[List[MatchSetResponse]]:
+    """A season's matches with their set responses, as the match endpoints load them"""
+    result = await db.execute(select(Match).where(Match.season_id == season_id).options(match_sets_option()))
+    return [match_set_responses(match) for match in result.scalars().all()]
+
+
+async def storage_bytes(engine) -> int:
+    """Bytes of matches + match_sets with their indexes"""
+    async with engine.connect() as conn:
+        if engine.dialect.name == "postgresql":
+            return await conn.scalar(text(
+                "SELECT pg_total_relation_size('matches') + pg_total_relation_size('match_sets')"
+            ))
+        # dbstat is compiled into the SQLite shipped with CPython on most platforms
+        return await conn.scalar(text(
+            "SELECT sum(pgsize) FROM dbstat WHERE name IN "
+            "(SELECT name FROM sqlite_master WHERE tbl_name IN ('matches', 'match_sets'))"
+        ))
+
+
+async def measure(engine, league: SyntheticLeague, mode: str, rounds: int = 20) -> dict:
+    """Seed `league` in `mode` into a wiped database and measure it"""
+    previous = settings.MATCH_SET_STORAGE
+    settings.MATCH_SET_STORAGE = mode
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        await seed_database(factory, league)
+        if engine.dialect.name == "postgresql":
+            async with engine.connect() as conn:
+                await conn.execute(text("ANALYZE"))
+
+        season_id = league.current_season.id
+        samples = []
+        for i in range(rounds + 1):
+            async with factory() as db:
+                started = time.perf_counter()
+                sets = await read_season_sets(db, season_id)
+                if i:  # First round warms up
+                    samples.append((time.perf_counter() - started) * 1000.0)
+        return {
+            "matches": len(sets),
+            "sets": sum(len(s) for s in sets),
+            "bytes": await storage_bytes(engine),
+            "read_median_ms": round(statistics.median(samples), 3),
+        }
+    finally:
+        settings.MATCH_SET_STORAGE = previous
+
+
+async def compare(url: Optional[str], league: SyntheticLeague, rounds: int) -> Dict[str, dict]:
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in MODES:
+            engine = create_async_engine(url) if url else create_sqlite_engine(str(Path(tmp) / f"{mode}.sqlite3"))
+            try:
+                results[mode] = await measure(engine, league, mode, rounds)
+            finally:
+                await engine.dispose()
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Storage size and read latency of rows vs array set storage")
+    parser.add_argument("--url", help="PostgreSQL URL to wipe and seed (default: temporary SQLite files)")
+    parser.add_argument("--teams-per-group", type=int, default=32)
+    parser.add_argument("--legs", type=int, default=2)
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    league = generate_league(teams_per_group=args.teams_per_group, legs=args.legs, seasons=args.seasons)
+    results = asyncio.run(compare(args.url, league, args.rounds))
+    print(f"{'storage':<8}{'matches':>9}{'sets':>8}{'KiB':>10}{'read ms':>10}")
+    for mode, r in results.items():
+        print(f"{mode:<8}{r['matches']:>9}{r['sets']:>8}{r['bytes'] / 1024:>10.1f}{r['read_median_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+Compare UUIDv4 and UUIDv7 primary keys on PostgreSQL.
+
+Inserts the same match rows into two match-shaped tables, one keyed by
+random v4 ids and one by time-ordered v7 ids (app.core.types.uuid7), in
+batches of one transaction each, and reports per key kind:
+insert throughput, primary-key index size, leaf density (with the
+pgstattuple extension, if it can be created) and WAL written.
+
+Usage (from the backend directory):
+    python -m perf.uuid_keys                        # 1,000,000 matches into DATABASE_URL
+    python -m perf.uuid_keys --rows 200000 --batch 1000 --url postgresql://localhost/padel_bench
+    python -m perf.uuid_keys --output results/uuid_keys.json
+
+The tables (uuid_keys_v4, uuid_keys_v7) are dropped afterwards unless --keep.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+# Allow running as a plain script as well as with -m
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.types import uuid7
+
+GENERATORS: Dict[str, Callable[[], uuid.UUID]] = {"v4": uuid.uuid4, "v7": uuid7}
+
+_COLUMNS = ["id", "season_id", "division_id", "date", "home_team_id", "away_team_id", "status"]
+
+
+def _dsn(url: str) -> str:
+    """asyncpg DSN from a SQLAlchemy URL"""
+    return url.replace("postgresql+asyncpg://", "postgresql://", 1)
+
+
+def _payloads(rows: int, seed: int = 7) -> List[tuple]:
+    """Match columns after the id: ~60 seasons of 16 teams in 2 groups"""
+    rng = random.Random(seed)
+    seasons = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(max(1, rows // 16_000))]
+    divisions = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(2 * len(seasons))]
+    teams = [uuid.UUID(int=rng.getrandbits(128), version=4) for _ in range(32 * len(seasons))]
+    start = datetime(2020, 1, 1)
+    payloads = []
+    for i in range(rows):
+        season = i * len(seasons) // rows
+        group = season * 2 + rng.randrange(2)
+        home, away = rng.sample(range(16), 2)
+        payloads.append((
+            seasons[season],
+            divisions[group],
+            start + timedelta(minutes=90 * i),
+            teams[group * 16 + home],
+            teams[group * 16 + away],
+            "played",
+        ))
+    return payloads
+
+
+async def measure(conn, kind: str, payloads: List[tuple], batch: int = 10_000, keep: bool = False) -> dict:
+    """Insert `payloads` into uuid_keys_<kind> with ids from GENERATORS[kind]"""
+    table = f"uuid_keys_{kind}"
+    generate = GENERATORS[kind]
+    await conn.execute(f"DROP TABLE IF EXISTS {table}")
+    await conn.execute(
+        f"CREATE TABLE {table} (id uuid PRIMARY KEY, season_id uuid NOT NULL, division_id uuid NOT NULL, "
+        "date timestamp NOT NULL, home_team_id uuid NOT NULL, away_team_id uuid NOT NULL, status text NOT NULL)"
+    )
+    await conn.execute("CHECKPOINT")
+    wal_start = await conn.fetchval("SELECT pg_current_wal_insert_lsn()")
+
+    seconds = 0.0
+    for start in range(0, len(payloads), batch):
+        # Ids are drawn as rows are written, like the ORM default does
+        records = [(generate(), *payload) for payload in payloads[start:start + batch]]
+        started = time.perf_counter()
+        async with conn.transaction():
+            await conn.copy_records_to_table(table, records=records, columns=_COLUMNS)
+        seconds += time.perf_counter() - started
+
+    wal_bytes = await conn.fetchval("SELECT pg_wal_lsn_diff(pg_current_wal_insert_lsn(), $1)", wal_start)
+    index_bytes = await conn.fetchval(f"SELECT pg_relation_size('{table}_pkey')")
+    density = None
+    try:
+        density = await conn.fetchval(f"SELECT avg_leaf_density FROM pgstatindex('{table}_pkey')")
+    except Exception:
+        pass  # pgstattuple not available
+    if not keep:
+        await conn.execute(f"DROP TABLE {table}")
+    return {
+        "rows": len(payloads),
+        "seconds": round(seconds, 3),
+        "rows_per_second": round(len(payloads) / seconds) if seconds else None,
+        "index_bytes": index_bytes,
+        "leaf_density": round(float(density), 1) if density is not None else None,
+        "wal_bytes": int(wal_bytes),
+    }
+
+
+async def compare(url: str, rows: int, batch: int = 10_000, keep: bool = False) -> Dict[str, dict]:
+    """v4 and v7 measured on the same rows"""
+    import asyncpg
+
+    payloads = _payloads(rows)
+    conn = await asyncpg.connect(_dsn(url))
+    try:
+        try:
+            await conn.execute("CREATE EXTENSION IF NOT EXISTS pgstattuple")
+        except Exception:
+            pass
+        return {kind: await measure(conn, kind, payloads, batch, keep) for kind in GENERATORS}
+    finally:
+        await conn.close()
+
+
+def print_report(results: Dict[str, dict]) -> None:
+    print(f"{'keys':<6}{'rows':>10}{'seconds':>10}{'rows/s':>10}{'pkey MiB':>10}{'density %':>11}{'WAL MiB':>9}")
+    for kind, r in results.items():
+        density = f"{r['leaf_density']:.1f}" if r["leaf_density"] is not None else "-"
+        print(
+            f"{kind:<6}{r['rows']:>10}{r['seconds']:>10.2f}{r['rows_per_second']:>10}"
+            f"{r['index_bytes'] / 2**20:>10.1f}{density:>11}{r['wal_bytes'] / 2**20:>9.1f}"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Insert throughput and index size of v4 vs v7 primary keys")
+    parser.add_argument("--url", default=os.environ.get("DATABASE_URL"), help="PostgreSQL URL (default: DATABASE_URL)")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=10_000, help="Rows per insert transaction")
+    parser.add_argument("--keep", action="store_true", help="Keep the tables for inspection")
+    parser.add_argument("--output", help="Also write the results as JSON")
+    args = parser.parse_args(argv)
+    if not args.url:
+        parser.error("--url or DATABASE_URL is required")
+
+    results = asyncio.run(compare(args.url, args.rows, args.batch, args.keep))
+    print_report(results)
+    if args.output:
+        Path(args.output).parent.mkdir(parents=True, exist_ok=True)
+        Path(args.output).write_text(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
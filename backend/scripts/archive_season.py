@@ -0,0 +1,94 @@
+"""
+Script to archive a finished season
+
+Exports the season's teams, matches, sets and final standings to Arrow IPC
+files in SEASON_ARCHIVE_DIR and removes them from the database. Public
+endpoints keep serving the season from the archive.
+
+Usage:
+    python scripts/archive_season.py --list
+    python scripts/archive_season.py "Season 2025" --dry-run
+    python scripts/archive_season.py <season-id>
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.models.season import Season
+from app.services.season_archive import archive_season, season_archive_path
+from app.exceptions import NotFoundError
+
+
+async def list_seasons():
+    """List seasons with their archive state"""
+    async with AsyncSessionLocal() as session:
+        result = await session.execute(
+            select(Season).order_by(Season.start_date.desc().nulls_last(), Season.name.desc())
+        )
+        for season in result.scalars().all():
+            if season.is_current:
+                state = "current"
+            elif season.archived_at:
+                state = f"archived {season.archived_at:%Y-%m-%d}"
+            else:
+                state = "-"
+            print(f"{season.id}  {season.name:<30} {state}")
+
+
+async def find_season_id(session, season: str) -> UUID:
+    try:
+        return UUID(season)
+    except ValueError:
+        pass
+    result = await session.execute(select(Season.id).where(Season.name == season))
+    season_id = result.scalar_one_or_none()
+    if season_id is None:
+        raise NotFoundError(f"Season '{season}' not found")
+    return season_id
+
+
+async def run(season: str, dry_run: bool) -> int:
+    """Archive one season; returns the process exit code"""
+    async with AsyncSessionLocal() as session:
+        try:
+            season_id = await find_season_id(session, season)
+            manifest = await archive_season(session, season_id, dry_run=dry_run)
+        except (NotFoundError, ValueError) as e:
+            await session.rollback()
+            print(f"❌ {e}", file=sys.stderr)
+            return 1
+
+    for name, info in manifest["files"].items():
+        size = f" ({info['bytes'] / 1024:.1f} KiB)" if "bytes" in info else ""
+        print(f"  {name:<10} {info['rows']:>7} rows{size}")
+    if dry_run:
+        print(f"Dry run - '{manifest['season_name']}' was not archived")
+    else:
+        print(f"✅ Archived '{manifest['season_name']}' to {season_archive_path(season_id)}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("season", nargs="?", help="Season name or id")
+    parser.add_argument("--dry-run", action="store_true", help="Only show what would be archived")
+    parser.add_argument("--list", action="store_true", help="List seasons and whether they are archived")
+    args = parser.parse_args()
+
+    if args.list:
+        asyncio.run(list_seasons())
+        return 0
+    if not args.season:
+        parser.error("season is required unless --list is given")
+    return asyncio.run(run(args.season, args.dry_run))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+"""
+Local stand-in for a CDN purge API
+
+Accepts the requests of the http purge client (app/core/cdn.py) and records
+them, so surrogate-key purging can be tested end to end without a CDN.
+
+Usage:
+    python scripts/cdn_purge_standin.py --port 8787
+    CDN_PURGE_BACKEND=http CDN_PURGE_URL=http://127.0.0.1:8787/purge uvicorn app.main:app
+
+    POST /purge     {"surrogate_keys": [...]} or {"purge_all": true}
+    GET  /purges    recorded purges as JSON
+    DELETE /purges  forget recorded purges
+
+Tests can run it in-process: `with PurgeStandIn() as standin: ... standin.purges`.
+"""
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, Optional
+
+
+class PurgeStandIn:
+    """Records purge requests; runs in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, token: Optional[str] = None, verbose: bool = False) -> None:
+        self.purges: List[dict] = []
+        self.token = token
+        self.verbose = verbose
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/purge"
+
+    @property
+    def keys(self) -> List[str]:
+        """All purged surrogate keys in order"""
+        with self._lock:
+            return [key for purge in self.purges for key in purge.get("surrogate_keys", [])]
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status: int, body: object) -> None:
+                data = json.dumps(body).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_POST(self):
+                if self.path != "/purge":
+                    return self._reply(404, {"detail": "Not found"})
+                if standin.token and self.headers.get("Authorization") != f"Bearer {standin.token}":
+                    return self._reply(401, {"detail": "Invalid token"})
+                try:
+                    payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                except ValueError:
+                    return self._reply(400, {"detail": "Invalid JSON"})
+                purge = {
+                    "time": time.time(),
+                    "surrogate_keys": list(payload.get("surrogate_keys", [])),
+                    "purge_all": bool(payload.get("purge_all", False)),
+                }
+                with standin._lock:
+                    standin.purges.append(purge)
+                if standin.verbose:
+                    keys = "ALL" if purge["purge_all"] else " ".join(purge["surrogate_keys"])
+                    print(f"purge: {keys}", flush=True)
+                self._reply(200, {"status": "ok"})
+
+            def do_GET(self):
+                if self.path != "/purges":
+                    return self._reply(404, {"detail": "Not found"})
+                with standin._lock:
+                    self._reply(200, list(standin.purges))
+
+            def do_DELETE(self):
+                if self.path != "/purges":
+                    return self._reply(404, {"detail": "Not found"})
+                with standin._lock:
+                    standin.purges.clear()
+                self._reply(200, {"status": "ok"})
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "PurgeStandIn":
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> "PurgeStandIn":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record CDN purge requests locally")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--token", default=None, help="Require 'Authorization: Bearer <token>'")
+    args = parser.parse_args()
+
+    standin = PurgeStandIn(args.host, args.port, token=args.token, verbose=True)
+    print(f"✓ CDN purge stand-in listening on {standin.url}", flush=True)
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        standin._server.server_close()
+
+
+if __name__ == "__main__":
+    main()
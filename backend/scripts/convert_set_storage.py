@@ -0,0 +1,48 @@
+"""
+Script to convert set scores between the two storage modes
+
+MATCH_SET_STORAGE=array reads set scores from matches.set_scores, which is
+kept up to date in both modes; results entered in array mode have no
+match_sets rows. Run this when switching:
+
+Usage:
+    python scripts/convert_set_storage.py --to array   # after switching to array: delete the redundant rows
+    python scripts/convert_set_storage.py --to rows    # before switching back to rows: rebuild the rows
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from app.core.database import AsyncSessionLocal
+from app.core.invalidation import ALL, publish
+from app.services.match_service import drop_set_rows, restore_set_rows
+
+
+async def run(to: str) -> None:
+    async with AsyncSessionLocal() as session:
+        if to == "rows":
+            count = await restore_set_rows(session)
+            message = f"Rebuilt the set rows of {count} matches"
+        else:
+            count = await drop_set_rows(session)
+            message = f"Deleted {count} set rows held in set_scores"
+        # Set ids differ between the modes: drop every cached response
+        await publish(session, ALL)
+        await session.commit()
+    print(f"✅ {message}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--to", choices=["rows", "array"], required=True, help="Storage mode being switched to")
+    args = parser.parse_args()
+    asyncio.run(run(args.to))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
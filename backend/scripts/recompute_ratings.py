@@ -0,0 +1,53 @@
+"""
+Script to replay the team ratings of seasons from their results
+
+Results keep ratings up to date as they are entered; run this after the
+migration that adds ratings (results entered before it are unrated) or after
+changing RATING_INITIAL / RATING_K.
+
+Usage:
+    python scripts/recompute_ratings.py              # every season that isn't archived
+    python scripts/recompute_ratings.py <season-id>
+"""
+import argparse
+import asyncio
+import sys
+from pathlib import Path
+from typing import Optional
+from uuid import UUID
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from sqlalchemy import select
+from app.core.database import AsyncSessionLocal
+from app.models.season import Season
+from app.services.ratings import recompute_ratings
+
+
+async def run(season_id: Optional[UUID]) -> None:
+    async with AsyncSessionLocal() as session:
+        query = select(Season.id, Season.name).where(Season.archived_at.is_(None))
+        if season_id is not None:
+            query = query.where(Season.id == season_id)
+        seasons = (await session.execute(query)).all()
+        if not seasons:
+            print("❌ No season to recompute")
+            return
+        for season_id, name in seasons:
+            # One transaction per season: readers see a season's old or new ratings, never a mix
+            applied = await recompute_ratings(session, season_id)
+            await session.commit()
+            print(f"✅ {name}: rated {applied} matches")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("season_id", nargs="?", type=UUID, help="Season to recompute (default: all not archived)")
+    args = parser.parse_args()
+    asyncio.run(run(args.season_id))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -37,5 +37,10 @@ echo "Starting server..."
 # Start the application
 # Render provides PORT env var, default to 8000
 PORT=${PORT:-8000}
-exec uvicorn app.main:app --host 0.0.0.0 --port $PORT
+
+# Worker count comes from Settings (WORKERS env var or .env), default 1.
+# Workers keep their in-process caches coherent through Postgres LISTEN/NOTIFY.
+WORKERS=$(python -c "from app.core.config import settings; print(settings.WORKERS)" 2>/dev/null || echo 1)
+echo "Starting uvicorn with $WORKERS worker(s)..."
+exec uvicorn app.main:app --host 0.0.0.0 --port $PORT --workers $WORKERS
 
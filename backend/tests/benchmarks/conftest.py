@@ -0,0 +1,282 @@
+"""
+Benchmark harness: timing fixture, synthetic datasets and baseline comparison.
+
+Benchmarks are deselected from the normal suite (pytest.ini) and run only when
+selected with -m benchmark:
+
+    pytest tests/benchmarks -m benchmark                  # compare against baseline.json
+    pytest tests/benchmarks -m benchmark --bench-save     # record a new baseline
+    pytest tests/benchmarks -m benchmark --bench-threshold 0.3
+    pytest tests/benchmarks -m benchmark --bench-require-baseline
+
+A benchmark fails when both its fastest round and its median are slower than
+the baseline's by more than the threshold (default 50%, or
+BENCH_REGRESSION_THRESHOLD). The fastest round is the one least disturbed by
+other load on the machine; also requiring the median keeps one lucky round in
+the baseline from failing later runs. Benchmarks without a baseline entry are
+reported as "new" and only fail with --bench-require-baseline (or
+BENCH_REQUIRE_BASELINE=1), which the CI benchmark job sets so that a missing
+or outdated baseline can't silently turn the check off. Database benchmarks
+run on SQLite files by default; set BENCH_DATABASE_URL to run them on
+PostgreSQL instead (the database is wiped and reseeded - never point it at
+real data).
+
+baseline.json is committed. Timings depend on the machine, so refresh it on
+the machine that runs the check, after a deliberate performance change or
+when adding benchmarks; --bench-save merges into the existing entries, so
+record both databases:
+
+    pytest tests/benchmarks -m benchmark --bench-save
+    BENCH_DATABASE_URL=postgresql+asyncpg://... pytest tests/benchmarks -m benchmark --bench-save
+"""
+import json
+import os
+import statistics
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Awaitable, Callable, Dict, Optional
+
+import pytest
+
+from perf.dataset import SyntheticLeague, generate_league, seed_database
+
+BENCH_DATABASE_URL = os.environ.get("BENCH_DATABASE_URL")
+
+# Fixed synthetic dataset sizes: (teams per group, legs, seasons)
+DATASET_SIZES = {
+    "small": (8, 1, 1),
+    "medium": (16, 2, 1),
+    "large": (32, 2, 1),
+    # The medium league behind four finished seasons; season-scoped queries
+    # should cost about the same as on "medium"
+    "history": (16, 2, 5),
+}
+
+# Sizes every `league` / `bench_db` benchmark runs on unless parametrized explicitly
+DEFAULT_SIZES = ["small", "medium", "large"]
+
+# Collected by the `benchmark` fixture, written by --bench-save
+_results: Dict[str, dict] = {}
+
+
+def _load_baseline(path: Path) -> Dict[str, dict]:
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text(encoding="utf-8")).get("benchmarks", {})
+
+
+@dataclass
+class Timing:
+    name: str
+    rounds: int
+    median_ms: float
+    min_ms: float
+    max_ms: float
+
+    def as_dict(self) -> dict:
+        return {
+            "rounds": self.rounds,
+            "median_ms": round(self.median_ms, 4),
+            "min_ms": round(self.min_ms, 4),
+            "max_ms": round(self.max_ms, 4),
+        }
+
+
+def is_regression(baseline: dict, timing: Timing, threshold: float) -> bool:
+    """Fastest round and median both slower than the baseline's by more than `threshold`"""
+    limit = 1 + threshold
+    return timing.min_ms > baseline["min_ms"] * limit and timing.median_ms > baseline["median_ms"] * limit
+
+
+def format_regression(name: str, baseline: dict, timing: Timing, threshold: float) -> str:
+    """Readable baseline-vs-current diff used as the failure message"""
+    change = (timing.min_ms - baseline["min_ms"]) / baseline["min_ms"]
+    return "\n".join([
+        f"Benchmark regression: {name}",
+        f"  {'':<10}{'baseline':>12}{'current':>12}",
+        f"  {'median':<10}{baseline['median_ms']:>10.3f}ms{timing.median_ms:>10.3f}ms",
+        f"  {'min':<10}{baseline['min_ms']:>10.3f}ms{timing.min_ms:>10.3f}ms",
+        f"  {'max':<10}{baseline['max_ms']:>10.3f}ms{timing.max_ms:>10.3f}ms",
+        f"  min change {change:+.1%} (and median) exceeds threshold +{threshold:.0%}",
+    ])
+
+
+class Benchmark:
+    """Times a callable, records the result and checks it against the baseline"""
+
+    def __init__(self, name: str, config: pytest.Config, baseline: Dict[str, dict]) -> None:
+        self.name = name
+        self.threshold = config.getoption("--bench-threshold")
+        self.rounds_override = config.getoption("--bench-rounds")
+        self.require_baseline = config.getoption("--bench-require-baseline") and not config.getoption("--bench-save")
+        self.baseline = baseline
+
+    def _finish(self, samples: list) -> Timing:
+        timing = Timing(
+            name=self.name,
+            rounds=len(samples),
+            median_ms=statistics.median(samples),
+            min_ms=min(samples),
+            max_ms=max(samples),
+        )
+        _results[self.name] = timing.as_dict()
+
+        baseline = self.baseline.get(self.name)
+        if baseline is None and self.require_baseline:
+            pytest.fail(f"No baseline for benchmark {self.name} (record it with --bench-save)", pytrace=False)
+        if baseline and is_regression(baseline, timing, self.threshold):
+            pytest.fail(format_regression(self.name, baseline, timing, self.threshold), pytrace=False)
+        return timing
+
+    def __call__(self, fn: Callable, *args, rounds: int = 20, warmup: int = 1, **kwargs) -> Timing:
+        rounds = self.rounds_override or rounds
+        for _ in range(warmup):
+            fn(*args, **kwargs)
+        samples = []
+        for _ in range(rounds):
+            started = time.perf_counter()
+            fn(*args, **kwargs)
+            samples.append((time.perf_counter() - started) * 1000.0)
+        return self._finish(samples)
+
+    async def run_async(
+        self,
+        fn: Callable[[], Awaitable],
+        rounds: int = 10,
+        warmup: int = 1,
+        setup: Optional[Callable[[], Awaitable]] = None,
+    ) -> Timing:
+        """Time an async callable; `setup` runs untimed before every call"""
+        rounds = self.rounds_override or rounds
+        samples = []
+        for i in range(warmup + rounds):
+            if setup is not None:
+                await setup()
+            started = time.perf_counter()
+            await fn()
+            elapsed = (time.perf_counter() - started) * 1000.0
+            if i >= warmup:
+                samples.append(elapsed)
+        return self._finish(samples)
+
+
+@pytest.fixture(scope="session")
+def bench_baseline(pytestconfig) -> Dict[str, dict]:
+    return _load_baseline(Path(pytestconfig.getoption("--bench-baseline")))
+
+
+@pytest.fixture
+def benchmark(request, pytestconfig, bench_baseline) -> Benchmark:
+    name = request.node.name
+    if "bench_db" in request.fixturenames:
+        # SQLite and PostgreSQL timings are not comparable - keep separate baselines
+        name += "@postgresql" if BENCH_DATABASE_URL else "@sqlite"
+    return Benchmark(name, pytestconfig, bench_baseline)
+
+
+_leagues: Dict[str, SyntheticLeague] = {}
+
+
+def get_league(size: str) -> SyntheticLeague:
+    """Synthetic league for a named size, generated once per session"""
+    if size not in _leagues:
+        teams_per_group, legs, seasons = DATASET_SIZES[size]
+        _leagues[size] = generate_league(
+            teams_per_group=teams_per_group,
+            legs=legs,
+            seasons=seasons,
+            with_admin=(size == "small"),
+        )
+    return _leagues[size]
+
+
+@pytest.fixture(params=DEFAULT_SIZES)
+def league(request) -> SyntheticLeague:
+    return get_league(request.param)
+
+
+_seeded: Dict[str, str] = {}
+
+
+async def _reset_and_seed(url: str, league: SyntheticLeague) -> None:
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+    from app.core.database import Base
+
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.drop_all)
+            await conn.run_sync(Base.metadata.create_all)
+        await seed_database(async_sessionmaker(engine, expire_on_commit=False), league)
+    finally:
+        await engine.dispose()
+
+
+@pytest.fixture(params=DEFAULT_SIZES)
+async def bench_db(request, tmp_path_factory):
+    """
+    Session factory for a database holding the synthetic league of the requested size.
+
+    Uses BENCH_DATABASE_URL (PostgreSQL) when set, otherwise a SQLite file per
+    dataset size. PostgreSQL is only reseeded when the size changes between tests.
+    Parametrize indirectly to pick other sizes:
+    @pytest.mark.parametrize("bench_db", ["history"], indirect=True)
+    """
+    from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+    from app.core.invalidation import ALL, invalidate_local
+    from app.core.sqlite import create_sqlite_engine
+
+    size = request.param
+    league = get_league(size)
+
+    if BENCH_DATABASE_URL:
+        if _seeded.get("postgresql") != size:
+            await _reset_and_seed(BENCH_DATABASE_URL, league)
+            _seeded["postgresql"] = size
+        engine = create_async_engine(BENCH_DATABASE_URL)
+    else:
+        if size not in _seeded:
+            path = tmp_path_factory.mktemp("bench") / f"{size}.sqlite3"
+            await _reset_and_seed(f"sqlite+aiosqlite:///{path}", league)
+            _seeded[size] = str(path)
+        engine = create_sqlite_engine(_seeded[size])
+
+    factory = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False, autoflush=False)
+    # Every database has its own current season - drop per-process caches
+    invalidate_local({ALL})
+    try:
+        yield factory, league
+    finally:
+        await engine.dispose()
+
+
+def pytest_collection_modifyitems(config, items):
+    if BENCH_DATABASE_URL:
+        return
+    skip = pytest.mark.skip(reason="requires PostgreSQL (set BENCH_DATABASE_URL)")
+    for item in items:
+        if "postgres" in item.keywords:
+            item.add_marker(skip)
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    if not _results:
+        return
+    baseline = _load_baseline(Path(config.getoption("--bench-baseline")))
+    terminalreporter.section("benchmarks")
+    terminalreporter.write_line(f"{'benchmark':<60}{'baseline':>12}{'median':>12}{'change':>9}")
+    for name, result in sorted(_results.items()):
+        base = baseline.get(name)
+        if base:
+            change = f"{(result['median_ms'] - base['median_ms']) / base['median_ms']:+.1%}"
+            base_str = f"{base['median_ms']:.3f}ms"
+        else:
+            change, base_str = "new", "-"
+        terminalreporter.write_line(f"{name:<60}{base_str:>12}{result['median_ms']:>10.3f}ms{change:>9}")
+
+    if config.getoption("--bench-save"):
+        path = Path(config.getoption("--bench-baseline"))
+        merged = {**baseline, **_results}
+        path.write_text(json.dumps({"benchmarks": merged}, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        terminalreporter.write_line(f"Baseline written to {path}")
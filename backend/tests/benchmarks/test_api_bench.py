@@ -0,0 +1,168 @@
+"""
+Benchmarks for list-endpoint serialization and admin login
+"""
+from typing import List
+
+import httpx
+import pytest
+from pydantic import TypeAdapter
+
+from app.core.compression import available_encodings, compress
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.response_cache import MemoryResponseCache, get_response_cache, set_response_cache
+from app.core.security import verify_password, create_access_token
+from app.core.sqlite import override_get_db
+from app.main import app
+from app.schemas.match import MatchResponse, MatchSetResponse
+from app.schemas.team import TeamResponse, TeamPlayerResponse
+from perf.dataset import BENCH_ADMIN_USERNAME, BENCH_ADMIN_PASSWORD, generate_league
+
+pytestmark = pytest.mark.benchmark
+
+API = "/api/v1"
+
+
+def _match_responses(matches) -> List[MatchResponse]:
+    """Mirrors the conversion done in the public matches router"""
+    return [
+        MatchResponse(
+            id=match.id,
+            date=match.date,
+            group=match.group,
+            round=match.round,
+            home_team_id=match.home_team_id,
+            away_team_id=match.away_team_id,
+            status=match.status,
+            match_sets=[
+                MatchSetResponse(id=ms.id, set_number=ms.set_number, home_games=ms.home_games, away_games=ms.away_games)
+                for ms in sorted(match.match_sets, key=lambda x: x.set_number)
+            ],
+            home_team_name=match.home_team.name,
+            away_team_name=match.away_team.name,
+        )
+        for match in matches
+    ]
+
+
+def _team_responses(teams) -> List[TeamResponse]:
+    """Mirrors the conversion done in the public teams router"""
+    return [
+        TeamResponse(
+            id=team.id,
+            name=team.name,
+            group=team.group,
+            active=team.active,
+            players=[
+                TeamPlayerResponse(id=tp.player.id, name=tp.player.name, role=tp.role.value.lower())
+                for tp in team.team_players
+            ],
+        )
+        for team in teams
+    ]
+
+
+def test_match_list_serialization(benchmark, league):
+    adapter = TypeAdapter(List[MatchResponse])
+    benchmark(lambda: adapter.dump_json(_match_responses(league.matches)), rounds=10)
+
+
+def test_team_list_serialization(benchmark, league):
+    adapter = TypeAdapter(List[TeamResponse])
+    benchmark(lambda: adapter.dump_json(_team_responses(league.teams)))
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "br"])
+def test_match_list_compression(benchmark, league, encoding):
+    """CPU cost of compressing a match list once; cache hits serve the stored result"""
+    if encoding not in available_encodings():
+        pytest.skip("brotli is not installed")
+    body = TypeAdapter(List[MatchResponse]).dump_json(_match_responses(league.matches))
+    benchmark(compress, body, encoding, rounds=10)
+    assert len(compress(body, encoding)) < len(body) / 3
+
+
+def test_verify_password_and_token(benchmark):
+    league = generate_league(teams_per_group=2, with_admin=True)
+    hashed = league.admin.hashed_password
+
+    def run():
+        assert verify_password(BENCH_ADMIN_PASSWORD, hashed)
+        create_access_token({"sub": str(league.admin.id), "username": league.admin.username})
+
+    benchmark(run, rounds=5)
+
+
+@pytest.fixture
+async def client(bench_db):
+    factory, league = bench_db
+    override_get_db(app, factory)
+    previous_cache = get_response_cache()
+    set_response_cache(None)  # Measure the endpoints; cache hits have their own benchmark
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            yield http, league
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        set_response_cache(previous_cache)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("path", ["/public/teams/", "/public/matches/", "/public/standings/"])
+async def test_list_endpoint(benchmark, client, path):
+    http, _ = client
+
+    async def run():
+        response = await http.get(f"{API}{path}")
+        assert response.status_code == 200
+
+    await benchmark.run_async(run)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("path", ["/public/teams/", "/public/matches/", "/public/standings/"])
+async def test_list_endpoint_cached(benchmark, client, path):
+    """Response cache hit: compare with test_list_endpoint"""
+    http, _ = client
+    set_response_cache(MemoryResponseCache(settings.RESPONSE_CACHE_MAX_BYTES, settings.RESPONSE_CACHE_TTL_SECONDS))
+    expected = (await http.get(f"{API}{path}")).content
+
+    async def run():
+        response = await http.get(f"{API}{path}")
+        assert response.content == expected
+
+    await benchmark.run_async(run)
+
+
+@pytest.mark.db
+async def test_login(benchmark, client):
+    http, league = client
+    if league.admin is None:
+        pytest.skip("Admin user is only seeded with the small dataset")
+
+    async def run():
+        response = await http.post(
+            f"{API}/admin/auth/login",
+            json={"username": BENCH_ADMIN_USERNAME, "password": BENCH_ADMIN_PASSWORD},
+        )
+        assert response.status_code == 200
+
+    await benchmark.run_async(run, rounds=5)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+async def test_match_export(benchmark, client, fmt):
+    """Streamed export of the current season; compare with test_list_endpoint[/public/matches/]"""
+    http, league = client
+    expected = sum(1 for m in league.matches if m.season_id == league.current_season.id)
+
+    async def run():
+        lines = 0
+        async with http.stream("GET", f"{API}/public/matches/export", params={"format": fmt}) as response:
+            assert response.status_code == 200
+            async for chunk in response.aiter_bytes():
+                lines += chunk.count(b"\n")
+        assert lines == expected + (fmt == "csv")
+
+    await benchmark.run_async(run)
@@ -0,0 +1,37 @@
+"""
+Benchmarks for CDN surrogate-key purging against the local stand-in
+
+A round of result entries (one write per match) must reach the CDN as a few
+batched purge requests carrying exactly the published keys.
+"""
+import pytest
+
+from app.core.cdn import HttpPurgeClient, PurgeQueue
+from app.core.invalidation import match_tags
+from scripts.cdn_purge_standin import PurgeStandIn
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def standin():
+    with PurgeStandIn() as server:
+        yield server
+
+
+async def test_purge_round_of_results(benchmark, standin, league):
+    round_matches = [m for m in league.played_matches if m.round == "1"]
+    assert round_matches
+    writes = [match_tags(m.id, m.group) for m in round_matches]
+    expected = sorted(set().union(*writes))
+    queue = PurgeQueue(HttpPurgeClient(standin.url), debounce_s=60, max_delay_s=60, batch_size=64)
+
+    async def run():
+        standin.purges.clear()
+        for tags in writes:
+            queue.add(tags)
+        await queue.close()
+        assert sorted(standin.keys) == expected
+        assert len(standin.purges) == -(-len(expected) // 64)
+
+    await benchmark.run_async(run, rounds=10)
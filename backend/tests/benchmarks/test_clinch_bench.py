@@ -0,0 +1,117 @@
+"""
+Benchmarks for the clinch and elimination bounds
+"""
+import itertools
+import random
+from uuid import uuid4
+
+import pytest
+
+from app.schemas.standings import TeamStandingResponse
+from app.services import clinch
+from app.services.clinch import get_position_bounds, position_bounds
+from app.services.league_state import get_league_state
+from app.services.standings_rules import DEFAULT_RULES, compile_rules
+
+pytestmark = pytest.mark.benchmark
+
+RESULTS = ((2, 0), (2, 1), (1, 2), (0, 2))
+
+
+def _table(points):
+    return [
+        TeamStandingResponse(
+            team_id=uuid4(), team_name=f"Team {i}", group="A", matches_played=0, matches_won=0, matches_lost=0,
+            sets_for=0, sets_against=0, games_for=0, games_against=0, points=p, set_diff=0, game_diff=0,
+            position=i + 1,
+        )
+        for i, p in enumerate(points)
+    ]
+
+
+def _enumerate(points, fixtures, rules):
+    """Bounds by playing out every combination of results"""
+    n = len(points)
+    best, worst = [n] * n, [1] * n
+    for results in itertools.product(RESULTS, repeat=len(fixtures)):
+        final = list(points)
+        for (home, away), (home_sets, away_sets) in zip(fixtures, results):
+            final[home] += rules.match_points(home_sets, away_sets)
+            final[away] += rules.match_points(away_sets, home_sets)
+        for t in range(n):
+            best[t] = min(best[t], 1 + sum(1 for j in range(n) if j != t and final[j] > final[t]))
+            worst[t] = max(worst[t], 1 + sum(1 for j in range(n) if j != t and final[j] >= final[t]))
+    return best, worst
+
+
+def test_position_bounds_match_enumeration():
+    """Exact for the default points table, safe (never narrower) for others"""
+    uneven = compile_rules({"points": {"2-0": 3, "2-1": 3, "1-2": 1, "0-2": 0}})
+    rng = random.Random(3)
+    for _ in range(150):
+        n = rng.randint(3, 6)
+        points = [rng.randint(0, 12) for _ in range(n)]
+        fixtures = [tuple(rng.sample(range(n), 2)) for _ in range(rng.randint(1, 5))]
+        table = _table(points)
+        for rules in (DEFAULT_RULES, uneven):
+            bounds = position_bounds(table, [(table[h].team_id, table[a].team_id) for h, a in fixtures], rules)
+            best, worst = _enumerate(points, fixtures, rules)
+            for i, s in enumerate(table):
+                if rules is DEFAULT_RULES:
+                    assert bounds[s.team_id] == (best[i], worst[i])
+                else:
+                    assert bounds[s.team_id][0] <= best[i] and bounds[s.team_id][1] >= worst[i]
+
+
+def test_position_bounds_clinched():
+    """Nine points clear with one match each left: first place is clinched"""
+    table = _table([12, 3, 2])
+    ids = [s.team_id for s in table]
+    bounds = position_bounds(table, [(ids[0], ids[1]), (ids[1], ids[2])], DEFAULT_RULES)
+    assert bounds[ids[0]] == (1, 1)
+    assert bounds[ids[1]] == (2, 3)
+    assert position_bounds(table, [], DEFAULT_RULES)[ids[2]] == (3, 3)
+
+
+@pytest.mark.parametrize("left", [12, 30, 66])
+def test_position_bounds(benchmark, left):
+    """A 12-team double round robin with `left` matches to play"""
+    rng = random.Random(left)
+    fixtures = [(h, a) for h in range(12) for a in range(12) if h != a]
+    rng.shuffle(fixtures)
+    points = [0] * 12
+    for home, away in fixtures[left:]:
+        home_sets, away_sets = rng.choice(RESULTS)
+        points[home] += DEFAULT_RULES.match_points(home_sets, away_sets)
+        points[away] += DEFAULT_RULES.match_points(away_sets, home_sets)
+    table = _table(points)
+    remaining = [(table[h].team_id, table[a].team_id) for h, a in fixtures[:left]]
+
+    benchmark(position_bounds, table, remaining, DEFAULT_RULES)
+    bounds = position_bounds(table, remaining, DEFAULT_RULES)
+    assert all(1 <= best <= worst <= 12 for best, worst in bounds.values())
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("bench_db", ["medium", "large"], indirect=True)
+async def test_get_position_bounds(benchmark, bench_db):
+    """Uncached bounds of the current season; every active team gets bounds around its group position"""
+    factory, league = bench_db
+    season = league.current_season
+
+    async def run():
+        clinch._bounds.clear()
+        async with factory() as session:
+            state = await get_league_state(session)
+            if state is not None:
+                state._views.pop(("derived", "position_bounds"), None)
+            await get_position_bounds(session)
+
+    await benchmark.run_async(run)
+    async with factory() as session:
+        bounds = await get_position_bounds(session)
+        # Cached until the next write
+        assert await get_position_bounds(session) is bounds
+    teams = [t for t in league.teams if t.season_id == season.id and t.active]
+    assert len(bounds) == len(teams)
+    assert all(1 <= best <= worst for best, worst in bounds.values())
@@ -0,0 +1,58 @@
+"""
+Benchmarks for the head-to-head matrix
+"""
+from uuid import uuid4
+
+import pytest
+
+from app.services import head_to_head
+from app.services.head_to_head import build_matrix, get_head_to_head
+from app.services.match_service import count_sets_won
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_build_matrix_folds_legs():
+    """Both legs of a pair end up in one row, from the lower-indexed team's side"""
+    a, b, c = uuid4(), uuid4(), uuid4()
+    teams = [(a, "A"), (b, "B"), (c, "C")]
+    matrix = build_matrix("A", teams, [
+        (b, a, 1, 1, 2, 0, 12, 5),  # B beat A 2-0 at home
+        (a, b, 1, 1, 2, 1, 16, 14),  # A beat B 2-1 at home
+        (c, a, 1, 0, 1, 2, 13, 15),  # A beat C 1-2 away
+    ])
+    assert matrix.team_ids == [a, b, c]
+    assert matrix.results == [
+        [0, 1, 2, 1, 1, 2, 3, 21, 26],
+        [0, 2, 1, 1, 0, 2, 1, 15, 13],
+    ]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("bench_db", ["medium", "large"], indirect=True)
+async def test_head_to_head(benchmark, bench_db):
+    """Uncached matrix of group A; pairs and totals match the played matches"""
+    factory, league = bench_db
+    season = league.current_season
+    played = [m for m in league.played_matches if m.season_id == season.id and m.group == "A"]
+    pairs = {frozenset((m.home_team_id, m.away_team_id)) for m in played}
+
+    async def run():
+        head_to_head._matrices.clear()
+        async with factory() as session:
+            await get_head_to_head(session, "A")
+
+    await benchmark.run_async(run)
+    async with factory() as session:
+        matrix = await get_head_to_head(session, "A")
+    assert len(matrix.results) == len(pairs)
+    assert sum(row[2] for row in matrix.results) == len(played)
+    sets = sum(sum(count_sets_won(m.match_sets)) for m in played)
+    assert sum(row[5] + row[6] for row in matrix.results) == sets
+    for row in matrix.results:
+        assert row[2] == row[3] + row[4]
+
+    async with factory() as session:
+        # Cached for the same data version
+        assert await get_head_to_head(session, "A") is await get_head_to_head(session, "A")
+        assert await get_head_to_head(session, "Z") is None
@@ -0,0 +1,83 @@
+"""
+Benchmarks for the in-memory league state
+
+Compare test_league_state_standings with test_calculate_standings: the
+difference is what public standings requests save per cache miss.
+test_league_snapshot_restore vs test_league_state_load is the cold-start gain.
+"""
+import pytest
+
+from app.services.league_state import LeagueState
+from app.services.league_snapshot import encode_snapshot, decode_snapshot
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.db]
+
+
+async def _load(factory, league) -> LeagueState:
+    async with factory() as session:
+        return await LeagueState.load(session, league.current_season.id)
+
+
+async def test_league_state_load(benchmark, bench_db):
+    factory, league = bench_db
+
+    async def run():
+        await _load(factory, league)
+
+    await benchmark.run_async(run)
+
+
+async def test_league_state_standings(benchmark, bench_db):
+    factory, league = bench_db
+    state = await _load(factory, league)
+
+    def run():
+        state._views.clear()  # Measure the accumulator pass, not the memoized list
+        state.standings()
+
+    benchmark(run)
+
+
+async def test_league_state_apply_result(benchmark, bench_db):
+    """One re-read match applied incrementally, as after an admin result entry"""
+    factory, league = bench_db
+    state = await _load(factory, league)
+    match_id = league.played_matches[-1].id
+
+    async def run():
+        async with factory() as session:
+            assert await state.apply_changes(session, set(), {match_id})
+
+    await benchmark.run_async(run)
+
+
+async def test_league_state_list_matches(benchmark, bench_db):
+    factory, league = bench_db
+    state = await _load(factory, league)
+    state.list_matches()  # Build the per-match responses once, as serving does
+
+    def run():
+        state._views.clear()
+        state.list_matches(group="A")
+
+    benchmark(run)
+
+
+async def test_league_snapshot_restore(benchmark, bench_db):
+    factory, league = bench_db
+    state = await _load(factory, league)
+    state.db_version = 1
+    data = encode_snapshot(state)
+
+    def run():
+        decode_snapshot(data)
+
+    benchmark(run)
+
+
+async def test_league_snapshot_encode(benchmark, bench_db):
+    factory, league = bench_db
+    state = await _load(factory, league)
+    state.db_version = 1
+
+    benchmark(encode_snapshot, state)
@@ -0,0 +1,94 @@
+"""
+Benchmarks for match result processing
+"""
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.core.sqlite import create_sqlite_session_factory
+from app.models.match import Match, MatchStatusEnum
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.services.match_service import count_sets_won, determine_match_winner, enter_match_result, team_match_ids
+from perf.dataset import seed_database
+from perf.set_storage import read_season_sets
+from tests.benchmarks.conftest import get_league
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_count_sets_won(benchmark, league):
+    matches = league.played_matches
+
+    def run():
+        for match in matches:
+            count_sets_won(match.match_sets)
+
+    benchmark(run)
+
+
+def test_determine_match_winner(benchmark, league):
+    matches = league.played_matches
+
+    def run():
+        for match in matches:
+            determine_match_winner(match)
+
+    benchmark(run)
+
+
+@pytest.mark.db
+async def test_enter_match_result(benchmark, bench_db):
+    factory, league = bench_db
+    match_id = league.scheduled_matches[0].id
+    result = MatchResultCreate(sets=[
+        MatchSetCreate(set_number=1, home_games=6, away_games=4),
+        MatchSetCreate(set_number=2, home_games=3, away_games=6),
+        MatchSetCreate(set_number=3, home_games=7, away_games=5),
+    ])
+
+    async def run():
+        async with factory() as session:
+            match = await enter_match_result(session, match_id, result)
+            assert match.status == MatchStatusEnum.PLAYED
+            await session.rollback()
+
+    await benchmark.run_async(run)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("bench_db", ["large", "history"], indirect=True)
+async def test_team_match_lookup(benchmark, bench_db):
+    """A team's matches through the two team indexes; sub-millisecond on PostgreSQL"""
+    factory, league = bench_db
+    team = league.teams[-1]
+    expected = sorted(m.id for m in league.matches if team.id in (m.home_team_id, m.away_team_id))
+    query = (
+        select(Match.id)
+        .where(Match.season_id == team.season_id, Match.id.in_(team_match_ids(team.id)))
+        .order_by(Match.id)
+    )
+
+    async with factory() as session:
+        async def run():
+            result = await session.execute(query)
+            assert list(result.scalars()) == expected
+
+        await benchmark.run_async(run, rounds=50)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("storage", ["rows", "array"])
+async def test_read_season_sets(benchmark, tmp_path, monkeypatch, storage):
+    """A season's matches with their sets; `python -m perf.set_storage` also compares storage size"""
+    monkeypatch.setattr(settings, "MATCH_SET_STORAGE", storage)
+    league = get_league("large")
+    factory = await create_sqlite_session_factory(str(tmp_path / "sets.sqlite3"))
+    await seed_database(factory, league)
+    season_id = league.current_season.id
+
+    async def run():
+        async with factory() as session:
+            sets = await read_season_sets(session, season_id)
+            assert sum(len(s) for s in sets) == len(league.match_sets)
+
+    await benchmark.run_async(run)
@@ -0,0 +1,139 @@
+"""
+Query-plan regression tests
+
+Every statement the endpoints send (public and admin, reads and writes) is
+captured and EXPLAINed on PostgreSQL with sequential scans disabled: the
+planner then only falls back to a Seq Scan when no index can serve the
+query, so any Seq Scan left on a large table is a missing index whatever the
+size of the test data. Writes run inside a transaction that is rolled back.
+"""
+from datetime import date, timedelta
+from typing import Iterator, List, Tuple
+
+import httpx
+import pytest
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from app.api.deps import get_current_user
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.invalidation import ALL, invalidate_local
+from app.core.response_cache import get_response_cache, set_response_cache
+from app.core.sqlite import override_get_db
+from app.main import app
+from app.models.user import User
+
+pytestmark = [pytest.mark.db, pytest.mark.postgres]
+
+API = "/api/v1"
+
+# Tables that grow with the league; seasons, divisions, users and data_version stay tiny
+LARGE_TABLES = {"matches", "match_sets", "teams", "team_players", "players", "standings_snapshots", "team_ratings"}
+
+
+def _requests(league) -> List[Tuple[str, str, dict]]:
+    """(method, path, options) for every endpoint, with ids from the current season"""
+    season = league.current_season
+    teams = [t for t in league.teams if t.season_id == season.id]
+    team = teams[0]
+    played = next(m for m in league.played_matches if m.season_id == season.id)
+    scheduled = next(m for m in league.scheduled_matches if m.season_id == season.id)
+    player = next(tp.player_id for tp in league.team_players if tp.team_id == team.id)
+    week = (played.date.date() - timedelta(days=3), played.date.date() + timedelta(days=3))
+    return [
+        ("GET", "/public/seasons/", {}),
+        ("GET", "/public/seasons/current", {}),
+        ("GET", "/public/teams/", {}),
+        ("GET", "/public/teams/", {"params": {"group": team.group, "active": "true"}}),
+        ("GET", f"/public/teams/{team.id}", {}),
+        ("GET", f"/public/teams/{team.id}/ratings", {}),
+        ("GET", "/public/standings/", {}),
+        ("GET", "/public/standings/", {"params": {"group": team.group}}),
+        ("GET", f"/public/standings/teams/{team.id}", {}),
+        ("GET", "/public/standings/history", {"params": {"group": team.group}}),
+        ("GET", f"/public/groups/{team.group}/head-to-head", {}),
+        ("GET", "/public/matches/", {}),
+        ("GET", "/public/matches/", {"params": {"group": team.group, "status": "played"}}),
+        ("GET", "/public/matches/", {"params": {"date_from": str(week[0]), "date_to": str(week[1])}}),
+        ("GET", "/public/matches/", {"params": {"team_id": str(team.id)}}),
+        ("GET", "/public/matches/export", {"params": {"format": "csv", "status": "played"}}),
+        ("GET", f"/public/matches/{played.id}", {}),
+        ("GET", "/admin/dashboard/stats", {}),
+        ("GET", "/admin/seasons/", {}),
+        ("GET", "/admin/teams/", {}),
+        ("GET", f"/admin/teams/{team.id}", {}),
+        ("GET", "/admin/players/", {}),
+        ("GET", f"/admin/players/{player}", {}),
+        ("GET", f"/admin/players/{player}/teams", {}),
+        ("GET", "/admin/matches/", {}),
+        ("GET", f"/admin/matches/{played.id}", {}),
+        ("POST", f"/admin/matches/{scheduled.id}/result", {"json": {"sets": [
+            {"set_number": 1, "home_games": 6, "away_games": 3},
+            {"set_number": 2, "home_games": 6, "away_games": 4},
+        ]}}),
+        ("GET", "/public/standings/history", {"params": {"as_of_round": scheduled.round}}),
+        ("PUT", f"/admin/matches/{played.id}", {"json": {"round": "R"}}),
+        # The match rated above moved: replays the season's ratings
+        ("PUT", f"/admin/matches/{scheduled.id}", {"json": {"date": scheduled.date.isoformat()}}),
+        ("PUT", f"/admin/teams/{team.id}", {"json": {"name": f"{team.name} (renamed)"}}),
+        ("DELETE", f"/admin/teams/{teams[1].id}", {}),
+        ("POST", f"/admin/teams/{teams[1].id}/activate", {}),
+        ("DELETE", f"/admin/matches/{played.id}", {}),
+    ]
+
+
+def _seq_scans(node: dict) -> Iterator[str]:
+    if node.get("Node Type") == "Seq Scan" and node.get("Relation Name") in LARGE_TABLES:
+        yield node["Relation Name"]
+    for child in node.get("Plans", []):
+        yield from _seq_scans(child)
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+@pytest.mark.parametrize("bench_db", ["history"], indirect=True)
+async def test_endpoint_queries_use_indexes(bench_db, league_state, monkeypatch):
+    factory, league = bench_db
+    engine = factory.kw["bind"]
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    statements: List[Tuple[str, tuple]] = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(("SELECT", "UPDATE", "DELETE", "WITH")):
+            # One parameter set of an executemany has the plan of all of them
+            statements.append((statement, tuple((parameters[0] if executemany else parameters) or ())))
+
+    previous_cache = get_response_cache()
+    set_response_cache(None)
+    app.dependency_overrides[get_current_user] = lambda: User(username="plans", email="plans@example.com")
+    async with engine.connect() as conn:
+        transaction = await conn.begin()
+        # Endpoint commits become savepoints of the outer transaction
+        override_get_db(app, async_sessionmaker(
+            bind=conn, class_=AsyncSession, expire_on_commit=False, join_transaction_mode="create_savepoint",
+        ))
+        event.listen(engine.sync_engine, "before_cursor_execute", capture)
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://plans") as http:
+                for method, path, options in _requests(league):
+                    response = await http.request(method, f"{API}{path}", **options)
+                    assert response.status_code < 400, (method, path, response.text)
+        finally:
+            event.remove(engine.sync_engine, "before_cursor_execute", capture)
+            app.dependency_overrides.pop(get_db, None)
+            app.dependency_overrides.pop(get_current_user, None)
+            set_response_cache(previous_cache)
+
+        assert statements
+        await conn.exec_driver_sql("SET LOCAL enable_seqscan = off")
+        failures = []
+        for statement, parameters in statements:
+            result = await conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {statement}", parameters)
+            plan = result.scalar()[0]["Plan"]
+            tables = sorted(set(_seq_scans(plan)))
+            if tables:
+                failures.append(f"Seq Scan on {', '.join(tables)}:\n    {' '.join(statement.split())}")
+        await transaction.rollback()
+    invalidate_local({ALL})  # Caches saw the rolled back writes
+
+    assert not failures, "Queries without a usable index:\n" + "\n".join(failures)
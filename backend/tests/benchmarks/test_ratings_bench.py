@@ -0,0 +1,73 @@
+"""
+Benchmarks for team ratings: per-result updates and season replays
+"""
+import pytest
+from sqlalchemy import func, select
+
+from app.models.team import Team
+from app.models.team_rating import TeamRating
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.services.match_service import enter_match_result
+from app.services.ratings import rating_change, recompute_ratings
+
+pytestmark = pytest.mark.benchmark
+
+RESULT = MatchResultCreate(sets=[
+    MatchSetCreate(set_number=1, home_games=6, away_games=2),
+    MatchSetCreate(set_number=2, home_games=6, away_games=3),
+])
+
+
+def test_rating_change():
+    """Zero for a draw; more for a wide win and for an upset"""
+    assert rating_change(1500, 1500, 1, 1, 6, 6) == 0
+    narrow = rating_change(1500, 1500, 2, 1, 15, 14)
+    wide = rating_change(1500, 1500, 2, 0, 12, 2)
+    assert 0 < narrow < wide
+    assert rating_change(1500, 1500, 1, 2, 14, 15) == pytest.approx(-narrow)
+    assert rating_change(1400, 1600, 2, 0, 12, 2) > wide > rating_change(1600, 1400, 2, 0, 12, 2)
+
+
+async def _ratings(session, season_id):
+    result = await session.execute(select(Team.id, Team.rating).where(Team.season_id == season_id))
+    return dict(result.all())
+
+
+@pytest.mark.db
+async def test_incremental_rating_matches_replay(bench_db):
+    """A result after every rated match moves only its two teams, to what a full replay gives"""
+    factory, league = bench_db
+    season_id = league.current_season.id
+    match = league.scheduled_matches[0]
+    async with factory() as session:
+        applied = await recompute_ratings(session, season_id)
+        assert applied == len([m for m in league.played_matches if m.season_id == season_id])
+        before = await _ratings(session, season_id)
+        assert sum(before.values()) == pytest.approx(1500 * len(before))
+
+        await enter_match_result(session, match.id, RESULT)
+        after = await _ratings(session, season_id)
+        changed = {team_id for team_id in after if after[team_id] != before[team_id]}
+        assert changed == {match.home_team_id, match.away_team_id}
+        assert after[match.home_team_id] > before[match.home_team_id]
+
+        await recompute_ratings(session, season_id)
+        assert await _ratings(session, season_id) == pytest.approx(after)
+        rows = await session.scalar(select(func.count()).select_from(TeamRating).where(TeamRating.season_id == season_id))
+        assert rows == 2 * (applied + 1)
+        await session.rollback()
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("bench_db", ["medium", "large", "history"], indirect=True)
+async def test_recompute_ratings(benchmark, bench_db):
+    """Replay of the current season's results after a corrected result"""
+    factory, league = bench_db
+    season_id = league.current_season.id
+
+    async def run():
+        async with factory() as session:
+            await recompute_ratings(session, season_id)
+            await session.rollback()
+
+    await benchmark.run_async(run)
@@ -0,0 +1,71 @@
+"""
+Benchmarks for serving archived seasons from Arrow IPC files
+
+Compare with test_calculate_standings_season_scoped / the match list
+benchmarks: archived reads should not depend on the database at all.
+"""
+import pytest
+
+from app.core.config import settings
+from app.core.invalidation import ALL, invalidate_local
+from app.core.sqlite import create_sqlite_session_factory
+from perf.dataset import seed_database
+from tests.benchmarks.conftest import get_league
+
+pytest.importorskip("pyarrow")
+
+from app.services import season_archive  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(params=["none", "zstd"])
+async def archived_season(request, tmp_path, monkeypatch):
+    """Oldest season of the "history" league, archived with the given compression"""
+    monkeypatch.setattr(settings, "SEASON_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(settings, "SEASON_ARCHIVE_COMPRESSION", request.param)
+
+    league = get_league("history")
+    factory = await create_sqlite_session_factory(str(tmp_path / "history.sqlite3"))
+    await seed_database(factory, league)
+    season = min(league.seasons, key=lambda s: s.start_date)
+    async with factory() as session:
+        await season_archive.archive_season(session, season.id)
+
+    invalidate_local({ALL})
+    yield season.id, league
+
+    for archived in season_archive._open_seasons.values():
+        archived.close()
+    season_archive._open_seasons.clear()
+    invalidate_local({ALL})
+
+
+def test_archived_season_open(benchmark, archived_season):
+    season_id, _ = archived_season
+    path = season_archive.season_archive_path(season_id)
+
+    def run():
+        season_archive.ArchivedSeason(path).close()
+
+    benchmark(run)
+
+
+def test_archived_season_list_matches(benchmark, archived_season):
+    season_id, league = archived_season
+    expected = sum(1 for m in league.matches if m.season_id == season_id)
+
+    def run():
+        matches = season_archive.load_archived_season(season_id).list_matches()
+        assert len(matches) == expected
+
+    benchmark(run)
+
+
+def test_archived_season_standings_group(benchmark, archived_season):
+    season_id, _ = archived_season
+
+    def run():
+        season_archive.load_archived_season(season_id).standings(group="A")
+
+    benchmark(run)
@@ -0,0 +1,62 @@
+"""
+Benchmarks for the Monte Carlo season outcome simulator
+"""
+import pytest
+
+from app.core.config import settings
+
+np = pytest.importorskip("numpy")
+
+from app.services import season_simulator  # noqa: E402
+from app.services.season_simulator import STAT_FIELDS, simulate_chunk, simulate_season  # noqa: E402
+
+pytestmark = pytest.mark.benchmark
+
+
+def _round_robin_fixtures(teams: int):
+    pairs = [(h, a) for h in range(teams) for a in range(teams) if h != a]
+    return np.array([h for h, _ in pairs]), np.array([a for _, a in pairs])
+
+
+@pytest.mark.parametrize("teams", [8, 32])
+def test_simulate_chunk(benchmark, teams):
+    """10,000 runs of a full double round robin still to play"""
+    home, away = _round_robin_fixtures(teams)
+    stats = np.zeros((teams, len(STAT_FIELDS)), dtype=np.int64)
+    p_home_set = np.random.default_rng(1).uniform(0.3, 0.7, len(home))
+
+    def run():
+        counts, _ = simulate_chunk(stats, np.arange(teams), home, away, p_home_set, 10_000, 1)
+        assert counts.sum() == 10_000 * teams
+
+    benchmark(run)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("workers", [0, 2])
+async def test_simulate_season(benchmark, bench_db, monkeypatch, workers):
+    """Both groups of the current season, 20,000 runs each, in a thread vs the process pool"""
+    factory, league = bench_db
+    monkeypatch.setattr(settings, "SIMULATION_WORKERS", workers)
+    season = league.current_season
+    teams = [t for t in league.teams if t.season_id == season.id and t.active]
+    remaining = [m for m in league.scheduled_matches if m.season_id == season.id]
+    season_simulator.start_simulation_pool()  # Process start-up is not part of the timing
+
+    async def run():
+        season_simulator._results.clear()
+        async with factory() as session:
+            result = await simulate_season(session, runs=20_000)
+        assert result.remaining_matches == len(remaining)
+        assert len(result.teams) == len(teams)
+        for team in result.teams:
+            assert abs(sum(team.position_probabilities) - 1) < 1e-3
+
+    try:
+        await benchmark.run_async(run)
+        # Cached for the same data version
+        async with factory() as session:
+            assert await simulate_season(session, runs=20_000) is await simulate_season(session, runs=20_000)
+    finally:
+        season_simulator.stop_simulation_pool()
+        season_simulator._results.clear()
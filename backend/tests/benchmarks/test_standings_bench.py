@@ -0,0 +1,200 @@
+"""
+Benchmarks for the standings calculation
+"""
+import asyncio
+
+import pytest
+from sqlalchemy import delete, func, select
+
+from app.core.invalidation import invalidate_local
+from app.models.standings_snapshot import StandingsSnapshot
+from app.services import standings as standings_service
+from app.schemas.season import StandingsRules
+from app.services.standings import calculate_standings, calculate_match_points, get_standings
+from app.services.standings_rules import DEFAULT_RULES, compile_rules
+from app.services.match_service import count_sets_won
+from app.services.standings_history import accumulate_rounds, get_standings_history, invalidate_history
+from tests.test_standings_rules import _reference_order, _tied_table
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_calculate_match_points(benchmark, league):
+    sets_won = [count_sets_won(match.match_sets) for match in league.played_matches]
+
+    def run():
+        for home_sets, away_sets in sets_won:
+            calculate_match_points(home_sets, away_sets)
+            calculate_match_points(away_sets, home_sets)
+
+    benchmark(run)
+
+
+@pytest.mark.db
+async def test_calculate_standings(benchmark, bench_db):
+    factory, league = bench_db
+
+    async def run():
+        async with factory() as session:
+            standings = await calculate_standings(session)
+            assert len(standings) == len(current_teams)
+
+    current_teams = [t for t in league.teams if t.season_id == league.current_season.id]
+    await benchmark.run_async(run)
+
+
+@pytest.mark.db
+async def test_calculate_standings_group(benchmark, bench_db):
+    factory, _ = bench_db
+
+    async def run():
+        async with factory() as session:
+            await calculate_standings(session, group="A")
+
+    await benchmark.run_async(run)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("bench_db", ["medium", "history"], indirect=True)
+async def test_calculate_standings_season_scoped(benchmark, bench_db):
+    """Finished seasons must not slow down the current standings (compare history vs medium)"""
+    factory, league = bench_db
+    current_teams = [t for t in league.teams if t.season_id == league.current_season.id]
+
+    async def run():
+        async with factory() as session:
+            standings = await calculate_standings(session)
+            assert len(standings) == len(current_teams)
+
+    await benchmark.run_async(run)
+
+
+@pytest.mark.db
+async def test_get_standings_refresh_burst(benchmark, bench_db):
+    """50 browsers refreshing right after a result entry: one calculation, 49 coalesced"""
+    factory, _ = bench_db
+    flight = standings_service._standings_flight
+
+    async def refresh():
+        async with factory() as session:
+            return await get_standings(session)
+
+    async def run():
+        invalidate_local({"standings"})
+        executions = flight.executions
+        results = await asyncio.gather(*(refresh() for _ in range(50)))
+        assert flight.executions == executions + 1
+        assert all(r is results[0] for r in results)
+
+    await benchmark.run_async(run)
+
+
+def _played_rounds(league):
+    return [
+        (int(m.round), m.home_team_id, m.away_team_id, m.home_sets_won, m.away_sets_won, m.home_games, m.away_games)
+        for m in league.played_matches
+    ]
+
+
+def test_accumulate_rounds(benchmark, league):
+    """The whole history of every group in one prefix-sum pass"""
+    matches = _played_rounds(league)
+    rounds = {m[0] for m in matches}
+
+    def run():
+        history = accumulate_rounds(matches)
+        assert len(history) == len(rounds)
+
+    benchmark(run)
+
+
+async def _clear_snapshots(factory) -> None:
+    async with factory() as session:
+        await session.execute(delete(StandingsSnapshot))
+        await session.commit()
+
+
+@pytest.mark.db
+async def test_standings_history_matches_standings(bench_db):
+    """The last round's table is the current table; invalidation drops only later rounds"""
+    factory, league = bench_db
+    await _clear_snapshots(factory)
+    try:
+        async with factory() as session:
+            history = await get_standings_history(session, group="A")
+            # History tables carry no ratings (those are per match: /teams/{id}/ratings)
+            current = await calculate_standings(session, group="A")
+            assert history[-1].standings == [s.model_copy(update={"rating": None}) for s in current]
+            assert [h.round for h in history] == list(range(1, len(history) + 1))
+
+            division = next(d for d in league.divisions if d.season_id == league.current_season.id and d.code == "A")
+            await invalidate_history(session, league.current_season.id, division.id, "3")
+            await session.commit()
+            rounds = await session.scalars(select(StandingsSnapshot.round).where(StandingsSnapshot.division_id == division.id))
+            assert sorted(rounds) == [1, 2]
+
+            assert await get_standings_history(session, group="A") == history
+            as_of = await get_standings_history(session, group="A", as_of_round=3)
+            assert as_of == [history[2]]
+    finally:
+        await _clear_snapshots(factory)
+
+
+@pytest.mark.db
+@pytest.mark.postgres
+@pytest.mark.parametrize("bench_db", ["small"], indirect=True)
+async def test_standings_history_does_not_wait_for_writes(bench_db):
+    """A history read during an uncommitted result change neither blocks nor stores snapshots"""
+    factory, league = bench_db
+    await _clear_snapshots(factory)
+    division = next(d for d in league.divisions if d.season_id == league.current_season.id and d.code == "A")
+    try:
+        async with factory() as writer, factory() as reader:
+            await invalidate_history(writer, league.current_season.id, division.id, "1")
+            history = await asyncio.wait_for(get_standings_history(reader, group="A"), timeout=10)
+            assert history
+            rounds = await reader.scalar(select(func.count()).select_from(StandingsSnapshot))
+            assert rounds == 0
+            await writer.rollback()
+            # Once the writer is gone, the next read stores them
+            assert await get_standings_history(reader, group="A") == history
+            assert await reader.scalar(select(func.count()).select_from(StandingsSnapshot)) == len(history)
+    finally:
+        await _clear_snapshots(factory)
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("persisted", [False, True], ids=["computed", "persisted"])
+async def test_standings_history(benchmark, bench_db, persisted):
+    """Both groups' history, computed from scratch vs read from the snapshots"""
+    factory, _ = bench_db
+    await _clear_snapshots(factory)
+
+    async def run():
+        if not persisted:
+            await _clear_snapshots(factory)
+        async with factory() as session:
+            assert await get_standings_history(session)
+
+    try:
+        await benchmark.run_async(run)
+    finally:
+        await _clear_snapshots(factory)
+
+
+@pytest.mark.parametrize("ordering", ["reference", "default", "head_to_head"])
+def test_rank_standings_rules(benchmark, ordering):
+    """Ranking 64-team tables full of ties: fixed key vs compiled rules vs head-to-head"""
+    tables = [_tied_table(64, seed) for seed in range(20)]
+    rules = compile_rules(StandingsRules(tiebreakers=["head_to_head_points", "matches_won", "set_diff"]).model_dump())
+
+    def run():
+        for standings, matches in tables:
+            if ordering == "reference":
+                _reference_order(standings)
+            elif ordering == "default":
+                DEFAULT_RULES.sort(list(standings))
+            else:
+                rules.sort(list(standings), matches)
+
+    benchmark(run)
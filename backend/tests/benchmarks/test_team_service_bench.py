@@ -0,0 +1,39 @@
+"""
+Benchmarks for team management logic
+"""
+import pytest
+
+from app.schemas.team import TeamPlayerCreate
+from app.services.team_service import validate_team_creation, archive_team, activate_team
+
+pytestmark = [pytest.mark.benchmark, pytest.mark.db]
+
+
+async def test_validate_team_creation(benchmark, bench_db):
+    factory, league = bench_db
+    team = league.teams[0]
+    players = [
+        TeamPlayerCreate(player_id=tp.player_id, role=tp.role.value.lower())
+        for tp in team.team_players
+    ]
+
+    async def run():
+        async with factory() as session:
+            await validate_team_creation(players, session)
+
+    await benchmark.run_async(run)
+
+
+async def test_archive_and_activate_team(benchmark, bench_db):
+    factory, league = bench_db
+    team_id = league.teams[-1].id
+
+    async def run():
+        async with factory() as session:
+            team = await archive_team(session, team_id)
+            assert not team.active
+            team = await activate_team(session, team_id)
+            assert team.active
+            await session.rollback()
+
+    await benchmark.run_async(run)
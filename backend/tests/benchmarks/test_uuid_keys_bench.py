@@ -0,0 +1,41 @@
+"""
+Benchmarks for UUIDv7 primary keys
+
+Inserts run against BENCH_DATABASE_URL; `python -m perf.uuid_keys` runs the
+full million-match comparison.
+"""
+import pytest
+
+from app.core.types import uuid7
+from perf.uuid_keys import _dsn, _payloads, compare, measure
+from tests.benchmarks.conftest import BENCH_DATABASE_URL
+
+pytestmark = pytest.mark.benchmark
+
+
+def test_uuid7(benchmark):
+    def run():
+        ids = [uuid7() for _ in range(10_000)]
+        assert ids == sorted(ids)
+        assert {i.version for i in ids} == {7}
+
+    benchmark(run, rounds=10)
+
+
+@pytest.mark.postgres
+@pytest.mark.parametrize("kind", ["v4", "v7"])
+async def test_primary_key_inserts(benchmark, kind):
+    import asyncpg
+
+    payloads = _payloads(50_000)
+    conn = await asyncpg.connect(_dsn(BENCH_DATABASE_URL))
+    try:
+        await benchmark.run_async(lambda: measure(conn, kind, payloads), rounds=3)
+    finally:
+        await conn.close()
+
+
+@pytest.mark.postgres
+async def test_uuid7_primary_key_is_denser():
+    results = await compare(BENCH_DATABASE_URL, rows=100_000)
+    assert results["v7"]["index_bytes"] < results["v4"]["index_bytes"] * 0.9
@@ -0,0 +1,97 @@
+"""
+Benchmarks for what-if standings (hypothetical results over the current table)
+"""
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.sqlite import override_get_db
+from app.exceptions import NotFoundError
+from app.main import app
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.schemas.standings import WhatIfResult
+from app.services.league_state import get_league_state
+from app.services.match_service import enter_match_result
+from app.services.standings import calculate_standings
+from app.services.what_if import get_what_if_standings, overlay_results
+
+pytestmark = pytest.mark.benchmark
+
+API = "/api/v1"
+SETS = [
+    MatchSetCreate(set_number=1, home_games=6, away_games=4),
+    MatchSetCreate(set_number=2, home_games=3, away_games=6),
+    MatchSetCreate(set_number=3, home_games=7, away_games=5),
+]
+
+
+def _what_if(matches):
+    return [WhatIfResult(match_id=m.id, sets=SETS) for m in matches]
+
+
+def _table(standings):
+    # Entering a result also moves ratings; the what-if table keeps the current ones
+    return [s.model_dump(exclude={"rating"}) for s in standings]
+
+
+@pytest.mark.db
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_what_if_matches_entered_results(bench_db, league_state, monkeypatch):
+    """The overlay ranks exactly as entering the results would, without touching the cached table"""
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    factory, league = bench_db
+    scheduled = [m for m in league.scheduled_matches if m.season_id == league.current_season.id][:5]
+    async with factory() as session:
+        before = _table(await calculate_standings(session))
+        what_if = await get_what_if_standings(session, _what_if(scheduled))
+        group = await get_what_if_standings(session, _what_if(scheduled), group="A")
+        assert _table(await calculate_standings(session)) == before
+
+        for match in scheduled:
+            await enter_match_result(session, match.id, MatchResultCreate(sets=SETS))
+        assert _table(what_if) == _table(await calculate_standings(session))
+        assert _table(group) == _table(await calculate_standings(session, group="A"))
+        await session.rollback()
+
+        with pytest.raises(NotFoundError):
+            await get_what_if_standings(session, [WhatIfResult(match_id=league.current_season.id, sets=SETS)])
+        with pytest.raises(ValueError):
+            await get_what_if_standings(session, _what_if(league.played_matches[-1:]))
+
+
+@pytest.mark.db
+async def test_overlay_results(benchmark, bench_db):
+    """Five hypothetical results over the whole current table, as served from the league state"""
+    factory, league = bench_db
+    async with factory() as session:
+        state = await get_league_state(session)
+    scheduled = [m for m in league.scheduled_matches if m.season_id == league.current_season.id][:5]
+    overlay = [(m.home_team_id, m.away_team_id, 2, 1, 16, 15) for m in scheduled]
+    standings = state.standings()
+
+    benchmark(overlay_results, standings, overlay, state.rules)
+
+
+@pytest.mark.db
+async def test_what_if_endpoint(benchmark, bench_db):
+    factory, league = bench_db
+    override_get_db(app, factory)
+    scheduled = [m for m in league.scheduled_matches if m.season_id == league.current_season.id][:5]
+    body = {"results": [r.model_dump(mode="json") for r in _what_if(scheduled)]}
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as http:
+            async def run():
+                response = await http.post(f"{API}/public/standings/what-if", json=body)
+                assert response.status_code == 200
+
+            await benchmark.run_async(run)
+
+            duplicate = {"results": body["results"][:1] * 2}
+            assert (await http.post(f"{API}/public/standings/what-if", json=duplicate)).status_code == 422
+            played = {"results": [{**body["results"][0], "match_id": str(league.played_matches[-1].id)}]}
+            assert (await http.post(f"{API}/public/standings/what-if", json=played)).status_code == 400
+            unfinished = {"results": [{**body["results"][0], "sets": body["results"][0]["sets"][:1]}]}
+            assert (await http.post(f"{API}/public/standings/what-if", json=unfinished)).status_code == 400
+    finally:
+        app.dependency_overrides.pop(get_db, None)
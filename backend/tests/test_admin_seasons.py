@@ -0,0 +1,58 @@
+"""
+Admin season endpoints
+"""
+from datetime import datetime
+
+from sqlalchemy import select
+
+from app.models.season import Season
+
+API = "/api/v1/admin/seasons"
+
+
+async def _archive(factory, season_id) -> None:
+    # Only the flag matters here; the archive files are season_archive's concern
+    async with factory() as session:
+        season = await session.get(Season, season_id)
+        season.archived_at = datetime(2026, 1, 1)
+        season.is_current = False
+        await session.commit()
+
+
+async def test_set_current_archived_season_is_rejected(client, league_db):
+    factory, league = league_db
+    current = league.current_season
+    await _archive(factory, current.id)
+
+    response = await client.post(f"{API}/{current.id}/current")
+    assert response.status_code == 400
+    assert "archived" in response.json()["detail"]
+    async with factory() as session:
+        assert await session.scalar(select(Season.is_current).where(Season.id == current.id)) is False
+
+    # The session was rolled back: the next request on the same app still works
+    assert (await client.get(f"{API}/")).status_code == 200
+
+
+async def test_set_current_unknown_season(client):
+    response = await client.post(f"{API}/00000000-0000-4000-8000-000000000000/current")
+    assert response.status_code == 404
+
+
+async def test_rules_reset_to_default(client, league_db):
+    factory, league = league_db
+    season_id = league.current_season.id
+    rules = {"points": {"2-0": 4, "2-1": 3, "1-2": 1, "0-2": 0}, "tiebreakers": ["head_to_head_points"]}
+
+    response = await client.put(f"{API}/{season_id}", json={"rules": rules})
+    assert response.status_code == 200 and response.json()["rules"] == rules
+    # Omitted: unchanged
+    response = await client.put(f"{API}/{season_id}", json={"name": "Renamed Season"})
+    assert response.json()["rules"] == rules
+
+    response = await client.put(f"{API}/{season_id}", json={"rules": None})
+    assert response.status_code == 200 and response.json()["rules"] is None
+    async with factory() as session:
+        assert await session.scalar(select(Season.rules).where(Season.id == season_id)) is None
+    response = await client.put(f"{API}/{season_id}", json={"name": "Renamed Again"})
+    assert response.json()["rules"] is None
@@ -0,0 +1,96 @@
+"""
+Best and worst final positions: matches in progress are still to be played.
+"""
+import uuid
+
+import pytest
+
+from app.core import response_cache
+from app.core import invalidation
+from app.core.config import settings
+from app.schemas.standings import TeamStandingResponse
+from app.services import clinch
+from app.services.clinch import position_bounds
+from app.services.standings_rules import DEFAULT_RULES
+
+ONE_SET = [{"set_number": 1, "home_games": 6, "away_games": 2}]
+STRAIGHT = ONE_SET + [{"set_number": 2, "home_games": 6, "away_games": 3}]
+
+
+def _standing(name: str, points: int, position: int) -> TeamStandingResponse:
+    return TeamStandingResponse(
+        team_id=uuid.uuid4(), team_name=name, group="A", matches_played=3, matches_won=points // 3,
+        matches_lost=3 - points // 3, sets_for=0, sets_against=0, games_for=0, games_against=0,
+        points=points, set_diff=0, game_diff=0, position=position,
+    )
+
+
+def test_level_teams_with_a_match_left_are_not_clinched():
+    first, second, third = _standing("A", 7, 1), _standing("B", 7, 2), _standing("C", 0, 3)
+    bounds = position_bounds([first, second, third], [(first.team_id, second.team_id)], DEFAULT_RULES)
+    assert bounds[first.team_id] == (1, 2)
+    assert bounds[second.team_id] == (1, 2)
+    assert bounds[third.team_id] == (3, 3)
+
+    final = position_bounds([first, second, third], [], DEFAULT_RULES)
+    assert [final[s.team_id] for s in (first, second, third)] == [(1, 1), (2, 2), (3, 3)]
+
+
+def _bounds(table):
+    return {row["team_id"]: (row["best_position"], row["worst_position"]) for row in table}
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_matches_in_progress_remain_to_be_played(league_db, client, league_state, monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    _, league = league_db
+    before = (await client.get("/api/v1/public/standings/", params={"group": "A"})).json()
+    assert any(best != worst for best, worst in _bounds(before).values())
+
+    # One set of every remaining match: all in progress, none finished
+    for match in league.scheduled_matches:
+        if match.season_id == league.current_season.id:
+            response = await client.post(f"/api/v1/admin/matches/{match.id}/result", json={"sets": ONE_SET})
+            assert response.status_code == 200
+
+    after = (await client.get("/api/v1/public/standings/", params={"group": "A"})).json()
+    assert after == before
+
+
+async def test_league_state_reads_skip_the_data_version(league_db, client, monkeypatch):
+    """Bounds are kept with the league state: reads don't query the data version, writes still refresh them"""
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", True)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    _, league = league_db
+    reads = []
+
+    async def get_data_version(db):
+        reads.append(db)
+        return await invalidation.get_data_version(db)
+
+    monkeypatch.setattr(clinch, "get_data_version", get_data_version)
+    before = (await client.get("/api/v1/public/standings/", params={"group": "A"})).json()
+    team_id = before[0]["team_id"]
+    for _ in range(3):
+        assert (await client.get("/api/v1/public/standings/", params={"group": "A"})).json() == before
+        assert (await client.get(f"/api/v1/public/standings/teams/{team_id}")).status_code == 200
+    assert reads == []
+
+    # Finish a group A match: the table and its bounds move
+    match = next(m for m in league.scheduled_matches
+                 if m.season_id == league.current_season.id and m.division.code == "A")
+    response = await client.post(f"/api/v1/admin/matches/{match.id}/result", json={"sets": STRAIGHT})
+    assert response.status_code == 200
+    after = (await client.get("/api/v1/public/standings/", params={"group": "A"})).json()
+    assert after != before
+    assert reads == []
+
+    # Same bounds as the database path computes
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", False)
+    clinch._bounds.clear()
+    database = (await client.get("/api/v1/public/standings/", params={"group": "A"})).json()
+    assert _bounds(database) == _bounds(after)
+    assert len(reads) == 1
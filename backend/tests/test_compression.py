@@ -0,0 +1,126 @@
+"""
+Compression middleware: size threshold, Accept-Encoding negotiation,
+precompressed responses and Vary.
+"""
+import httpx
+import pytest
+from fastapi import FastAPI, Response
+
+from app.core import compression, response_cache
+from app.core.compression import CompressionMiddleware, compress
+from app.core.config import settings
+from app.core.response_cache import MemoryResponseCache
+
+BODY = b'{"teams": [' + b", ".join(b'"team %d"' % i for i in range(200)) + b"]}"
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+
+
+@app.get("/json")
+async def json_body(size: int = len(BODY)):
+    return Response(BODY[:size], media_type="application/json")
+
+
+@app.get("/vary")
+async def vary_body():
+    return Response(BODY, media_type="application/json", headers={"Vary": "Origin"})
+
+
+@app.get("/image")
+async def image_body():
+    return Response(b"\x89PNG" + bytes(2000), media_type="image/png")
+
+
+@app.get("/precompressed")
+async def precompressed_body():
+    return Response(compress(BODY, "gzip"), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+
+@pytest.fixture
+async def http():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        yield client
+
+
+async def _get(http, path, accept_encoding, **params):
+    return await http.get(path, params=params, headers={"Accept-Encoding": accept_encoding})
+
+
+async def test_minimum_size(http):
+    minimum = settings.COMPRESSION_MINIMUM_SIZE
+    assert len(BODY) > minimum
+    small = await _get(http, "/json", "gzip", size=minimum - 1)
+    assert "content-encoding" not in small.headers
+    assert small.content == BODY[:minimum - 1]
+    assert small.headers["vary"] == "Accept-Encoding"
+
+    large = await _get(http, "/json", "gzip", size=minimum)
+    assert large.headers["content-encoding"] == "gzip"
+    assert int(large.headers["content-length"]) < minimum
+    assert large.content == BODY[:minimum]
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br, gzip", "br"),
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=1.0, br;q=0.5", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("gzip;q=0", None),
+    ("identity", None),
+    ("", None),
+])
+async def test_negotiation(http, accept_encoding, expected):
+    response = await _get(http, "/json", accept_encoding)
+    assert response.headers.get("content-encoding") == expected
+    assert response.content == BODY
+
+
+async def test_gzip_without_brotli(http, monkeypatch):
+    monkeypatch.setattr(compression, "_brotli_checked", True)
+    monkeypatch.setattr(compression, "_brotli_module", None)
+    response = await _get(http, "/json", "br, gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert (await _get(http, "/json", "br")).headers.get("content-encoding") is None
+
+
+async def test_disabled(http, monkeypatch):
+    monkeypatch.setattr(settings, "COMPRESSION_ENABLED", False)
+    response = await _get(http, "/json", "gzip")
+    assert "content-encoding" not in response.headers and "vary" not in response.headers
+
+
+async def test_vary(http):
+    assert (await _get(http, "/json", "identity")).headers["vary"] == "Accept-Encoding"
+    assert (await _get(http, "/vary", "gzip")).headers["vary"] == "Origin, Accept-Encoding"
+    image = await _get(http, "/image", "gzip")
+    assert "vary" not in image.headers and "content-encoding" not in image.headers
+
+
+async def test_precompressed_passes_through(http, monkeypatch):
+    monkeypatch.setattr(compression, "compress", _no_compression)
+    response = await _get(http, "/precompressed", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == BODY  # Decoded once: not compressed twice
+
+
+async def test_cached_variants_are_served_without_compressing(league_db, client, monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", MemoryResponseCache(1 << 20, 60.0))
+    monkeypatch.setattr(response_cache, "_configured", True)
+    for encoding in ("br", "gzip", "identity"):
+        await _get(client, "/api/v1/public/matches/", encoding)  # The miss stores every variant
+    expected = (await _get(client, "/api/v1/public/matches/", "identity")).json()
+
+    monkeypatch.setattr(compression, "compress", _no_compression)
+    for encoding in ("br", "gzip"):
+        response = await _get(client, "/api/v1/public/matches/", encoding)
+        assert response.headers["content-encoding"] == encoding
+        assert response.headers["vary"] == "Accept-Encoding"
+        assert response.json() == expected
+    assert "content-encoding" not in (await _get(client, "/api/v1/public/matches/", "identity")).headers
+
+
+def _no_compression(body, encoding):
+    raise AssertionError("compressed again")
@@ -0,0 +1,133 @@
+"""
+Head-to-head matrix: both legs of a pair folded into one row from the lower
+index's point of view, deactivated teams left out, archived seasons alike.
+"""
+import uuid
+
+import pytest
+
+from app.core import response_cache
+from app.core.config import settings
+from app.core.invalidation import ALL, invalidate_local
+from app.core.sqlite import create_sqlite_session_factory
+from app.schemas.standings import HEAD_TO_HEAD_FIELDS
+from app.services import head_to_head
+from app.services.head_to_head import build_matrix, get_head_to_head
+from perf.dataset import generate_league, seed_database
+
+
+@pytest.fixture(autouse=True)
+def no_matrix_cache():
+    # Cached per (season, group, version): every test seeds the same season ids
+    head_to_head._matrices.clear()
+    yield
+    head_to_head._matrices.clear()
+
+
+def _row(**values):
+    return [values.get(field, 0) for field in HEAD_TO_HEAD_FIELDS]
+
+
+def test_build_matrix_folds_both_legs():
+    a, b, c, gone = (uuid.uuid4() for _ in range(4))
+    teams = [(a, "A"), (b, "B"), (c, "C")]
+    totals = [
+        (a, b, 1, 1, 2, 0, 12, 5),  # A beat B at home 6-3 6-2
+        (b, a, 1, 1, 2, 1, 15, 14),  # B beat A at home in three sets
+        (c, a, 1, 0, 0, 2, 4, 12),  # A won away: i > j, the row is from A's side
+        (c, gone, 1, 1, 2, 0, 12, 3),  # Deactivated opponent
+        (gone, b, 2, 0, 1, 4, 20, 26),
+    ]
+    matrix = build_matrix("A", teams, totals)
+
+    assert matrix.team_ids == [a, b, c] and matrix.team_names == ["A", "B", "C"]
+    assert matrix.fields == list(HEAD_TO_HEAD_FIELDS)
+    assert matrix.results == [
+        _row(i=0, j=1, played=2, won=1, lost=1, sets_for=3, sets_against=2, games_for=26, games_against=20),
+        _row(i=0, j=2, played=1, won=1, lost=0, sets_for=2, sets_against=0, games_for=12, games_against=4),
+    ]
+
+
+def _expected(matches, team_ids):
+    """Matrix rows folded match by match from the sets"""
+    index = {team_id: i for i, team_id in enumerate(team_ids)}
+    rows = {}
+    for match in matches:
+        if match.home_team_id not in index or match.away_team_id not in index:
+            continue
+        home_sets = sum(1 for s in match.match_sets if s.home_games > s.away_games)
+        away_sets = sum(1 for s in match.match_sets if s.away_games > s.home_games)
+        home_games = sum(s.home_games for s in match.match_sets)
+        away_games = sum(s.away_games for s in match.match_sets)
+        i, j = index[match.home_team_id], index[match.away_team_id]
+        sides = (home_sets, away_sets, home_games, away_games)
+        if i > j:
+            i, j = j, i
+            sides = (away_sets, home_sets, away_games, home_games)
+        won = 1 if sides[0] > sides[1] else 0
+        row = rows.setdefault((i, j), _row(i=i, j=j))
+        for k, value in enumerate((1, won, 1 - won, *sides), 2):
+            row[k] += value
+    return [rows[pair] for pair in sorted(rows)]
+
+
+def _played(league, season_id, group):
+    return [m for m in league.played_matches if m.season_id == season_id and m.division.code == group]
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_matrix_and_deactivated_team(league_db, client, league_state, monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    factory, league = league_db
+    season_id = league.current_season.id
+    played = _played(league, season_id, "A")
+
+    async with factory() as session:
+        matrix = await get_head_to_head(session, "A")
+    assert len(matrix.team_ids) == 6
+    assert matrix.results == _expected(played, matrix.team_ids)
+    # Single leg: every pair of the played rounds is one match
+    assert sum(row[2] for row in matrix.results) == len(played)
+
+    gone = matrix.team_ids[2]
+    response = await client.put(f"/api/v1/admin/teams/{gone}", json={"active": False})
+    assert response.status_code == 200
+    async with factory() as session:
+        matrix = await get_head_to_head(session, "A")
+    assert gone not in matrix.team_ids and len(matrix.team_ids) == 5
+    assert matrix.results == _expected(played, matrix.team_ids)
+
+
+async def test_both_legs_and_archived_season(tmp_path, monkeypatch):
+    """A two-leg season, from the database and again from its archive"""
+    pytest.importorskip("pyarrow")
+    from app.services import season_archive
+
+    monkeypatch.setattr(settings, "SEASON_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", False)
+    league = generate_league(teams_per_group=4, seasons=2, legs=2)
+    factory = await create_sqlite_session_factory(str(tmp_path / "league.sqlite3"))
+    await seed_database(factory, league)
+    invalidate_local({ALL})
+    past = league.seasons[0]
+    played = _played(league, past.id, "B")
+    try:
+        async with factory() as session:
+            live = await get_head_to_head(session, "B", season_id=past.id)
+        assert live.results == _expected(played, live.team_ids)
+        # Every pair met twice, home and away
+        assert [row[2] for row in live.results] == [2] * 6
+
+        async with factory() as session:
+            await season_archive.archive_season(session, past.id)
+        invalidate_local({ALL})
+        async with factory() as session:
+            archived = await get_head_to_head(session, "B", season_id=past.id)
+        assert archived == live
+    finally:
+        for season in season_archive._open_seasons.values():
+            season.close()
+        season_archive._open_seasons.clear()
+        invalidate_local({ALL})
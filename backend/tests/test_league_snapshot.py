@@ -0,0 +1,133 @@
+"""
+League snapshots: encoding round trip, damaged files and verification
+against the database's data version.
+"""
+import pytest
+from sqlalchemy import update
+
+from app.core.invalidation import get_data_version, publish
+from app.models.match import Match
+from app.models.season import Season
+from app.services import league_state
+from app.services.league_snapshot import (
+    NO_STRING, decode_snapshot, encode_snapshot, read_snapshot, write_snapshot_file, _HEADER,
+)
+from app.services.league_state import LeagueState, adopt_provisional, has_provisional, install_provisional
+from app.services.standings_rules import DEFAULT_RULES
+
+RULES = {
+    "points": {"2-0": 4, "2-1": 3, "1-2": 1, "0-2": 0},
+    "tiebreakers": ["head_to_head_points", "game_diff", "set_diff"],
+}
+
+
+async def _load(factory, league, rules=None) -> LeagueState:
+    """The current season with `rules` and a match without a round, stamped with its data version"""
+    season_id = league.current_season.id
+    unnamed = next(m for m in league.matches if m.season_id == season_id)
+    async with factory() as session:
+        await session.execute(update(Season).where(Season.id == season_id).values(rules=rules))
+        await session.execute(update(Match).where(Match.id == unnamed.id).values(round=None))
+        await publish(session, "seasons")
+        await session.commit()
+        state = await LeagueState.load(session, season_id)
+        state.db_version = await get_data_version(session)
+    return state
+
+
+@pytest.mark.parametrize("rules", [None, RULES], ids=["default_rules", "season_rules"])
+async def test_snapshot_round_trip(league_db, rules):
+    factory, league = league_db
+    state = await _load(factory, league, rules)
+    data = encode_snapshot(state)
+    restored = decode_snapshot(data)
+
+    assert (restored.season_id, restored.db_version) == (state.season_id, state.db_version)
+    if rules is None:
+        assert restored.rules is DEFAULT_RULES
+        assert _HEADER.unpack_from(data)[-1] == NO_STRING
+    else:
+        assert restored.rules.rules == state.rules.rules
+        assert restored.rules.head_to_head
+
+    # Rosters and sets are stored flat; every row must get its own slice back
+    assert [(t.id, t.name, t.group, t.active, t.players, t.rating) for t in restored.teams] == [
+        (t.id, t.name, t.group, t.active, t.players, t.rating) for t in state.teams
+    ]
+    assert [(m.id, m.date, m.group, m.round, m.home, m.away, m.status, m.set_ids, m.sets) for m in restored.matches] == [
+        (m.id, m.date, m.group, m.round, m.home, m.away, m.status, m.set_ids, m.sets) for m in state.matches
+    ]
+    assert any(m.round is None for m in restored.matches)
+    assert restored.team_index == state.team_index and restored.match_index == state.match_index
+    assert restored.accumulators == state.accumulators
+    assert restored.fingerprint() == state.fingerprint()
+    assert restored.standings() == state.standings()
+    assert restored.standings(group="A") == state.standings(group="A")
+    assert restored.list_matches() == state.list_matches()
+
+
+async def test_checksum_mismatch_is_rejected(league_db):
+    factory, league = league_db
+    data = bytearray(encode_snapshot(await _load(factory, league)))
+    data[_HEADER.size + 100] ^= 0xFF
+    with pytest.raises(ValueError, match="checksum"):
+        decode_snapshot(data)
+
+
+def _truncated(data: bytes) -> bytes:
+    return data[:len(data) // 2]
+
+
+def _corrupted(data: bytes) -> bytes:
+    return data[:-10] + bytes(b ^ 0xFF for b in data[-10:])
+
+
+def _header_only(data: bytes) -> bytes:
+    return data[:_HEADER.size - 1]
+
+
+def _other_format(data: bytes) -> bytes:
+    return data[:4] + b"\xff\xff" + data[6:]
+
+
+@pytest.mark.parametrize("damage", [_truncated, _corrupted, _header_only, _other_format])
+async def test_damaged_snapshot_file_is_ignored(league_db, tmp_path, damage):
+    factory, league = league_db
+    state = await _load(factory, league)
+    path = write_snapshot_file(state, tmp_path / "league.snapshot")
+    assert read_snapshot(path).fingerprint() == state.fingerprint()
+
+    path.write_bytes(damage(path.read_bytes()))
+    assert read_snapshot(path) is None
+
+
+async def test_missing_snapshot_file(tmp_path):
+    assert read_snapshot(tmp_path / "missing.snapshot") is None
+
+
+async def test_adopt_provisional(league_db, monkeypatch):
+    factory, league = league_db
+    monkeypatch.setattr(league_state, "_state", None)
+    state = decode_snapshot(encode_snapshot(await _load(factory, league)))
+
+    install_provisional(state)
+    async with factory() as session:
+        assert await adopt_provisional(session)
+    assert not has_provisional()
+    assert league_state._state is state
+
+
+async def test_adopt_provisional_rejects_stale_version(league_db, monkeypatch):
+    factory, league = league_db
+    monkeypatch.setattr(league_state, "_state", None)
+    state = decode_snapshot(encode_snapshot(await _load(factory, league)))
+    async with factory() as session:
+        # An admin write after the snapshot was taken
+        await publish(session, "teams")
+        await session.commit()
+
+    install_provisional(state)
+    async with factory() as session:
+        assert not await adopt_provisional(session)
+    assert not has_provisional()
+    assert league_state._state is None
@@ -0,0 +1,117 @@
+"""
+The in-memory league state against the database after admin writes:
+results, team edits, roster changes, archived teams and deleted matches.
+"""
+import pytest
+
+from app.core import response_cache
+from app.core.config import settings
+from app.services.league_state import LeagueState, get_league_state
+from app.services.standings import calculate_standings
+
+STRAIGHT = [{"set_number": 1, "home_games": 6, "away_games": 2}, {"set_number": 2, "home_games": 6, "away_games": 3}]
+DECIDER = [
+    {"set_number": 1, "home_games": 4, "away_games": 6},
+    {"set_number": 2, "home_games": 6, "away_games": 3},
+    {"set_number": 3, "home_games": 5, "away_games": 7},
+]
+ONE_SET = [{"set_number": 1, "home_games": 6, "away_games": 1}]
+
+
+@pytest.fixture(autouse=True)
+def _uncached(monkeypatch):
+    # Responses cached while one side served would be replayed for the other
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+
+
+async def _write(client, league):
+    """
+    Admin writes of every kind; returns the (team ids, match ids) they touched.
+    Results move ratings, and corrections replay the season: every team counts.
+    """
+    season_id = league.current_season.id
+    scheduled = [m for m in league.scheduled_matches if m.season_id == season_id]
+    played = [m for m in league.played_matches if m.season_id == season_id]
+    teams = [t for t in league.teams if t.season_id == season_id]
+    team_ids, match_ids = {t.id for t in teams}, set()
+
+    for match, sets in ((scheduled[0], STRAIGHT), (scheduled[1], DECIDER), (scheduled[2], ONE_SET), (played[0], DECIDER)):
+        response = await client.post(f"/api/v1/admin/matches/{match.id}/result", json={"sets": sets})
+        assert response.status_code == 200, response.text
+        match_ids.add(match.id)
+
+    renamed, rostered, archived = teams[0], teams[1], teams[2]
+    response = await client.put(f"/api/v1/admin/teams/{renamed.id}", json={"name": "Renamed Team"})
+    assert response.status_code == 200, response.text
+    response = await client.put(f"/api/v1/admin/teams/{rostered.id}", json={"players": [
+        {"name": "New Player One", "role": "main"},
+        {"name": "New Player Two", "role": "main"},
+    ]})
+    assert response.status_code == 200, response.text
+    response = await client.delete(f"/api/v1/admin/teams/{archived.id}")
+    assert response.status_code == 204, response.text
+
+    response = await client.delete(f"/api/v1/admin/matches/{played[1].id}")
+    assert response.status_code == 204, response.text
+    match_ids.add(played[1].id)
+    return team_ids, match_ids
+
+
+async def _get(client, path, **params):
+    response = await client.get(f"/api/v1/public/{path}", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+async def _public_views(client):
+    """Public list responses, in a stable order (the database doesn't order ties)"""
+    by_id = lambda rows: sorted(rows, key=lambda row: row["id"])
+    return {
+        "teams": by_id(await _get(client, "teams/")),
+        "archived_teams": by_id(await _get(client, "teams/", active="false")),
+        "group_teams": by_id(await _get(client, "teams/", group="A")),
+        "matches": by_id(await _get(client, "matches/")),
+        "played": by_id(await _get(client, "matches/", status="played")),
+        "group_matches": by_id(await _get(client, "matches/", group="B")),
+        "standings": await _get(client, "standings/"),
+        "group_standings": await _get(client, "standings/", group="A"),
+    }
+
+
+async def test_apply_changes_matches_database(league_db, client, monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", False)
+    factory, league = league_db
+    season_id = league.current_season.id
+    async with factory() as session:
+        state = await LeagueState.load(session, season_id)
+
+    team_ids, match_ids = await _write(client, league)
+    async with factory() as session:
+        assert await state.apply_changes(session, team_ids, match_ids)
+        assert state.standings() == await calculate_standings(session, season_id=season_id)
+        for group in ("A", "B"):
+            assert state.standings(group=group) == await calculate_standings(session, group=group, season_id=season_id)
+        assert state.fingerprint() == (await LeagueState.load(session, season_id)).fingerprint()
+
+    views = await _public_views(client)
+    dump = lambda rows: sorted((row.model_dump(mode="json") for row in rows), key=lambda row: row["id"])
+    assert dump(state.list_teams(active=True)) == views["teams"]
+    assert dump(state.list_teams(active=False)) == views["archived_teams"]
+    assert dump(state.list_teams(group="A", active=True)) == views["group_teams"]
+    assert dump(state.list_matches()) == views["matches"]
+    assert dump(state.list_matches(status="played")) == views["played"]
+    assert dump(state.list_matches(group="B")) == views["group_matches"]
+
+
+async def test_public_reads_after_writes_match_database(league_db, client, monkeypatch):
+    """Writes reach the live state through invalidation (the queued changes)"""
+    factory, league = league_db
+    await _public_views(client)  # Loads the state
+    await _write(client, league)
+    from_state = await _public_views(client)
+    async with factory() as session:
+        assert await get_league_state(session) is not None
+
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", False)
+    assert from_state == await _public_views(client)
@@ -0,0 +1,155 @@
+"""
+Streaming match exports: NDJSON and CSV content, filters and both set storages.
+"""
+import csv
+import io
+import json
+from datetime import datetime, time, timedelta
+
+import pytest
+
+from app.core.config import settings
+from app.models.match import MatchStatusEnum
+from app.schemas.match import MatchResponse
+from app.services import match_export
+from app.services.match_export import CSV_COLUMNS, encode_matches, stream_season_matches
+
+
+@pytest.fixture(params=["rows", "array"])
+def set_storage(request, monkeypatch):
+    monkeypatch.setattr(settings, "MATCH_SET_STORAGE", request.param)
+    return request.param
+
+
+def _season_matches(league):
+    season_id = league.current_season.id
+    matches = [m for m in league.matches if m.season_id == season_id]
+    return sorted(matches, key=lambda m: m.id)
+
+
+def _sets(match):
+    return [(s.set_number, s.home_games, s.away_games) for s in sorted(match.match_sets, key=lambda s: s.set_number)]
+
+
+async def _export(factory, league, **filters):
+    async with factory() as session:
+        return [match async for match in stream_season_matches(session, league.current_season.id, **filters)]
+
+
+async def _encode(matches, fmt) -> str:
+    return b"".join([chunk async for chunk in encode_matches(matches, fmt)]).decode("utf-8")
+
+
+async def test_every_match_with_its_sets(league_db, set_storage):
+    factory, league = league_db
+    exported = await _export(factory, league)
+
+    expected = _season_matches(league)
+    assert len(exported) == len(expected)
+    # Newest first, match id between matches on the same date
+    assert [(m.date, m.id) for m in exported] == sorted(
+        [(m.date, m.id) for m in expected], key=lambda key: (-key[0].timestamp(), key[1])
+    )
+    by_id = {m.id: m for m in exported}
+    for match in expected:
+        response = by_id[match.id]
+        assert [(s.set_number, s.home_games, s.away_games) for s in response.match_sets] == _sets(match)
+        assert response.group == match.division.code
+        assert response.status == match.status
+        assert (response.home_team_name, response.away_team_name) == (match.home_team.name, match.away_team.name)
+
+
+def _day_start(day):
+    return datetime.combine(day, time.min)
+
+
+@pytest.mark.parametrize("filters", ["group", "status", "dates"])
+async def test_filters(league_db, set_storage, filters):
+    factory, league = league_db
+    matches = _season_matches(league)
+    start = min(m.date for m in matches)
+    if filters == "group":
+        kwargs = {"group": "B"}
+        expected = [m for m in matches if m.division.code == "B"]
+    elif filters == "status":
+        kwargs = {"status": MatchStatusEnum.SCHEDULED}
+        expected = [m for m in matches if m.status == MatchStatusEnum.SCHEDULED]
+    else:
+        # Dates compare from midnight: rounds 2 and 3 only
+        kwargs = {"date_from": (start + timedelta(days=7)).date(), "date_to": (start + timedelta(days=21)).date()}
+        expected = [
+            m for m in matches
+            if _day_start(kwargs["date_from"]) <= m.date <= _day_start(kwargs["date_to"])
+        ]
+    assert expected and len(expected) < len(matches)
+
+    exported = await _export(factory, league, **kwargs)
+    assert sorted(m.id for m in exported) == [m.id for m in expected]
+
+
+async def test_ndjson(league_db):
+    factory, league = league_db
+    exported = await _export(factory, league)
+    body = await _encode(exported, "ndjson")
+
+    lines = body.splitlines()
+    assert body.endswith("\n") and len(lines) == len(exported)
+    assert [MatchResponse.model_validate(json.loads(line)) for line in lines] == exported
+
+
+async def test_csv(league_db):
+    factory, league = league_db
+    exported = await _export(factory, league)
+    rows = list(csv.reader(io.StringIO(await _encode(exported, "csv"))))
+
+    assert rows[0] == CSV_COLUMNS
+    assert len(rows) == len(exported) + 1
+    by_id = {str(m.id): m for m in _season_matches(league)}
+    for row in rows[1:]:
+        values = dict(zip(CSV_COLUMNS, row))
+        match = by_id[values["match_id"]]
+        assert values["group"] == match.division.code
+        assert values["round"] == match.round
+        assert values["status"] == match.status.value
+        assert values["home_team_name"] == match.home_team.name
+        assert values["away_team_name"] == match.away_team.name
+        sets = _sets(match)
+        if not sets:
+            assert [values[c] for c in CSV_COLUMNS[10:]] == [""] * 8
+            continue
+        assert int(values["home_sets_won"]) == sum(1 for _, home, away in sets if home > away)
+        assert int(values["away_sets_won"]) == sum(1 for _, home, away in sets if away > home)
+        for set_number in (1, 2, 3):
+            games = next(((home, away) for n, home, away in sets if n == set_number), None)
+            cells = (values[f"set{set_number}_home"], values[f"set{set_number}_away"])
+            assert cells == (("", "") if games is None else (str(games[0]), str(games[1])))
+
+
+@pytest.mark.parametrize("fmt", ["ndjson", "csv"])
+async def test_chunks_join_to_the_same_output(league_db, fmt, monkeypatch):
+    factory, league = league_db
+    exported = await _export(factory, league)
+    whole = await _encode(exported, fmt)
+
+    monkeypatch.setattr(match_export, "_CHUNK_BYTES", 512)
+    chunks = [chunk async for chunk in encode_matches(exported, fmt)]
+    assert len(chunks) > 1
+    assert b"".join(chunks).decode("utf-8") == whole
+
+
+async def test_unknown_format():
+    with pytest.raises(ValueError):
+        await _encode([], "xml")
+
+
+async def test_export_endpoint(client, league_db):
+    factory, league = league_db
+    response = await client.get("/api/v1/public/matches/export", params={"format": "csv", "group": "A"})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    assert 'filename="matches.csv"' in response.headers["content-disposition"]
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == CSV_COLUMNS
+    assert sorted(row[0] for row in rows[1:]) == sorted(
+        str(m.id) for m in _season_matches(league) if m.division.code == "A"
+    )
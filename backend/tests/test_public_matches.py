@@ -0,0 +1,101 @@
+"""
+Public match list: the team_id filter returns exactly the team's home and
+away matches, from the league state, the database and an archived season.
+"""
+import httpx
+import pytest
+
+from app.core import response_cache
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.invalidation import ALL, invalidate_local
+from app.core.sqlite import create_sqlite_session_factory, override_get_db
+from app.main import app
+from perf.dataset import generate_league, seed_database
+
+pytest.importorskip("pyarrow")
+
+from app.services import season_archive  # noqa: E402
+
+API = "/api/v1/public/matches/"
+
+
+@pytest.fixture
+async def seasons(tmp_path, monkeypatch):
+    """
+    (client, league, archived season id) on a three-season league whose
+    oldest season is archived; the middle one stays in the database.
+    """
+    monkeypatch.setattr(settings, "SEASON_ARCHIVE_DIR", str(tmp_path / "archive"))
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    league = generate_league(teams_per_group=4, seasons=3)
+    factory = await create_sqlite_session_factory(str(tmp_path / "league.sqlite3"))
+    await seed_database(factory, league)
+    archived = league.seasons[0].id
+    assert not league.seasons[0].is_current
+    async with factory() as session:
+        await season_archive.archive_season(session, archived)
+    invalidate_local({ALL})
+
+    override_get_db(app, factory)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+            yield client, league, archived
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+        for season in season_archive._open_seasons.values():
+            season.close()
+        season_archive._open_seasons.clear()
+        invalidate_local({ALL})
+
+
+def _team_matches(league, team):
+    # Either side; a single-leg round-robin may leave a team with no home match
+    return sorted(m.id for m in league.matches if team.id in (m.home_team_id, m.away_team_id))
+
+
+async def _check_team(client, league, team, **params):
+    response = await client.get(API, params={"team_id": str(team.id), **params})
+    assert response.status_code == 200
+    matches = response.json()
+    assert matches
+    assert sorted(m["id"] for m in matches) == [str(match_id) for match_id in _team_matches(league, team)]
+    assert all(str(team.id) in (m["home_team_id"], m["away_team_id"]) for m in matches)
+    assert [m["date"] for m in matches] == sorted((m["date"] for m in matches), reverse=True)
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_current_season_team(seasons, league_state, monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    client, league, _ = seasons
+    for team in league.teams:
+        if team.season_id == league.current_season.id:
+            await _check_team(client, league, team)
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_past_season_team(seasons, league_state, monkeypatch):
+    """Not in the league state: the team's own season comes from the database"""
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    client, league, archived = seasons
+    past = league.seasons[1]
+    assert past.id != archived and not past.is_current
+    for team in league.teams:
+        if team.season_id == past.id:
+            await _check_team(client, league, team)
+            await _check_team(client, league, team, season_id=str(past.id))
+
+
+async def test_archived_season_team(seasons):
+    client, league, archived = seasons
+    for team in league.teams:
+        if team.season_id == archived:
+            await _check_team(client, league, team)
+            await _check_team(client, league, team, season_id=str(archived))
+
+
+async def test_unknown_team(seasons):
+    client, league, _ = seasons
+    response = await client.get(API, params={"team_id": str(league.seasons[0].id)})
+    assert response.status_code == 200 and response.json() == []
@@ -0,0 +1,131 @@
+"""
+Team ratings: a new result moves both teams by the Elo change; corrected,
+out-of-order and deleted results replay the season to what a fresh replay
+gives.
+"""
+import math
+
+import pytest
+from sqlalchemy import select
+
+from app.core.config import settings
+from app.models.match import Match, MatchStatusEnum
+from app.models.team import Team
+from app.models.team_rating import TeamRating
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.services.match_service import enter_match_result
+from app.services.ratings import recompute_ratings
+
+WIDE = [{"set_number": 1, "home_games": 6, "away_games": 1}, {"set_number": 2, "home_games": 6, "away_games": 0}]
+CLOSE = [
+    {"set_number": 1, "home_games": 6, "away_games": 7},
+    {"set_number": 2, "home_games": 7, "away_games": 5},
+    {"set_number": 3, "home_games": 3, "away_games": 6},
+]
+
+
+async def _ratings(session, season_id):
+    result = await session.execute(select(Team.id, Team.rating).where(Team.season_id == season_id))
+    return dict(result.all())
+
+
+async def _history(session, season_id):
+    result = await session.execute(
+        select(TeamRating.team_id, TeamRating.match_id, TeamRating.rating, TeamRating.change)
+        .where(TeamRating.season_id == season_id)
+    )
+    return sorted(result.all())
+
+
+async def _fresh_replay(session, season_id):
+    """Ratings from the played matches in (date, id) order, with the formula written out"""
+    result = await session.execute(
+        select(
+            Match.home_team_id, Match.away_team_id, Match.home_sets_won, Match.away_sets_won,
+            Match.home_games, Match.away_games,
+        )
+        .where(Match.season_id == season_id, Match.status == MatchStatusEnum.PLAYED)
+        .order_by(Match.date, Match.id)
+    )
+    ratings = {team_id: settings.RATING_INITIAL for team_id in await _ratings(session, season_id)}
+    for home, away, home_sets, away_sets, home_games, away_games in result.all():
+        expected = 1 / (1 + 10 ** ((ratings[away] - ratings[home]) / 400))
+        margin = (abs(home_sets - away_sets) + math.log1p(abs(home_games - away_games))) / 3
+        change = settings.RATING_K * margin * ((1.0 if home_sets > away_sets else 0.0) - expected)
+        ratings[home] += change
+        ratings[away] -= change
+    return ratings
+
+
+async def _rated(factory, league):
+    season_id = league.current_season.id
+    async with factory() as session:
+        await recompute_ratings(session, season_id)
+        await session.commit()
+        return await _ratings(session, season_id)
+
+
+async def test_result_moves_both_teams_by_the_elo_change(league_db):
+    factory, league = league_db
+    season_id = league.current_season.id
+    before = await _rated(factory, league)
+    # The first unplayed round: after every rated match of both teams
+    match = next(m for m in league.scheduled_matches if m.season_id == season_id)
+    home, away = before[match.home_team_id], before[match.away_team_id]
+
+    async with factory() as session:
+        sets = [MatchSetCreate(**s) for s in WIDE]
+        await enter_match_result(session, match.id, MatchResultCreate(sets=sets))
+        await session.commit()
+        after = await _ratings(session, season_id)
+        rows = (await session.execute(select(TeamRating).where(TeamRating.match_id == match.id))).scalars().all()
+
+    expected = 1 / (1 + 10 ** ((away - home) / 400))
+    change = settings.RATING_K * (2 + math.log1p(11)) / 3 * (1 - expected)
+    assert after[match.home_team_id] == pytest.approx(home + change)
+    assert after[match.away_team_id] == pytest.approx(away - change)
+    assert {team_id for team_id in after if after[team_id] != before[team_id]} == {match.home_team_id, match.away_team_id}
+    assert {row.team_id: row.change for row in rows} == pytest.approx(
+        {match.home_team_id: change, match.away_team_id: -change}
+    )
+    async with factory() as session:
+        assert after == pytest.approx(await _fresh_replay(session, season_id))
+
+
+@pytest.mark.parametrize("change", ["correction", "out_of_order", "delete"])
+async def test_changes_replay_the_season(league_db, client, change):
+    factory, league = league_db
+    season_id = league.current_season.id
+    await _rated(factory, league)
+    played = sorted((m for m in league.played_matches if m.season_id == season_id), key=lambda m: (m.date, m.id))
+    scheduled = sorted((m for m in league.scheduled_matches if m.season_id == season_id), key=lambda m: (m.date, m.id))
+
+    if change == "correction":
+        # The season's first result changed: every later rating depends on it
+        response = await client.post(f"/api/v1/admin/matches/{played[0].id}/result", json={"sets": CLOSE})
+        assert response.status_code == 200
+    elif change == "out_of_order":
+        # The earlier match shares a team with the later one, so it lands before a rated match
+        later = scheduled[-1]
+        earlier = next(m for m in scheduled if {m.home_team_id, m.away_team_id} & {later.home_team_id, later.away_team_id})
+        assert earlier.date < later.date
+        for match in (later, earlier):
+            response = await client.post(f"/api/v1/admin/matches/{match.id}/result", json={"sets": WIDE})
+            assert response.status_code == 200
+    else:
+        response = await client.delete(f"/api/v1/admin/matches/{played[0].id}")
+        assert response.status_code == 204
+
+    async with factory() as session:
+        ratings = await _ratings(session, season_id)
+        history = await _history(session, season_id)
+        assert ratings == pytest.approx(await _fresh_replay(session, season_id))
+
+        await recompute_ratings(session, season_id)
+        assert await _ratings(session, season_id) == pytest.approx(ratings)
+        replayed = await _history(session, season_id)
+        assert [row[:2] for row in replayed] == [row[:2] for row in history]
+        assert [value for row in replayed for value in row[2:]] == pytest.approx(
+            [value for row in history for value in row[2:]]
+        )
+        await session.rollback()
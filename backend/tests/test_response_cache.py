@@ -0,0 +1,120 @@
+"""
+Response cache (memory backend): tag invalidation, the generation guard,
+LRU eviction, TTL expiry and Surrogate-Key headers.
+"""
+from types import SimpleNamespace
+
+import pytest
+from fastapi import Request
+from sqlalchemy import select
+
+from app.core import response_cache
+from app.core.invalidation import invalidate_local, publish, team_tags
+from app.core.response_cache import IDENTITY, MemoryResponseCache, cache_key, cached_response
+from app.models.team import Team
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = MemoryResponseCache(1 << 20, 60.0)
+    monkeypatch.setattr(response_cache, "_cache", cache)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    return cache
+
+
+def _request(path: str, query: str = "") -> Request:
+    return Request({"type": "http", "method": "GET", "path": path, "query_string": query.encode(), "headers": []})
+
+
+def _teams(league):
+    return [t for t in league.teams if t.season_id == league.current_season.id]
+
+
+async def test_entries_are_dropped_by_tag_after_commit(league_db, client, cache):
+    factory, league = league_db
+    renamed, other = _teams(league)[:2]
+    paths = ["/api/v1/public/teams/", f"/api/v1/public/teams/{renamed.id}", f"/api/v1/public/teams/{other.id}"]
+    for path in paths * 2:
+        assert (await client.get(path)).status_code == 200
+    assert (cache.misses, cache.hits) == (3, 3)
+
+    # Published but rolled back: nothing changed, nothing is dropped
+    async with factory() as session:
+        await publish(session, *team_tags(renamed.id))
+        await session.rollback()
+    assert all([await cache.get(cache_key(_request(path))) for path in paths])
+
+    response = await client.put(f"/api/v1/admin/teams/{renamed.id}", json={"name": "Renamed Team"})
+    assert response.status_code == 200
+    assert await cache.get(cache_key(_request(paths[0]))) is None
+    assert await cache.get(cache_key(_request(paths[1]))) is None
+    assert await cache.get(cache_key(_request(paths[2]))) is not None  # Tagged by the other team only
+    assert (await client.get(paths[1])).json()["name"] == "Renamed Team"
+
+
+async def test_render_overtaken_by_a_write_is_not_stored(league_db, cache):
+    factory, league = league_db
+    body = b'{"teams":%d}' % len(league.teams)
+    sessions = []
+
+    @cached_response(dict, tags={"teams"})
+    async def endpoint(request: Request, db, write: bool):
+        sessions.append(db)
+        count = len((await db.execute(select(Team.id))).all())
+        if write:
+            invalidate_local({"matches"})  # An admin write commits while this renders
+        return {"teams": count}
+
+    request = _request("/teams-count")
+    async with factory() as db:
+        response = await endpoint(request=request, db=db, write=True)
+        assert response.body == body
+        assert await cache.get(cache_key(request)) is None
+
+        await endpoint(request=request, db=db, write=False)
+        assert (await cache.get(cache_key(request))).body == body
+    # Rendered on sessions of their own, not on the request's
+    assert all(session is not db for session in sessions)
+
+
+async def test_least_recently_used_entries_are_evicted():
+    cache = MemoryResponseCache(max_bytes=100, ttl_s=60.0)
+    for key in ("a", "b", "c"):
+        await cache.set(key, {IDENTITY: b"x" * 40}, {f"tag:{key}"})
+        if key == "b":
+            await cache.get("a")  # "a" is now more recent than "b"
+
+    assert await cache.get("b") is None
+    assert (await cache.get("a")).body == b"x" * 40
+    assert (await cache.get("c")).body == b"x" * 40
+    assert (cache.size, cache.evictions) == (80, 1)
+    assert "tag:b" not in cache._tags
+
+    await cache.set("big", {IDENTITY: b"x" * 101}, {"tag:big"})
+    assert await cache.get("big") is None and cache.size == 80
+
+
+async def test_entries_expire(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache, "time", SimpleNamespace(monotonic=lambda: now[0]))
+    cache = MemoryResponseCache(max_bytes=1000, ttl_s=30.0)
+    await cache.set("key", {IDENTITY: b"body"}, {"teams"})
+
+    now[0] += 29.9
+    assert await cache.get("key") is not None
+    now[0] += 0.2
+    assert await cache.get("key") is None
+    assert cache.size == 0 and not cache._tags
+
+
+@pytest.mark.parametrize("cached", [True, False], ids=["cached", "uncached"])
+async def test_surrogate_key_header(league_db, client, cached, monkeypatch):
+    _, league = league_db
+    monkeypatch.setattr(response_cache, "_cache", MemoryResponseCache(1 << 20, 60.0) if cached else None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    team = _teams(league)[0]
+    for _ in range(2):  # Miss, then hit
+        response = await client.get(f"/api/v1/public/teams/{team.id}")
+        assert response.headers["Surrogate-Key"] == f"team:{team.id}"
+        response = await client.get("/api/v1/public/teams/")
+        assert response.headers["Surrogate-Key"] == "teams"
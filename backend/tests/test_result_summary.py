@@ -0,0 +1,110 @@
+"""
+Result summary columns (sets won, games, winner) agree with the sets after
+every kind of write, and the migration's backfill computes the same values.
+"""
+import importlib.util
+from pathlib import Path
+
+from sqlalchemy import select, text, update
+
+from app.models.match import Match
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.services.match_service import count_sets_won, enter_match_result, match_sets_option, ordered_sets
+
+MIGRATION = Path(__file__).parent.parent / "alembic" / "versions" / "2026_10_19_add_match_result_summary.py"
+
+THREE_SETS = [
+    {"set_number": 1, "home_games": 6, "away_games": 4},
+    {"set_number": 2, "home_games": 3, "away_games": 6},
+    {"set_number": 3, "home_games": 7, "away_games": 6},
+]
+REVERSED = [
+    {"set_number": 1, "home_games": 2, "away_games": 6},
+    {"set_number": 2, "home_games": 6, "away_games": 7},
+]
+ONE_SET = [{"set_number": 1, "home_games": 6, "away_games": 3}]
+
+
+async def _check_summaries(factory, season_id):
+    """Every match's summary columns from its sets; returns the checked matches by id"""
+    async with factory() as session:
+        result = await session.execute(select(Match).where(Match.season_id == season_id).options(match_sets_option()))
+        matches = {match.id: match for match in result.scalars().all()}
+    for match in matches.values():
+        sets = ordered_sets(match)
+        home_sets, away_sets = count_sets_won(sets)
+        assert (match.home_sets_won, match.away_sets_won) == (home_sets, away_sets)
+        assert match.home_games == sum(s.home_games for s in sets)
+        assert match.away_games == sum(s.away_games for s in sets)
+        expected_winner = (
+            match.home_team_id if home_sets >= 2 else match.away_team_id if away_sets >= 2 else None
+        )
+        assert match.winner_team_id == expected_winner
+    return matches
+
+
+async def test_summary_follows_every_write(league_db, client):
+    factory, league = league_db
+    season_id = league.current_season.id
+    await _check_summaries(factory, season_id)
+    scheduled = [m for m in league.scheduled_matches if m.season_id == season_id]
+    played = next(m for m in league.played_matches if m.season_id == season_id)
+
+    # Entered through the service
+    async with factory() as session:
+        await enter_match_result(
+            session, scheduled[0].id, MatchResultCreate(sets=[MatchSetCreate(**s) for s in THREE_SETS])
+        )
+        await session.commit()
+    # Entered and corrected through the API, and a match still in progress
+    for match_id, sets in ((scheduled[1].id, THREE_SETS), (scheduled[1].id, REVERSED), (played.id, REVERSED),
+                           (scheduled[2].id, ONE_SET)):
+        response = await client.post(f"/api/v1/admin/matches/{match_id}/result", json={"sets": sets})
+        assert response.status_code == 200
+    # Home and away swapped: the winner is a team id, the sets now read the other way round
+    response = await client.put(
+        f"/api/v1/admin/matches/{played.id}",
+        json={"home_team_id": str(played.away_team_id), "away_team_id": str(played.home_team_id)},
+    )
+    assert response.status_code == 200
+
+    matches = await _check_summaries(factory, season_id)
+    assert matches[scheduled[0].id].winner_team_id == scheduled[0].home_team_id
+    assert matches[scheduled[1].id].winner_team_id == scheduled[1].away_team_id
+    assert (matches[scheduled[2].id].home_sets_won, matches[scheduled[2].id].winner_team_id) == (1, None)
+    # REVERSED is an away win; after the swap the original home team is away
+    assert matches[played.id].winner_team_id == played.home_team_id
+
+
+def _summary(match):
+    return match.home_sets_won, match.away_sets_won, match.home_games, match.away_games, match.winner_team_id
+
+
+def _backfill_sql() -> str:
+    spec = importlib.util.spec_from_file_location("add_match_result_summary", MIGRATION)
+    migration = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(migration)
+    return migration.BACKFILL_SUMMARY
+
+
+async def test_migration_backfill(league_db, client):
+    factory, league = league_db
+    season_id = league.current_season.id
+    in_progress = next(m for m in league.scheduled_matches if m.season_id == season_id)
+    response = await client.post(f"/api/v1/admin/matches/{in_progress.id}/result", json={"sets": ONE_SET})
+    assert response.status_code == 200
+    before = await _check_summaries(factory, season_id)
+
+    # The columns as the migration adds them, then the backfill
+    async with factory() as session:
+        await session.execute(
+            update(Match).values(home_sets_won=0, away_sets_won=0, home_games=0, away_games=0, winner_team_id=None)
+        )
+        await session.execute(text(_backfill_sql()))
+        await session.commit()
+
+    after = await _check_summaries(factory, season_id)
+    assert {match_id: _summary(m) for match_id, m in after.items()} == {
+        match_id: _summary(m) for match_id, m in before.items()
+    }
+    assert any(m.winner_team_id is not None for m in after.values())
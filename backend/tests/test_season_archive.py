@@ -0,0 +1,73 @@
+"""
+Lookups by id in archived seasons go through the id index, not a scan.
+"""
+import pytest
+
+from app.core.config import settings
+from app.core.invalidation import ALL, invalidate_local
+from app.core.sqlite import create_sqlite_session_factory
+from perf.dataset import generate_league, seed_database
+
+pytest.importorskip("pyarrow")
+
+from app.services import season_archive  # noqa: E402
+
+
+@pytest.fixture
+async def archived(tmp_path, monkeypatch):
+    """(league, archived season ids): the two finished seasons of a three-season league"""
+    monkeypatch.setattr(settings, "SEASON_ARCHIVE_DIR", str(tmp_path / "archive"))
+    league = generate_league(teams_per_group=4, seasons=3)
+    factory = await create_sqlite_session_factory(str(tmp_path / "league.sqlite3"))
+    await seed_database(factory, league)
+    finished = [s.id for s in league.seasons if not s.is_current]
+    for season_id in finished:
+        async with factory() as session:
+            await season_archive.archive_season(session, season_id)
+
+    invalidate_local({ALL})
+    yield league, finished
+
+    _close_all()
+    invalidate_local({ALL})
+
+
+def _close_all():
+    for season in season_archive._open_seasons.values():
+        season.close()
+    season_archive._open_seasons.clear()
+
+
+def _check_lookups(league, finished):
+    for team in league.teams:
+        season = season_archive.find_archived_team(team.id)
+        if team.season_id in finished:
+            assert season.season_id == team.season_id and season.get_team(team.id).name == team.name
+        else:
+            assert season is None
+    for match in league.matches:
+        season = season_archive.find_archived_match(match.id)
+        assert (season.season_id if season else None) == (match.season_id if match.season_id in finished else None)
+
+
+async def test_lookups_use_the_id_index(archived):
+    league, finished = archived
+    for season_id in finished:
+        assert (season_archive.season_archive_path(season_id) / season_archive.IDS_FILE).is_file()
+
+    current = next(m for m in league.matches if m.season_id not in finished)
+    assert season_archive.find_archived_match(current.id) is None
+    assert season_archive.find_archived_team(current.home_team_id) is None
+    assert not season_archive._open_seasons  # Misses open no archive
+
+    _check_lookups(league, finished)
+
+
+async def test_archives_without_ids_file(archived):
+    """Archives written before ids.json: the index is built from the id columns"""
+    league, finished = archived
+    for season_id in finished:
+        (season_archive.season_archive_path(season_id) / season_archive.IDS_FILE).unlink()
+    _close_all()
+    invalidate_local({ALL})
+    _check_lookups(league, finished)
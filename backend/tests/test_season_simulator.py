@@ -0,0 +1,173 @@
+"""
+Season simulator: known odds, the season's ranking rules and matches still
+to finish.
+"""
+import uuid
+
+import pytest
+
+from app.core import response_cache
+from app.core.config import settings
+from app.schemas.season import StandingsRules
+from app.services.standings_rules import DEFAULT_RULES, CompiledRules
+
+np = pytest.importorskip("numpy")
+
+from app.services import season_simulator  # noqa: E402
+from app.services.season_simulator import (  # noqa: E402
+    STAT_FIELDS, played_head_to_head, simulate_chunk, simulate_season,
+)
+
+HEAD_TO_HEAD_RULES = {
+    "points": {"2-0": 3, "2-1": 2, "1-2": 1, "0-2": 0},
+    "tiebreakers": ["head_to_head_points", "set_diff", "game_diff"],
+}
+ONE_SET = [{"set_number": 1, "home_games": 6, "away_games": 2}]
+STRAIGHT = ONE_SET + [{"set_number": 2, "home_games": 6, "away_games": 3}]
+
+
+@pytest.fixture(autouse=True)
+def no_pool(monkeypatch):
+    monkeypatch.setattr(settings, "SIMULATION_WORKERS", 0)
+    season_simulator._results.clear()
+    yield
+    season_simulator._results.clear()
+
+
+def _round_robin_fixtures(teams: int):
+    pairs = [(h, a) for h in range(teams) for a in range(teams) if h != a]
+    return np.array([h for h, _ in pairs]), np.array([a for _, a in pairs])
+
+
+def _stats(*rows):
+    """Stats rows of (points, matches won, set diff, game diff); sets and games for are 0"""
+    return np.array([list(row) + [0] * (len(STAT_FIELDS) - len(row)) for row in rows], dtype=np.int64)
+
+
+def test_simulate_chunk_even_teams():
+    """Equal teams, coin-flip sets: 1.5 expected points per match and evenly spread positions"""
+    teams, runs = 4, 40_000
+    home, away = _round_robin_fixtures(teams)
+    stats = _stats(*[(0, 0, 0, 0)] * teams)
+    counts, points_sum = simulate_chunk(stats, np.arange(teams), home, away, np.full(len(home), 0.5), runs, 1)
+
+    assert counts.sum(axis=1).tolist() == [runs] * teams
+    assert counts.sum(axis=0).tolist() == [runs] * teams
+    matches_per_team = 2 * (teams - 1)
+    assert np.allclose(points_sum / runs, 1.5 * matches_per_team, atol=0.05)
+    assert np.allclose(counts / runs, 1 / teams, atol=0.02)
+
+
+def test_simulate_chunk_decided_table():
+    """A lead no remaining match can close keeps first place in every run"""
+    teams, runs = 4, 1000
+    home, away = _round_robin_fixtures(teams)
+    stats = _stats((100, 30, 40, 100), (0, 0, 0, 0), (0, 0, 0, 0), (0, 0, 0, 0))
+    counts, _ = simulate_chunk(stats, np.arange(teams), home, away, np.full(len(home), 0.5), runs, 1)
+    assert counts[0, 0] == runs
+
+
+@pytest.mark.parametrize("p", [0.5, 0.7])
+def test_single_remaining_match(p):
+    """Two level teams and one match between them: the winner of the match finishes first"""
+    runs = 200_000
+    counts, points_sum = simulate_chunk(
+        _stats((6, 2, 1, 5), (6, 2, 1, 5)), np.arange(2), np.array([0]), np.array([1]), np.array([p]), runs, 7,
+    )
+    # Best of three sets: 2-0, 2-1, 1-2 and 0-2 for the home team
+    outcomes = [p * p, 2 * p * p * (1 - p), 2 * p * (1 - p) ** 2, (1 - p) ** 2]
+    assert counts[0, 0] / runs == pytest.approx(outcomes[0] + outcomes[1], abs=0.005)
+    assert counts[0, 0] + counts[1, 0] == runs
+    expected_home_points = 6 + sum(points * share for points, share in zip((3, 2, 1, 0), outcomes))
+    assert points_sum[0] / runs == pytest.approx(expected_home_points, abs=0.01)
+    assert points_sum.sum() == runs * (12 + 3)
+
+
+@pytest.mark.parametrize("criteria", [("points", "sets_for"), ("points", "games_for", "sets_for")])
+def test_criteria_beyond_the_default(criteria):
+    """No points for anything: sets won (or games, then sets) decide between two teams"""
+    runs, p = 50_000, 0.7
+    counts, points_sum = simulate_chunk(
+        _stats((0,), (0,)), np.arange(2), np.array([0]), np.array([1]), np.array([p]), runs, 5,
+        points_table=[0] * 9, criteria=criteria,
+    )
+    assert points_sum.tolist() == [0, 0]
+    assert counts.sum(axis=0).tolist() == [runs, runs]
+    if criteria[1] == "sets_for":
+        # The match winner has two sets, the loser one at most
+        assert counts[0, 0] / runs == pytest.approx(p * p * (3 - 2 * p), abs=0.005)
+
+
+def test_head_to_head_criteria():
+    """
+    Teams 0 and 1 are level on points; team 0 has the better set difference,
+    team 1 won their match. The remaining match can't reach them.
+    """
+    teams = [uuid.uuid4() for _ in range(4)]
+    stats = _stats((9, 3, 6, 20), (9, 3, 2, 5), (0, 0, -4, -12), (0, 0, -4, -13))
+    played = [(teams[1], teams[0], 2, 1, 14, 13)]
+    rules = CompiledRules(StandingsRules.model_validate(HEAD_TO_HEAD_RULES))
+    played_h2h = played_head_to_head({team: i for i, team in enumerate(teams)}, played, rules)
+    assert played_h2h[0][1][0] == 2 and played_h2h[0][0][1] == 1
+    assert played_h2h[1][1][0] == 1 and played_h2h[2][0][1] == -1
+
+    fixture = (np.array([2]), np.array([3]), np.array([0.5]))
+    default, _ = simulate_chunk(stats, np.arange(4), *fixture, 1000, 1, criteria=DEFAULT_RULES.criteria)
+    assert default[0, 0] == 1000
+    head_to_head, _ = simulate_chunk(
+        stats, np.arange(4), *fixture, 1000, 1, criteria=rules.criteria, played_h2h=played_h2h,
+    )
+    assert head_to_head[1, 0] == 1000
+    # Teams 2 and 3 split third place by their own match
+    assert head_to_head[2, 2] + head_to_head[3, 2] == 1000 and 0 < head_to_head[2, 2] < 1000
+
+
+def test_head_to_head_counts_simulated_matches():
+    """Level teams whose only match is still to play: its winner is ranked first"""
+    rules = CompiledRules(StandingsRules.model_validate(HEAD_TO_HEAD_RULES))
+    stats = _stats((6, 2, 4, 8), (6, 2, 4, 8))
+    counts, _ = simulate_chunk(
+        stats, np.arange(2), np.array([0]), np.array([1]), np.array([0.9]), 50_000, 3,
+        criteria=rules.criteria,
+    )
+    assert counts[0, 0] / 50_000 == pytest.approx(0.81 * (3 - 1.8), abs=0.005)
+
+
+async def _enter_every_remaining_result(client, league, sets):
+    for match in league.scheduled_matches:
+        if match.season_id == league.current_season.id:
+            response = await client.post(f"/api/v1/admin/matches/{match.id}/result", json={"sets": sets})
+            assert response.status_code == 200
+
+
+@pytest.mark.parametrize("rules", [None, HEAD_TO_HEAD_RULES], ids=["default_rules", "head_to_head"])
+async def test_finished_season_is_the_table(league_db, client, rules, monkeypatch):
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+    factory, league = league_db
+    if rules is not None:
+        response = await client.put(f"/api/v1/admin/seasons/{league.current_season.id}", json={"rules": rules})
+        assert response.status_code == 200
+    await _enter_every_remaining_result(client, league, STRAIGHT)
+
+    async with factory() as session:
+        result = await simulate_season(session, runs=1000)
+    assert result.remaining_matches == 0
+    for group in ("A", "B"):
+        table = (await client.get("/api/v1/public/standings/", params={"group": group})).json()
+        simulated = {team.team_id: team for team in result.teams if team.group == group}
+        for position, row in enumerate(table):
+            team = simulated[uuid.UUID(row["team_id"])]
+            assert team.position_probabilities[position] == 1.0
+            assert team.expected_points == row["points"]
+
+
+async def test_matches_in_progress_remain(league_db, client):
+    factory, league = league_db
+    remaining = [m for m in league.scheduled_matches if m.season_id == league.current_season.id]
+    await _enter_every_remaining_result(client, league, ONE_SET)
+
+    async with factory() as session:
+        result = await simulate_season(session, runs=1000)
+    assert result.remaining_matches == len(remaining)
+    assert any(max(team.position_probabilities) < 1.0 for team in result.teams)
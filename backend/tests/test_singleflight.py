@@ -0,0 +1,57 @@
+"""
+Single-flight tasks run on their own session, not on the caller's, and
+waiting callers give their connection back.
+"""
+import asyncio
+
+from sqlalchemy import func, select
+
+from app.core.database import session_factory
+from app.core.singleflight import SingleFlight
+from app.models.team import Team
+
+
+async def test_flight_survives_a_cancelled_caller(league_db):
+    factory, league = league_db
+    flight = SingleFlight("tests.flight")
+    started = asyncio.Event()
+    release = asyncio.Event()
+    sessions = []
+
+    async def count_teams(session):
+        sessions.append(session)
+        started.set()
+        await release.wait()
+        return (await session.execute(select(func.count(Team.id)))).scalar_one()
+
+    async with factory() as first_db, factory() as second_db:
+        first = asyncio.ensure_future(flight.do("teams", count_teams, session_factory(first_db)))
+        await started.wait()
+        second = asyncio.ensure_future(flight.do("teams", count_teams, session_factory(second_db)))
+        await asyncio.sleep(0)
+
+        # The request that started the task goes away with its session
+        first.cancel()
+        await first_db.close()
+        release.set()
+
+        assert await second == len(league.teams)
+        assert sessions[0] is not first_db and sessions[0] is not second_db
+    assert flight.stats()["executions"] == 1 and flight.stats()["coalesced"] == 1
+
+
+
+async def test_waiting_caller_releases_its_connection(league_db):
+    factory, _ = league_db
+    flight = SingleFlight("tests.release")
+
+    async with factory() as caller:
+        async def caller_in_transaction(session):
+            return caller.in_transaction()
+
+        await caller.execute(select(Team.id).limit(1))  # Begins a transaction implicitly
+        assert not await flight.do("read", caller_in_transaction, session_factory(caller), release=caller)
+
+        async with caller.begin():  # An explicit transaction is the caller's to end
+            await caller.execute(select(Team.id).limit(1))
+            assert await flight.do("write", caller_in_transaction, session_factory(caller), release=caller)
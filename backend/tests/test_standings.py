@@ -0,0 +1,21 @@
+"""
+Public standings: the team endpoint agrees with the table.
+"""
+import pytest
+
+from app.core import response_cache
+from app.core.config import settings
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_team_standing_matches_table(league_db, client, league_state, monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    monkeypatch.setattr(response_cache, "_cache", None)
+    monkeypatch.setattr(response_cache, "_configured", True)
+
+    table = (await client.get("/api/v1/public/standings/")).json()
+    assert all(row["best_position"] is not None for row in table)
+    for row in table:
+        response = await client.get(f"/api/v1/public/standings/teams/{row['team_id']}")
+        assert response.status_code == 200
+        assert response.json() == row
@@ -0,0 +1,45 @@
+"""
+Standings history snapshots: stored by reads only when no write interferes
+"""
+from sqlalchemy import func, select
+
+from app.core.invalidation import get_data_version, publish
+from app.models.standings_snapshot import StandingsSnapshot
+from app.services.standings_history import _persist_snapshots, get_standings_history
+
+
+async def _snapshot_count(factory) -> int:
+    async with factory() as session:
+        return await session.scalar(select(func.count()).select_from(StandingsSnapshot))
+
+
+async def test_history_read_stores_missing_rounds(league_db):
+    factory, _ = league_db
+    async with factory() as session:
+        history = await get_standings_history(session, group="A")
+    assert history
+    stored = await _snapshot_count(factory)
+    assert stored == len(history)
+    async with factory() as session:
+        # Served from the snapshots, unchanged
+        assert await get_standings_history(session, group="A") == history
+    assert await _snapshot_count(factory) == stored
+
+
+async def test_stale_snapshots_are_not_stored(league_db):
+    """Rounds computed before a write committed are returned but never stored"""
+    factory, league = league_db
+    division = next(d for d in league.divisions if d.season_id == league.current_season.id and d.code == "A")
+    async with factory() as session:
+        version = await get_data_version(session)
+        await publish(session, "standings")
+        await session.commit()
+
+        snapshot = StandingsSnapshot(season_id=league.current_season.id, division_id=division.id, round=1, stats={})
+        assert not await _persist_snapshots(session, [snapshot], version)
+        assert await _persist_snapshots(
+            session,
+            [StandingsSnapshot(season_id=league.current_season.id, division_id=division.id, round=1, stats={})],
+            await get_data_version(session),
+        )
+    assert await _snapshot_count(factory) == 1
@@ -0,0 +1,68 @@
+"""
+Standings rules: the compiled default rules and head-to-head mini-leagues.
+"""
+import random
+from uuid import uuid4
+
+from app.schemas.season import StandingsRules
+from app.schemas.standings import TeamStandingResponse
+from app.services.standings import calculate_match_points, rank_standings
+from app.services.standings_rules import DEFAULT_RULES, compile_rules
+
+
+def _standing(name, points=0, won=0, set_diff=0, game_diff=0) -> TeamStandingResponse:
+    return TeamStandingResponse(
+        team_id=uuid4(), team_name=name, group="A", matches_played=0, matches_won=won, matches_lost=0,
+        sets_for=0, sets_against=0, games_for=0, games_against=0,
+        points=points, set_diff=set_diff, game_diff=game_diff, position=0,
+    )
+
+
+def _tied_table(teams: int, seed: int = 1):
+    """A table with many ties on points and a round robin among its teams"""
+    rng = random.Random(seed)
+    standings = [
+        _standing(f"Team {i:03}", rng.randint(0, 6), rng.randint(0, 2), rng.randint(-2, 2), rng.randint(-5, 5))
+        for i in range(teams)
+    ]
+    matches = []
+    for i, home in enumerate(standings):
+        for away in standings[i + 1:]:
+            home_sets, away_sets = rng.choice(((2, 0), (2, 1), (1, 2), (0, 2)))
+            matches.append((home.team_id, away.team_id, home_sets, away_sets, rng.randint(6, 19), rng.randint(6, 19)))
+    return standings, matches
+
+
+def _reference_order(standings):
+    """The fixed ordering the compiled default rules replace"""
+    return sorted(standings, key=lambda s: (-s.points, -s.matches_won, -s.set_diff, -s.game_diff, s.team_name.lower()))
+
+
+def test_default_rules_match_fixed_ordering():
+    standings, _ = _tied_table(200)
+    expected = [s.team_id for s in _reference_order(standings)]
+    assert [s.team_id for s in rank_standings(list(standings))] == expected
+    assert compile_rules(None) is DEFAULT_RULES
+    assert [calculate_match_points(h, a) for h, a in ((2, 0), (2, 1), (1, 2), (0, 2))] == [3, 2, 1, 0]
+
+
+def test_head_to_head_mini_league():
+    """Three teams level on points are split by the matches among them only"""
+    rules = compile_rules(StandingsRules(
+        points={"2-0": 2, "2-1": 2, "1-2": 0, "0-2": 0},
+        tiebreakers=["head_to_head_points", "head_to_head_set_diff", "set_diff"],
+    ).model_dump())
+    a, b, c, d = (_standing(name, points=4, set_diff=diff) for name, diff in (("A", 3), ("B", 2), ("C", 1), ("D", 0)))
+    d.points = 2
+    matches = [
+        (c.team_id, a.team_id, 2, 0, 12, 4),  # C beats A
+        (c.team_id, b.team_id, 2, 1, 15, 14),  # C beats B
+        (a.team_id, b.team_id, 2, 1, 16, 13),  # A beats B
+        (b.team_id, d.team_id, 2, 0, 12, 3),  # Outside the mini-league
+    ]
+    assert rules.match_points(2, 1) == 2
+    ranked = rank_standings([a, b, c, d], rules, matches)
+    assert [s.team_name for s in ranked] == ["C", "A", "B", "D"]
+    assert [s.position for s in ranked] == [1, 2, 3, 4]
+    # Without the matches, head-to-head leaves the tie to the set difference
+    assert [s.team_name for s in rank_standings([a, b, c, d], rules)] == ["A", "B", "C", "D"]
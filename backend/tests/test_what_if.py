@@ -0,0 +1,62 @@
+"""
+What-if standings against the table after really entering the same results
+"""
+import pytest
+
+from app.core.config import settings
+from app.schemas.match import MatchResultCreate, MatchSetCreate
+from app.schemas.standings import WhatIfResult
+from app.services.match_service import enter_match_result
+from app.services.standings import calculate_standings
+from app.services.what_if import get_what_if_standings
+
+STRAIGHT = [MatchSetCreate(set_number=1, home_games=6, away_games=2), MatchSetCreate(set_number=2, home_games=6, away_games=3)]
+DECIDER = [
+    MatchSetCreate(set_number=1, home_games=4, away_games=6),
+    MatchSetCreate(set_number=2, home_games=6, away_games=3),
+    MatchSetCreate(set_number=3, home_games=5, away_games=7),
+]
+UNFINISHED = [
+    [MatchSetCreate(set_number=1, home_games=6, away_games=2)],
+    [MatchSetCreate(set_number=1, home_games=6, away_games=2), MatchSetCreate(set_number=2, home_games=3, away_games=6)],
+]
+
+
+def _table(standings):
+    # Entering a result also moves ratings; the what-if table keeps the current ones
+    return [s.model_dump(exclude={"rating"}) for s in standings]
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+async def test_what_if_equals_entered_results(league_db, league_state, monkeypatch):
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    factory, league = league_db
+    scheduled = [m for m in league.scheduled_matches if m.season_id == league.current_season.id][:4]
+    results = [
+        WhatIfResult(match_id=m.id, sets=STRAIGHT if i % 2 else DECIDER)
+        for i, m in enumerate(scheduled)
+    ]
+    async with factory() as session:
+        what_if = await get_what_if_standings(session, results)
+        group = await get_what_if_standings(session, results, group="A")
+        for result in results:
+            await enter_match_result(session, result.match_id, MatchResultCreate(sets=result.sets))
+        assert _table(what_if) == _table(await calculate_standings(session))
+        assert _table(group) == _table(await calculate_standings(session, group="A"))
+        await session.rollback()
+
+
+@pytest.mark.parametrize("league_state", [False, True], ids=["database", "league_state"])
+@pytest.mark.parametrize("sets", UNFINISHED, ids=["one_set", "one_all"])
+async def test_what_if_rejects_unfinished_results(league_db, league_state, sets, monkeypatch):
+    """Entering these sets leaves the match in progress, so they can't change the table"""
+    monkeypatch.setattr(settings, "LEAGUE_STATE_ENABLED", league_state)
+    factory, league = league_db
+    match = next(m for m in league.scheduled_matches if m.season_id == league.current_season.id)
+    async with factory() as session:
+        with pytest.raises(ValueError, match="no winner"):
+            await get_what_if_standings(session, [WhatIfResult(match_id=match.id, sets=sets)])
+        before = _table(await calculate_standings(session))
+        await enter_match_result(session, match.id, MatchResultCreate(sets=sets))
+        assert _table(await calculate_standings(session)) == before
+        await session.rollback()
@@ -11,6 +11,7 @@ export function useMatches(params?: {
   status?: MatchStatus;
   date_from?: string;
   date_to?: string;
+  team_id?: string;
 }) {
   return useQuery({
     queryKey: ["matches", params],
@@ -16,6 +16,7 @@ export type ApiTeam = {
     name: string;
     role: "main" | "reserve";
   }>;
+  rating?: number | null;
 };
 
 export type ApiMatchSet = {
@@ -53,6 +54,9 @@ export type ApiTeamStanding = {
   set_diff: number;
   game_diff: number;
   position: number;
+  rating?: number | null;
+  best_position?: number | null;
+  worst_position?: number | null;
 };
 
 export type ApiToken = {
@@ -171,12 +175,14 @@ export const publicApi = {
     status?: "scheduled" | "in_progress" | "played" | "cancelled";
     date_from?: string;
     date_to?: string;
+    team_id?: string;
   }): Promise<ApiMatch[]> => {
     const searchParams = new URLSearchParams();
     if (params?.group) searchParams.append("group", params.group);
     if (params?.status) searchParams.append("status", params.status);
     if (params?.date_from) searchParams.append("date_from", params.date_from);
     if (params?.date_to) searchParams.append("date_to", params.date_to);
+    if (params?.team_id) searchParams.append("team_id", params.team_id);
     
     const query = searchParams.toString();
     return apiRequest<ApiMatch[]>(`/api/v1/public/matches/${query ? `?${query}` : ""}`);
@@ -202,6 +208,30 @@ export const publicApi = {
   getTeamStanding: async (teamId: string): Promise<ApiTeamStanding> => {
     return apiRequest<ApiTeamStanding>(`/api/v1/public/standings/teams/${teamId}`);
   },
+
+  // Get standings as if the given results of scheduled matches were entered
+  getWhatIfStandings: async (
+    results: Array<{
+      match_id: string;
+      sets: Array<{
+        set_number: number;
+        home_games: number;
+        away_games: number;
+      }>;
+    }>,
+    params?: { group?: "A" | "B" | "all" }
+  ): Promise<ApiTeamStanding[]> => {
+    const searchParams = new URLSearchParams();
+    if (params?.group && params.group !== "all") {
+      searchParams.append("group", params.group);
+    }
+
+    const query = searchParams.toString();
+    return apiRequest<ApiTeamStanding[]>(`/api/v1/public/standings/what-if${query ? `?${query}` : ""}`, {
+      method: "POST",
+      body: JSON.stringify({ results }),
+    });
+  },
 };
 
 // Admin API endpoints
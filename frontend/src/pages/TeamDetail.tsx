@@ -17,13 +17,9 @@ export default function TeamDetail() {
 
   const { data: team, isLoading: teamLoading, error: teamError } = useTeam(teamId);
   const { data: teamStanding, isLoading: standingLoading } = useTeamStanding(teamId);
-  const { data: allMatches = [], isLoading: matchesIsLoading, error: matchesError } = useMatches({ status: "played" });
+  const { data: teamMatches = [], isLoading: matchesIsLoading, error: matchesError } = useMatches({ status: "played", team_id: teamId });
   const { data: allTeams = [], isLoading: teamsIsLoading, error: teamsError } = useTeams();
 
-  const teamMatches = allMatches.filter(
-    (m) => (m.homeTeamId === teamId || m.awayTeamId === teamId)
-  );
-
   const getOpponentName = (match: Match) => {
     if (teamsError) {
       return "Greška pri učitavanju timova";